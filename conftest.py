@@ -1,6 +1,60 @@
 # coding: utf-8
 """Configurations for py.test runner"""
+import logging
+import os
 import pytest
+import shutil
+import sys
+import tempfile
+
+#: Same as :data:`robottelo.constants.FIXTURE_POOL_DIR_ENV`, not imported so
+#: unit test runs do not need the robottelo dependencies
+FIXTURE_POOL_DIR_ENV = 'ROBOTTELO_FIXTURE_POOL_DIR'
+
+
+def pytest_configure(config):
+    """Create the fixture pool directory shared by all workers.
+
+    The master process sets the environment variable before the xdist
+    workers are started so they inherit it.
+    """
+    if not hasattr(config, 'slaveinput') and not os.environ.get(
+            FIXTURE_POOL_DIR_ENV):
+        os.environ[FIXTURE_POOL_DIR_ENV] = config.fixture_pool_dir = (
+            tempfile.mkdtemp(prefix='robottelo_fixture_pool_'))
+
+
+def pytest_unconfigure(config):
+    """Close the shared ssh connections, log the prerequisites setup times
+    and delete the pooled fixtures once all workers finished.
+    """
+    ssh = sys.modules.get('robottelo.ssh')
+    if ssh is not None:
+        ssh.close_shared_connections()
+    factory = sys.modules.get('robottelo.cli.factory')
+    if factory is not None and factory.PREREQUISITE_TIMES:
+        logging.getLogger('robottelo').info(
+            'Prerequisites setup times:\n%s', factory.prerequisites_report())
+    if hasattr(config, 'slaveinput'):
+        return
+    pool_dir = os.environ.get(FIXTURE_POOL_DIR_ENV)
+    if not pool_dir or not os.path.isdir(pool_dir):
+        return
+    errors = []
+    if os.path.exists(os.path.join(pool_dir, 'manifest.json')):
+        from robottelo.config import settings
+        from robottelo.fixture_pool import FixturePool
+        # the xdist master does not run any test, so it did not read the
+        # settings the pooled entities are deleted with
+        if not settings.configured:
+            settings.configure()
+        errors = FixturePool(pool_dir).teardown()
+    if errors:
+        logging.getLogger('robottelo').warning(
+            '%s pooled fixtures could not be deleted, see the manifest on %s',
+            len(errors), pool_dir)
+    elif getattr(config, 'fixture_pool_dir', None) == pool_dir:
+        shutil.rmtree(pool_dir, ignore_errors=True)
 
 
 @pytest.fixture(scope="session")
@@ -11,3 +65,12 @@ def worker_id(request):
         return request.config.slaveinput['slaveid']
     else:
         return 'master'
+
+
+@pytest.fixture(scope="session")
+def pooled_fixture():
+    """Pool of expensive entities shared by all the session workers, see
+    :class:`robottelo.fixture_pool.FixturePool`.
+    """
+    from robottelo.fixture_pool import session_pool
+    return session_pool()
@@ -0,0 +1,239 @@
+"""Create an entity and all the entities it depends on, concurrently.
+
+The dependencies between the ``nailgun.entities`` classes (the same ones
+``scripts/graph_entities.py`` draws) are followed from a target entity type
+to find which entities must be created first. Independent entities are
+created at the same time, so building deep fixtures takes as long as the
+slowest branch of the graph and not the sum of all of them::
+
+    plan = EntityPlan('Host', include=HOST_FIXTURE)
+    graph = plan.build()
+    host = graph['Host']
+    host.hostgroup.id == graph['HostGroup'].id
+
+Only the required relations are followed by default, ``include`` names the
+optional ones to follow too. Each entity type appears once on the graph and
+every relation to an already created type points to it, so e.g. the domain,
+subnet and host group of a host all belong to the same organization.
+
+Entities are created by nailgun, hence they share the pooled HTTP sessions of
+:mod:`robottelo.sessions` when the ``pooled_http_sessions`` setting is on.
+
+"""
+import inspect
+import six
+
+from nailgun import entities, entity_mixins
+from robottelo.executor import Recipe, RecipeError
+
+#: Optional relations followed to build a host with a fully populated host
+#: group
+HOST_FIXTURE = {
+    'Host': ('hostgroup',),
+    'HostGroup': (
+        'architecture',
+        'domain',
+        'environment',
+        'medium',
+        'operatingsystem',
+        'ptable',
+        'subnet',
+    ),
+}
+
+
+class EntityPlanError(Exception):
+    """Indicates that an entity graph could not be planned or built."""
+
+
+def entity_classes():
+    """Return a dictionary mapping names to the creatable entity classes of
+    ``nailgun.entities``.
+
+    """
+    return dict(
+        (name, klass)
+        for name, klass in inspect.getmembers(entities, inspect.isclass)
+        if issubclass(klass, entity_mixins.Entity) and
+        issubclass(klass, entity_mixins.EntityCreateMixin)
+    )
+
+
+def relations(entity_cls, server_config=None):
+    """Return the relations of an entity class.
+
+    :returns: A dictionary mapping each relation field name to a tuple with
+        the related entity class name, whether the relation is one-to-many
+        and whether it is required.
+
+    """
+    result = {}
+    for name, field in entity_cls(server_config).get_fields().items():
+        if not isinstance(
+                field,
+                (entity_mixins.OneToOneField, entity_mixins.OneToManyField)):
+            continue
+        related = field.entity
+        if not isinstance(related, six.string_types):
+            related = related.__name__
+        result[name] = (
+            related,
+            isinstance(field, entity_mixins.OneToManyField),
+            field.required,
+        )
+    return result
+
+
+class EntityPlan(object):
+    """Plan the creation of an entity and of the entities it depends on.
+
+    :param target: Name of the ``nailgun.entities`` class to create.
+    :param include: A dictionary mapping entity names to the optional
+        relation fields which must be followed too, e.g.
+        :data:`HOST_FIXTURE`.
+    :param values: A dictionary mapping entity names to the field values
+        given to them. Relations given a value are not followed.
+    :param server_config: A ``nailgun.config.ServerConfig``, defaults to
+        nailgun's default one.
+    :param max_workers: Maximum number of entities created at the same time.
+    :raises robottelo.api.planner.EntityPlanError: If an entity is unknown
+        or the followed relations have a cycle.
+
+    """
+    def __init__(self, target, include=None, values=None, server_config=None,
+                 max_workers=None):
+        self.target = target
+        self.include = include or {}
+        self.values = values or {}
+        self.server_config = server_config
+        self.max_workers = max_workers
+        self._classes = entity_classes()
+        self._relations = {}
+        self.requires = {}
+        self._walk(target)
+        self._add_links()
+        self.levels = self._topological_levels()
+
+    def _get_relations(self, name):
+        """Return the cached relations of entity ``name``."""
+        if name not in self._relations:
+            if name not in self._classes:
+                raise EntityPlanError(
+                    u'Unknown or not creatable entity "{0}"'.format(name))
+            self._relations[name] = relations(
+                self._classes[name], self.server_config)
+        return self._relations[name]
+
+    def _walk(self, name):
+        """Find the entities ``name`` depends on, recursively."""
+        if name in self.requires:
+            return
+        self.requires[name] = set()
+        given = self.values.get(name, {})
+        for field_name, (related, _, required) in sorted(
+                self._get_relations(name).items()):
+            if field_name in given or related == name:
+                continue
+            if required or field_name in self.include.get(name, ()):
+                self.requires[name].add(related)
+                self._walk(related)
+
+    def _depends_on(self, name, other):
+        """Tell whether ``name`` depends on ``other``, even indirectly."""
+        stack = [name]
+        seen = set()
+        while stack:
+            current = stack.pop()
+            if current == other:
+                return True
+            if current not in seen:
+                seen.add(current)
+                stack.extend(self.requires[current])
+        return False
+
+    def _add_links(self):
+        """Make entities depend on the other planned entities they relate
+        to, so those relations are set when they are created.
+
+        Links which would make a cycle are dropped. Links to the entities
+        most other entities relate to, like organizations and locations, are
+        added first so they win over the links in the opposite direction.
+
+        """
+        links = [
+            (name, related)
+            for name in self.requires
+            for field_name, (related, _, _) in self._get_relations(
+                name).items()
+            if related in self.requires and related != name and
+            field_name not in self.values.get(name, {})
+        ]
+        referrers = dict((name, 0) for name in self.requires)
+        for _, related in set(links):
+            referrers[related] += 1
+        links = sorted(
+            (-referrers[related], name, related)
+            for name, related in set(links)
+        )
+        for _, name, related in links:
+            if not self._depends_on(related, name):
+                self.requires[name].add(related)
+
+    def _topological_levels(self):
+        """Group the planned entities in levels, each level depending only
+        on the previous ones.
+
+        """
+        levels = []
+        done = set()
+        pending = set(self.requires)
+        while pending:
+            level = sorted(
+                name for name in pending if self.requires[name] <= done)
+            if not level:
+                raise EntityPlanError(
+                    u'Dependency cycle between {0}'.format(
+                        u', '.join(sorted(pending))))
+            levels.append(level)
+            done.update(level)
+            pending.difference_update(level)
+        return levels
+
+    def _create(self, name, created):
+        """Create entity ``name``, linking it to the ``created`` entities it
+        requires.
+
+        """
+        kwargs = dict(self.values.get(name, {}))
+        for field_name, (related, many, _) in self._get_relations(
+                name).items():
+            if field_name in kwargs or related not in created:
+                continue
+            kwargs[field_name] = (
+                [created[related]] if many else created[related])
+        return self._classes[name](self.server_config, **kwargs).create()
+
+    def build(self):
+        """Create the planned entities, as concurrently as possible.
+
+        :returns: A dictionary mapping each planned entity name to the
+            created entity.
+        :raises robottelo.api.planner.EntityPlanError: If any entity could
+            not be created.
+
+        """
+        recipe = Recipe(
+            u'{0} entity graph'.format(self.target), self.max_workers)
+        for level in self.levels:
+            for name in level:
+                recipe.add(
+                    name,
+                    lambda _name=name, **created: self._create(
+                        _name, created),
+                    requires=sorted(self.requires[name]),
+                )
+        try:
+            results = recipe.run()
+        except RecipeError as err:
+            raise EntityPlanError(u'{0}'.format(err))
+        return results
@@ -1,16 +1,112 @@
 # -*- encoding: utf-8 -*-
 """Module containing convenience functions for working with the API."""
-import time
-
 from inflector import Inflector
 from nailgun import entities
-from robottelo.decorators import bz_bug_is_open
+from robottelo.executor import run_bulk
+from robottelo.wait import wait_for
+
+
+#: Page size of the repository search resolving the enabled repository ids
+REPOSITORIES_PER_PAGE = 1000
+
+
+def _run_all(func, items, max_workers=None):
+    """Call ``func`` on every item concurrently.
+
+    :returns: The results, in the same order as ``items``.
+    :raises: The exception raised for the first failing item, if any.
+
+    """
+    result = run_bulk(func, items, max_workers)
+    if result.errors:
+        raise result.errors[min(result.errors)]
+    return result.succeeded
+
+
+def enable_rhrepos_and_fetch_ids(org_id, specs, max_workers=None):
+    """Enable several RedHat repositories and fetch their ids.
+
+    Each product and repository set is looked up only once, the repositories
+    are enabled concurrently and all their ids are resolved with a single
+    repository search, which is repeated until all the enabled repositories
+    show up.
+
+    Usage::
+
+        repo_ids = enable_rhrepos_and_fetch_ids(org.id, [
+            {
+                'basearch': 'x86_64',
+                'product': PRDS['rhel'],
+                'repo': REPOS['rhst7']['name'],
+                'reposet': REPOSET['rhst7'],
+                'releasever': None,
+            },
+            ...
+        ])
+
+    :param str org_id: The organization Id.
+    :param specs: A list of dictionaries with the ``basearch``, ``product``,
+        ``repo``, ``reposet`` and ``releasever`` keys, as described on
+        :func:`enable_rhrepo_and_fetchid`.
+    :param max_workers: Maximum number of concurrent requests.
+    :return: The repository Ids, in the same order as ``specs``.
+    :rtype: list
+
+    """
+    product_names = sorted(set(spec['product'] for spec in specs))
+    products = dict(zip(product_names, _run_all(
+        lambda name: entities.Product(
+            name=name, organization=org_id).search()[0],
+        product_names,
+        max_workers
+    )))
+    reposet_keys = sorted(
+        set((spec['product'], spec['reposet']) for spec in specs))
+    reposets = dict(zip(reposet_keys, _run_all(
+        lambda key: entities.RepositorySet(
+            name=key[1], product=products[key[0]]).search()[0],
+        reposet_keys,
+        max_workers
+    )))
+
+    def enable(spec):
+        """Enable a single repository."""
+        payload = {}
+        if spec.get('basearch') is not None:
+            payload['basearch'] = spec['basearch']
+        if spec.get('releasever') is not None:
+            payload['releasever'] = spec['releasever']
+        reposets[(spec['product'], spec['reposet'])].enable(data=payload)
+
+    _run_all(enable, specs, max_workers)
+    names = set(spec['repo'] for spec in specs)
+
+    def search():
+        """Search the enabled repositories, return them once all are
+        found (see BZ 1252101).
+        """
+        found = dict(
+            (repo.name, repo.id)
+            for repo in entities.Repository().search(query={
+                'organization_id': org_id,
+                'per_page': REPOSITORIES_PER_PAGE,
+            })
+            if repo.name in names
+        )
+        return found if len(found) == len(names) else None
+
+    repo_ids = wait_for(
+        search, timeout=25, name=u'repositories of org {0}'.format(org_id))
+    return [repo_ids[spec['repo']] for spec in specs]
 
 
 def enable_rhrepo_and_fetchid(basearch, org_id, product, repo,
                               reposet, releasever):
     """Enable a RedHat Repository and fetches it's Id.
 
+    See :func:`enable_rhrepos_and_fetch_ids` to enable several repositories
+    at once.
+
     :param str org_id: The organization Id.
     :param str product: The product name in which repository exists.
     :param str reposet: The reposet name in which repository exists.
@@ -21,24 +117,13 @@ def enable_rhrepo_and_fetchid(basearch, org_id, product, repo,
     :rtype: str
 
     """
-    product = entities.Product(name=product, organization=org_id).search()[0]
-    r_set = entities.RepositorySet(name=reposet, product=product).search()[0]
-    payload = {}
-    if basearch is not None:
-        payload['basearch'] = basearch
-    if releasever is not None:
-        payload['releasever'] = releasever
-    r_set.enable(data=payload)
-    result = entities.Repository(name=repo).search(
-        query={'organization_id': org_id})
-    if bz_bug_is_open(1252101):
-        for _ in range(5):
-            if len(result) > 0:
-                break
-            time.sleep(5)
-            result = entities.Repository(name=repo).search(
-                query={'organization_id': org_id})
-    return result[0].id
+    return enable_rhrepos_and_fetch_ids(org_id, [{
+        'basearch': basearch,
+        'product': product,
+        'releasever': releasever,
+        'repo': repo,
+        'reposet': reposet,
+    }])[0]
 
 
 def promote(content_view_version, environment_id, force=False):
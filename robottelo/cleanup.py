@@ -1,10 +1,15 @@
 # -*- encoding: utf-8 -*-
 """Cleanup module for different entities"""
 import logging
+import six
+import time
+
 from collections import deque, defaultdict
 from nailgun import entities, signals
 from robottelo.cli.proxy import Proxy
 from robottelo.constants import DEFAULT_ORG_ID
+from robottelo.executor import run_bulk
+from robottelo.wait import WaitTimeoutError, wait_for
 
 
 LOGGER = logging.getLogger(__name__)
@@ -25,14 +30,74 @@ def org_cleanup(org_id=None):
     entities.Organization(id=org_id).delete()
 
 
+#: Number of entities updated or deleted at the same time
+CLEANUP_WORKERS = 8
+
+#: Page size of the bulk host search, large enough to get all the hosts of
+#: the organizations being deleted in a single request
+HOSTS_PER_PAGE = 10000
+
+#: Seconds to wait for the asynchronous deletion tasks
+TASK_TIMEOUT = 600
+
+#: Foreman task states which mean the task is not running anymore
+TASK_FINISHED_STATES = ('stopped', 'paused')
+
+
+class CleanupReport(object):
+    """What an :class:`EntitiesCleaner` cleaned and failed to clean.
+
+    Each attribute maps an entity type name to a dictionary mapping the
+    entity id to a description of what happened.
+
+    """
+    def __init__(self):
+        self.cleaned = defaultdict(dict)
+        self.failed = defaultdict(dict)
+        self.skipped = defaultdict(dict)
+        self.elapsed = 0.0
+
+    @staticmethod
+    def _count(outcomes):
+        """Count the entities on an outcome dictionary."""
+        return sum(len(ids) for ids in outcomes.values())
+
+    def __str__(self):
+        lines = [
+            u'Cleanup took {0:.1f}s: {1} cleaned, {2} failed, {3} skipped'
+            .format(
+                self.elapsed,
+                self._count(self.cleaned),
+                self._count(self.failed),
+                self._count(self.skipped),
+            )
+        ]
+        for label, outcomes in (
+                (u'failed', self.failed), (u'skipped', self.skipped)):
+            for entity_type in sorted(outcomes):
+                for entity_id, reason in sorted(
+                        outcomes[entity_type].items()):
+                    lines.append(u'  {0} {1} {2}: {3}'.format(
+                        label, entity_type, entity_id, reason))
+        return u'\n'.join(lines)
+
+
 class EntitiesCleaner(object):
-    """Register and clean entities for cleanup using signals"""
+    """Register and clean entities for cleanup using signals
+
+    Entities are cleaned in dependency order: hosts and host groups are moved
+    to the default organization first, then organizations are deleted. Within
+    each step the entities are handled concurrently and asynchronous
+    deletions are waited for together.
+
+    """
 
     def __init__(self, *types_to_cleanup):
         self.cleanup_queue = defaultdict(deque)
         self.deleted_entities = defaultdict(set)
         self.types_to_cleanup = types_to_cleanup
         self.logger = logging.getLogger('robottelo')
+        self.report = CleanupReport()
         self.connect_cleanup_signals()
 
     def connect_cleanup_signals(self):
@@ -49,7 +114,13 @@ class EntitiesCleaner(object):
         self.cleanup_queue[entity.__class__.__name__].appendleft(entity)
 
     def clean(self):
-        """This method is called in TearDownClass only when cleanup=true"""
+        """This method is called in TearDownClass only when cleanup=true
+
+        :returns: A :class:`CleanupReport`.
+
+        """
+        start = time.time()
+        self.report = CleanupReport()
         default_org = entities.Organization(id=DEFAULT_ORG_ID)
         # reassign created hosts to default org
         self.update_entities(
@@ -70,42 +141,162 @@ class EntitiesCleaner(object):
             self.cleanup_queue.get(entities.Organization.__name__, []),
             synchronous=False
         )
+        self.report.elapsed = time.time() - start
+        self.logger.info(six.text_type(self.report))
+        return self.report
 
-        self.logger.debug(
-            'Cleanup deleted %s entities', len(self.deleted_entities))
+    def _hosts_by_org(self, org_ids):
+        """Count the hosts of each organization with a single search.
+
+        :returns: A dictionary mapping organization ids to their number of
+            hosts, organizations without hosts are not included.
+
+        """
+        hosts = entities.Host().search(query={
+            'per_page': HOSTS_PER_PAGE,
+            'search': u'organization_id ^ ({0})'.format(
+                u','.join(six.text_type(org_id) for org_id in org_ids)),
+        })
+        counts = defaultdict(int)
+        for host in hosts:
+            counts[host.organization.id] += 1
+        return counts
+
+    def _wait_for_tasks(self, tasks):
+        """Wait for the deletion tasks to finish, checking all of them on
+        each poll.
+
+        :param tasks: A dictionary mapping task ids to the entity being
+            deleted.
+
+        """
+        states = {}
+
+        def all_finished():
+            """Search all tasks at once, tell whether they all finished."""
+            found = entities.ForemanTask().search(query={
+                'per_page': len(tasks),
+                'search': u'id ^ ({0})'.format(u','.join(tasks)),
+            })
+            for task in found:
+                states[task.id] = (task.state, task.result)
+            return all(
+                states.get(task_id, (None, None))[0] in TASK_FINISHED_STATES
+                for task_id in tasks
+            )
+
+        try:
+            wait_for(
+                all_finished,
+                timeout=TASK_TIMEOUT,
+                delay=1,
+                max_delay=10,
+                name='cleanup tasks',
+            )
+        except WaitTimeoutError:
+            self.logger.warning(
+                'Cleanup tasks did not finish in %ss', TASK_TIMEOUT)
+        for task_id, entity in tasks.items():
+            state, result = states.get(task_id, (None, None))
+            if state in TASK_FINISHED_STATES and result == 'success':
+                self._mark_cleaned(entity, u'deleted')
+            else:
+                self._mark_failed(entity, u'task {0} {1} ({2})'.format(
+                    task_id, state, result))
+
+    def _mark_cleaned(self, entity, action):
+        """Record a cleaned entity on the report."""
+        entity_type = entity.__class__.__name__
+        self.report.cleaned[entity_type][entity.id] = action
+        if action == u'deleted':
+            self.deleted_entities[entity_type].add(entity.id)
+
+    def _mark_failed(self, entity, reason):
+        """Record an entity which could not be cleaned on the report."""
+        self.logger.warning(
+            'Error cleaning %s %s: %s',
+            entity.__class__.__name__, entity.id, reason)
+        self.report.failed[entity.__class__.__name__][entity.id] = reason
 
     def delete_entities(self, entity_list, **kwargs):
+        """Delete the entities concurrently.
+
+        Organizations which still have hosts are skipped. Asynchronous
+        deletions (``synchronous=False``) are submitted first and their tasks
+        are then waited for together.
+
+        :param entity_list: The entities to delete.
+        :param kwargs: Arguments passed to each entity ``delete`` method.
+
+        """
         self.logger.debug(
             'Cleanup got %s entities to delete', len(entity_list))
+        # skip already deleted entities
+        entity_list = [
+            entity for entity in entity_list
+            if entity.id not in
+            self.deleted_entities[entity.__class__.__name__]
+        ]
+        org_ids = [
+            entity.id for entity in entity_list
+            if isinstance(entity, entities.Organization)
+        ]
+        hosts_by_org = {}
+        if org_ids:
+            try:
+                hosts_by_org = self._hosts_by_org(org_ids)
+            except Exception as err:  # pylint:disable=broad-except
+                for entity in entity_list:
+                    self._mark_failed(
+                        entity, u'host search failed: {0}'.format(err))
+                return
+        to_delete = []
         for entity in entity_list:
-            entity_type = entity.__class__.__name__
-            if entity.id in self.deleted_entities[entity_type]:
-                # skip already deleted entities
+            if isinstance(entity, entities.Organization) and hosts_by_org.get(
+                    entity.id):
+                # Do not delete organizations with hosts
+                self.logger.debug(
+                    'Org %s can\'t be deleted as it has %s hosts',
+                    entity.id,
+                    hosts_by_org[entity.id]
+                )
+                self.report.skipped[entity.__class__.__name__][entity.id] = (
+                    u'has {0} hosts'.format(hosts_by_org[entity.id]))
                 continue
-            try:
-                if isinstance(entity, entities.Organization):
-                    query = {'search': 'organization_id={0}'.format(entity.id)}
-                    org_hosts = entities.Host().search(query=query)
-                    if org_hosts:  # Do not delete organizations with hosts
-                        self.logger.debug(
-                            'Org %s can\'t be deleted as it has %s hosts',
-                            entity.id,
-                            len(org_hosts)
-                        )
-                        return
-                entity.delete(**kwargs)
-            except Exception as e:
-                self.logger.warn('Error deleting entity %s', str(e))
+            to_delete.append(entity)
+        result = run_bulk(
+            lambda entity: entity.delete(**kwargs), to_delete, CLEANUP_WORKERS)
+        tasks = {}
+        for index, response in result.results.items():
+            entity = to_delete[index]
+            if isinstance(response, dict) and u'pending' in response:
+                tasks[response[u'id']] = entity
             else:
-                self.deleted_entities[entity_type].add(entity.id)
+                self._mark_cleaned(entity, u'deleted')
+        for index, err in result.errors.items():
+            self._mark_failed(to_delete[index], six.text_type(err))
+        if tasks:
+            self._wait_for_tasks(tasks)
 
     def update_entities(self, entity_list, **kwargs):
+        """Update the entities concurrently.
+
+        :param entity_list: The entities to update.
+        :param kwargs: The fields to update and their new values.
+
+        """
         self.logger.debug(
             'Cleanup got %s entities to update', len(entity_list))
-        for entity in entity_list:
-            try:
-                for key, value in kwargs.items():
-                    setattr(entity, key, value)
-                entity.update(fields=kwargs.keys())
-            except Exception as e:
-                self.logger.warn('Error updating entity %s', str(e))
+        entity_list = list(entity_list)
+
+        def update(entity):
+            """Update a single entity."""
+            for key, value in kwargs.items():
+                setattr(entity, key, value)
+            entity.update(fields=kwargs.keys())
+
+        result = run_bulk(update, entity_list, CLEANUP_WORKERS)
+        for index in result.results:
+            self._mark_cleaned(entity_list[index], u'updated')
+        for index, err in result.errors.items():
+            self._mark_failed(entity_list[index], six.text_type(err))
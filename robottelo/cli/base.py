@@ -1,6 +1,8 @@
 # -*- encoding: utf-8 -*-
 """Generic base class for cli hammer commands."""
 import logging
+import six
+import threading
 
 from robottelo import ssh
 from robottelo.cli import hammer
@@ -29,6 +31,44 @@ class CLIReturnCodeError(Exception):
         return self.msg
 
 
+#: Class attributes which CLI classes reassign on every command call
+THREAD_LOCAL_ATTRIBUTES = ('command_sub', 'command_requires_org')
+
+_thread_state = threading.local()
+
+
+def _thread_overrides():
+    """Return the attribute values assigned to CLI classes by this thread."""
+    if not hasattr(_thread_state, 'overrides'):
+        _thread_state.overrides = {}
+    return _thread_state.overrides
+
+
+class _BaseMeta(type):
+    """Metaclass keeping :data:`THREAD_LOCAL_ATTRIBUTES` per thread.
+
+    CLI methods assign ``cls.command_sub`` (and sometimes
+    ``cls.command_requires_org``) right before building the command. Storing
+    those assignments per thread lets the same CLI class be used by many
+    threads at once, e.g. by the concurrent factory helpers. Values defined on
+    the class body are used as defaults.
+
+    """
+    def __getattribute__(cls, name):
+        if name in THREAD_LOCAL_ATTRIBUTES:
+            overrides = _thread_overrides()
+            if (cls, name) in overrides:
+                return overrides[(cls, name)]
+        return super(_BaseMeta, cls).__getattribute__(name)
+
+    def __setattr__(cls, name, value):
+        if name in THREAD_LOCAL_ATTRIBUTES:
+            _thread_overrides()[(cls, name)] = value
+        else:
+            super(_BaseMeta, cls).__setattr__(name, value)
+
+
+@six.add_metaclass(_BaseMeta)
 class Base(object):
     """
     @param command_base: base command of hammer.
@@ -131,6 +171,35 @@ class Base(object):
             )
         return response.stdout
 
+    @classmethod
+    def _execute_async(cls, options=None, timeout=None):
+        """Execute the current ``command_sub`` with the ``--async`` flag.
+
+        Hammer returns as soon as the server accepts the request, instead of
+        holding the SSH channel until the Dynflow task finishes.
+
+        :param options: options of the command, ``async`` is added to a copy
+            of them.
+        :param timeout: SSH command timeout.
+        :returns: the ID of the task started by the server.
+        :raises robottelo.cli.base.CLIError: If hammer output does not contain
+            a task ID.
+        """
+        options = dict(options or {})
+        options[u'async'] = True
+        result = cls.execute(
+            cls._construct_command(options),
+            output_format='csv',
+            ignore_stderr=True,
+            timeout=timeout,
+        )
+        if not result or not result[0].get('id'):
+            raise CLIError(
+                u'Command "{0} {1}" did not return a task ID: {2}'
+                .format(cls.command_base, cls.command_sub, result)
+            )
+        return result[0]['id']
+
     @classmethod
     def add_operating_system(cls, options=None):
         """
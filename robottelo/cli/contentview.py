@@ -77,6 +77,16 @@ class ContentView(Base):
             timeout=timeout,
         )
 
+    @classmethod
+    def publish_async(cls, options):
+        """Starts publishing a new version of content-view without waiting
+        for it.
+
+        :returns: the ID of the publish task.
+        """
+        cls.command_sub = 'publish'
+        return cls._execute_async(options)
+
     @classmethod
     def version_info(cls, options):
         """Provides version info related to content-view's version."""
@@ -255,6 +265,16 @@ class ContentView(Base):
             ignore_stderr=True,
         )
 
+    @classmethod
+    def version_promote_async(cls, options):
+        """Starts promoting a content-view version to next env without
+        waiting for it.
+
+        :returns: the ID of the promotion task.
+        """
+        cls.command_sub = 'version promote'
+        return cls._execute_async(options)
+
     @classmethod
     def version_delete(cls, options):
         """Removes content-view version."""
@@ -8,7 +8,11 @@ import json
 import logging
 import os
 import random
+import six
+import sys
+import time
 
+from collections import defaultdict
 from fauxfactory import (
     gen_alphanumeric,
     gen_integer,
@@ -17,8 +21,10 @@ from fauxfactory import (
     gen_netmask,
     gen_string,
 )
+from nailgun import entities
 from os import chmod
-from robottelo import manifests, ssh
+from requests.exceptions import HTTPError
+from robottelo import manifests, ssh, wait
 from robottelo.cli.activationkey import ActivationKey
 from robottelo.cli.architecture import Architecture
 from robottelo.cli.base import CLIReturnCodeError
@@ -50,6 +56,7 @@ from robottelo.cli.syncplan import SyncPlan
 from robottelo.cli.template import Template
 from robottelo.cli.user import User
 from robottelo.cli.usergroup import UserGroup, UserGroupExternal
+from robottelo.config import settings
 from robottelo.constants import (
     DEFAULT_SUBSCRIPTION_NAME,
     DOCKER_0_EXTERNAL_REGISTRY,
@@ -60,10 +67,10 @@ from robottelo.constants import (
     TEMPLATE_TYPES,
 )
 from robottelo.decorators import bz_bug_is_open, cacheable
+from robottelo.executor import Recipe, RecipeError, run_bulk
 from robottelo.helpers import update_dictionary
 from robottelo.ssh import upload_file
 from tempfile import mkstemp
-from time import sleep
 
 logger = logging.getLogger(__name__)
 
@@ -111,6 +118,240 @@ def create_object(cli_object, options, values):
     return result
 
 
+def _entity_exists(cli_object):
+    """Return a function telling whether an entity created by ``cli_object``
+    still exists on the server.
+
+    Used as :func:`robottelo.decorators.cacheable` validator, so cached
+    entities removed by a test or a cleanup are created again.
+
+    """
+    def validate(entity):
+        """Run a cheap ``info`` on the cached entity."""
+        try:
+            return bool(cli_object.info({u'id': entity['id']}))
+        except CLIReturnCodeError:
+            return False
+    return validate
+
+
+def make_many(factory, count, options_fn=None, max_workers=None,
+              name_key=u'name'):
+    """Create ``count`` entities concurrently using a ``make_*`` factory.
+
+    Usage::
+
+        result = make_many(
+            make_product,
+            100,
+            lambda index: {u'organization-id': org['id']},
+        )
+        products = result.succeeded
+
+    :param factory: A ``make_*`` factory function.
+    :param int count: Number of entities to create.
+    :param options_fn: Callable receiving the item index (from ``0`` to
+        ``count - 1``) and returning the options for that item. If ``None``
+        the factory defaults are used.
+    :param max_workers: Maximum number of entities created at the same time.
+    :param name_key: Option holding the entity name, e.g. ``login`` for
+        :func:`make_user`. Items without it get a name made of a random
+        prefix, shared by the whole batch, and the item index, so names never
+        collide within the batch. Use ``None`` to leave names to the factory.
+    :raises robottelo.cli.factory.CLIFactoryError: If ``options_fn`` returns
+        the same name for more than one item.
+    :return: A :class:`robottelo.executor.BulkResult` whose results and
+        errors are keyed by item index.
+
+    """
+    prefix = gen_alphanumeric(8)
+    items = []
+    names = set()
+    for index in range(count):
+        options = dict(options_fn(index) if options_fn else {})
+        if name_key is not None:
+            if options.get(name_key) is None:
+                options[name_key] = u'{0}{1}'.format(prefix, index)
+            if options[name_key] in names:
+                raise CLIFactoryError(
+                    u'{0} "{1}" was given for more than one item'
+                    .format(name_key, options[name_key])
+                )
+            names.add(options[name_key])
+        items.append(options)
+    result = run_bulk(factory, items, max_workers)
+    logger.info(
+        u'%s created %s of %s entities (%.2f/s), latency percentiles: %s',
+        factory.__name__,
+        len(result.results),
+        count,
+        result.throughput,
+        result.latency_percentiles,
+    )
+    return result
+
+
+def _api_org(options):
+    """Create an organization through the API, CLI ``info`` shaped."""
+    org = entities.Organization(**options).create_json()
+    return {
+        u'description': org['description'],
+        u'id': six.text_type(org['id']),
+        u'label': org['label'],
+        u'name': org['name'],
+        u'title': org['title'],
+    }
+
+
+def _api_location(options):
+    """Create a location through the API, CLI ``info`` shaped."""
+    location = entities.Location(**options).create_json()
+    return {
+        u'description': location['description'],
+        u'id': six.text_type(location['id']),
+        u'name': location['name'],
+        u'title': location['title'],
+    }
+
+
+def _api_product(options):
+    """Create a product through the API, CLI ``info`` shaped."""
+    product = entities.Product(**options).create_json()
+    return {
+        u'description': product['description'],
+        u'id': six.text_type(product['id']),
+        u'label': product['label'],
+        u'name': product['name'],
+        u'organization': product['organization']['name'],
+    }
+
+
+def _api_lifecycle_environment(options):
+    """Create a lifecycle environment through the API, CLI ``info``
+    shaped.
+
+    """
+    options = dict(options)
+    prior = options.pop('prior', None)
+    if prior is not None:
+        options['prior'] = entities.LifecycleEnvironment(
+            organization=options['organization']
+        ).search(query={u'search': u'name="{0}"'.format(prior)})[0]
+    lce = entities.LifecycleEnvironment(**options).create_json()
+    return {
+        u'description': lce['description'],
+        u'id': six.text_type(lce['id']),
+        u'label': lce['label'],
+        u'name': lce['name'],
+        u'organization': lce['organization']['name'],
+        u'prior-lifecycle-environment': lce['prior']['name'],
+    }
+
+
+#: Factories which can create prerequisites through the API. Maps the CLI
+#: factory name to the API creator and to the CLI options it understands,
+#: which in turn map to the nailgun entity field names. Options not listed
+#: make the prerequisite fall back to hammer.
+API_PREREQUISITES = {
+    'make_lifecycle_environment': (_api_lifecycle_environment, {
+        u'description': 'description',
+        u'label': 'label',
+        u'name': 'name',
+        u'organization-id': 'organization',
+        u'prior': 'prior',
+    }),
+    'make_location': (_api_location, {
+        u'description': 'description',
+        u'name': 'name',
+    }),
+    'make_org': (_api_org, {
+        u'description': 'description',
+        u'label': 'label',
+        u'name': 'name',
+    }),
+    'make_product': (_api_product, {
+        u'description': 'description',
+        u'label': 'label',
+        u'name': 'name',
+        u'organization-id': 'organization',
+    }),
+}
+
+#: Prerequisite setup times, maps ``(module, channel)`` to a list of the
+#: seconds each prerequisite took to be created. ``channel`` is either
+#: ``api`` or ``cli``.
+PREREQUISITE_TIMES = defaultdict(list)
+
+
+def make_prerequisite(factory, options=None):
+    """Create an entity which is needed by a test but is not under test.
+
+    When the ``api_factory_prerequisites`` setting is enabled and the entity
+    can be created through the API (see :data:`API_PREREQUISITES`) it is
+    created with nailgun, which avoids the SSH connection, the hammer startup
+    and the follow-up ``info`` of the CLI factories. The returned dictionary
+    has the same shape as the one returned by ``factory``, so tests don't
+    notice the difference. Otherwise ``factory`` is called.
+
+    Usage::
+
+        org = make_prerequisite(make_org)
+        product = make_prerequisite(
+            make_product, {u'organization-id': org['id']})
+        # The entity under test is still created through hammer
+        repo = make_repository({u'product-id': product['id']})
+
+    Creation times are recorded per calling module, see
+    :func:`prerequisites_report`.
+
+    :param factory: A ``make_*`` factory function.
+    :param dict options: The options passed to ``factory``.
+    :return: A dictionary representing the newly created resource.
+
+    """
+    options = options or {}
+    # pylint:disable=protected-access
+    module = sys._getframe(1).f_globals.get('__name__', u'')
+    channel = u'cli'
+    creator, fields = API_PREREQUISITES.get(factory.__name__, (None, {}))
+    start = time.time()
+    if (settings.api_factory_prerequisites and creator is not None and
+            set(options).issubset(fields)):
+        channel = u'api'
+        try:
+            result = creator(dict(
+                (fields[key], value)
+                for key, value in options.items()
+                if value is not None
+            ))
+        except HTTPError as err:
+            raise CLIFactoryError(
+                u'Failed to create prerequisite through the API with {0}\n{1}'
+                .format(factory.__name__, err)
+            )
+    else:
+        result = factory(options)
+    PREREQUISITE_TIMES[(module, channel)].append(time.time() - start)
+    return result
+
+
+def prerequisites_report():
+    """Return a human readable report of the time spent creating
+    prerequisites per test module and channel.
+
+    Running the same modules with ``api_factory_prerequisites`` enabled and
+    disabled allows comparing the setup time of both channels.
+
+    """
+    lines = [u'{0:<60} {1:<4} {2:>6} {3:>10} {4:>8}'.format(
+        u'module', u'via', u'count', u'total (s)', u'mean (s)')]
+    for (module, channel), times in sorted(PREREQUISITE_TIMES.items()):
+        lines.append(u'{0:<60} {1:<4} {2:>6} {3:>10.2f} {4:>8.2f}'.format(
+            module, channel, len(times), sum(times),
+            sum(times) / len(times)))
+    return u'\n'.join(lines)
+
+
 @cacheable
 def make_activation_key(options=None):
     """
@@ -263,7 +504,7 @@ def make_container(options=None):
     return create_object(DockerContainer, args, options)
 
 
-@cacheable
+@cacheable(validate=_entity_exists(ContentView))
 def make_content_view(options=None):
     """
     Usage::
@@ -351,7 +592,7 @@ def make_gpg_key(options=None):
     return create_object(GPGKey, args, options)
 
 
-@cacheable
+@cacheable(validate=_entity_exists(Location))
 def make_location(options=None):
     """Location CLI factory
 
@@ -563,9 +804,8 @@ def make_product_wait(options=None, wait_for=5):
     This is a temporary workaround for BZ#1332650: Sometimes cli product
     create errors for no reason when there are multiple product creation
     requests at the sametime although the product entities are created.  This
-    workaround will attempt to wait for 5 seconds and query the
-    product again to make sure it is actually created.  If it is not found,
-    it will fail and stop.
+    workaround will poll the product for up to ``wait_for`` seconds to make
+    sure it is actually created.  If it is not found, it will fail and stop.
 
     Note: This wrapper method is created instead of patching make_product
     because this issue does not happen for all entities and this workaround
@@ -580,15 +820,18 @@ def make_product_wait(options=None, wait_for=5):
     except CLIFactoryError as err:
         if not bz_bug_is_open(1332650):
             raise err
-        sleep(wait_for)
         try:
-            product = Product.info({
-                'name': options.get('name'),
-                'organization-id': options.get('organization-id'),
-            })
-        except CLIReturnCodeError:
-            raise err
-        if not product:
+            product = wait.wait_for(
+                lambda: Product.info({
+                    'name': options.get('name'),
+                    'organization-id': options.get('organization-id'),
+                }),
+                timeout=wait_for,
+                delay=0.5,
+                exceptions=(CLIReturnCodeError,),
+                name=u'product {0}'.format(options['name']),
+            )
+        except wait.WaitTimeoutError:
             raise err
     return product
 
@@ -1256,7 +1499,7 @@ def make_compute_resource(options=None):
     return create_object(ComputeResource, args, options)
 
 
-@cacheable
+@cacheable(validate=_entity_exists(Org))
 def make_org(options=None):
     """
     Usage::
@@ -1752,6 +1995,153 @@ def activationkey_add_subscription_to_repo(options=None):
                 )
 
 
+def _add_org_and_env_steps(recipe, options):
+    """Add the ``org_id`` and ``env_id`` steps to a setup recipe.
+
+    Organization and lifecycle environment are created only if their IDs were
+    not given in ``options``.
+
+    """
+    if options.get('organization-id') is None:
+        recipe.add('org_id', lambda: make_org()['id'])
+    else:
+        recipe.add_value('org_id', options['organization-id'])
+    if options.get('lifecycle-environment-id') is None:
+        recipe.add(
+            'env_id',
+            lambda org_id: make_lifecycle_environment(
+                {u'organization-id': org_id})['id'],
+            requires=('org_id',)
+        )
+    else:
+        recipe.add_value('env_id', options['lifecycle-environment-id'])
+
+
+def _add_content_view_steps(recipe, options):
+    """Add the content view and activation key steps to a setup recipe.
+
+    Expects the recipe to already have the ``org_id``, ``env_id``,
+    ``repository`` and ``synchronize`` steps. Adds:
+
+    * ``cv_id``: create a content view if its ID was not given.
+    * ``add_repository``: add the repository to the content view.
+    * ``promote``: publish a new content view version and promote it to the
+      lifecycle environment.
+    * ``activationkey_id``: create an activation key (or update the given
+      one) associated with the content view.
+
+    """
+    if options.get('content-view-id') is None:
+        recipe.add(
+            'cv_id',
+            lambda org_id: make_content_view(
+                {u'organization-id': org_id})['id'],
+            requires=('org_id',)
+        )
+    else:
+        recipe.add_value('cv_id', options['content-view-id'])
+
+    def add_repository(cv_id, org_id, repository):
+        """Associate the repository with the content view."""
+        try:
+            ContentView.add_repository({
+                u'id': cv_id,
+                u'organization-id': org_id,
+                u'repository-id': repository['id'],
+            })
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to add repository to content view\n{0}'
+                .format(err.msg)
+            )
+    recipe.add(
+        'add_repository',
+        add_repository,
+        requires=('cv_id', 'org_id', 'repository')
+    )
+
+    def promote(cv_id, org_id, env_id, **kwargs):
+        """Publish a new version of the content view and promote it."""
+        try:
+            ContentView.publish({u'id': cv_id})
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to publish new version of content view\n{0}'
+                .format(err.msg)
+            )
+        # Get the version id
+        try:
+            cvv = ContentView.info({u'id': cv_id})['versions'][-1]
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to fetch content view info\n{0}'.format(err.msg))
+        # Promote version to next env
+        try:
+            ContentView.version_promote({
+                u'id': cvv['id'],
+                u'organization-id': org_id,
+                u'to-lifecycle-environment-id': env_id,
+            })
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to promote version to next environment\n{0}'
+                .format(err.msg)
+            )
+    # Publishing needs the synchronized content to be in the content view
+    recipe.add(
+        'promote',
+        promote,
+        requires=('cv_id', 'org_id', 'env_id', 'add_repository', 'synchronize')
+    )
+
+    def activation_key(cv_id, org_id, env_id, **kwargs):
+        """Create an activation key if needed and associate the content view
+        with it.
+
+        """
+        if options.get('activationkey-id') is None:
+            return make_activation_key({
+                u'content-view-id': cv_id,
+                u'lifecycle-environment-id': env_id,
+                u'organization-id': org_id,
+            })['id']
+        activationkey_id = options['activationkey-id']
+        # Given activation key may have no (or different) CV associated.
+        # Associate activation key with CV just to be sure
+        try:
+            ActivationKey.update({
+                u'content-view-id': cv_id,
+                u'id': activationkey_id,
+                u'organization-id': org_id,
+            })
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to associate activation-key with CV\n{0}'
+                .format(err.msg)
+            )
+        return activationkey_id
+    recipe.add(
+        'activationkey_id',
+        activation_key,
+        requires=('cv_id', 'org_id', 'env_id', 'promote')
+    )
+
+
+def _run_setup_recipe(recipe):
+    """Run a setup recipe converting its failures into ``CLIFactoryError``.
+
+    :return: A dictionary with the results of each recipe step.
+    :raises robottelo.cli.factory.CLIFactoryError: If any step fails. The
+        message includes the error of each failed step and the steps which
+        were not run.
+
+    """
+    try:
+        return recipe.run()
+    except RecipeError as err:
+        raise CLIFactoryError(six.text_type(err))
+
+
 def setup_org_for_a_custom_repo(options=None):
     """Sets up Org for the given custom repo by:
 
@@ -1766,6 +2156,10 @@ def setup_org_for_a_custom_repo(options=None):
         associates it with the content view.
     5. Adds the custom repo subscription to the activation key
 
+    Steps which do not depend on each other (e.g. the lifecycle environment,
+    the product and the content view creation) run concurrently, see
+    :class:`robottelo.executor.Recipe`.
+
     Options::
 
         url - URL to custom repository
@@ -1786,99 +2180,55 @@ def setup_org_for_a_custom_repo(options=None):
             not options or
             not options.get('url')):
         raise CLIFactoryError('Please provide valid custom repo URL.')
+    recipe = Recipe('setup_org_for_a_custom_repo')
     # Create new organization and lifecycle environment if needed
-    if options.get('organization-id') is None:
-        org_id = make_org()['id']
-    else:
-        org_id = options['organization-id']
-    if options.get('lifecycle-environment-id') is None:
-        env_id = make_lifecycle_environment({u'organization-id': org_id})['id']
-    else:
-        env_id = options['lifecycle-environment-id']
+    _add_org_and_env_steps(recipe, options)
     # Create custom product and repository
-    custom_product = make_product({u'organization-id': org_id})
-    custom_repo = make_repository({
-        u'content-type': 'yum',
-        u'product-id': custom_product['id'],
-        u'url': options.get('url'),
-    })
-    # Synchronize custom repository
-    try:
-        Repository.synchronize({'id': custom_repo['id']})
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to synchronize repository\n{0}'.format(err.msg))
-    # Create CV if needed and associate repo with it
-    if options.get('content-view-id') is None:
-        cv_id = make_content_view({u'organization-id': org_id})['id']
-    else:
-        cv_id = options['content-view-id']
-    try:
-        ContentView.add_repository({
-            u'id': cv_id,
-            u'organization-id': org_id,
-            u'repository-id': custom_repo['id'],
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to add repository to content view\n{0}'.format(err.msg))
-    # Publish a new version of CV
-    try:
-        ContentView.publish({u'id': cv_id})
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to publish new version of content view\n{0}'
-            .format(err.msg)
-        )
-    # Get the version id
-    cvv = ContentView.info({u'id': cv_id})['versions'][-1]
-    # Promote version to next env
-    try:
-        ContentView.version_promote({
-            u'id': cvv['id'],
-            u'organization-id': org_id,
-            u'to-lifecycle-environment-id': env_id,
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to promote version to next environment\n{0}'
-            .format(err.msg)
-        )
-    # Create activation key if needed and associate content view with it
-    if options.get('activationkey-id') is None:
-        activationkey_id = make_activation_key({
-            u'content-view-id': cv_id,
-            u'lifecycle-environment-id': env_id,
-            u'organization-id': org_id,
-        })['id']
-    else:
-        activationkey_id = options['activationkey-id']
-        # Given activation key may have no (or different) CV associated.
-        # Associate activation key with CV just to be sure
+    recipe.add(
+        'product',
+        lambda org_id: make_product({u'organization-id': org_id}),
+        requires=('org_id',)
+    )
+    recipe.add(
+        'repository',
+        lambda product: make_repository({
+            u'content-type': 'yum',
+            u'product-id': product['id'],
+            u'url': options.get('url'),
+        }),
+        requires=('product',)
+    )
+
+    def synchronize(repository):
+        """Synchronize custom repository."""
         try:
-            ActivationKey.update({
-                u'content-view-id': cv_id,
-                u'id': activationkey_id,
-                u'organization-id': org_id,
-            })
+            Repository.synchronize({'id': repository['id']})
         except CLIReturnCodeError as err:
             raise CLIFactoryError(
-                u'Failed to associate activation-key with CV\n{0}'
-                .format(err.msg)
-            )
+                u'Failed to synchronize repository\n{0}'.format(err.msg))
+    recipe.add('synchronize', synchronize, requires=('repository',))
+    # Create CV if needed, associate repo with it, publish and promote it,
+    # then create or update the activation key
+    _add_content_view_steps(recipe, options)
     # Add subscription to activation-key
-    activationkey_add_subscription_to_repo({
-        u'activationkey-id': activationkey_id,
-        u'organization-id': org_id,
-        u'subscription': custom_product['name'],
-    })
+    recipe.add(
+        'subscription',
+        lambda activationkey_id, org_id, product:
+        activationkey_add_subscription_to_repo({
+            u'activationkey-id': activationkey_id,
+            u'organization-id': org_id,
+            u'subscription': product['name'],
+        }),
+        requires=('activationkey_id', 'org_id', 'product')
+    )
+    results = _run_setup_recipe(recipe)
     return {
-        u'activationkey-id': activationkey_id,
-        u'content-view-id': cv_id,
-        u'lifecycle-environment-id': env_id,
-        u'organization-id': org_id,
-        u'product-id': custom_product['id'],
-        u'repository-id': custom_repo['id'],
+        u'activationkey-id': results['activationkey_id'],
+        u'content-view-id': results['cv_id'],
+        u'lifecycle-environment-id': results['env_id'],
+        u'organization-id': results['org_id'],
+        u'product-id': results['product']['id'],
+        u'repository-id': results['repository']['id'],
     }
 
 
@@ -1897,6 +2247,10 @@ def setup_org_for_a_rh_repo(options=None):
         associates it with the content view.
     6. Adds the RH repo subscription to the activation key
 
+    Steps which do not depend on each other (e.g. the manifest clone, the
+    lifecycle environment and the content view creation) run concurrently,
+    see :class:`robottelo.executor.Recipe`.
+
     Options::
 
         product - RH product name
@@ -1924,130 +2278,89 @@ def setup_org_for_a_rh_repo(options=None):
             not options.get('repository')):
         raise CLIFactoryError(
             'Please provide valid product, repository-set and repo.')
+    recipe = Recipe('setup_org_for_a_rh_repo')
     # Create new organization and lifecycle environment if needed
-    if options.get('organization-id') is None:
-        org_id = make_org()['id']
-    else:
-        org_id = options['organization-id']
-    if options.get('lifecycle-environment-id') is None:
-        env_id = make_lifecycle_environment({u'organization-id': org_id})['id']
-    else:
-        env_id = options['lifecycle-environment-id']
-    # Clone manifest and upload it
-    with manifests.clone() as manifest:
-        upload_file(manifest.content, manifest.filename)
-    try:
-        Subscription.upload({
-            u'file': manifest.filename,
-            u'organization-id': org_id,
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to upload manifest\n{0}'.format(err.msg))
-    # Enable repo from Repository Set
-    try:
-        RepositorySet.enable({
-            u'basearch': 'x86_64',
-            u'name': options['repository-set'],
-            u'organization-id': org_id,
-            u'product': options['product'],
-            u'releasever': options.get('releasever'),
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to enable repository set\n{0}'.format(err.msg))
-    # Fetch repository info
-    try:
-        rhel_repo = Repository.info({
-            u'name': options['repository'],
-            u'organization-id': org_id,
-            u'product': options['product'],
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to fetch repository info\n{0}'.format(err.msg))
-    # Synchronize the RH repository
-    try:
-        Repository.synchronize({
-            u'name': options['repository'],
-            u'organization-id': org_id,
-            u'product': options['product'],
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to synchronize repository\n{0}'.format(err.msg))
-    # Create CV if needed and associate repo with it
-    if options.get('content-view-id') is None:
-        cv_id = make_content_view({u'organization-id': org_id})['id']
-    else:
-        cv_id = options['content-view-id']
-    try:
-        ContentView.add_repository({
-            u'id': cv_id,
-            u'organization-id': org_id,
-            u'repository-id': rhel_repo['id'],
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to add repository to content view\n{0}'.format(err.msg))
-    # Publish a new version of CV
-    try:
-        ContentView.publish({u'id': cv_id})
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to publish new version of content view\n{0}'
-            .format(err.msg)
-        )
-    # Get the version id
-    try:
-        cvv = ContentView.info({u'id': cv_id})['versions'][-1]
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to fetch content view info\n{0}'.format(err.msg))
-    # Promote version1 to next env
-    try:
-        ContentView.version_promote({
-            u'id': cvv['id'],
-            u'organization-id': org_id,
-            u'to-lifecycle-environment-id': env_id,
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to promote version to next environment\n{0}'
-            .format(err.msg)
-        )
-    # Create activation key if needed and associate content view with it
-    if options.get('activationkey-id') is None:
-        activationkey_id = make_activation_key({
-            u'content-view-id': cv_id,
-            u'lifecycle-environment-id': env_id,
-            u'organization-id': org_id,
-        })['id']
-    else:
-        activationkey_id = options['activationkey-id']
-        # Given activation key may have no (or different) CV associated.
-        # Associate activation key with CV just to be sure
+    _add_org_and_env_steps(recipe, options)
+
+    def clone_manifest():
+        """Clone manifest and upload it to the server."""
+        with manifests.clone() as manifest:
+            upload_file(manifest.content, manifest.filename)
+        return manifest.filename
+    recipe.add('manifest', clone_manifest)
+
+    def upload_manifest(manifest, org_id):
+        """Upload the manifest to the organization."""
         try:
-            ActivationKey.update({
-                u'id': activationkey_id,
+            Subscription.upload({
+                u'file': manifest,
                 u'organization-id': org_id,
-                u'content-view-id': cv_id,
             })
         except CLIReturnCodeError as err:
             raise CLIFactoryError(
-                u'Failed to associate activation-key with CV\n{0}'
-                .format(err.msg)
-            )
+                u'Failed to upload manifest\n{0}'.format(err.msg))
+    recipe.add(
+        'upload_manifest', upload_manifest, requires=('manifest', 'org_id'))
+
+    def enable_repository(org_id, **kwargs):
+        """Enable repo from Repository Set and fetch repository info."""
+        try:
+            RepositorySet.enable({
+                u'basearch': 'x86_64',
+                u'name': options['repository-set'],
+                u'organization-id': org_id,
+                u'product': options['product'],
+                u'releasever': options.get('releasever'),
+            })
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to enable repository set\n{0}'.format(err.msg))
+        try:
+            return Repository.info({
+                u'name': options['repository'],
+                u'organization-id': org_id,
+                u'product': options['product'],
+            })
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to fetch repository info\n{0}'.format(err.msg))
+    recipe.add(
+        'repository',
+        enable_repository,
+        requires=('org_id', 'upload_manifest')
+    )
+
+    def synchronize(org_id, **kwargs):
+        """Synchronize the RH repository."""
+        try:
+            Repository.synchronize({
+                u'name': options['repository'],
+                u'organization-id': org_id,
+                u'product': options['product'],
+            })
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to synchronize repository\n{0}'.format(err.msg))
+    recipe.add('synchronize', synchronize, requires=('org_id', 'repository'))
+    # Create CV if needed, associate repo with it, publish and promote it,
+    # then create or update the activation key
+    _add_content_view_steps(recipe, options)
     # Add subscription to activation-key
-    activationkey_add_subscription_to_repo({
-        u'organization-id': org_id,
-        u'activationkey-id': activationkey_id,
-        u'subscription': DEFAULT_SUBSCRIPTION_NAME,
-    })
+    recipe.add(
+        'subscription',
+        lambda activationkey_id, org_id:
+        activationkey_add_subscription_to_repo({
+            u'organization-id': org_id,
+            u'activationkey-id': activationkey_id,
+            u'subscription': DEFAULT_SUBSCRIPTION_NAME,
+        }),
+        requires=('activationkey_id', 'org_id')
+    )
+    results = _run_setup_recipe(recipe)
     return {
-        u'activationkey-id': activationkey_id,
-        u'content-view-id': cv_id,
-        u'lifecycle-environment-id': env_id,
-        u'organization-id': org_id,
-        u'repository-id': rhel_repo['id'],
+        u'activationkey-id': results['activationkey_id'],
+        u'content-view-id': results['cv_id'],
+        u'lifecycle-environment-id': results['env_id'],
+        u'organization-id': results['org_id'],
+        u'repository-id': results['repository']['id'],
     }
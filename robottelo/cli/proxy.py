@@ -25,7 +25,7 @@ import logging
 from robottelo import ssh
 from robottelo.cli.base import Base
 from robottelo.config import settings
-from time import sleep
+from robottelo.wait import WaitTimeoutError, wait_for
 
 
 class SSHTunnelError(Exception):
@@ -45,7 +45,7 @@ def default_url_on_new_port(oldport, newport):
 
     """
     logger = logging.getLogger('robottelo')
-    command_timeout = 2
+    command_timeout = 15
     domain = settings.server.hostname
     user = settings.server.ssh_username
     key = settings.server.ssh_key
@@ -62,17 +62,33 @@ def default_url_on_new_port(oldport, newport):
         transport = connection.get_transport()
         channel = transport.open_session()
         channel.exec_command(command)
-        # if exit_status appears until command_timeout, throw error
-        for _ in range(command_timeout):
+
+        def tunnel_ready():
+            """Return whether the new port is listening, raise if the tunnel
+            command exited.
+            """
             if channel.exit_status_ready():
-                if channel.recv_exit_status() != 0:
-                    stderr = u''
-                    while channel.recv_stderr_ready():
-                        stderr += channel.recv_stderr(1)
-                    logger.debug('Tunnel failed: {0}'.format(stderr))
-                    # Something failed, so raise an exception.
-                    raise SSHTunnelError(stderr)
-            sleep(1)
+                stderr = u''
+                while channel.recv_stderr_ready():
+                    stderr += channel.recv_stderr(1)
+                logger.debug('Tunnel failed: {0}'.format(stderr))
+                # Something failed, so raise an exception.
+                raise SSHTunnelError(stderr)
+            return ssh.command(
+                u'ss -tln | grep -q ":{0} "'.format(newport)
+            ).return_code == 0
+
+        try:
+            wait_for(
+                tunnel_ready,
+                timeout=command_timeout,
+                delay=0.5,
+                name=u'tunnel on port {0}'.format(newport),
+            )
+        except WaitTimeoutError:
+            raise SSHTunnelError(
+                u'Port {0} not listening after {1}s'.format(
+                    newport, command_timeout))
         yield 'https://{0}:{1}'.format(domain, newport)
         ssh.command('rm -f /tmp/dsa_{0}'.format(newport))
 
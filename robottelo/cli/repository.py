@@ -75,6 +75,16 @@ class Repository(Base):
             return_raw_response=return_raw_response,
         )
 
+    @classmethod
+    def synchronize_async(cls, options):
+        """Starts a repository synchronization without waiting for it.
+
+        :returns: the ID of the synchronization task. Use
+            :meth:`robottelo.cli.task.Task.wait_for_tasks` to wait for it.
+        """
+        cls.command_sub = 'synchronize'
+        return cls._execute_async(options)
+
     @classmethod
     def upload_content(cls, options):
         """Upload content to repository."""
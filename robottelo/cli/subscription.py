@@ -42,6 +42,16 @@ class Subscription(Base):
             timeout=timeout,
         )
 
+    @classmethod
+    def upload_async(cls, options=None):
+        """Starts a subscription manifest upload without waiting for it.
+
+        :returns: the ID of the import task.
+        """
+        cls.command_sub = 'upload'
+        # The manifest file is still sent before hammer returns
+        return cls._execute_async(options, timeout=300)
+
     @classmethod
     def delete_manifest(cls, options=None):
         """Deletes a subscription manifest."""
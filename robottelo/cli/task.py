@@ -16,8 +16,65 @@ Subcommands::
     resume                        Resume all tasks paused in error state
 """
 
+import logging
+import time
+
+from datetime import datetime
 from robottelo.cli.base import Base
 
+LOGGER = logging.getLogger(__name__)
+
+#: Task states in which a task will not make any further progress
+TASK_FINISHED_STATES = ('stopped', 'paused')
+
+#: Timestamp formats used by ``hammer task list`` started/ended columns
+TASK_TIME_FORMATS = ('%Y/%m/%d %H:%M:%S', '%Y-%m-%d %H:%M:%S')
+
+
+def _parse_task_time(value):
+    """Parse a ``hammer task list`` timestamp, ``None`` if not possible."""
+    if not value:
+        return None
+    value = value.replace(' UTC', '').strip()
+    for time_format in TASK_TIME_FORMATS:
+        try:
+            return datetime.strptime(value, time_format)
+        except ValueError:
+            continue
+    return None
+
+
+class TaskOutcome(object):
+    """Outcome of a task tracked by :meth:`Task.wait_for_tasks`.
+
+    :param task_id: UUID of the task.
+    :param state: Last seen state of the task, e.g. ``stopped``.
+    :param result: Last seen result of the task, e.g. ``success``.
+    :param duration: Seconds the task took. Taken from the server timestamps
+        when available, otherwise measured from the start of the wait.
+    :param timed_out: ``True`` if the task did not finish before the wait
+        timed out.
+    """
+
+    def __init__(self, task_id, state=None, result=None, duration=None,
+                 timed_out=False):
+        self.task_id = task_id
+        self.state = state
+        self.result = result
+        self.duration = duration
+        self.timed_out = timed_out
+
+    @property
+    def succeeded(self):
+        """Whether the task has finished successfully."""
+        return self.state == 'stopped' and self.result == 'success'
+
+    def __repr__(self):
+        return (
+            '<TaskOutcome {0} state={1} result={2} duration={3}>'
+            .format(self.task_id, self.state, self.result, self.duration)
+        )
+
 
 class Task(Base):
     """
@@ -25,6 +82,76 @@ class Task(Base):
     """
     command_base = 'task'
 
+    @classmethod
+    def list_by_ids(cls, task_ids):
+        """List the tasks matching ``task_ids`` using a single hammer call.
+
+        :param task_ids: A list of task UUIDs.
+        :returns: A list of task dictionaries as returned by ``task list``.
+        """
+        if not task_ids:
+            return []
+        return cls.list({
+            u'search': u'id ^ ({0})'.format(u','.join(task_ids)),
+        })
+
+    @classmethod
+    def wait_for_tasks(cls, task_ids, timeout=3600, poll_interval=2,
+                       max_poll_interval=30, backoff=1.5):
+        """Wait for many tasks at once, polling them all together.
+
+        Every iteration runs a single ``hammer task list`` for all the tasks
+        still pending. The interval between polls grows by ``backoff`` (up to
+        ``max_poll_interval``) while no task finishes and goes back to
+        ``poll_interval`` as soon as one does.
+
+        :param task_ids: A list of task UUIDs, usually returned by the
+            ``*_async`` command methods.
+        :param timeout: Maximum number of seconds to wait for all tasks.
+        :param poll_interval: Initial number of seconds between polls.
+        :param max_poll_interval: Maximum number of seconds between polls.
+        :param backoff: Factor the interval grows by on idle polls.
+        :returns: A dictionary mapping each task ID to a :class:`TaskOutcome`.
+        """
+        start = time.time()
+        outcomes = dict(
+            (task_id, TaskOutcome(task_id)) for task_id in task_ids)
+        pending = set(outcomes)
+        interval = poll_interval
+        while pending:
+            finished = 0
+            for task in cls.list_by_ids(sorted(pending)):
+                task_id = task.get('id')
+                if task_id not in pending:
+                    continue
+                outcome = outcomes[task_id]
+                outcome.state = task.get('state')
+                outcome.result = task.get('result')
+                if outcome.state not in TASK_FINISHED_STATES:
+                    continue
+                started = _parse_task_time(task.get('started-at'))
+                ended = _parse_task_time(task.get('ended-at'))
+                if started is not None and ended is not None:
+                    outcome.duration = (ended - started).total_seconds()
+                else:
+                    outcome.duration = time.time() - start
+                pending.remove(task_id)
+                finished += 1
+            if not pending:
+                break
+            remaining = timeout - (time.time() - start)
+            if remaining <= 0:
+                for task_id in pending:
+                    outcomes[task_id].timed_out = True
+                LOGGER.warning(
+                    'Timed out waiting for tasks: %s', ', '.join(pending))
+                break
+            if finished:
+                interval = poll_interval
+            time.sleep(min(interval, remaining))
+            interval = min(interval * backoff, max_poll_interval)
+        return outcomes
+
     @classmethod
     def progress(cls, options=None):
         """Shows a task progress
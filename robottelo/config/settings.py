@@ -7,6 +7,7 @@ from logging import config
 from nailgun import entities, entity_mixins
 from nailgun.config import ServerConfig
 from robottelo.config import casts
+from robottelo.sessions import DEFAULT_POOL_SIZE, install_nailgun_sessions
 from six.moves.urllib.parse import urlunsplit, urljoin
 from six.moves.configparser import (
     NoOptionError,
@@ -417,6 +418,21 @@ class PerformanceSettings(FeatureSettings):
         self.sync_count = None
         self.sync_type = None
         self.repos = None
+        self.metrics_port = None
+        self.metrics_snapshot = None
+        self.resource_sample_interval = None
+        self.server_logs = None
+        self.latency_histograms = None
+        self.adaptive_ci_width = None
+        self.adaptive_percentile = None
+        self.sweep_mode = None
+        self.sweep_step = None
+        self.sweep_iterations = None
+        self.sweep_plateau = None
+        self.sweep_latency_factor = None
+        self.agents = None
+        self.agent_port = None
+        self.agent_directory = None
 
     def read(self, reader):
         """Read performance settings."""
@@ -438,6 +454,36 @@ class PerformanceSettings(FeatureSettings):
             'performance', 'sync_type', 'sync')
         self.repos = reader.get(
             'performance', 'repos', cast=list)
+        self.metrics_port = reader.get(
+            'performance', 'metrics_port', cast=int)
+        self.metrics_snapshot = reader.get(
+            'performance', 'metrics_snapshot')
+        self.resource_sample_interval = reader.get(
+            'performance', 'resource_sample_interval', 5, int)
+        self.server_logs = reader.get(
+            'performance', 'server_logs', False, bool)
+        self.latency_histograms = reader.get(
+            'performance', 'latency_histograms', False, bool)
+        self.adaptive_ci_width = reader.get(
+            'performance', 'adaptive_ci_width', cast=float)
+        self.adaptive_percentile = reader.get(
+            'performance', 'adaptive_percentile', 95, float)
+        self.sweep_mode = reader.get(
+            'performance', 'sweep_mode', 'linear')
+        self.sweep_step = reader.get(
+            'performance', 'sweep_step', cast=float)
+        self.sweep_iterations = reader.get(
+            'performance', 'sweep_iterations', 20, int)
+        self.sweep_plateau = reader.get(
+            'performance', 'sweep_plateau', 0.05, float)
+        self.sweep_latency_factor = reader.get(
+            'performance', 'sweep_latency_factor', 2.0, float)
+        self.agents = reader.get(
+            'performance', 'agents', cast=list)
+        self.agent_port = reader.get(
+            'performance', 'agent_port', 5050, int)
+        self.agent_directory = reader.get(
+            'performance', 'agent_directory')
 
     def validate(self):
         """Validate performance settings."""
@@ -454,6 +500,9 @@ class PerformanceSettings(FeatureSettings):
         if self.enabled_repos_savepoint is None:
             validation_errors.append(
                 '[performance] enabled_repos_savepoint must be provided.')
+        if self.sweep_mode not in ('linear', 'geometric'):
+            validation_errors.append(
+                '[performance] sweep_mode must be linear or geometric.')
         return validation_errors
 
 
@@ -528,8 +577,11 @@ class Settings(object):
         self._all_features = None
         self._configured = False
         self._validation_errors = []
+        self.api_factory_prerequisites = None
         self.browser = None
+        self.http_pool_size = None
         self.locale = None
+        self.pooled_http_sessions = None
         self.project = None
         self.reader = None
         self.rhel6_repo = None
@@ -638,6 +690,12 @@ class Settings(object):
         self.run_one_datapoint = self.reader.get(
             'robottelo', 'run_one_datapoint', False, bool)
         self.cleanup = self.reader.get('robottelo', 'cleanup', False, bool)
+        self.api_factory_prerequisites = self.reader.get(
+            'robottelo', 'api_factory_prerequisites', False, bool)
+        self.pooled_http_sessions = self.reader.get(
+            'robottelo', 'pooled_http_sessions', False, bool)
+        self.http_pool_size = self.reader.get(
+            'robottelo', 'http_pool_size', DEFAULT_POOL_SIZE, int)
         self.upstream = self.reader.get('robottelo', 'upstream', True, bool)
         self.verbosity = self.reader.get(
             'robottelo',
@@ -713,6 +771,8 @@ class Settings(object):
         * Set ``entity_mixins.CREATE_MISSING`` to ``True``. This causes method
         ``EntityCreateMixin.create_raw`` to generate values for empty and
         required fields.
+        * Send NailGun's requests through the pooled sessions of
+        :mod:`robottelo.sessions` if ``pooled_http_sessions`` is set.
         * Set ``nailgun.entity_mixins.DEFAULT_SERVER_CONFIG`` to whatever is
         returned by :meth:`robottelo.helpers.get_nailgun_config`. See
         ``robottelo.entity_mixins.Entity`` for more information on the effects
@@ -724,6 +784,8 @@ class Settings(object):
         the configuration file.
         """
         entity_mixins.CREATE_MISSING = True
+        if self.pooled_http_sessions:
+            install_nailgun_sessions(self.http_pool_size)
         entity_mixins.DEFAULT_SERVER_CONFIG = ServerConfig(
             self.server.get_url(),
             self.server.get_credentials(),
@@ -890,3 +890,7 @@ STRING_TYPES = [
     u'alpha', u'numeric', u'alphanumeric',
     u'latin1', u'utf8', u'cjk', u'html'
 ]
+
+#: Environment variable holding the directory of the fixture pool of the
+#: current test session, see :mod:`robottelo.fixture_pool`
+FIXTURE_POOL_DIR_ENV = 'ROBOTTELO_FIXTURE_POOL_DIR'
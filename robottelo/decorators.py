@@ -4,8 +4,13 @@ import bugzilla
 import logging
 import pytest
 import requests
+import six
+import threading
+import time
 import unittest2
 
+from collections import OrderedDict
+from contextlib import contextmanager
 from functools import wraps
 from robottelo.config import settings
 from robottelo.constants import BZ_OPEN_STATUSES, NOT_IMPLEMENTED
@@ -14,7 +19,8 @@ from xml.parsers.expat import ExpatError, ErrorString
 
 BUGZILLA_URL = "https://bugzilla.redhat.com/xmlrpc.cgi"
 LOGGER = logging.getLogger(__name__)
-OBJECT_CACHE = {}
+OBJECT_CACHE_MAX_SIZE = 256
+OBJECT_CACHE_TTL = 3600
 REDMINE_URL = 'http://projects.theforeman.org'
 
 # Test Tier Decorators
@@ -150,8 +156,185 @@ def stubbed(reason=None):
     return wrapper
 
 
-def cacheable(func):
-    """Decorator that makes an optional object cache available"""
+def _normalize_options(options):
+    """Return a hashable representation of factory ``options``.
+
+    Options set to ``None`` are dropped since factories treat them as not
+    given, integers are converted to text since hammer receives every value
+    as text, and the order of dictionary keys is irrelevant.
+
+    """
+    if isinstance(options, dict):
+        return tuple(sorted(
+            (six.text_type(key), _normalize_options(value))
+            for key, value in options.items()
+            if value is not None
+        ))
+    if isinstance(options, (list, tuple, set)):
+        return tuple(_normalize_options(value) for value in options)
+    if isinstance(options, six.integer_types) and not isinstance(
+            options, bool):
+        return six.text_type(options)
+    return options
+
+
+class ObjectCache(object):
+    """Thread-safe LRU cache of objects created by factories.
+
+    :param max_size: Maximum number of cached objects. The least recently
+        used object is evicted when it is exceeded.
+    :param ttl: Seconds an object is kept in the cache, ``None`` to keep it
+        until evicted.
+
+    """
+    def __init__(self, max_size=OBJECT_CACHE_MAX_SIZE, ttl=OBJECT_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        # [lock, number of threads holding or waiting for it] of the keys
+        # being looked up, a key's entry is dropped once no thread uses it
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    @contextmanager
+    def _key_lock(self, key):
+        """Hold the lock serializing the creation of ``key``."""
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.RLock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[key]
+
+    def _lookup(self, key):
+        """Return ``(True, object)`` if ``key`` is cached and not expired,
+        ``(False, None)`` otherwise.
+
+        """
+        with self._lock:
+            if key not in self._entries:
+                return False, None
+            value, created = self._entries[key]
+            if self.ttl is not None and time.time() - created > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                return False, None
+            # Mark as the most recently used
+            del self._entries[key]
+            self._entries[key] = (value, created)
+            return True, value
+
+    def set(self, key, value):
+        """Cache ``value`` under ``key``, evicting the least recently used
+        objects if the cache is full.
+
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, time.time())
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def remove(self, key):
+        """Remove ``key`` from the cache if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove all cached objects and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+            self.expirations = self.stale = 0
+
+    def get_or_create(self, key, create, validate=None):
+        """Return the object cached under ``key``, creating it if needed.
+
+        Concurrent callers asking for the same key wait for the first one to
+        create the object instead of creating duplicates.
+
+        :param key: A hashable cache key.
+        :param create: Callable returning a new object.
+        :param validate: Optional callable receiving a cached object and
+            returning whether it can still be used, e.g. whether the entity
+            still exists on the server. Invalid objects are replaced.
+
+        """
+        with self._key_lock(key):
+            found, value = self._lookup(key)
+            if found and validate is not None and not validate(value):
+                LOGGER.debug('Cached object %s is stale, recreating it', key)
+                self.remove(key)
+                with self._lock:
+                    self.stale += 1
+                found = False
+            with self._lock:
+                if found:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+            if not found:
+                value = create()
+                self.set(key, value)
+            return value
+
+    def stats(self):
+        """Return a dictionary with the cache statistics."""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'stale': self.stale,
+            }
+
+
+OBJECT_CACHE = ObjectCache()
+
+
+def cacheable(func=None, validate=None):
+    """Decorator that makes an optional object cache available
+
+    Objects are cached in :data:`OBJECT_CACHE` under the factory name and the
+    given options, so calls with different options get different objects::
+
+        @cacheable
+        def make_foo(options=None):
+            ...
+
+        make_foo({'name': 'foo'}, cached=True)
+
+    :param validate: Optional callable receiving a cached object and returning
+        whether it can still be used. Use it with keyword argument syntax::
+
+            @cacheable(validate=lambda org: org_exists(org['id']))
+            def make_org(options=None):
+                ...
+
+    """
+    if func is None:
+        return lambda func: cacheable(func, validate=validate)
 
     @wraps(func)
     def cacheable_function(options=None, cached=False):
@@ -159,13 +342,14 @@ def cacheable(func):
         This is the function being returned.
         Requires input function's name start with 'make_'
         """
-        object_key = func.__name__.replace('make_', '')
-        if cached is True and object_key in OBJECT_CACHE:
-            return OBJECT_CACHE[object_key]
-        new_object = func(options)
-        if cached is True:
-            OBJECT_CACHE[object_key] = new_object
-        return new_object
+        if cached is not True:
+            return func(options)
+        object_key = (
+            func.__name__.replace('make_', ''),
+            _normalize_options(options or {}),
+        )
+        return OBJECT_CACHE.get_or_create(
+            object_key, lambda: func(options), validate)
 
     return cacheable_function
 
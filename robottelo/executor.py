@@ -0,0 +1,310 @@
+"""Utilities to run robottelo setup steps concurrently.
+
+A :class:`Recipe` is a small dependency graph of named steps. Each step is a
+callable which receives, as keyword arguments, the results of the steps it
+requires. Steps whose requirements are satisfied run concurrently on a
+bounded pool of worker threads::
+
+    recipe = Recipe('custom product')
+    recipe.add('org', make_org)
+    recipe.add(
+        'product',
+        lambda org: make_product({u'organization-id': org['id']}),
+        requires=('org',)
+    )
+    recipe.add(
+        'lifecycle_environment',
+        lambda org: make_lifecycle_environment(
+            {u'organization-id': org['id']}),
+        requires=('org',)
+    )
+    results = recipe.run()
+
+In the example above the product and the lifecycle environment are created at
+the same time, once the organization is available.
+
+:func:`run_bulk` fans a single callable out over many items on a bounded pool
+and reports partial success, throughput and latency percentiles.
+
+"""
+import logging
+import numpy
+import sys
+import time
+
+from multiprocessing.pool import ThreadPool
+from six.moves import queue
+
+LOGGER = logging.getLogger(__name__)
+
+#: Number of worker threads used when none is specified
+DEFAULT_MAX_WORKERS = 4
+
+
+class RecipeError(Exception):
+    """Indicates that a recipe could not be run until the end.
+
+    :param recipe_name: The name of the failed recipe.
+    :param failures: A dictionary mapping each failed step name to the
+        exception it raised.
+    :param skipped: Names of the steps which were not run because a step
+        they depend on failed.
+    :param timings: The :attr:`Recipe.timings` collected until the failure.
+
+    """
+    def __init__(self, recipe_name, failures, skipped, timings):
+        self.recipe_name = recipe_name
+        self.failures = failures
+        self.skipped = skipped
+        self.timings = timings
+        super(RecipeError, self).__init__(self.__str__())
+
+    def __str__(self):
+        lines = [u'Recipe "{0}" failed:'.format(self.recipe_name)]
+        for name, error in sorted(self.failures.items()):
+            lines.append(u'  step "{0}" raised {1}: {2}'.format(
+                name, type(error).__name__, error))
+        if self.skipped:
+            lines.append(u'  skipped steps: {0}'.format(
+                u', '.join(sorted(self.skipped))))
+        return u'\n'.join(lines)
+
+
+class StepTiming(object):
+    """Timing information of a recipe step.
+
+    :param start: Seconds between the recipe start and the step start.
+    :param duration: Seconds the step took to run.
+
+    """
+    def __init__(self, start, duration):
+        self.start = start
+        self.duration = duration
+
+    @property
+    def end(self):
+        """Seconds between the recipe start and the step end."""
+        return self.start + self.duration
+
+    def __repr__(self):
+        return '<StepTiming start={0:.3f} duration={1:.3f}>'.format(
+            self.start, self.duration)
+
+
+class Recipe(object):
+    """A set of named steps which depend on each other.
+
+    :param name: A name used on logs and errors.
+    :param max_workers: Maximum number of steps running at the same time.
+
+    """
+    def __init__(self, name, max_workers=None):
+        self.name = name
+        self.max_workers = max_workers or DEFAULT_MAX_WORKERS
+        self.results = {}
+        self.timings = {}
+        self._steps = {}
+        self._order = []
+
+    def add(self, name, func, requires=()):
+        """Add a step to the recipe.
+
+        :param str name: Step name, must be unique within the recipe and a
+            valid python identifier since it is used as keyword argument for
+            the dependent steps.
+        :param func: Callable run by the step. It is called with one keyword
+            argument per required step, holding that step result.
+        :param requires: Names of the steps which must finish before this one
+            starts.
+        :raises ValueError: If the name is already taken or a required step
+            is unknown.
+
+        """
+        if name in self._steps:
+            raise ValueError(
+                u'Step "{0}" already defined in recipe "{1}"'
+                .format(name, self.name)
+            )
+        for requirement in requires:
+            if requirement not in self._steps:
+                raise ValueError(
+                    u'Step "{0}" requires unknown step "{1}"'
+                    .format(name, requirement)
+                )
+        self._steps[name] = (func, tuple(requires))
+        self._order.append(name)
+
+    def add_value(self, name, value):
+        """Add a step which just provides ``value`` to its dependents.
+
+        Useful when an entity was given by the caller and does not need to be
+        created.
+
+        """
+        self.add(name, lambda: value)
+
+    def timing_report(self):
+        """Return a human readable timing breakdown of the last run."""
+        lines = [u'Recipe "{0}" timings:'.format(self.name)]
+        for name in sorted(self.timings, key=lambda n: self.timings[n].start):
+            timing = self.timings[name]
+            lines.append(u'  {0:<30} start {1:8.3f}s duration {2:8.3f}s'
+                         .format(name, timing.start, timing.duration))
+        if self.timings:
+            lines.append(u'  {0:<30} {1:8.3f}s'.format(
+                u'total', max(t.end for t in self.timings.values())))
+        return u'\n'.join(lines)
+
+    def _run_step(self, name, done):
+        """Run step ``name`` and report its outcome on the ``done`` queue."""
+        func, requires = self._steps[name]
+        kwargs = dict((req, self.results[req]) for req in requires)
+        step_start = time.time()
+        try:
+            result = func(**kwargs)
+        except Exception as err:  # pylint:disable=broad-except
+            LOGGER.debug(
+                'Recipe "%s" step "%s" failed', self.name, name,
+                exc_info=sys.exc_info()
+            )
+            done.put((name, False, err, step_start, time.time()))
+        else:
+            done.put((name, True, result, step_start, time.time()))
+
+    def run(self):
+        """Run all steps, as concurrently as their dependencies allow.
+
+        :returns: A dictionary mapping each step name to its result.
+        :raises RecipeError: If any step fails. Running steps are waited for,
+            but no new step is started after a failure.
+
+        """
+        self.results = {}
+        self.timings = {}
+        failures = {}
+        pending = list(self._order)
+        running = set()
+        done = queue.Queue()
+        started = time.time()
+        pool = ThreadPool(self.max_workers)
+        try:
+            while pending or running:
+                if not failures:
+                    ready = [
+                        name for name in pending
+                        if all(req in self.results
+                               for req in self._steps[name][1])
+                    ]
+                    for name in ready:
+                        pending.remove(name)
+                        running.add(name)
+                        pool.apply_async(self._run_step, (name, done))
+                if not running:
+                    break
+                name, success, value, step_start, step_end = done.get()
+                running.remove(name)
+                self.timings[name] = StepTiming(
+                    step_start - started, step_end - step_start)
+                if success:
+                    self.results[name] = value
+                else:
+                    failures[name] = value
+        finally:
+            pool.close()
+            pool.join()
+        LOGGER.debug(self.timing_report())
+        if failures:
+            raise RecipeError(self.name, failures, pending, self.timings)
+        return self.results
+
+
+class BulkResult(object):
+    """Outcome of :func:`run_bulk`.
+
+    :param results: A dictionary mapping the index of each successful item to
+        its result.
+    :param errors: A dictionary mapping the index of each failed item to the
+        exception it raised.
+    :param latencies: Seconds each item took, in completion order.
+    :param elapsed: Seconds the whole bulk operation took.
+
+    """
+    #: Latency percentiles reported by :attr:`latency_percentiles`
+    PERCENTILES = (50, 90, 95, 99)
+
+    def __init__(self, results, errors, latencies, elapsed):
+        self.results = results
+        self.errors = errors
+        self.latencies = latencies
+        self.elapsed = elapsed
+
+    @property
+    def succeeded(self):
+        """List of the successful results, sorted by item index."""
+        return [self.results[index] for index in sorted(self.results)]
+
+    @property
+    def throughput(self):
+        """Number of items processed per second."""
+        if not self.elapsed:
+            return 0.0
+        return len(self.latencies) / float(self.elapsed)
+
+    @property
+    def latency_percentiles(self):
+        """A dictionary mapping each of :attr:`PERCENTILES` to the item
+        latency in seconds, empty if no item was processed.
+
+        """
+        if not self.latencies:
+            return {}
+        values = numpy.percentile(self.latencies, self.PERCENTILES)
+        return dict(zip(self.PERCENTILES, (float(v) for v in values)))
+
+    def __repr__(self):
+        return (
+            '<BulkResult succeeded={0} failed={1} throughput={2:.2f}/s>'
+            .format(len(self.results), len(self.errors), self.throughput)
+        )
+
+
+def run_bulk(func, items, max_workers=None):
+    """Call ``func`` once per item of ``items`` on a bounded thread pool.
+
+    Failures do not stop the other items from being processed.
+
+    :param func: Callable receiving a single item.
+    :param items: A list of items.
+    :param max_workers: Maximum number of concurrent calls.
+    :returns: A :class:`BulkResult`.
+
+    """
+    def run_item(index_item):
+        """Call ``func`` on a single item, capturing its outcome."""
+        index, item = index_item
+        start = time.time()
+        try:
+            value = func(item)
+        except Exception as err:  # pylint:disable=broad-except
+            LOGGER.debug(
+                'Bulk item %s failed', index, exc_info=sys.exc_info())
+            return index, False, err, time.time() - start
+        return index, True, value, time.time() - start
+
+    results = {}
+    errors = {}
+    latencies = []
+    start = time.time()
+    pool = ThreadPool(max_workers or DEFAULT_MAX_WORKERS)
+    try:
+        for index, success, value, latency in pool.imap_unordered(
+                run_item, enumerate(items)):
+            latencies.append(latency)
+            if success:
+                results[index] = value
+            else:
+                errors[index] = value
+    finally:
+        pool.close()
+        pool.join()
+    return BulkResult(results, errors, latencies, time.time() - start)
@@ -0,0 +1,315 @@
+"""Session wide pool of expensive entities shared between test workers.
+
+Creating an organization with an uploaded manifest, enabled Red Hat
+repositories and synchronized content is the most expensive setup done by
+the tests. The :class:`FixturePool` creates such "heavy" entities once per
+test session and leases them to every pytest-xdist worker which asks for
+them::
+
+    def test_positive_create(pooled_fixture):
+        with pooled_fixture.lease('org_with_manifest') as org:
+            make_product({u'organization-id': org['id']})
+
+Unittest classes get the same pool with :func:`session_pool`.
+
+A lease is either shared, in which case many workers can use the same entity
+at the same time, or exclusive, in which case a new entity is created if all
+existing ones are in use. Tests which change the entity in a way other tests
+could observe must ask for an exclusive lease.
+
+The pool state lives in a JSON session manifest on disk, guarded by a file
+lock, so all workers of a session see the same entities. The directory is
+taken from the ``ROBOTTELO_FIXTURE_POOL_DIR`` environment variable, which the
+pytest master process sets on ``conftest.py`` before the workers are started.
+Entities recorded on the manifest are deleted by :meth:`FixturePool.teardown`
+at the end of the session.
+
+"""
+import errno
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+from contextlib import contextmanager
+from robottelo import manifests
+from robottelo.cli.base import CLIReturnCodeError
+from robottelo.cli.factory import (
+    CLIFactoryError,
+    make_org,
+    setup_org_for_a_rh_repo,
+)
+from robottelo.cli.org import Org
+from robottelo.cli.subscription import Subscription
+from robottelo.constants import FIXTURE_POOL_DIR_ENV
+from robottelo.decorators import _normalize_options
+from robottelo.ssh import upload_file
+
+LOGGER = logging.getLogger(__name__)
+
+#: Name of the session manifest file inside the pool directory
+MANIFEST_FILE_NAME = 'manifest.json'
+
+
+class FixturePoolError(Exception):
+    """Indicates an error while leasing or building a pooled entity."""
+
+
+def build_org_with_manifest(options=None):
+    """Create an organization and upload a cloned manifest to it.
+
+    :param options: Options passed to
+        :func:`robottelo.cli.factory.make_org`.
+    :returns: The organization dictionary.
+
+    """
+    org = make_org(options)
+    with manifests.clone() as manifest:
+        upload_file(manifest.content, manifest.filename)
+    try:
+        Subscription.upload({
+            u'file': manifest.filename,
+            u'organization-id': org['id'],
+        })
+    except CLIReturnCodeError as err:
+        raise CLIFactoryError(
+            u'Failed to upload manifest\n{0}'.format(err.msg))
+    org[u'organization-id'] = org['id']
+    return org
+
+
+def build_rh_repo(options=None):
+    """Create an organization with an enabled and synchronized Red Hat
+    repository.
+
+    :param options: Options passed to
+        :func:`robottelo.cli.factory.setup_org_for_a_rh_repo`.
+    :returns: The dictionary returned by ``setup_org_for_a_rh_repo``.
+
+    """
+    return setup_org_for_a_rh_repo(options)
+
+
+def delete_org(entity):
+    """Delete the organization holding a pooled entity."""
+    Org.delete({u'id': entity[u'organization-id']})
+
+
+#: Builders of the pooled entity kinds, mapping each kind name to a pair of
+#: callables: one which creates the entity given the options and another
+#: which deletes it on the pool teardown.
+FIXTURE_BUILDERS = {
+    'org_with_manifest': (build_org_with_manifest, delete_org),
+    'rh_repo': (build_rh_repo, delete_org),
+}
+
+
+class FixturePool(object):
+    """Pool of expensive entities shared between the workers of a session.
+
+    :param path: Directory holding the session manifest and lock files.
+        Defaults to the ``ROBOTTELO_FIXTURE_POOL_DIR`` environment variable
+        or, if unset, to a directory under the system temporary directory.
+    :param holder: Identifier of the leaseholder, defaults to the current
+        process id.
+
+    """
+    def __init__(self, path=None, holder=None):
+        if path is None:
+            path = os.environ.get(FIXTURE_POOL_DIR_ENV) or os.path.join(
+                tempfile.gettempdir(), 'robottelo_fixture_pool')
+        self.path = path
+        self.holder = holder or u'{0}'.format(os.getpid())
+        try:
+            os.makedirs(self.path)
+        except OSError as err:
+            if err.errno != errno.EEXIST:
+                raise
+        self.manifest_path = os.path.join(self.path, MANIFEST_FILE_NAME)
+
+    @contextmanager
+    def _file_lock(self, name):
+        """Hold an exclusive lock on the pool lock file ``name``."""
+        lock_path = os.path.join(self.path, u'{0}.lock'.format(name))
+        with open(lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_manifest(self):
+        """Read the session manifest, must be called holding the lock."""
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path) as manifest_file:
+            return json.load(manifest_file)
+
+    def _write_manifest(self, manifest):
+        """Atomically write the session manifest, must be called holding the
+        lock.
+
+        """
+        temp_path = u'{0}.tmp'.format(self.manifest_path)
+        with open(temp_path, 'w') as manifest_file:
+            json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+        os.rename(temp_path, self.manifest_path)
+
+    @contextmanager
+    def _manifest(self):
+        """Yield the session manifest and write it back, holding the lock."""
+        with self._file_lock('manifest'):
+            manifest = self._read_manifest()
+            yield manifest
+            self._write_manifest(manifest)
+
+    @staticmethod
+    def fixture_key(kind, options=None):
+        """Return the manifest key of the ``kind`` entities built with
+        ``options``.
+
+        """
+        return json.dumps([kind, _normalize_options(options or {})])
+
+    def _try_lease(self, key, exclusive):
+        """Lease an existing entity for ``key`` if one is available.
+
+        :returns: The leased manifest entry or ``None``.
+
+        """
+        with self._manifest() as manifest:
+            for entry in manifest.get(key, []):
+                if entry['exclusive_holder'] is not None:
+                    continue
+                if exclusive and entry['shared_holders']:
+                    continue
+                if exclusive:
+                    entry['exclusive_holder'] = self.holder
+                else:
+                    entry['shared_holders'].append(self.holder)
+                return entry
+        return None
+
+    def acquire(self, kind, options=None, exclusive=False):
+        """Lease an entity of ``kind``, building it if none is available.
+
+        Only one worker builds an entity for the same kind and options at a
+        time, the others wait for it and lease the built entity if they ask
+        for a shared lease.
+
+        :param str kind: One of the :data:`FIXTURE_BUILDERS` keys.
+        :param dict options: Options passed to the builder.
+        :param bool exclusive: Whether the entity must not be used by any
+            other worker while leased.
+        :returns: The dictionary returned by the builder.
+        :raises robottelo.fixture_pool.FixturePoolError: If ``kind`` is
+            unknown or the entity could not be built.
+
+        """
+        if kind not in FIXTURE_BUILDERS:
+            raise FixturePoolError(
+                u'Unknown fixture kind "{0}"'.format(kind))
+        key = self.fixture_key(kind, options)
+        entry = self._try_lease(key, exclusive)
+        if entry is not None:
+            return entry['entity']
+        build_lock = u'build-{0}'.format(
+            hashlib.sha1(key.encode('utf-8')).hexdigest())
+        with self._file_lock(build_lock):
+            # Another worker may have built it while we waited for the lock
+            entry = self._try_lease(key, exclusive)
+            if entry is not None:
+                return entry['entity']
+            LOGGER.info('Building pooled fixture %s', key)
+            build = FIXTURE_BUILDERS[kind][0]
+            try:
+                entity = build(options)
+            except Exception as err:
+                raise FixturePoolError(
+                    u'Failed to build fixture "{0}": {1}'.format(kind, err))
+            with self._manifest() as manifest:
+                manifest.setdefault(key, []).append({
+                    'kind': kind,
+                    'entity': entity,
+                    'exclusive_holder': self.holder if exclusive else None,
+                    'shared_holders': [] if exclusive else [self.holder],
+                })
+        return entity
+
+    def release(self, kind, entity, options=None):
+        """Give back a lease taken with :meth:`acquire`."""
+        key = self.fixture_key(kind, options)
+        with self._manifest() as manifest:
+            for entry in manifest.get(key, []):
+                if entry['entity'] != entity:
+                    continue
+                if entry['exclusive_holder'] == self.holder:
+                    entry['exclusive_holder'] = None
+                elif self.holder in entry['shared_holders']:
+                    entry['shared_holders'].remove(self.holder)
+                return
+
+    @contextmanager
+    def lease(self, kind, options=None, exclusive=False):
+        """Context manager version of :meth:`acquire` and :meth:`release`."""
+        entity = self.acquire(kind, options, exclusive)
+        try:
+            yield entity
+        finally:
+            self.release(kind, entity, options)
+
+    def teardown(self):
+        """Delete every entity recorded on the session manifest.
+
+        The entities which could not be deleted are kept on the manifest, so
+        a later teardown can retry them.
+
+        :returns: A list of ``(kind, entity, error)`` tuples for the entities
+            which could not be deleted.
+
+        """
+        errors = []
+        with self._manifest() as manifest:
+            for key in sorted(manifest):
+                remaining = []
+                for entry in manifest[key]:
+                    delete = FIXTURE_BUILDERS[entry['kind']][1]
+                    try:
+                        delete(entry['entity'])
+                    except Exception as err:  # pylint:disable=broad-except
+                        LOGGER.warning(
+                            'Failed to delete pooled fixture %s: %s',
+                            key, err)
+                        errors.append((entry['kind'], entry['entity'], err))
+                        remaining.append(entry)
+                if remaining:
+                    manifest[key] = remaining
+                else:
+                    del manifest[key]
+        return errors
+
+
+_session_pool = None
+
+
+def session_pool():
+    """Return the :class:`FixturePool` of the current test session.
+
+    The same instance is returned by the ``pooled_fixture`` pytest fixture,
+    so unittest classes can lease pooled entities on their ``setUpClass``::
+
+        @classmethod
+        def setUpClass(cls):
+            cls.org = session_pool().acquire('org_with_manifest')
+
+        @classmethod
+        def tearDownClass(cls):
+            session_pool().release('org_with_manifest', cls.org)
+
+    """
+    global _session_pool  # pylint:disable=global-statement
+    if _session_pool is None:
+        _session_pool = FixturePool()
+    return _session_pool
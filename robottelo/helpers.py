@@ -86,6 +86,12 @@ def get_host_info(hostname=None):
 def get_nailgun_config():
     """Return a NailGun configuration file constructed from default values.
 
+    A new object is returned on each call since callers often change its
+    ``auth``. Connections are not tied to it: with the
+    ``pooled_http_sessions`` setting on, all configurations of the same server
+    and credential share a pooled session, see
+    :func:`robottelo.sessions.install_nailgun_sessions`.
+
     :return: A ``nailgun.config.ServerConfig`` object, populated with values
         from ``robottelo.config.settings``.
 
@@ -1,45 +1,473 @@
 """Utilities to help work with log files"""
+import logging
+import mmap
 import os
 import re
+import six
+import threading
+import time
+import zlib
 
+from collections import deque
 from robottelo import ssh
 from robottelo.config.settings import get_project_root
+from robottelo.wait import current_deadline, WaitTimeoutError
+from six.moves import shlex_quote
+
+LOGGER = logging.getLogger(__name__)
 
 LOGS_DATA_DIR = os.path.join(get_project_root(), 'data', 'logs')
 
+#: Exit status of the remote commands when the log file can not be read
+_NO_INPUT = 66
+
+#: Size of the chunks read from the remote commands output
+CHUNK_SIZE = 1024 * 1024
+
+
+def _run_remote(cmd, hostname=None, handler=None):
+    """Run ``cmd`` on the remote host.
+
+    :param handler: Optional callable given each chunk of the output as it
+        is received, instead of returning the whole output.
+    :return: A tuple with the exit status and the raw output, ``None`` if
+        it was given to ``handler``.
+
+    """
+    with ssh._get_connection(hostname=hostname) as connection:
+        _, stdout, _ = connection.exec_command(cmd)
+        if handler is None:
+            output = stdout.read()
+        else:
+            output = None
+            for chunk in iter(lambda: stdout.read(CHUNK_SIZE), b''):
+                handler(chunk)
+        return stdout.channel.recv_exit_status(), output
+
 
 class LogFile(object):
     """
     References a remote log file. The log file will be downloaded to allow
     operate on it using python
+
+    Large logs need not be transferred as a whole:
+
+    * with ``download=False`` nothing is transferred until needed and
+      :meth:`filter` runs ``grep`` on the server, so only the matching lines
+      are transferred;
+    * :meth:`mark` sets a bookmark on the current end of the file, e.g. at
+      the beginning of a test, so only what is logged afterwards is
+      filtered or downloaded;
+    * downloads are gzip compressed on the server and uncompressed while
+      received;
+    * a downloaded copy is filtered on a memory map of the file, without
+      loading it in memory.
+
+    :param remote_path: Path of the log file on the server.
+    :param pattern: Default pattern of :meth:`filter`.
+    :param download: Whether to download the log file right away.
+    :param offset: Byte offset of the file to start from, e.g. a bookmark
+        returned by :meth:`mark`.
+    :param hostname: The server, defaults to the configured
+        ``server.hostname``.
+    :raises IOError: If the remote file can not be read.
     """
 
-    def __init__(self, remote_path, pattern=None):
+    def __init__(self, remote_path, pattern=None, download=True, offset=0,
+                 hostname=None):
         self.remote_path = remote_path
         self.pattern = pattern
+        self.offset = offset
+        self.hostname = hostname
+        self.downloaded = False
 
         if not os.path.isdir(LOGS_DATA_DIR):
             os.makedirs(LOGS_DATA_DIR)
         self.local_path = os.path.join(LOGS_DATA_DIR,
                                        os.path.basename(remote_path))
-        ssh.download_file(remote_path, self.local_path)
+        if download:
+            self.download()
+
+    def _command(self, cmd):
+        """Prefix ``cmd`` with a check that the remote file is readable and
+        feed it the file content from the offset
+        """
+        path = shlex_quote(self.remote_path)
+        return 'test -r {0} || exit {1}; tail -c +{2} {0} | {3}'.format(
+            path, _NO_INPUT, self.offset + 1, cmd)
+
+    def _check(self, status):
+        """Raise IOError if the remote command could not read the file."""
+        if status == _NO_INPUT:
+            raise IOError(
+                'Could not read {0} on the server'.format(self.remote_path))
+
+    def size(self):
+        """Return the current size of the remote file, in bytes."""
+        status, output = _run_remote(
+            'stat -c %s {0}'.format(shlex_quote(self.remote_path)),
+            self.hostname,
+        )
+        if status != 0:
+            self._check(_NO_INPUT)
+        return int(output.strip())
+
+    def mark(self):
+        """
+        Bookmark the current end of the remote file: from now on only what
+        is appended is filtered or downloaded
+
+        :return: The bookmark, a byte offset which can be given to a new
+            ``LogFile``.
+        """
+        self.offset = self.size()
+        self.downloaded = False
+        return self.offset
+
+    def download(self):
+        """
+        Download the remote file, from the offset, to ``local_path``. The
+        content is compressed while transferred
+        """
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        with open(self.local_path, 'wb') as file_:
+            status, _ = _run_remote(
+                self._command('gzip -c'),
+                self.hostname,
+                lambda chunk: file_.write(decompressor.decompress(chunk)),
+            )
+            file_.write(decompressor.flush())
+        self._check(status)
+        self.downloaded = True
+
+    @property
+    def data(self):
+        """The lines of the log file, downloaded if needed"""
+        if not self.downloaded:
+            self.download()
         with open(self.local_path) as file_:
-            self.data = file_.readlines()
+            return file_.readlines()
 
     def filter(self, pattern=None):
         """
         Filter the log file using the pattern argument or object's pattern
+
+        If the log file was downloaded, the local copy is filtered, otherwise
+        the remote file is filtered by ``grep -P``, whose Perl regular
+        expressions are close to the Python ones.
         """
 
         if pattern is None:
             pattern = self.pattern
 
-        compiled = re.compile(pattern)
+        if self.downloaded:
+            return [
+                line.decode('utf-8', 'replace')
+                for line in _scan_lines(self.local_path, pattern)
+            ]
+
+        status, output = _run_remote(
+            self._command('grep -P -- {0}'.format(shlex_quote(pattern))),
+            self.hostname,
+        )
+        self._check(status)
+        return output.decode('utf-8', 'replace').splitlines(True)
+
+
+def _scan_lines(path, pattern):
+    """
+    Return the lines of a local file matching ``pattern``, searched on a
+    memory map of the file: the regular expression looks for the matches
+    through the whole map, then only the lines holding them are checked
+    """
+    if not os.path.getsize(path):
+        return []
+    if not isinstance(pattern, bytes):
+        pattern = pattern.encode('utf-8')
+    # ^ and $ match on every line, as when searching line per line
+    searched = re.compile(pattern, re.MULTILINE)
+    compiled = re.compile(pattern)
+    result = []
+    with open(path, 'rb') as file_:
+        mapped = mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            position = 0
+            size = len(mapped)
+            while position < size:
+                match = searched.search(mapped, position)
+                if match is None:
+                    break
+                start = mapped.rfind(b'\n', 0, match.start()) + 1
+                end = mapped.find(b'\n', start)
+                end = size if end == -1 else end + 1
+                line = mapped[start:end]
+                # a match spanning many lines is checked line per line
+                if compiled.search(line) is not None:
+                    result.append(line)
+                position = end
+        finally:
+            mapped.close()
+    return result
+
+
+class LogTail(object):
+    """
+    Reads the lines appended to a remote log file since a mark, e.g. the
+    lines logged by the server while a test was running::
+
+        tail = LogTail('/var/log/foreman/production.log')
+        tail.mark()
+        ...
+        lines = tail.read()
+
+    If the file shrank since the mark, e.g. it was rotated, it is read from
+    its beginning.
+    """
 
-        result = []
+    def __init__(self, remote_path, hostname=None):
+        self.remote_path = remote_path
+        self.hostname = hostname
+        self.offset = 0
+
+    def _run(self, cmd):
+        """Run ``cmd`` on the remote host and return its raw output."""
+        return _run_remote(cmd, self.hostname)[1]
+
+    def size(self):
+        """Return the current size of the remote file, in bytes."""
+        output = self._run(
+            'stat -c %s {0}'.format(shlex_quote(self.remote_path)))
+        return int(output.strip() or 0)
+
+    def mark(self):
+        """Only read the lines appended from now on."""
+        self.offset = self.size()
+        return self.offset
+
+    def read(self):
+        """
+        Return the complete lines appended since the mark or the previous
+        read and move the mark after them
+        """
+        size = self.size()
+        if size < self.offset:
+            self.offset = 0
+        if size == self.offset:
+            return []
+        data = self._run('tail -c +{0} {1} | head -c {2}'.format(
+            self.offset + 1,
+            shlex_quote(self.remote_path),
+            size - self.offset,
+        ))
+        # a line still being written is left for the next read
+        data = data[:data.rfind(b'\n') + 1]
+        self.offset += len(data)
+        return data.decode('utf-8', 'replace').splitlines(True)
+
+
+class LogLine(object):
+    """A line received by a :class:`LogWatcher`.
+
+    :param path: The remote file the line was written to.
+    :param text: The line, without its line ending.
+    :param received: When the line was received, in seconds since the
+        epoch.
+    :param parsed: What the watcher parser returned for the line, if any.
+    """
+
+    def __init__(self, path, text, received, parsed=None):
+        self.path = path
+        self.text = text
+        self.received = received
+        self.parsed = parsed
+
+    def __repr__(self):
+        return '<LogLine {0}: {1!r}>'.format(self.path, self.text)
+
+
+class LogWatcher(object):
+    """
+    Streams the lines written to remote log files while they are written,
+    from a ``tail -F`` running on a channel of the shared ssh connection,
+    see :func:`robottelo.ssh.get_shared_connection`::
+
+        watcher = LogWatcher(['/var/log/foreman/production.log'])
+        watcher.start()
+        ...  # trigger the operation
+        line = watcher.wait_for(r'Completed 200', timeout=60)
+        watcher.stop()
+
+    The received lines are kept on a buffer of at most ``buffer_size``
+    lines. When it is full the watcher stops reading the channel, so the
+    ssh flow control makes ``tail`` wait: nothing is lost and memory stays
+    bounded, but the lines are only received once the buffer is consumed,
+    or discarded with :meth:`clear`. With ``drop_oldest`` the oldest lines
+    are discarded instead, which suits a watcher left running for a whole
+    session and only looked at from time to time.
 
-        for line in self.data:
-            if compiled.search(line) is not None:
-                result.append(line)
+    :param paths: The remote log files.
+    :param hostname: The server, defaults to the configured
+        ``server.hostname``.
+    :param buffer_size: Maximum number of buffered lines.
+    :param drop_oldest: Whether to drop the oldest lines when the buffer is
+        full, instead of waiting for room.
+    :param parser: Optional callable parsing each line as it arrives, its
+        result is the :attr:`LogLine.parsed` attribute.
+    """
+
+    def __init__(self, paths, hostname=None, buffer_size=10000,
+                 drop_oldest=False, parser=None):
+        if isinstance(paths, six.string_types):
+            paths = [paths]
+        self.paths = list(paths)
+        self.hostname = hostname
+        self.buffer_size = buffer_size
+        self.drop_oldest = drop_oldest
+        self.parser = parser
+        #: Number of lines dropped because the buffer was full
+        self.dropped = 0
+        self.closed = False
+        self._lines = deque()
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._channel = None
+        self._thread = None
+
+    def start(self):
+        """Open the ``tail -F`` channel and start receiving lines."""
+        transport = ssh.get_shared_connection(self.hostname).get_transport()
+        self._channel = transport.open_session()
+        # On a pty the remote tail gets a SIGHUP when the channel is closed,
+        # otherwise it keeps running until it fails writing to the channel,
+        # which never happens on a quiet log
+        self._channel.get_pty()
+        # -v prints a header before the lines of each file
+        self._channel.exec_command('tail -v -n 0 -F {0}'.format(
+            ' '.join(shlex_quote(path) for path in self.paths)))
+        self._thread = threading.Thread(target=self._receive)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Close the channel, which hangs up the remote ``tail``, and stop
+        receiving lines.
+        """
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._channel is not None:
+            self._channel.close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _receive(self):
+        """Read the channel, splitting it in lines."""
+        path = self.paths[0]
+        pending = b''
+        try:
+            while not self._stop_event.is_set():
+                data = self._channel.recv(CHUNK_SIZE)
+                if not data:
+                    break
+                lines = (pending + data).split(b'\n')
+                pending = lines.pop()
+                for line in lines:
+                    text = line.decode('utf-8', 'replace').rstrip('\r')
+                    if text.startswith('==> ') and text.endswith(' <=='):
+                        path = text[4:-4]
+                    elif text:
+                        # blank lines only separate the file headers
+                        self._put(LogLine(path, text, time.time()))
+                    if self._stop_event.is_set():
+                        break
+        except Exception as err:  # pylint:disable=broad-except
+            if not self._stop_event.is_set():
+                LOGGER.error('Log watcher of %s stopped: %s', self.paths, err)
+        finally:
+            with self._condition:
+                self.closed = True
+                self._condition.notify_all()
+
+    def _put(self, line):
+        """Buffer a line, waiting for room unless dropping the oldest."""
+        if self.parser is not None:
+            line.parsed = self.parser(line.text)
+        with self._condition:
+            while (len(self._lines) >= self.buffer_size and
+                   not self.drop_oldest and
+                   not self._stop_event.is_set()):
+                self._condition.wait(1)
+            if len(self._lines) >= self.buffer_size:
+                self._lines.popleft()
+                self.dropped += 1
+            self._lines.append(line)
+            self._condition.notify_all()
 
-        return result
+    def clear(self):
+        """Discard the buffered lines, e.g. before triggering an operation
+        whose lines are waited for.
+        """
+        with self._condition:
+            self._lines.clear()
+            self._condition.notify_all()
+
+    def get(self, timeout=None):
+        """
+        Return the next line, waiting at most ``timeout`` seconds for it, or
+        ``None``
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while not self._lines:
+                if self.closed:
+                    return None
+                remaining = (
+                    None if deadline is None else deadline - time.time())
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+            line = self._lines.popleft()
+            self._condition.notify_all()
+            return line
+
+    def wait_for(self, pattern, timeout=60, path=None):
+        """
+        Wait for a line matching ``pattern``. The lines received before it
+        are consumed
+
+        :param pattern: Regular expression searched on each line.
+        :param timeout: Maximum number of seconds to wait. The wait also
+            stops at the deadline of any enclosing
+            :func:`robottelo.wait.wait_for`.
+        :param path: Only look at the lines of this file.
+        :return: The matching :class:`LogLine`.
+        :raises robottelo.wait.WaitTimeoutError: If no line matched in time.
+        :raises IOError: If the watcher stopped receiving lines.
+        """
+        compiled = re.compile(pattern)
+        deadline = time.time() + timeout
+        outer = current_deadline()
+        if outer is not None:
+            deadline = min(deadline, outer)
+        while True:
+            line = self.get(max(deadline - time.time(), 0))
+            if line is None:
+                if self.closed and not self._lines:
+                    raise IOError(
+                        'Log watcher of {0} is closed'.format(self.paths))
+                if time.time() >= deadline:
+                    raise WaitTimeoutError(
+                        'No line matching {0!r} in {1} after {2}s'.format(
+                            pattern, self.paths, timeout))
+                continue
+            if path is not None and line.path != path:
+                continue
+            if compiled.search(line.text) is not None:
+                return line
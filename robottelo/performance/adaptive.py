@@ -0,0 +1,242 @@
+"""Adaptive sample size for performance measurements
+
+Running a fixed number of iterations wastes time on the concurrency levels
+whose timings converged early and may not collect enough on the noisy ones.
+An :class:`AdaptiveSampler` is fed the timings as they are measured and
+tells when to stop:
+
+* the first timings, measured while the server warms up (caches, JIT,
+  connection pools), are left out once the steady state is detected, see
+  :func:`steady_state_start`;
+* sampling goes on until the confidence interval of the chosen percentile
+  of the steady state timings is narrower than ``target_width``, relative to
+  the percentile, see :func:`percentile_interval`;
+* or until the budget, a number of timings or a duration, runs out.
+
+Outliers are flagged, not removed, see :func:`flag_outliers`::
+
+    sampler = AdaptiveSampler(percentile=95, target_width=0.05,
+                              max_samples=5000)
+    while not sampler.done:
+        sampler.add(run_batch())
+    sampler.summary()
+
+"""
+import math
+import numpy
+import time
+
+#: Default percentile whose confidence interval decides the convergence
+DEFAULT_PERCENTILE = 95
+
+
+def _normal_quantile(probability):
+    """Return the standard normal quantile of ``probability``, found by
+    bisection on :func:`math.erfc`.
+    """
+    low, high = -10.0, 10.0
+    for _ in range(100):
+        middle = (low + high) / 2
+        if 0.5 * math.erfc(-middle / math.sqrt(2)) < probability:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def steady_state_start(samples, batch_size=5):
+    """Detect the end of the warm-up of a series of timings.
+
+    Uses the MSER-5 rule: the timings are averaged over batches of
+    ``batch_size`` and the series is truncated where the standard error of
+    the remaining batch means is the lowest. Only the first half of the
+    series is considered, as MSER recommends.
+
+    :param samples: The timings, in the order they were measured.
+    :returns: The number of warm-up timings to leave out, a multiple of
+        ``batch_size``.
+
+    """
+    num_batches = len(samples) // batch_size
+    if num_batches < 4:
+        return 0
+    means = numpy.asarray(
+        samples[:num_batches * batch_size], dtype=float
+    ).reshape(num_batches, batch_size).mean(axis=1)
+    # mean and variance of means[d:] for every truncation point d
+    remaining = numpy.arange(num_batches, 0, -1, dtype=float)
+    sums = numpy.cumsum(means[::-1])[::-1]
+    squares = numpy.cumsum((means ** 2)[::-1])[::-1]
+    variances = squares / remaining - (sums / remaining) ** 2
+    statistic = variances / remaining
+    candidates = statistic[:num_batches // 2 + 1]
+    return int(numpy.argmin(candidates)) * batch_size
+
+
+def percentile_interval(samples, percentile=DEFAULT_PERCENTILE,
+                        confidence=0.95):
+    """Compute a distribution free confidence interval of a percentile.
+
+    The bounds are the order statistics whose ranks are the binomial
+    ``n * p -/+ z * sqrt(n * p * (1 - p))``, which holds whatever the
+    distribution of the timings.
+
+    :returns: A tuple with the lower bound, the percentile and the upper
+        bound, or ``None`` if there are not enough samples for the interval
+        to be within them.
+
+    """
+    values = numpy.sort(numpy.asarray(samples, dtype=float))
+    count = len(values)
+    if not count:
+        return None
+    quantile = percentile / 100.0
+    spread = _normal_quantile(0.5 + confidence / 2) * math.sqrt(
+        count * quantile * (1 - quantile))
+    low = int(math.floor(count * quantile - spread))
+    high = int(math.ceil(count * quantile + spread))
+    if low < 0 or high >= count:
+        return None
+    return (
+        float(values[low]),
+        float(numpy.percentile(values, percentile)),
+        float(values[high]),
+    )
+
+
+def flag_outliers(samples, threshold=3.5):
+    """Flag the outliers of a series of timings.
+
+    A timing is an outlier when its modified z-score, based on the median
+    and the median absolute deviation, is above ``threshold``, as
+    recommended by Iglewicz and Hoaglin.
+
+    :returns: The sorted indexes of the outliers.
+
+    """
+    values = numpy.asarray(samples, dtype=float)
+    if len(values) < 3:
+        return []
+    median = numpy.median(values)
+    deviations = numpy.abs(values - median)
+    mad = numpy.median(deviations)
+    if mad:
+        scores = 0.6745 * deviations / mad
+    else:
+        # more than half of the timings are equal, use the mean deviation
+        mean_deviation = deviations.mean()
+        if not mean_deviation:
+            return []
+        scores = deviations / (1.253314 * mean_deviation)
+    return numpy.flatnonzero(scores > threshold).tolist()
+
+
+class AdaptiveSampler(object):
+    """Decide when enough timings were measured.
+
+    :param percentile: The percentile whose confidence interval decides the
+        convergence.
+    :param target_width: Width of the confidence interval to reach,
+        relative to the percentile, e.g. ``0.05`` for 5%.
+    :param confidence: Confidence level of the interval.
+    :param min_samples: Number of steady state timings required before
+        checking the convergence.
+    :param max_samples: Budget of timings, no limit if ``None``.
+    :param max_duration: Budget of seconds since the first timing, no limit
+        if ``None``.
+    :param batch_size: Batch size of the warm-up detection.
+
+    """
+    def __init__(self, percentile=DEFAULT_PERCENTILE, target_width=0.05,
+                 confidence=0.95, min_samples=50, max_samples=None,
+                 max_duration=None, batch_size=5):
+        self.percentile = percentile
+        self.target_width = target_width
+        self.confidence = confidence
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.max_duration = max_duration
+        self.batch_size = batch_size
+        self.samples = []
+        self.started = None
+
+    def add(self, samples):
+        """Add timings, in the order they were measured."""
+        if self.started is None:
+            self.started = time.time()
+        self.samples.extend(samples)
+
+    @property
+    def warmup(self):
+        """Number of warm-up timings."""
+        return steady_state_start(self.samples, self.batch_size)
+
+    @property
+    def steady(self):
+        """The steady state timings."""
+        return self.samples[self.warmup:]
+
+    def interval(self):
+        """Return the confidence interval of the percentile of the steady
+        state timings, see :func:`percentile_interval`.
+        """
+        return percentile_interval(
+            self.steady, self.percentile, self.confidence)
+
+    @property
+    def relative_width(self):
+        """Width of the confidence interval relative to the percentile, or
+        ``None`` if it can not be computed yet.
+        """
+        interval = self.interval()
+        if interval is None or not interval[1]:
+            return None
+        return (interval[2] - interval[0]) / interval[1]
+
+    @property
+    def converged(self):
+        """Whether the confidence interval is narrow enough."""
+        if len(self.steady) < self.min_samples:
+            return False
+        width = self.relative_width
+        return width is not None and width <= self.target_width
+
+    @property
+    def exhausted(self):
+        """Whether the budget ran out."""
+        if (self.max_samples is not None and
+                len(self.samples) >= self.max_samples):
+            return True
+        return (
+            self.max_duration is not None and self.started is not None and
+            time.time() - self.started >= self.max_duration
+        )
+
+    @property
+    def done(self):
+        """Whether to stop sampling."""
+        return self.converged or self.exhausted
+
+    def summary(self):
+        """Return a JSON serializable summary of the sampling.
+
+        :returns: A dictionary with the number of ``samples``, ``warmup``
+            timings and ``outliers`` among the steady state ones, the
+            ``percentile`` with its ``estimate``, ``low`` and ``high``
+            bounds and ``relative_width``, and whether it ``converged``.
+
+        """
+        steady = self.steady
+        interval = self.interval() or (None, None, None)
+        return {
+            'samples': len(self.samples),
+            'warmup': len(self.samples) - len(steady),
+            'outliers': len(flag_outliers(steady)),
+            'percentile': self.percentile,
+            'low': interval[0],
+            'estimate': interval[1],
+            'high': interval[2],
+            'relative_width': self.relative_width,
+            'target_width': self.target_width,
+            'converged': self.converged,
+        }
@@ -6,11 +6,11 @@ register and attach, single subscription deletion.
 
 """
 import logging
-import requests
 import time
 
 from robottelo import ssh
 from robottelo.config import settings
+from robottelo.sessions import get_session
 from six.moves.urllib.parse import urljoin
 
 LOGGER = logging.getLogger(__name__)
@@ -38,7 +38,11 @@ class Candlepin(object):
 
     @classmethod
     def single_register_activation_key(cls, ak_name, default_org, vm_ip):
-        """Subscribe VM to Satellite by Register + ActivationKey"""
+        """Subscribe VM to Satellite by Register + ActivationKey
+
+        :return: The real timing value, ``0`` if the register failed
+
+        """
 
         # note: must create ssh keys for vm if running on local
         result = ssh.command('subscription-manager clean', hostname=vm_ip)
@@ -50,13 +54,18 @@ class Candlepin(object):
 
         if result.return_code != 0:
             LOGGER.error('Fail to subscribe {0} by ak!'.format(vm_ip))
-        else:
-            LOGGER.info('Subscribe client {0} successfully'.format(vm_ip))
+            return 0
+        LOGGER.info('Subscribe client {0} successfully'.format(vm_ip))
         return cls.get_real_time(result.stderr)
 
     @classmethod
     def single_register_attach(cls, sub_id, default_org, environment, vm_ip):
-        """Subscribe VM to Satellite by Register + Attach"""
+        """Subscribe VM to Satellite by Register + Attach
+
+        :return: The register and attach timing values, ``0`` for a step
+            which failed
+
+        """
         ssh.command('subscription-manager clean', hostname=vm_ip)
 
         time_reg = cls.sub_mgr_register_authentication(
@@ -67,7 +76,11 @@ class Candlepin(object):
 
     @classmethod
     def sub_mgr_register_authentication(cls, default_org, environment, vm_ip):
-        """subscription-manager register -u -p --org --environment"""
+        """subscription-manager register -u -p --org --environment
+
+        :return: The real timing value, ``0`` if the register failed
+
+        """
         result = ssh.command(
             'time -p subscription-manager register --username={0} '
             '--password={1} '
@@ -86,13 +99,17 @@ class Candlepin(object):
             LOGGER.error(
                 'Fail to register client {0} by sub-mgr!'.format(vm_ip)
             )
-        else:
-            LOGGER.info('Register client {0} successfully'.format(vm_ip))
+            return 0
+        LOGGER.info('Register client {0} successfully'.format(vm_ip))
         return cls.get_real_time(result.stderr)
 
     @classmethod
     def sub_mgr_attach(cls, pool_id, vm_ip):
-        """subscription-manager attach --pool=pool_id"""
+        """subscription-manager attach --pool=pool_id
+
+        :return: The real timing value, ``0`` if the attach failed
+
+        """
         result = ssh.command(
             'time -p subscription-manager attach --pool={0}'.format(pool_id),
             hostname=vm_ip
@@ -100,32 +117,34 @@ class Candlepin(object):
 
         if result.return_code != 0:
             LOGGER.error('Fail to attach client {0}'.format(vm_ip))
-        else:
-            LOGGER.info('Attach client {0} successfully'.format(vm_ip))
+            return 0
+        LOGGER.info('Attach client {0} successfully'.format(vm_ip))
         return cls.get_real_time(result.stderr)
 
     @classmethod
     def single_delete(cls, id, thread_id):
-        """Delete host from subscription"""
+        """Delete host from subscription
+
+        :return: The deletion time, ``0`` if the deletion failed
+
+        """
+        url = urljoin(
+            settings.server.get_url(), '/katello/api/hosts/{0}'.format(id))
+        credentials = settings.server.get_credentials()
+        session = get_session(
+            url, credentials, verify=False, pool_size=settings.http_pool_size)
         start = time.time()
-        response = requests.delete(
-            urljoin(
-                settings.server.get_url(),
-                '/katello/api/hosts/{0}'.format(id)
-            ),
-            auth=settings.server.get_credentials(),
-            verify=False
-        )
+        response = session.delete(url, auth=credentials, verify=False)
+        end = time.time()
 
         if response.status_code != 204:
             LOGGER.error(
                 'Fail to delete {0} on thread-{1}!'.format(id, thread_id)
             )
             LOGGER.error(response.content)
-        else:
-            LOGGER.info(
-                "Delete {0} on thread-{1} successful!".format(id, thread_id)
-            )
-        end = time.time()
+            return 0
+        LOGGER.info(
+            "Delete {0} on thread-{1} successful!".format(id, thread_id)
+        )
         LOGGER.info('real  {0}s'.format(end-start))
         return end - start
@@ -0,0 +1,441 @@
+"""Compare the timings of performance runs to find regressions
+
+A run is loaded from its raw outputs, either ``perf-raw-*.csv`` files or the
+:mod:`robottelo.performance.store` directories, and its timings are grouped
+by operation and concurrency level, e.g. ``('ak', 10)`` for the activation
+key registrations with 10 clients::
+
+    baseline = load_run(['old/perf-runs'])
+    candidate = load_run(['new/perf-runs'])
+    report = compare_runs([baseline, candidate], names=['6.2.1', '6.2.2'])
+    report['verdict']  # 'pass' or 'fail'
+    print(render_markdown(report))
+
+For each operation and concurrency level found on both runs, a Mann-Whitney
+U test tells whether the timings come from different distributions and
+bootstrap confidence intervals bound the change of the median and 95th
+percentile. A regression is flagged when the distributions differ
+significantly and a percentile got slower by more than the threshold, even
+at the optimistic end of its confidence interval.
+
+``scripts/compare_perf_runs.py`` is the command line entry point.
+
+"""
+import csv
+import math
+import numpy
+import os
+import re
+
+from robottelo.performance.store import METADATA_FILE_NAME, TimingStore
+
+#: Title of the raw timing blocks, e.g. ``raw-ak-10-clients``
+RAW_TITLE = re.compile(
+    r'^raw-(?P<operation>.+)-(?P<concurrency>\d+)-clients$')
+
+#: Percentiles whose change is bounded by a confidence interval
+COMPARED_PERCENTILES = (50, 95)
+
+#: Relative slowdown of a percentile flagged as a regression
+DEFAULT_THRESHOLD = 0.05
+
+#: Significance level of the Mann-Whitney U test
+DEFAULT_ALPHA = 0.05
+
+#: Number of bootstrap resamples
+DEFAULT_ITERATIONS = 1000
+
+#: Maximum number of samples drawn at once by the bootstrap
+BOOTSTRAP_CHUNK = 10 ** 7
+
+
+def _parse_title(title):
+    """Return the ``(operation, concurrency)`` key of a raw block title, or
+    ``None`` if it is not one.
+    """
+    match = RAW_TITLE.match(title.strip())
+    if match is None:
+        return None
+    return match.group('operation'), int(match.group('concurrency'))
+
+
+def _add(run, key, values):
+    """Add timings to a run, appending to the existing ones of ``key``."""
+    values = numpy.asarray(values, dtype=float)
+    if key in run:
+        values = numpy.concatenate([run[key], values])
+    run[key] = values
+
+
+def _merge_runs(run, other):
+    """Add the timings of ``other`` to ``run``."""
+    for key, values in other.items():
+        _add(run, key, values)
+
+
+def load_raw_csv(filename, run=None):
+    """Load a ``perf-raw-*.csv`` file.
+
+    Each block of the file is a ``raw-<operation>-<N>-clients`` title row,
+    followed by one row of timings per client and an empty row.
+
+    :param run: Optional run dictionary the timings are added to.
+    :returns: A dictionary mapping ``(operation, concurrency)`` to an array
+        of timings.
+
+    """
+    run = {} if run is None else run
+    key = None
+    with open(filename) as handler:
+        for row in csv.reader(handler):
+            if not row:
+                key = None
+                continue
+            if len(row) == 1:
+                title_key = _parse_title(row[0])
+                if title_key is not None:
+                    key = title_key
+                    continue
+            if key is not None:
+                _add(run, key, [float(value) for value in row if value])
+    return run
+
+
+def load_store(path, run=None):
+    """Load a :class:`robottelo.performance.store.TimingStore` directory.
+
+    The key is read from the ``test_case`` run metadata, as written by
+    ``robottelo.test.ConcurrentTestCase``, or else from the stored
+    operation names and the ``num_threads`` metadata.
+
+    :param run: Optional run dictionary the timings are added to.
+    :returns: A dictionary mapping ``(operation, concurrency)`` to an array
+        of timings.
+
+    """
+    run = {} if run is None else run
+    store = TimingStore.open(path)
+    metadata = store.metadata['run']
+    key = _parse_title(metadata.get('test_case', ''))
+    if key is not None:
+        _add(run, key, store.column('latency'))
+        return run
+    for operation in store.metadata['operations']:
+        _add(
+            run,
+            (operation, int(metadata.get('num_threads', 0))),
+            store.column('latency')[
+                store.column('operation') ==
+                store.metadata['operations'].index(operation)
+            ],
+        )
+    return run
+
+
+def load_run(paths):
+    """Load the timings of a run from its outputs.
+
+    :param paths: Raw csv files, timing store directories or directories
+        holding any of them, e.g. the ``perf-runs`` directory.
+    :returns: A dictionary mapping ``(operation, concurrency)`` to an array
+        of timings.
+
+    """
+    run = {}
+    for path in paths:
+        if os.path.isfile(os.path.join(path, METADATA_FILE_NAME)):
+            load_store(path, run)
+        elif os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                child = os.path.join(path, name)
+                if (os.path.isfile(os.path.join(child, METADATA_FILE_NAME)) or
+                        name.startswith('perf-raw-') and
+                        name.endswith('.csv')):
+                    _merge_runs(run, load_run([child]))
+        else:
+            load_raw_csv(path, run)
+    return run
+
+
+def mann_whitney(baseline, candidate):
+    """Two sided Mann-Whitney U test, with the normal approximation and the
+    tie correction.
+
+    :returns: A tuple with the U statistic of ``baseline`` and the p-value.
+
+    """
+    baseline = numpy.asarray(baseline, dtype=float)
+    candidate = numpy.asarray(candidate, dtype=float)
+    size1, size2 = len(baseline), len(candidate)
+    size = size1 + size2
+    _, inverse, counts = numpy.unique(
+        numpy.concatenate([baseline, candidate]),
+        return_inverse=True,
+        return_counts=True,
+    )
+    ends = numpy.cumsum(counts)
+    ranks = ((ends - counts + 1 + ends) / 2.0)[inverse]
+    u_statistic = ranks[:size1].sum() - size1 * (size1 + 1) / 2.0
+    ties = float((counts ** 3 - counts).sum())
+    variance = size1 * size2 / 12.0 * (
+        size + 1 - ties / (size * (size - 1)))
+    if variance <= 0:
+        return u_statistic, 1.0
+    z_score = (u_statistic - size1 * size2 / 2.0) / math.sqrt(variance)
+    return u_statistic, math.erfc(abs(z_score) / math.sqrt(2))
+
+
+def _bootstrap_percentiles(values, quantile, iterations, random_state):
+    """Return the ``quantile`` percentile of ``iterations`` resamples of
+    ``values``.
+    """
+    rows = max(1, BOOTSTRAP_CHUNK // len(values))
+    result = []
+    for start in range(0, iterations, rows):
+        count = min(rows, iterations - start)
+        samples = values[
+            random_state.randint(0, len(values), size=(count, len(values)))]
+        result.append(numpy.percentile(samples, quantile, axis=1))
+    return numpy.concatenate(result)
+
+
+def bootstrap_change(baseline, candidate, quantile,
+                     iterations=DEFAULT_ITERATIONS, confidence=0.95,
+                     random_state=None):
+    """Bootstrap confidence interval of the relative change of a
+    percentile.
+
+    :param quantile: The percentile, between 0 and 100.
+    :param random_state: A ``numpy.random.RandomState``, for reproducible
+        intervals.
+    :returns: A tuple with the relative change of the percentile from
+        ``baseline`` to ``candidate``, e.g. ``0.1`` when 10% slower, and the
+        lower and upper bounds of its confidence interval.
+
+    """
+    if random_state is None:
+        random_state = numpy.random.RandomState()
+    baseline = numpy.asarray(baseline, dtype=float)
+    candidate = numpy.asarray(candidate, dtype=float)
+    base_value = numpy.percentile(baseline, quantile)
+    if base_value == 0:
+        return float('nan'), float('nan'), float('nan')
+    candidate_values = _bootstrap_percentiles(
+        candidate, quantile, iterations, random_state)
+    baseline_values = _bootstrap_percentiles(
+        baseline, quantile, iterations, random_state)
+    changes = candidate_values / baseline_values - 1
+    tail = (1 - confidence) / 2 * 100
+    low, high = numpy.percentile(changes, [tail, 100 - tail])
+    change = numpy.percentile(candidate, quantile) / base_value - 1
+    return float(change), float(low), float(high)
+
+
+def compare_samples(baseline, candidate, threshold=DEFAULT_THRESHOLD,
+                    alpha=DEFAULT_ALPHA, iterations=DEFAULT_ITERATIONS,
+                    random_state=None):
+    """Compare the timings of an operation on two runs.
+
+    :returns: A dictionary with the sample ``counts``, the Mann-Whitney
+        ``p_value``, a dictionary per compared percentile (``p50``, ``p95``)
+        with the ``baseline`` and ``candidate`` values, the relative
+        ``change`` and its confidence interval ``low`` and ``high`` bounds,
+        and the ``verdict``: ``regression``, ``improvement``, ``unchanged``
+        or ``insufficient data``.
+
+    """
+    result = {'counts': [len(baseline), len(candidate)]}
+    if len(baseline) < 2 or len(candidate) < 2:
+        result['verdict'] = 'insufficient data'
+        return result
+    if random_state is None:
+        random_state = numpy.random.RandomState(0)
+    result['p_value'] = mann_whitney(baseline, candidate)[1]
+    slower = faster = False
+    for quantile in COMPARED_PERCENTILES:
+        change, low, high = bootstrap_change(
+            baseline, candidate, quantile, iterations,
+            random_state=random_state)
+        result['p{0}'.format(quantile)] = {
+            'baseline': float(numpy.percentile(baseline, quantile)),
+            'candidate': float(numpy.percentile(candidate, quantile)),
+            'change': change,
+            'low': low,
+            'high': high,
+        }
+        slower = slower or low > threshold
+        faster = faster or high < -threshold
+    significant = result['p_value'] < alpha
+    if significant and slower:
+        result['verdict'] = 'regression'
+    elif significant and faster:
+        result['verdict'] = 'improvement'
+    else:
+        result['verdict'] = 'unchanged'
+    return result
+
+
+def compare_runs(runs, names=None, threshold=DEFAULT_THRESHOLD,
+                 alpha=DEFAULT_ALPHA, iterations=DEFAULT_ITERATIONS):
+    """Compare runs against the first one.
+
+    :param runs: Run dictionaries, as returned by :func:`load_run`. The
+        first one is the baseline.
+    :param names: Names of the runs, e.g. the Satellite builds.
+    :returns: A JSON serializable report, with the ``baseline`` name, the
+        parameters, one entry per candidate run, operation and concurrency
+        level on ``comparisons``, the keys found only on some runs on
+        ``missing``, and the overall ``verdict``: ``fail`` if any regression
+        was flagged, ``pass`` otherwise.
+
+    """
+    if len(runs) < 2:
+        raise ValueError('At least two runs are needed')
+    if names is None:
+        names = ['run-{0}'.format(index) for index in range(len(runs))]
+    baseline = runs[0]
+    comparisons = []
+    missing = []
+    for name, run in zip(names[1:], runs[1:]):
+        for key in sorted(set(baseline) | set(run)):
+            if key not in baseline or key not in run:
+                missing.append({
+                    'candidate': name,
+                    'operation': key[0],
+                    'concurrency': key[1],
+                    'missing_from': name if key in baseline else names[0],
+                })
+                continue
+            comparison = {
+                'candidate': name,
+                'operation': key[0],
+                'concurrency': key[1],
+            }
+            comparison.update(compare_samples(
+                baseline[key], run[key], threshold, alpha, iterations))
+            comparisons.append(comparison)
+    regressions = [
+        comparison for comparison in comparisons
+        if comparison['verdict'] == 'regression'
+    ]
+    return {
+        'alpha': alpha,
+        'baseline': names[0],
+        'comparisons': comparisons,
+        'missing': missing,
+        'regressions': len(regressions),
+        'threshold': threshold,
+        'verdict': 'fail' if regressions else 'pass',
+    }
+
+
+def _format_percentile(comparison, quantile):
+    """Return the cells of a percentile of a comparison."""
+    stats = comparison.get('p{0}'.format(quantile))
+    if stats is None:
+        return ['', '']
+    return [
+        '{0:.3f} / {1:.3f}'.format(stats['baseline'], stats['candidate']),
+        '{0:+.1%} [{1:+.1%}, {2:+.1%}]'.format(
+            stats['change'], stats['low'], stats['high']),
+    ]
+
+
+def _summary_rows(report):
+    """Return the header and rows of the summary tables."""
+    header = ['candidate', 'operation', 'clients', 'samples', 'p-value']
+    for quantile in COMPARED_PERCENTILES:
+        header.extend([
+            'p{0} (s)'.format(quantile),
+            'p{0} change (CI)'.format(quantile),
+        ])
+    header.append('verdict')
+    rows = []
+    for comparison in report['comparisons']:
+        row = [
+            comparison['candidate'],
+            comparison['operation'],
+            '{0}'.format(comparison['concurrency']),
+            '{0} / {1}'.format(*comparison['counts']),
+            '{0:.3g}'.format(comparison['p_value'])
+            if 'p_value' in comparison else '',
+        ]
+        for quantile in COMPARED_PERCENTILES:
+            row.extend(_format_percentile(comparison, quantile))
+        row.append(comparison['verdict'])
+        rows.append(row)
+    return header, rows
+
+
+def _report_title(report):
+    """Return the title line of a report."""
+    return (
+        'Performance comparison against {0}: {1} ({2} regressions, '
+        'threshold {3:.0%}, alpha {4})'.format(
+            report['baseline'],
+            report['verdict'].upper(),
+            report['regressions'],
+            report['threshold'],
+            report['alpha'],
+        )
+    )
+
+
+def render_markdown(report):
+    """Return a markdown summary of a :func:`compare_runs` report."""
+    header, rows = _summary_rows(report)
+    lines = [
+        '# {0}'.format(_report_title(report)),
+        '',
+        '| {0} |'.format(' | '.join(header)),
+        '|{0}'.format('---|' * len(header)),
+    ]
+    lines.extend('| {0} |'.format(' | '.join(row)) for row in rows)
+    if report['missing']:
+        lines.extend(['', '## Not compared', ''])
+        lines.extend(
+            '- {operation} with {concurrency} clients: missing from '
+            '{missing_from}'.format(**missing)
+            for missing in report['missing']
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def _escape(text):
+    """Escape text for HTML."""
+    return (
+        text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+        .replace('"', '&quot;')
+    )
+
+
+def render_html(report):
+    """Return an HTML summary of a :func:`compare_runs` report."""
+    header, rows = _summary_rows(report)
+    colors = {'regression': '#f2dede', 'improvement': '#dff0d8'}
+    lines = [
+        '<!DOCTYPE html>',
+        '<html><head><meta charset="utf-8"><title>Performance comparison'
+        '</title></head><body>',
+        '<h1>{0}</h1>'.format(_escape(_report_title(report))),
+        '<table border="1" cellspacing="0" cellpadding="4">',
+        '<tr>{0}</tr>'.format(''.join(
+            '<th>{0}</th>'.format(_escape(cell)) for cell in header)),
+    ]
+    for row in rows:
+        lines.append('<tr style="background: {0}">{1}</tr>'.format(
+            colors.get(row[-1], 'white'),
+            ''.join('<td>{0}</td>'.format(_escape(cell)) for cell in row),
+        ))
+    lines.append('</table>')
+    if report['missing']:
+        lines.append('<h2>Not compared</h2><ul>')
+        lines.extend(
+            '<li>{0}</li>'.format(_escape(
+                '{operation} with {concurrency} clients: missing from '
+                '{missing_from}'.format(**missing)))
+            for missing in report['missing']
+        )
+        lines.append('</ul>')
+    lines.append('</body></html>')
+    return '\n'.join(lines) + '\n'
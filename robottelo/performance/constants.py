@@ -29,5 +29,17 @@ STAT_REG_FILE_NAME = 'perf-statistics-register.csv'
 RAW_SYNC_FILE_NAME = 'perf-raw-sync.csv'
 STAT_SYNC_FILE_NAME = 'perf-statistics-sync.csv'
 
+# directory of the columnar raw timing stores, one sub directory per run
+RAW_STORE_DIR = 'perf-runs'
+
+# server resource samples, saved on each run directory of RAW_STORE_DIR
+RESOURCES_FILE_NAME = 'resources.csv'
+
+# server logs of the requests timings, and the breakdown of the client
+# operations into server side times saved on each run directory
+FOREMAN_LOG = '/var/log/foreman/production.log'
+CANDLEPIN_LOG = '/var/log/candlepin/candlepin.log'
+REQUESTS_FILE_NAME = 'requests.csv'
+
 # parameters for number of threads/clients
 NUM_THREADS = '1,2,4,6,8,10'
@@ -0,0 +1,563 @@
+"""Load generation distributed over several driver hosts
+
+A single driver running the threads of :mod:`robottelo.performance.thread`
+is itself a bottleneck, for the SSH fan-out to the client virtual machines
+and for the Python threads sharing one interpreter lock. An :class:`Agent`
+runs on each driver host, started over SSH by :func:`start_remote_agent`, or
+locally as a separate process by :func:`start_local_agent`, and a
+:class:`Coordinator` drives them:
+
+1. the coordinator connects to each agent, authenticated by a shared key,
+   and measures the offset of the agent clock;
+2. each agent receives a shard of the workload, see :func:`make_shards`,
+   and the start time, converted to its clock, so all the agents start
+   together;
+3. each agent runs its clients in a closed loop and streams the timing of
+   every operation back as soon as it completes;
+4. the coordinator merges the timings, on its own clock, by client name,
+   the ``thread-<n>`` keys of the ``time_result_dict`` of the stat and
+   chart pipeline::
+
+    authkey = new_authkey()
+    addresses = [
+        start_remote_agent(host, authkey, directory='robottelo')[1]
+        for host in ('driver1.example.com', 'driver2.example.com')
+    ]
+    with Coordinator(addresses, authkey) as coordinator:
+        records = coordinator.run(make_shards(
+            'register_ak',
+            {'ak_name': ak_name, 'default_org': org, 'vm_ips': vm_ips},
+            clients=len(vm_ips), iterations=100, agents=len(addresses),
+            split='vm_ips',
+        ))
+
+Agents run the workloads of :mod:`robottelo.performance.load`, so the
+driver hosts need a robottelo checkout with its ``robottelo.properties``.
+
+"""
+import argparse
+import binascii
+import importlib
+import logging
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+
+from multiprocessing.connection import Client, Listener
+from multiprocessing.pool import ThreadPool
+from robottelo import ssh
+from robottelo.config import settings
+from robottelo.performance.load import (
+    CandlepinAttachWorkload,
+    CandlepinDeleteWorkload,
+    CandlepinRegisterAKWorkload,
+    OperationRecord,
+    PulpSyncWorkload,
+    run_operation,
+)
+from six.moves import shlex_quote
+
+LOGGER = logging.getLogger(__name__)
+
+#: Port the agents listen on
+DEFAULT_AGENT_PORT = 5050
+
+#: Environment variable holding the authentication key of an agent
+AUTHKEY_ENV = 'ROBOTTELO_AGENT_AUTHKEY'
+
+#: Workloads run by the agents, by operation name. Other names are imported
+#: as the dotted path of a workload class.
+WORKLOADS = {
+    'delete': CandlepinDeleteWorkload,
+    'register_ak': CandlepinRegisterAKWorkload,
+    'register_attach': CandlepinAttachWorkload,
+    'sync': PulpSyncWorkload,
+}
+
+LISTENING = re.compile(r'^Agent listening on (\S*):(\d+)$')
+
+
+def new_authkey():
+    """Return a random authentication key for the agents of a run."""
+    return binascii.hexlify(os.urandom(16)).decode('ascii')
+
+
+def coordinator_interface():
+    """Return the address of the interface facing the coordinator.
+
+    Agents started over SSH by :func:`start_remote_agent` listen on the
+    address the coordinator reached this host on, read from the
+    ``SSH_CONNECTION`` environment variable, other agents on the loopback
+    interface.
+
+    """
+    connection = os.environ.get('SSH_CONNECTION', '').split()
+    if len(connection) == 4:
+        return connection[2]
+    return '127.0.0.1'
+
+
+def _encode(authkey):
+    """Return ``authkey`` as expected by :mod:`multiprocessing.connection`."""
+    return authkey.encode('ascii')
+
+
+def make_shards(workload, kwargs, clients, iterations, agents, split=None):
+    """Share the clients of a workload out among agents.
+
+    :param str workload: The workload name, see :data:`WORKLOADS`.
+    :param dict kwargs: The arguments of the workload.
+    :param int clients: The total number of concurrent clients.
+    :param int iterations: Operations run by each client.
+    :param int agents: The number of agents.
+    :param str split: Name of the argument, a list or a dictionary, whose
+        items are shared out too, in proportion to the clients of each
+        agent, e.g. the virtual machines or the content host ids.
+    :returns: A list of shards, one per agent with clients.
+    :raises ValueError: If there are less ``split`` items than clients or,
+        when the workload uses an item per operation (see
+        :attr:`robottelo.performance.load.Workload.indexed_argument`), than
+        operations.
+
+    """
+    items = per_client = None
+    if split is not None:
+        items = kwargs[split]
+        if isinstance(items, dict):
+            items = sorted(items.items())
+        per_client = len(items) // clients
+        if not per_client:
+            raise ValueError(
+                'Not enough {0} for {1} clients'.format(split, clients))
+        indexed = getattr(WORKLOADS.get(workload), 'indexed_argument', None)
+        if indexed == split and iterations > per_client:
+            raise ValueError(
+                'Not enough {0} for {1} clients of {2} iterations, each '
+                'operation needs its own'.format(split, clients, iterations))
+    shards = []
+    first = 0
+    for agent in range(agents):
+        count = clients // agents + (1 if agent < clients % agents else 0)
+        if not count:
+            continue
+        shard_kwargs = dict(kwargs)
+        if split is not None:
+            share = items[first * per_client:(first + count) * per_client]
+            if isinstance(kwargs[split], dict):
+                share = dict(share)
+            shard_kwargs[split] = share
+        shards.append({
+            'workload': workload,
+            'kwargs': shard_kwargs,
+            'clients': count,
+            'first_client': first,
+            'iterations': iterations,
+        })
+        first += count
+    return shards
+
+
+def build_workload(name, kwargs):
+    """Return the workload named ``name``, see :data:`WORKLOADS`."""
+    if name in WORKLOADS:
+        if not settings.configured:
+            settings.configure()
+        return WORKLOADS[name](**kwargs)
+    module, _, cls = name.rpartition('.')
+    return getattr(importlib.import_module(module), cls)(**kwargs)
+
+
+class Agent(object):
+    """Run the shards of a :class:`Coordinator` on this host.
+
+    The agent serves a single coordinator, until it sends ``stop`` or
+    disconnects.
+
+    :param str host: The interface to listen on, defaults to
+        :func:`coordinator_interface`.
+    :param int port: The port to listen on, ``0`` for any free port.
+    :param str authkey: The key the coordinator must authenticate with.
+        The agent runs the workloads it is sent, so it refuses to start
+        without one.
+
+    """
+    def __init__(self, host=None, port=DEFAULT_AGENT_PORT, authkey=None):
+        if not authkey:
+            raise ValueError('An agent needs an authentication key')
+        if host is None:
+            host = coordinator_interface()
+        self.listener = Listener((host, port), authkey=_encode(authkey))
+
+    @property
+    def address(self):
+        """The ``(host, port)`` the agent listens on."""
+        return self.listener.address
+
+    def serve(self):
+        """Serve the first coordinator which authenticates."""
+        try:
+            while True:
+                try:
+                    connection = self.listener.accept()
+                except Exception as err:  # pylint:disable=broad-except
+                    LOGGER.warning('Coordinator rejected: %s', err)
+                    continue
+                break
+            try:
+                self._serve(connection)
+            finally:
+                connection.close()
+        finally:
+            self.listener.close()
+
+    def _serve(self, connection):
+        """Answer the messages of the coordinator."""
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError:
+                return
+            if message[0] == 'clock':
+                connection.send(('clock', time.time()))
+            elif message[0] == 'run':
+                self._run(connection, message[1], message[2])
+            elif message[0] == 'stop':
+                return
+
+    def _run(self, connection, shard, start):
+        """Run the clients of ``shard`` from ``start``, streaming the timing
+        of each operation.
+        """
+        try:
+            workload = build_workload(shard['workload'], shard['kwargs'])
+        except Exception as err:  # pylint:disable=broad-except
+            LOGGER.exception('Workload %s failed', shard['workload'])
+            connection.send(('error', repr(err)))
+            return
+        iterations = shard['iterations']
+        lock = threading.Lock()
+
+        def client(number):
+            """Run the operations of a client"""
+            for offset in range(iterations):
+                record = OperationRecord(
+                    number * iterations + offset, time.time())
+                run_operation(workload, record)
+                with lock:
+                    connection.send((
+                        'record',
+                        shard['first_client'] + number,
+                        record.index,
+                        record.started,
+                        record.completed,
+                        record.value,
+                        None if record.success else repr(record.error),
+                    ))
+
+        pool = ThreadPool(shard['clients'])
+        delay = start - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        try:
+            pool.map(client, range(shard['clients']))
+        finally:
+            pool.close()
+            pool.join()
+        connection.send(('done',))
+
+
+class DistributedRun(object):
+    """A run of shards on the agents of a :class:`Coordinator`.
+
+    Behaves as a started performance thread: :meth:`join` waits for the
+    agents to complete and ``windows`` holds the ``(started, completed)``
+    time of each operation.
+
+    :param callback: Optional callable receiving the client name and the
+        :class:`robottelo.performance.load.OperationRecord` of each
+        successful operation, as soon as it is received.
+    :param metrics: Optional
+        :class:`robottelo.performance.metrics.LiveMetrics` fed with the
+        operations.
+
+    """
+    def __init__(self, agents, shards, start, callback=None, metrics=None):
+        self.agents = agents
+        self.shards = shards
+        self.start_time = start
+        self.callback = callback
+        self.metrics = metrics
+        self.records = {}
+        self.windows = []
+        self.errors = []
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        """Send the shards and receive the timings in the background."""
+        for (connection, offset), shard in zip(self.agents, self.shards):
+            connection.send(('run', shard, self.start_time + offset))
+            thread = threading.Thread(
+                target=self._receive,
+                args=(connection, offset, shard['workload']),
+            )
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def _receive(self, connection, offset, operation):
+        """Receive the timings of an agent until it is done."""
+        while True:
+            try:
+                message = connection.recv()
+            except (EOFError, IOError) as err:
+                self.errors.append('Agent disconnected: {0!r}'.format(err))
+                return
+            if message[0] == 'done':
+                return
+            if message[0] == 'error':
+                self.errors.append(message[1])
+                return
+            _, client, index, started, completed, value, error = message
+            # agent clock to coordinator clock
+            record = OperationRecord(index, started - offset)
+            record.started = started - offset
+            record.completed = completed - offset
+            record.value = value
+            record.success = error is None
+            record.error = error
+            name = 'thread-{0}'.format(client)
+            with self._lock:
+                self.records.setdefault(name, []).append(record)
+                self.windows.append((record.started, record.completed))
+                if self.callback is not None and record.success:
+                    self.callback(name, record)
+            if self.metrics is not None:
+                self.metrics.record(
+                    operation, record.service_time,
+                    error=not (record.success and value))
+
+    def completion_times(self):
+        """Return the completion time of the successful operations of each
+        client, in the order they were passed to the callback.
+        """
+        with self._lock:
+            return dict(
+                (name, [
+                    record.completed for record in records if record.success
+                ])
+                for name, records in self.records.items()
+            )
+
+    def join(self):
+        """Wait for all the agents to complete.
+
+        :raises: ``RuntimeError`` if an agent failed.
+
+        """
+        for thread in self._threads:
+            thread.join()
+        if self.errors:
+            raise RuntimeError(
+                'Distributed run failed: {0}'.format('; '.join(self.errors)))
+
+
+class Coordinator(object):
+    """Drive the agents of a distributed run.
+
+    :param addresses: The ``(host, port)`` of each agent.
+    :param str authkey: The key the agents were started with.
+    :param metrics: Optional
+        :class:`robottelo.performance.metrics.LiveMetrics` fed with the
+        operations of the agents.
+    :param float start_delay: Seconds between sending the shards and the
+        synchronized start.
+
+    """
+    def __init__(self, addresses, authkey, metrics=None, start_delay=1.0):
+        self.addresses = addresses
+        self.authkey = authkey
+        self.metrics = metrics
+        self.start_delay = start_delay
+        self.agents = []
+
+    def connect(self):
+        """Connect to the agents and measure their clock offset."""
+        for address in self.addresses:
+            connection = Client(tuple(address), authkey=_encode(self.authkey))
+            offset = self._clock_offset(connection)
+            LOGGER.info(
+                'Agent %s:%s clock offset: %.3fs', address[0], address[1],
+                offset)
+            self.agents.append((connection, offset))
+
+    @staticmethod
+    def _clock_offset(connection, samples=5):
+        """Return the offset of the agent clock, from the exchange with the
+        shortest round trip.
+        """
+        best = None
+        for _ in range(samples):
+            before = time.time()
+            connection.send(('clock',))
+            agent_time = connection.recv()[1]
+            after = time.time()
+            if best is None or after - before < best[0]:
+                best = (after - before, agent_time - (before + after) / 2)
+        return best[1]
+
+    def start(self, shards, callback=None):
+        """Start running ``shards``, one per agent, see
+        :func:`make_shards`.
+
+        :returns: The started :class:`DistributedRun`.
+
+        """
+        if len(shards) > len(self.agents):
+            raise ValueError(
+                '{0} shards for {1} agents'.format(
+                    len(shards), len(self.agents)))
+        run = DistributedRun(
+            self.agents[:len(shards)],
+            shards,
+            time.time() + self.start_delay,
+            callback,
+            self.metrics,
+        )
+        run.start()
+        return run
+
+    def run(self, shards, callback=None):
+        """Run ``shards`` until all the agents complete.
+
+        :returns: A dictionary mapping the client names, ``thread-<n>``, to
+            the :class:`robottelo.performance.load.OperationRecord` of their
+            operations, on the coordinator clock.
+
+        """
+        run = self.start(shards, callback)
+        run.join()
+        return run.records
+
+    def close(self):
+        """Stop the agents."""
+        for connection, _ in self.agents:
+            try:
+                connection.send(('stop',))
+            except (IOError, OSError):
+                pass
+            connection.close()
+        self.agents = []
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _listening_port(line):
+    """Return the port of the agent listening line."""
+    match = LISTENING.match(line.strip())
+    if match is None:
+        raise RuntimeError('Agent failed to start: {0}'.format(line))
+    return int(match.group(2))
+
+
+def start_local_agent(authkey, port=0, cwd=None):
+    """Start an agent in a separate process of this host.
+
+    :returns: The agent ``subprocess.Popen`` and its ``(host, port)``.
+
+    """
+    env = dict(os.environ)
+    env[AUTHKEY_ENV] = str(authkey)
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'robottelo.performance.distributed',
+         '--host', '127.0.0.1', '--port', str(port)],
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    line = process.stdout.readline()
+    try:
+        return process, ('127.0.0.1', _listening_port(line))
+    except RuntimeError:
+        process.kill()
+        raise
+
+
+def start_remote_agent(hostname, authkey, port=DEFAULT_AGENT_PORT,
+                       directory=None, python='python'):
+    """Start an agent on ``hostname`` over SSH.
+
+    The authentication key is sent on the standard input of the agent, so
+    it is not seen on the command line of the remote processes.
+
+    :param str directory: The robottelo checkout on ``hostname``, defaults
+        to the home directory.
+    :param str python: The Python interpreter on ``hostname``.
+    :returns: The SSH channel running the agent and its ``(host, port)``.
+
+    """
+    command = (
+        'exec {0} -m robottelo.performance.distributed --port {1} '
+        '--authkey-stdin'.format(python, port)
+    )
+    if directory:
+        command = 'cd {0} && {1}'.format(shlex_quote(directory), command)
+    transport = ssh.get_shared_connection(hostname).get_transport()
+    channel = transport.open_session()
+    channel.exec_command(command)
+    channel.sendall('{0}\n'.format(authkey).encode('ascii'))
+    line = channel.makefile('r').readline()
+    if isinstance(line, bytes):
+        line = line.decode('utf-8', 'replace')
+    if not line:
+        stderr = channel.makefile_stderr('r').read()
+        channel.close()
+        raise RuntimeError(
+            'Agent failed to start on {0}: {1}'.format(hostname, stderr))
+    return channel, (hostname, _listening_port(line))
+
+
+def main():
+    """Run an agent until its coordinator is done."""
+    parser = argparse.ArgumentParser(description='Run a load agent.')
+    parser.add_argument(
+        '--host',
+        help='interface to listen on (default: the one facing the '
+             'coordinator)')
+    parser.add_argument(
+        '--port', type=int, default=DEFAULT_AGENT_PORT,
+        help='port to listen on, 0 for any (default: %(default)s)')
+    parser.add_argument(
+        '--authkey-stdin', action='store_true',
+        help='read the authentication key from the first line of the '
+             'standard input instead of the {0} environment variable'
+             .format(AUTHKEY_ENV))
+    args = parser.parse_args()
+    if args.authkey_stdin:
+        authkey = sys.stdin.readline().strip()
+    else:
+        authkey = os.environ.get(AUTHKEY_ENV)
+    if not authkey:
+        parser.error(
+            'the {0} environment variable, or the standard input with '
+            '--authkey-stdin, must hold the authentication key'
+            .format(AUTHKEY_ENV))
+    logging.basicConfig(level=logging.INFO)
+    agent = Agent(args.host, args.port, authkey)
+    host, port = agent.address
+    sys.stdout.write('Agent listening on {0}:{1}\n'.format(host, port))
+    sys.stdout.flush()
+    agent.serve()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,80 @@
-"""Test utilities for generating charts for both Candlepin and Pulp tests"""
+"""Test utilities for generating charts for both Candlepin and Pulp tests
+
+Raw timing series longer than :data:`MAX_CHART_POINTS` are downsampled by
+:func:`min_max_decimate` before being plotted.
+
+Charts can be rendered off the test critical path by a
+:class:`ChartRenderer`, which runs the chart functions on a pool of
+background processes. Raw charts are rendered from the saved
+:class:`robottelo.performance.store.TimingStore` runs, which remember their
+charts, so :func:`regenerate_charts` can render them again later without
+running the tests.
+
+"""
+import logging
+import multiprocessing
+import numpy
+import os
 import pygal
 
+from robottelo.performance.store import METADATA_FILE_NAME, TimingStore
+
+LOGGER = logging.getLogger(__name__)
+
+#: Maximum number of points plotted per client on the raw charts
+MAX_CHART_POINTS = 500
+
+
+def min_max_decimate(time_result_dict, max_points=MAX_CHART_POINTS):
+    """Downsample the raw series of all clients, preserving their shape.
+
+    The iterations are split in windows, the same for all clients, and each
+    window is replaced by its minimum and maximum timings, in the order they
+    happened, so spikes are kept.
+
+    :param dict time_result_dict: The ``{'thread-N': [...]}`` raw timings.
+    :param int max_points: Maximum number of points per series.
+    :returns: A ``(labels, series)`` tuple: the x labels, the iteration
+        number of each point, and a dictionary mapping each thread to its
+        downsampled series. Missing values of the clients with fewer
+        iterations are ``None``.
+
+    """
+    length = max(
+        [len(time_list) for time_list in time_result_dict.values()] + [0])
+    if length <= max_points:
+        return (
+            [str(i) for i in range(1, length + 1)],
+            dict(
+                (key, list(time_list))
+                for key, time_list in time_result_dict.items()
+            ),
+        )
+    window = -(-length // max(1, max_points // 2))
+    num_windows = -(-length // window)
+    labels = []
+    for index in range(num_windows):
+        labels.append(str(index * window + 1))
+        labels.append(str(min(length, (index + 1) * window)))
+    rows = numpy.arange(num_windows)
+    series = {}
+    for key, time_list in time_result_dict.items():
+        matrix = numpy.full(num_windows * window, numpy.nan)
+        matrix[:len(time_list)] = numpy.asarray(time_list, dtype=float)
+        matrix = matrix.reshape(num_windows, window)
+        missing = numpy.isnan(matrix)
+        lows = numpy.where(missing, numpy.inf, matrix).argmin(axis=1)
+        highs = numpy.where(missing, -numpy.inf, matrix).argmax(axis=1)
+        pairs = numpy.column_stack([
+            matrix[rows, numpy.minimum(lows, highs)],
+            matrix[rows, numpy.maximum(lows, highs)],
+        ])
+        series[key] = [
+            None if numpy.isnan(value) else float(value)
+            for value in pairs.ravel()
+        ]
+    return labels, series
+
 
 def generate_bar_chart_stat(stat_dict, head, filename, legend):
     """Generate Bar chart for stat on concurrent subscription
@@ -16,7 +90,8 @@ def generate_bar_chart_stat(stat_dict, head, filename, legend):
     bar_chart.x_labels = ('min', 'median', 'max', 'std')
     bar_chart.x_title = 'Statistics'
     bar_chart.y_title = 'Time (s)'
-    for key in range(len(stat_dict)):
+    # clients whose operations all failed have no statistics
+    for key in sorted(stat_dict):
         bar_chart.add('{0}-{1}'.format(legend, key), stat_dict.get(key))
     bar_chart.render_to_file(filename)
 
@@ -34,15 +109,15 @@ def generate_stacked_line_chart_raw(time_result_dict, head, filename):
         show_dots=False,
         range=(0, 60),
     )
-    max_label = len(time_result_dict.get('thread-0'))
-    stackedline_chart.x_labels = [str(i) for i in range(1, max_label + 1)]
+    labels, series = min_max_decimate(time_result_dict)
+    stackedline_chart.x_labels = labels
     stackedline_chart.title = head
     stackedline_chart.x_title = 'Iterations'
     stackedline_chart.y_title = 'Time (s)'
     # for each client, add time list into chart
     for thread in range(len(time_result_dict)):
         key = 'thread-{0}'.format(thread)
-        time_list = time_result_dict.get(key)
+        time_list = series.get(key)
         stackedline_chart.add('client-{0}'.format(thread), time_list)
     stackedline_chart.render_to_file(filename)
 
@@ -67,15 +142,15 @@ def generate_line_chart_raw(time_result_dict, head, filename, line_chart):
     :param obj line_chart: Line chart object from either Pulp or Candlepin
 
     """
-    max_label = len(time_result_dict.get('thread-0'))
-    line_chart.x_labels = [str(i) for i in range(1, max_label + 1)]
+    labels, series = min_max_decimate(time_result_dict)
+    line_chart.x_labels = labels
     line_chart.title = head
     line_chart.x_title = 'Iterations'
     line_chart.y_title = 'Time (s)'
     # for each client, add time list into chart
     for thread in range(len(time_result_dict)):
         key = 'thread-{0}'.format(thread)
-        time_list = time_result_dict.get(key)
+        time_list = series.get(key)
         line_chart.add('client-{0}'.format(thread), time_list)
     line_chart.render_to_file(filename)
 
@@ -169,3 +244,122 @@ def generate_line_chart_stat_pulp(stat_dict, head, filename, max_num_tests):
     line_chart.x_title = '# of Repos Synced'
     line_chart.y_title = 'Time (s)'
     generate_line_chart_stat(stat_dict, filename, line_chart)
+
+
+#: Raw chart functions rendered from timing stores, by chart kind
+RAW_CHARTS = {
+    'line_candlepin': generate_line_chart_raw_candlepin,
+    'line_pulp': generate_line_chart_raw_pulp,
+    'stacked_line': generate_stacked_line_chart_raw,
+}
+
+
+def render_raw_chart_from_store(path, kind, head, filename):
+    """Render a raw chart from the timings of a saved run
+
+    :param str path: Directory of the
+        :class:`robottelo.performance.store.TimingStore` run
+    :param str kind: One of the :data:`RAW_CHARTS` keys
+    :param str head: Title of charts
+    :param str filename: The name of output svg chart
+
+    """
+    RAW_CHARTS[kind](TimingStore.open(path).time_result_dict(), head, filename)
+
+
+class ChartRenderer(object):
+    """Render charts on a pool of background processes
+
+    The chart functions of this module are submitted with their arguments
+    and run by the pool, so the tests don't wait for pygal. Call
+    :meth:`wait` before the end of the test run.
+
+    The processes are spawned where the interpreter supports it, else
+    forked: call :meth:`start` before starting any other thread then, so
+    the processes don't inherit locks held by those threads.
+
+    :param int processes: Number of rendering processes, defaults to the
+        number of CPUs.
+
+    """
+    def __init__(self, processes=None):
+        self.processes = processes
+        self._pool = None
+        self._pending = []
+
+    def start(self):
+        """Start the rendering processes, if not started yet"""
+        if self._pool is not None:
+            return
+        get_context = getattr(multiprocessing, 'get_context', None)
+        if get_context is None:
+            self._pool = multiprocessing.Pool(self.processes)
+        else:
+            self._pool = get_context('spawn').Pool(self.processes)
+
+    def submit(self, function, *args):
+        """Render a chart in the background
+
+        :param function: A chart function of this module, e.g.
+            :func:`generate_bar_chart_stat` or
+            :func:`render_raw_chart_from_store`
+        :param args: The function arguments
+
+        """
+        self.start()
+        self._pending.append(
+            (function.__name__, self._pool.apply_async(function, args)))
+
+    def wait(self):
+        """Wait for all the submitted charts to be rendered
+
+        :return: A list of ``(function name, error)`` tuples of the charts
+            which failed to render.
+
+        """
+        errors = []
+        for name, result in self._pending:
+            try:
+                result.get()
+            except Exception as err:  # pylint:disable=broad-except
+                LOGGER.warning('Failed to render chart %s: %s', name, err)
+                errors.append((name, err))
+        self._pending = []
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        return errors
+
+
+def regenerate_charts(path, renderer=None):
+    """Render again the raw charts of saved runs
+
+    Each run remembers its charts on the ``charts`` list of its metadata,
+    as ``{'kind': ..., 'head': ..., 'filename': ...}`` dictionaries.
+
+    :param str path: Directory of a timing store run or a directory holding
+        runs, e.g. ``perf-runs``
+    :param renderer: Optional :class:`ChartRenderer` the charts are
+        submitted to, else they are rendered right away
+    :return: The file names of the rendered charts
+
+    """
+    if os.path.isfile(os.path.join(path, METADATA_FILE_NAME)):
+        run_paths = [path]
+    else:
+        run_paths = [
+            os.path.join(path, name) for name in sorted(os.listdir(path))
+            if os.path.isfile(os.path.join(path, name, METADATA_FILE_NAME))
+        ]
+    filenames = []
+    for run_path in run_paths:
+        metadata = TimingStore.open(run_path).metadata['run']
+        for chart in metadata.get('charts', []):
+            args = (run_path, chart['kind'], chart['head'], chart['filename'])
+            if renderer is None:
+                render_raw_chart_from_store(*args)
+            else:
+                renderer.submit(render_raw_chart_from_store, *args)
+            filenames.append(chart['filename'])
+    return filenames
@@ -0,0 +1,353 @@
+"""Streaming latency histograms with a fixed memory footprint
+
+Keeping every timing of a long running test in a list makes its memory grow
+without bound. A :class:`LatencyHistogram` counts the timings on logarithmic
+buckets instead, so its size only depends on the range and precision of the
+recorded values, and percentiles are computed with a bounded relative
+error::
+
+    histogram = LatencyHistogram(precision=0.01)
+    histogram.record(0.42)
+    histogram.record_many(timings)
+    histogram.percentile(99)
+
+Histograms with the same parameters can be merged, including the ones built
+on other processes and sent over as :meth:`LatencyHistogram.to_dict`
+dictionaries.
+
+A :class:`LatencyRecorder` is shared by many threads: each thread records
+into its own histograms, so recording needs no lock, and every
+``bucket_size`` timings of a thread a new bucket histogram is started,
+giving the bucketed series computed by :mod:`robottelo.performance.stat`.
+
+"""
+import math
+import numpy
+import threading
+
+
+class LatencyHistogram(object):
+    """Count latencies on logarithmic buckets.
+
+    :param precision: Maximum relative error of the computed percentiles.
+    :param lowest: Lowest distinguishable value, smaller values are counted
+        on the lowest bucket.
+    :param highest: Highest distinguishable value, greater values are
+        counted on the highest bucket.
+
+    Minimum, maximum, mean and standard deviation are exact.
+
+    """
+    def __init__(self, precision=0.01, lowest=1e-6, highest=86400.0):
+        if not 0 < precision < 1:
+            raise ValueError('precision must be between 0 and 1')
+        if not 0 < lowest < highest:
+            raise ValueError('lowest must be positive and below highest')
+        self.precision = precision
+        self.lowest = lowest
+        self.highest = highest
+        self._gamma = (1 + precision) / (1 - precision)
+        self._log_gamma = math.log(self._gamma)
+        self._offset = self._index(lowest)
+        self.counts = numpy.zeros(
+            self._index(highest) - self._offset + 1, dtype=numpy.int64)
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.sum = 0.0
+        self.sum_squares = 0.0
+
+    def _index(self, value):
+        """Return the absolute bucket index of ``value``."""
+        return int(math.ceil(math.log(value) / self._log_gamma))
+
+    def _bucket(self, value):
+        """Return the position on :attr:`counts` of ``value``."""
+        value = min(max(value, self.lowest), self.highest)
+        return self._index(value) - self._offset
+
+    def _value(self, bucket):
+        """Return the value representing the bucket at position
+        ``bucket``.
+        """
+        return (
+            2 * self._gamma ** (bucket + self._offset) / (self._gamma + 1))
+
+    def _update_moments(self, count, minimum, maximum, total, squares):
+        """Update the exact metrics with the ones of recorded values."""
+        self.count += count
+        self.min = minimum if self.min is None else min(self.min, minimum)
+        self.max = maximum if self.max is None else max(self.max, maximum)
+        self.sum += total
+        self.sum_squares += squares
+
+    def record(self, value):
+        """Record a single value."""
+        value = float(value)
+        self.counts[self._bucket(value)] += 1
+        self._update_moments(1, value, value, value, value * value)
+
+    def record_many(self, values):
+        """Record a sequence of values at once."""
+        values = numpy.asarray(values, dtype=float)
+        if not values.size:
+            return
+        clipped = numpy.clip(values, self.lowest, self.highest)
+        buckets = numpy.ceil(
+            numpy.log(clipped) / self._log_gamma).astype(int) - self._offset
+        self.counts += numpy.bincount(
+            buckets, minlength=len(self.counts)).astype(numpy.int64)
+        self._update_moments(
+            values.size,
+            float(values.min()),
+            float(values.max()),
+            float(values.sum()),
+            float(numpy.dot(values, values)),
+        )
+
+    def _check_compatible(self, other):
+        """Make sure ``other`` has the same buckets."""
+        if (self.precision, self.lowest, self.highest) != (
+                other.precision, other.lowest, other.highest):
+            raise ValueError(
+                'Cannot merge histograms with different parameters')
+
+    def merge(self, other):
+        """Add the values recorded by ``other``.
+
+        :returns: This histogram.
+        :raises ValueError: If the histograms have different parameters.
+
+        """
+        self._check_compatible(other)
+        if other.count:
+            self.counts += other.counts
+            self._update_moments(
+                other.count, other.min, other.max, other.sum,
+                other.sum_squares)
+        return self
+
+    def copy(self):
+        """Return a copy of this histogram."""
+        result = LatencyHistogram(self.precision, self.lowest, self.highest)
+        return result.merge(self)
+
+    @property
+    def mean(self):
+        """Mean of the recorded values."""
+        if not self.count:
+            return None
+        return self.sum / self.count
+
+    @property
+    def std(self):
+        """Population standard deviation of the recorded values, as
+        ``numpy.std``.
+        """
+        if not self.count:
+            return None
+        variance = self.sum_squares / self.count - self.mean ** 2
+        return math.sqrt(max(variance, 0.0))
+
+    def percentiles(self, quantiles):
+        """Return the values below which the given percentages of the
+        recorded values fall.
+
+        :param quantiles: Sequence of percentages between 0 and 100.
+        :returns: A list of values, ``None`` for each if nothing was
+            recorded.
+
+        """
+        if not self.count:
+            return [None for _ in quantiles]
+        cumulative = numpy.cumsum(self.counts)
+        result = []
+        for quantile in quantiles:
+            if not 0 <= quantile <= 100:
+                raise ValueError('Percentiles must be between 0 and 100')
+            rank = quantile / 100.0 * (self.count - 1)
+            bucket = int(numpy.searchsorted(cumulative, rank, side='right'))
+            result.append(min(max(self._value(bucket), self.min), self.max))
+        return result
+
+    def percentile(self, quantile):
+        """Return the value below which ``quantile`` percent of the recorded
+        values fall.
+        """
+        return self.percentiles([quantile])[0]
+
+    @property
+    def median(self):
+        """Median of the recorded values."""
+        return self.percentile(50)
+
+    def to_dict(self):
+        """Return a JSON serializable dictionary of this histogram, see
+        :meth:`from_dict`.
+        """
+        nonzero = numpy.nonzero(self.counts)[0]
+        return {
+            'precision': self.precision,
+            'lowest': self.lowest,
+            'highest': self.highest,
+            'count': self.count,
+            'min': self.min,
+            'max': self.max,
+            'sum': self.sum,
+            'sum_squares': self.sum_squares,
+            'counts': dict(
+                (str(bucket), int(self.counts[bucket])) for bucket in nonzero
+            ),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a histogram from a :meth:`to_dict` dictionary."""
+        histogram = cls(data['precision'], data['lowest'], data['highest'])
+        for bucket, count in data['counts'].items():
+            histogram.counts[int(bucket)] = count
+        histogram.count = data['count']
+        histogram.min = data['min']
+        histogram.max = data['max']
+        histogram.sum = data['sum']
+        histogram.sum_squares = data['sum_squares']
+        return histogram
+
+
+def merge_histograms(histograms):
+    """Return a new histogram with the values of all ``histograms``.
+
+    :raises ValueError: If no histogram is given or they have different
+        parameters.
+
+    """
+    histograms = list(histograms)
+    if not histograms:
+        raise ValueError('No histogram to merge')
+    result = histograms[0].copy()
+    for histogram in histograms[1:]:
+        result.merge(histogram)
+    return result
+
+
+class LatencyRecorder(object):
+    """Record latencies from many threads.
+
+    Each key, by default the recording thread name, has its own series of
+    histograms, so threads never share a histogram as long as each one
+    records with its own key.
+
+    :param bucket_size: Number of values of each bucket histogram of a key,
+        ``None`` to record all of them on a single histogram.
+    :param histogram_options: Keyword arguments given to the
+        :class:`LatencyHistogram` instances.
+
+    """
+    def __init__(self, bucket_size=None, **histogram_options):
+        self.bucket_size = bucket_size
+        self.histogram_options = histogram_options
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def _new_histogram(self):
+        """Return an empty histogram."""
+        return LatencyHistogram(**self.histogram_options)
+
+    def record(self, value, key=None):
+        """Record a latency.
+
+        :param value: The latency, in seconds.
+        :param key: The series the value belongs to, defaults to the current
+            thread name.
+
+        """
+        if key is None:
+            key = threading.current_thread().name
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(
+                    key, [self._new_histogram()])
+        if self.bucket_size and series[-1].count >= self.bucket_size:
+            series.append(self._new_histogram())
+        series[-1].record(value)
+
+    def keys(self):
+        """Return the recorded keys, sorted."""
+        with self._lock:
+            return sorted(self._series)
+
+    def buckets(self, key):
+        """Return the bucket histograms of ``key``, in recording order."""
+        with self._lock:
+            return list(self._series.get(key, []))
+
+    def histogram(self, key=None):
+        """Return a histogram of all the values of ``key``, or of all the
+        keys if ``None``.
+        """
+        keys = self.keys() if key is None else [key]
+        histograms = [
+            histogram for name in keys for histogram in self.buckets(name)]
+        if not histograms:
+            return self._new_histogram()
+        return merge_histograms(histograms)
+
+    def merged_buckets(self):
+        """Return the i-th bucket histograms of all keys merged together,
+        for each i.
+        """
+        series = [self.buckets(key) for key in self.keys()]
+        length = max([len(buckets) for buckets in series] + [0])
+        return [
+            merge_histograms(
+                buckets[index] for buckets in series if index < len(buckets))
+            for index in range(length)
+        ]
+
+    def to_dict(self):
+        """Return a JSON serializable dictionary of all the series, see
+        :meth:`from_dict`.
+        """
+        return {
+            'bucket_size': self.bucket_size,
+            'series': dict(
+                (key, [histogram.to_dict() for histogram in self.buckets(key)])
+                for key in self.keys()
+            ),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a recorder from a :meth:`to_dict` dictionary."""
+        recorder = cls(data['bucket_size'])
+        for key, buckets in data['series'].items():
+            recorder._series[key] = [
+                LatencyHistogram.from_dict(bucket) for bucket in buckets]
+            if buckets:
+                first = recorder._series[key][0]
+                recorder.histogram_options = {
+                    'precision': first.precision,
+                    'lowest': first.lowest,
+                    'highest': first.highest,
+                }
+        return recorder
+
+    def merge(self, other):
+        """Add the series of ``other``, e.g. a recorder of another process.
+
+        Buckets of a key recorded by both are merged position by position.
+
+        :returns: This recorder.
+
+        """
+        for key in other.keys():
+            theirs = other.buckets(key)
+            with self._lock:
+                ours = self._series.setdefault(key, [])
+                for index, histogram in enumerate(theirs):
+                    if index < len(ours):
+                        ours[index].merge(histogram)
+                    else:
+                        ours.append(histogram.copy())
+        return self
@@ -0,0 +1,407 @@
+"""Open-loop load generation at a controlled arrival rate
+
+The threads of :mod:`robottelo.performance.thread` run a closed loop: each
+thread sends its next request once the previous one finishes, so a slow
+server also slows down the load and the measured latencies miss the time the
+requests would have waited (coordinated omission).
+
+:class:`LoadGenerator` instead schedules the operations of a workload at the
+arrival times given by a rate profile, whatever the server response time. A
+worker pool runs them and, for every operation, the intended start, the
+actual start and the completion times are recorded::
+
+    generator = LoadGenerator(
+        CandlepinRegisterAKWorkload(ak_name, org_label, vm_ips),
+        RampRate(start_rate=0.5, end_rate=2, duration=600),
+        max_workers=len(vm_ips),
+    )
+    result = generator.run()
+    result.latencies()  # from intended start to completion
+
+"""
+import logging
+import math
+import numpy
+import random
+import sys
+import time
+
+from multiprocessing.pool import ThreadPool
+from robottelo.performance.candlepin import Candlepin
+from robottelo.performance.pulp import Pulp
+from six.moves import queue
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ConstantRate(object):
+    """Arrivals at a constant rate.
+
+    :param rate: Operations per second.
+    :param duration: Seconds the load lasts.
+    :param poisson: Use exponentially distributed inter-arrival times with
+        the same mean instead of evenly spaced arrivals.
+
+    """
+    def __init__(self, rate, duration, poisson=False):
+        if rate <= 0 or duration <= 0:
+            raise ValueError('rate and duration must be positive')
+        self.rate = float(rate)
+        self.duration = float(duration)
+        self.poisson = poisson
+
+    def offsets(self):
+        """Return the arrival offsets, in seconds from the load start."""
+        if not self.poisson:
+            count = int(math.ceil(self.rate * self.duration))
+            return [index / self.rate for index in range(count)]
+        offsets = []
+        offset = random.expovariate(self.rate)
+        while offset < self.duration:
+            offsets.append(offset)
+            offset += random.expovariate(self.rate)
+        return offsets
+
+
+class RampRate(object):
+    """Arrivals at a rate changing linearly from ``start_rate`` to
+    ``end_rate``.
+
+    :param start_rate: Operations per second at the load start.
+    :param end_rate: Operations per second at the load end.
+    :param duration: Seconds the load lasts.
+
+    """
+    def __init__(self, start_rate, end_rate, duration):
+        if start_rate < 0 or end_rate < 0 or start_rate == end_rate == 0:
+            raise ValueError('rates must be positive')
+        if duration <= 0:
+            raise ValueError('duration must be positive')
+        self.start_rate = float(start_rate)
+        self.end_rate = float(end_rate)
+        self.duration = float(duration)
+
+    def offsets(self):
+        """Return the arrival offsets, in seconds from the load start.
+
+        The n-th arrival happens when the integral of the rate reaches n.
+
+        """
+        slope = (self.end_rate - self.start_rate) / self.duration
+        total = (self.start_rate + self.end_rate) * self.duration / 2
+        offsets = []
+        for index in range(int(math.ceil(total))):
+            if slope == 0:
+                offset = index / self.start_rate
+            else:
+                offset = (
+                    -self.start_rate +
+                    math.sqrt(
+                        max(0, self.start_rate ** 2 + 2 * slope * index))
+                ) / slope
+            if offset < self.duration:
+                offsets.append(offset)
+        return offsets
+
+
+class OperationRecord(object):
+    """Timing of a single scheduled operation.
+
+    All times are :func:`time.time` timestamps.
+
+    :param index: Operation sequence number.
+    :param intended: When the operation was scheduled to start.
+
+    """
+    def __init__(self, index, intended):
+        self.index = index
+        self.intended = intended
+        self.started = None
+        self.completed = None
+        self.success = None
+        self.error = None
+        self.value = None
+
+    @property
+    def latency(self):
+        """Seconds from the intended start to the completion, the latency a
+        client arriving on schedule would have seen.
+
+        """
+        return self.completed - self.intended
+
+    @property
+    def service_time(self):
+        """Seconds from the actual start to the completion."""
+        return self.completed - self.started
+
+    @property
+    def start_delay(self):
+        """Seconds the operation started late because no worker or
+        resource was available.
+
+        """
+        return self.started - self.intended
+
+
+class LoadResult(object):
+    """Records of a :class:`LoadGenerator` run.
+
+    :param records: The :class:`OperationRecord` of each operation.
+    :param start: When the load started.
+    :param end: When the last operation completed.
+
+    """
+    def __init__(self, records, start, end):
+        self.records = records
+        self.start = start
+        self.end = end
+
+    @property
+    def completed(self):
+        """Records of the successful operations."""
+        return [record for record in self.records if record.success]
+
+    @property
+    def failed(self):
+        """Records of the failed operations."""
+        return [record for record in self.records if not record.success]
+
+    @property
+    def achieved_rate(self):
+        """Completed operations per second."""
+        if self.end <= self.start:
+            return 0.0
+        return len(self.completed) / (self.end - self.start)
+
+    def latencies(self):
+        """Latencies of the successful operations, see
+        :attr:`OperationRecord.latency`.
+        """
+        return numpy.array([record.latency for record in self.completed])
+
+    def service_times(self):
+        """Service times of the successful operations."""
+        return numpy.array(
+            [record.service_time for record in self.completed])
+
+    def start_delays(self):
+        """Start delays of all the operations."""
+        return numpy.array([record.start_delay for record in self.records])
+
+    def time_result_dict(self, key='thread-0'):
+        """Return the latencies in the ``{thread-name: [...]}`` form used by
+        :mod:`robottelo.performance.stat` and
+        :mod:`robottelo.performance.graph`.
+
+        """
+        return {key: [float(value) for value in self.latencies()]}
+
+
+class Workload(object):
+    """Base class of the operations run by a :class:`LoadGenerator`.
+
+    Subclasses implement :meth:`run`, any callable receiving the operation
+    index can be used as workload too.
+
+    """
+    #: Name of the argument, a list, whose item ``index`` is used by operation
+    #: ``index``, hence which needs an item per operation
+    indexed_argument = None
+
+    def __call__(self, index):
+        return self.run(index)
+
+    def run(self, index):
+        """Run operation number ``index``."""
+        raise NotImplementedError()
+
+
+class ResourcePool(object):
+    """Hands out resources, such as client VMs, which must not be used by
+    two operations at the same time.
+
+    Waiting for a resource delays the operation start, which is recorded as
+    :attr:`OperationRecord.start_delay`.
+
+    """
+    def __init__(self, resources):
+        self._queue = queue.Queue()
+        for resource in resources:
+            self._queue.put(resource)
+
+    def acquire(self):
+        """Wait for a free resource and return it."""
+        return self._queue.get()
+
+    def release(self, resource):
+        """Give a resource back."""
+        self._queue.put(resource)
+
+
+class CandlepinRegisterAKWorkload(Workload):
+    """Register a client by activation key, see
+    :meth:`robottelo.performance.candlepin.Candlepin.single_register_activation_key`.
+
+    """
+    def __init__(self, ak_name, default_org, vm_ips):
+        self.ak_name = ak_name
+        self.default_org = default_org
+        self.vms = ResourcePool(vm_ips)
+
+    def run(self, index):
+        vm_ip = self.vms.acquire()
+        try:
+            elapsed = Candlepin.single_register_activation_key(
+                self.ak_name, self.default_org, vm_ip)
+            if not elapsed:
+                raise RuntimeError(
+                    'Register {0} by activation key failed'.format(vm_ip))
+            return elapsed
+        finally:
+            self.vms.release(vm_ip)
+
+
+class CandlepinAttachWorkload(Workload):
+    """Register a client and attach a subscription, see
+    :meth:`robottelo.performance.candlepin.Candlepin.single_register_attach`.
+
+    """
+    def __init__(self, sub_id, default_org, environment, vm_ips):
+        self.sub_id = sub_id
+        self.default_org = default_org
+        self.environment = environment
+        self.vms = ResourcePool(vm_ips)
+
+    def run(self, index):
+        vm_ip = self.vms.acquire()
+        try:
+            elapsed = Candlepin.single_register_attach(
+                self.sub_id, self.default_org, self.environment, vm_ip)
+            if not all(elapsed):
+                raise RuntimeError(
+                    'Register and attach {0} failed'.format(vm_ip))
+            return elapsed
+        finally:
+            self.vms.release(vm_ip)
+
+
+class CandlepinDeleteWorkload(Workload):
+    """Delete a content host, see
+    :meth:`robottelo.performance.candlepin.Candlepin.single_delete`.
+
+    :param uuids: The content host ids, operation ``index`` deletes
+        ``uuids[index]``.
+
+    """
+    indexed_argument = 'uuids'
+
+    def __init__(self, uuids):
+        self.uuids = uuids
+
+    def run(self, index):
+        elapsed = Candlepin.single_delete(self.uuids[index], 'load')
+        if not elapsed:
+            raise RuntimeError(
+                'Delete content host {0} failed'.format(self.uuids[index]))
+        return elapsed
+
+
+class PulpSyncWorkload(Workload):
+    """Synchronize a repository, see
+    :meth:`robottelo.performance.pulp.Pulp.repository_single_sync`.
+
+    :param repositories: A dictionary mapping repository names to ids.
+        Operations cycle through them, a repository is never synchronized
+        twice at the same time.
+
+    """
+    def __init__(self, repositories):
+        self.repositories = ResourcePool(sorted(repositories.items()))
+
+    def run(self, index):
+        repository = self.repositories.acquire()
+        try:
+            repo_name, repo_id = repository
+            elapsed = Pulp.repository_single_sync(repo_id, repo_name, 'load')
+            if not elapsed:
+                raise RuntimeError(
+                    'Sync repository {0} failed'.format(repo_name))
+            return elapsed
+        finally:
+            self.repositories.release(repository)
+
+
+def run_operation(workload, record):
+    """Run the operation of ``record`` with ``workload``, filling the start
+    and completion times, the outcome and the returned value of the record.
+    Exceptions are recorded, not raised.
+    """
+    record.started = time.time()
+    try:
+        record.value = workload(record.index)
+    except Exception as err:  # pylint:disable=broad-except
+        LOGGER.debug(
+            'Operation %s failed', record.index, exc_info=sys.exc_info())
+        record.error = err
+        record.success = False
+    else:
+        record.success = True
+    record.completed = time.time()
+
+
+class LoadGenerator(object):
+    """Run a workload at the arrival times of a rate profile.
+
+    Operations are submitted at their intended start time whether or not the
+    previous ones completed.
+
+    :param workload: A :class:`Workload` or any callable receiving the
+        operation index.
+    :param profile: A rate profile, e.g. :class:`ConstantRate` or
+        :class:`RampRate`.
+    :param max_workers: Maximum number of operations running at the same
+        time. Operations arriving when all workers are busy start late.
+
+    """
+    def __init__(self, workload, profile, max_workers=10):
+        self.workload = workload
+        self.profile = profile
+        self.max_workers = max_workers
+
+    def _run_operation(self, record):
+        """Run a single operation, filling its record."""
+        run_operation(self.workload, record)
+
+    def run(self):
+        """Run the load until all the scheduled operations completed.
+
+        :returns: A :class:`LoadResult`.
+
+        """
+        offsets = self.profile.offsets()
+        records = []
+        pool = ThreadPool(self.max_workers)
+        start = time.time()
+        try:
+            for index, offset in enumerate(offsets):
+                intended = start + offset
+                delay = intended - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                record = OperationRecord(index, intended)
+                records.append(record)
+                pool.apply_async(self._run_operation, (record,))
+        finally:
+            pool.close()
+            pool.join()
+        end = max([start] + [
+            record.completed for record in records
+            if record.completed is not None
+        ])
+        result = LoadResult(records, start, end)
+        LOGGER.info(
+            'Load of %s operations: %s failed, %.2f/s achieved',
+            len(records), len(result.failed), result.achieved_rate
+        )
+        return result
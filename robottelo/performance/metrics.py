@@ -0,0 +1,334 @@
+"""Live metrics of the operations of a performance run
+
+:class:`LiveMetrics` keeps, per operation type, the total and error counts,
+the number of operations in flight and the latencies of the last ``window``
+seconds, on one :class:`robottelo.performance.histogram.LatencyHistogram`
+per second, so memory does not grow with the run length::
+
+    metrics = LiveMetrics(window=60)
+    with metrics.track('register'):
+        Candlepin.single_register_activation_key(ak_name, org, vm_ip)
+    metrics.snapshot()['register']['p95']
+
+The metrics can be watched while the run is in progress, either from a
+:class:`MetricsServer`, which serves them in the Prometheus text format on
+``/metrics`` and as JSON on ``/metrics.json``, or from the JSON file
+periodically rewritten by a :class:`SnapshotWriter`.
+
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+from robottelo.performance.histogram import LatencyHistogram, merge_histograms
+from six.moves import BaseHTTPServer, socketserver
+
+LOGGER = logging.getLogger(__name__)
+
+#: Latency percentiles reported for each operation
+REPORTED_PERCENTILES = (50, 95, 99)
+
+
+class _OperationMetrics(object):
+    """Counters and sliding window latencies of one operation type."""
+
+    def __init__(self, window, histogram_options):
+        self.lock = threading.Lock()
+        self.window = window
+        self.histogram_options = histogram_options
+        self.count = 0
+        self.errors = 0
+        self.in_flight = 0
+        # one [second, histogram, errors] slot per second of the window
+        self.slots = [[None, None, 0] for _ in range(window)]
+
+    def _slot(self, second):
+        """Return the slot of ``second``, reset if it was of an older
+        second. Must be called holding the lock.
+        """
+        slot = self.slots[second % self.window]
+        if slot[0] != second:
+            slot[0] = second
+            slot[1] = LatencyHistogram(**self.histogram_options)
+            slot[2] = 0
+        return slot
+
+    def record(self, latency, error, now):
+        """Record a finished operation. Must be called holding the lock."""
+        slot = self._slot(int(now))
+        self.count += 1
+        if error:
+            self.errors += 1
+            slot[2] += 1
+        else:
+            slot[1].record(latency)
+
+    def window_slots(self, now):
+        """Return the slots of the last ``window`` seconds. Must be called
+        holding the lock.
+        """
+        oldest = int(now) - self.window + 1
+        return [
+            (slot[1].copy(), slot[2]) for slot in self.slots
+            if slot[0] is not None and slot[0] >= oldest
+        ]
+
+
+class LiveMetrics(object):
+    """Rolling metrics of the operations of a run.
+
+    Each operation type has its own lock, held only while its counters are
+    updated.
+
+    :param int window: Seconds of the sliding window the rates and
+        percentiles are computed on.
+    :param histogram_options: Keyword arguments of the
+        :class:`robottelo.performance.histogram.LatencyHistogram` instances.
+
+    """
+    def __init__(self, window=60, **histogram_options):
+        self.window = window
+        self.histogram_options = histogram_options
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._operations = {}
+
+    def _operation(self, operation):
+        """Return the metrics of ``operation``, creating them if needed."""
+        metrics = self._operations.get(operation)
+        if metrics is None:
+            with self._lock:
+                metrics = self._operations.setdefault(
+                    operation,
+                    _OperationMetrics(self.window, self.histogram_options),
+                )
+        return metrics
+
+    def start(self, operation):
+        """Count an operation as in flight.
+
+        :returns: The start time, to be given to :meth:`finish`.
+
+        """
+        metrics = self._operation(operation)
+        with metrics.lock:
+            metrics.in_flight += 1
+        return time.time()
+
+    def finish(self, operation, started, error=False):
+        """Record the end of an operation started by :meth:`start`."""
+        now = time.time()
+        metrics = self._operation(operation)
+        with metrics.lock:
+            metrics.in_flight -= 1
+            metrics.record(now - started, error, now)
+
+    def record(self, operation, latency, error=False):
+        """Record an operation which was not tracked by :meth:`start`."""
+        metrics = self._operation(operation)
+        with metrics.lock:
+            metrics.record(latency, error, time.time())
+
+    @contextmanager
+    def track(self, operation):
+        """Track the operation run inside the context, an exception counts
+        as an error.
+        """
+        started = self.start(operation)
+        try:
+            yield
+        except Exception:
+            self.finish(operation, started, error=True)
+            raise
+        self.finish(operation, started)
+
+    def snapshot(self):
+        """Return the current metrics.
+
+        :returns: A dictionary mapping each operation to a dictionary with
+            the total ``count`` and ``errors``, the operations ``in_flight``,
+            the ``ops_per_sec`` and ``errors_per_sec`` and the ``p50``,
+            ``p95`` and ``p99`` latencies over the window.
+
+        """
+        now = time.time()
+        elapsed = max(min(self.window, now - self.started), 1.0)
+        with self._lock:
+            operations = list(self._operations.items())
+        result = {}
+        for operation, metrics in operations:
+            with metrics.lock:
+                count = metrics.count
+                errors = metrics.errors
+                in_flight = metrics.in_flight
+                slots = metrics.window_slots(now)
+            histograms = [histogram for histogram, _ in slots]
+            histogram = (
+                merge_histograms(histograms) if histograms
+                else LatencyHistogram(**self.histogram_options)
+            )
+            window_errors = sum(slot_errors for _, slot_errors in slots)
+            stats = {
+                'count': count,
+                'errors': errors,
+                'errors_per_sec': window_errors / elapsed,
+                'in_flight': in_flight,
+                'ops_per_sec': (histogram.count + window_errors) / elapsed,
+            }
+            for quantile, value in zip(
+                    REPORTED_PERCENTILES,
+                    histogram.percentiles(REPORTED_PERCENTILES)):
+                stats['p{0}'.format(quantile)] = value
+            result[operation] = stats
+        return result
+
+    def prometheus_text(self):
+        """Return the current metrics in the Prometheus text format."""
+        snapshot = self.snapshot()
+        families = (
+            ('robottelo_operations_total', 'counter',
+             'Finished operations.', 'count'),
+            ('robottelo_operation_errors_total', 'counter',
+             'Failed operations.', 'errors'),
+            ('robottelo_operations_in_flight', 'gauge',
+             'Operations in progress.', 'in_flight'),
+            ('robottelo_operations_per_second', 'gauge',
+             'Finished operations per second over the window.',
+             'ops_per_sec'),
+        )
+        lines = []
+        for name, kind, description, key in families:
+            lines.append('# HELP {0} {1}'.format(name, description))
+            lines.append('# TYPE {0} {1}'.format(name, kind))
+            for operation in sorted(snapshot):
+                lines.append('{0}{{operation="{1}"}} {2}'.format(
+                    name, _label(operation), snapshot[operation][key]))
+        name = 'robottelo_operation_latency_seconds'
+        lines.append(
+            '# HELP {0} Operation latency percentiles over the window.'
+            .format(name))
+        lines.append('# TYPE {0} gauge'.format(name))
+        for operation in sorted(snapshot):
+            for quantile in REPORTED_PERCENTILES:
+                value = snapshot[operation]['p{0}'.format(quantile)]
+                lines.append(
+                    '{0}{{operation="{1}",quantile="{2}"}} {3}'.format(
+                        name,
+                        _label(operation),
+                        quantile / 100.0,
+                        'NaN' if value is None else value,
+                    )
+                )
+        return '\n'.join(lines) + '\n'
+
+
+def _label(value):
+    """Escape a Prometheus label value."""
+    return (
+        u'{0}'.format(value).replace('\\', '\\\\').replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn,
+                           BaseHTTPServer.HTTPServer):
+    """HTTP server handling each request on its own thread."""
+    daemon_threads = True
+
+
+class MetricsServer(object):
+    """Serve live metrics over HTTP on a background thread.
+
+    ``/metrics`` returns the Prometheus text format and ``/metrics.json``
+    the :meth:`LiveMetrics.snapshot`.
+
+    :param metrics: The :class:`LiveMetrics` to serve.
+    :param str host: Address to listen on.
+    :param int port: Port to listen on, ``0`` picks a free one, see
+        :attr:`port`.
+
+    """
+    def __init__(self, metrics, host='127.0.0.1', port=0):
+        self.metrics = metrics
+
+        class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+            """Answer the metrics requests."""
+
+            def do_GET(self):  # noqa pylint:disable=C0103
+                """Send the metrics."""
+                if self.path == '/metrics':
+                    body = metrics.prometheus_text()
+                    content_type = 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body = json.dumps(metrics.snapshot(), sort_keys=True)
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                body = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):  # pylint:disable=W0622
+                LOGGER.debug(format, *args)
+
+        self._server = _ThreadingHTTPServer((host, port), Handler)
+        self.port = self._server.server_address[1]
+        self._thread = None
+
+    def start(self):
+        """Start serving on a daemon thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        LOGGER.info('Serving live metrics on port %s', self.port)
+
+    def stop(self):
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class SnapshotWriter(threading.Thread):
+    """Periodically rewrite a JSON file with the metrics snapshot.
+
+    :param metrics: The :class:`LiveMetrics` to write.
+    :param str filename: The JSON file, replaced atomically.
+    :param interval: Seconds between two writes.
+
+    """
+    def __init__(self, metrics, filename, interval=10):
+        super(SnapshotWriter, self).__init__()
+        self.daemon = True
+        self.metrics = metrics
+        self.filename = filename
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def write(self):
+        """Write the current snapshot."""
+        temp_name = u'{0}.tmp'.format(self.filename)
+        with open(temp_name, 'w') as handler:
+            json.dump({
+                'time': time.time(),
+                'operations': self.metrics.snapshot(),
+            }, handler, indent=2, sort_keys=True)
+        os.rename(temp_name, self.filename)
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.write()
+
+    def stop(self):
+        """Stop the periodic writes, writing a last snapshot."""
+        self._stop_event.set()
+        self.join()
+        self.write()
@@ -6,6 +6,7 @@ sequential repository sync, sequential repository re-sync.
 
 """
 import logging
+import time
 
 from robottelo import ssh
 from robottelo.cli.base import CLIReturnCodeError
@@ -96,11 +97,14 @@ class Pulp(object):
             repo_names_list,
             map_repo_name_id,
             sync_iterations,
-            savepoint=None):
+            savepoint=None,
+            completion_times=None):
         """Sync all repositories linearly, and repeat X times
 
         :param list repo_names_list: A list of targeting repository names
         :param int sync_iterations: The number of times to repeat sync
+        :param dict completion_times: Optional dictionary the completion
+            time of each sync is appended to, keyed as the timings
         :return time_result_dict_sync
         :rtype: dict
 
@@ -125,10 +129,15 @@ class Pulp(object):
                 LOGGER.debug(
                     'Sequential Sync {0} attempt {1}:'.format(repo_name, i)
                 )
-                # sync repository once at a time
-                time_result_dict_sync[key].append(
-                    cls.repository_single_sync(repo_id, repo_name, 'linear')
-                )
+                # sync repository once at a time, failed syncs have no
+                # timing
+                elapsed = cls.repository_single_sync(
+                    repo_id, repo_name, 'linear')
+                if not elapsed:
+                    continue
+                time_result_dict_sync[key].append(elapsed)
+                if completion_times is not None:
+                    completion_times.setdefault(key, []).append(time.time())
             # for resync purpose, no need to restore
             if savepoint is None:
                 return
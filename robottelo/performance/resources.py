@@ -0,0 +1,344 @@
+"""Resource usage of the Satellite server during a performance run
+
+A :class:`ResourceSampler` runs a shell loop on the server, over a single
+SSH channel kept open for the whole run, which prints every ``interval``
+seconds the system CPU, memory, load and disk counters and the processes
+list. Each sample is timestamped with the local clock when it is received,
+the same clock the client side timings are taken with, so the server
+resources and the client latencies share one timeline::
+
+    sampler = ResourceSampler(interval=5)
+    sampler.start()
+    ...  # run the load
+    sampler.stop()
+    sampler.write_csv('resources.csv', start=run_started, end=run_finished)
+
+Besides the system wide figures, the CPU, memory and number of processes are
+reported for each of the :data:`SERVICES`, and the number of open Postgres
+connections is counted from the Postgres backend processes.
+
+"""
+import csv
+import logging
+import re
+import threading
+import time
+
+from robottelo import ssh
+
+LOGGER = logging.getLogger(__name__)
+
+#: Services whose processes are reported, matched on the process command
+#: line. A process is reported with the first service it matches.
+SERVICES = (
+    ('postgres', re.compile(r'^(postgres|postmaster|/usr/\S*/postgres)')),
+    ('candlepin', re.compile(r'tomcat|catalina')),
+    ('pulp', re.compile(r'celery|pulp')),
+    ('qpidd', re.compile(r'qpidd|qdrouterd')),
+    ('mongod', re.compile(r'mongod')),
+    ('foreman', re.compile(r'[Pp]assenger|puma|dynflow|foreman')),
+    ('httpd', re.compile(r'httpd')),
+)
+
+#: Command line of the Postgres processes serving a client connection, e.g.
+#: ``postgres: candlepin candlepin 127.0.0.1(45678) idle``
+POSTGRES_CONNECTION = re.compile(r'^postgres: \S+ \S+ (\[local\]|\S+\(\d+\))')
+
+#: Whole disks of ``/proc/diskstats``, their partitions are not counted
+DISK = re.compile(r'^((s|v|xv|h)d[a-z]+|nvme\d+n\d+|dm-\d+)$')
+
+#: Columns of a resource sample, in csv column order
+RESOURCE_COLUMNS = (
+    'timestamp',
+    'cpu_percent',
+    'iowait_percent',
+    'load1',
+    'mem_used_mb',
+    'swap_used_mb',
+    'disk_read_mbps',
+    'disk_write_mbps',
+    'db_connections',
+) + tuple(
+    '{0}_{1}'.format(name, figure)
+    for name, _ in SERVICES
+    for figure in ('cpu_percent', 'rss_mb', 'processes')
+)
+
+#: Shell loop printing the raw counters every ``interval`` seconds. The CPU
+#: time of each process is read from ``/proc/<pid>/stat`` in clock ticks, as
+#: ``ps`` reports it in whole seconds.
+SAMPLE_SCRIPT = (
+    "tck=$(getconf CLK_TCK); "
+    "while :; do "
+    "echo '--- stat'; head -n 1 /proc/stat; "
+    "echo '--- meminfo'; cat /proc/meminfo; "
+    "echo '--- loadavg'; cat /proc/loadavg; "
+    "echo '--- diskstats'; cat /proc/diskstats; "
+    "echo '--- processes'; ps -eo pid=,rss=,args=; "
+    "echo '--- clktck'; echo $tck; "
+    "echo '--- cputicks'; cat /proc/[0-9]*/stat 2>/dev/null; "
+    "echo '--- end'; "
+    "sleep {interval}; "
+    "done"
+)
+
+
+def _cputimes(lines, clock_ticks):
+    """Read the user plus system CPU time, in seconds, of each process from
+    its ``/proc/<pid>/stat`` line.
+    """
+    cputimes = {}
+    for line in lines:
+        pid = line.split(None, 1)[0]
+        # the command name is between parentheses and may contain spaces
+        fields = line.rpartition(')')[2].split()
+        if len(fields) < 13:
+            continue
+        # utime and stime are the 14th and 15th fields of the whole line
+        cputimes[pid] = (
+            int(fields[11]) + int(fields[12])) / float(clock_ticks)
+    return cputimes
+
+
+def parse_sample(sections):
+    """Parse the raw output of one iteration of :data:`SAMPLE_SCRIPT`.
+
+    :param dict sections: The lines printed after each ``--- <name>``
+        marker, by section name.
+    :returns: A dictionary with the raw counters: ``cpu`` (total and idle
+        jiffies), ``meminfo`` (kB), ``load1``, ``disk`` (read and written
+        sectors) and ``processes`` (pid to service, rss and cputime). The
+        cputime of the processes which exited before their CPU time was read
+        is ``None``.
+
+    """
+    raw = {}
+    for line in sections.get('stat', []):
+        fields = line.split()
+        if fields and fields[0] == 'cpu':
+            jiffies = [int(value) for value in fields[1:9]]
+            raw['cpu'] = (sum(jiffies), jiffies[3], jiffies[4])
+    meminfo = {}
+    for line in sections.get('meminfo', []):
+        name, _, value = line.partition(':')
+        if value.split():
+            meminfo[name.strip()] = int(value.split()[0])
+    raw['meminfo'] = meminfo
+    for line in sections.get('loadavg', []):
+        raw['load1'] = float(line.split()[0])
+    read = written = 0
+    for line in sections.get('diskstats', []):
+        fields = line.split()
+        if len(fields) > 9 and DISK.match(fields[2]):
+            read += int(fields[5])
+            written += int(fields[9])
+    raw['disk'] = (read, written)
+    clock_ticks = 100
+    for line in sections.get('clktck', []):
+        clock_ticks = int(line)
+    cputimes = _cputimes(sections.get('cputicks', []), clock_ticks)
+    processes = {}
+    connections = 0
+    for line in sections.get('processes', []):
+        fields = line.split(None, 2)
+        if len(fields) < 3:
+            continue
+        pid, rss, args = fields
+        if POSTGRES_CONNECTION.match(args):
+            connections += 1
+        for name, pattern in SERVICES:
+            if pattern.search(args):
+                processes[pid] = (name, int(rss), cputimes.get(pid))
+                break
+    raw['processes'] = processes
+    raw['db_connections'] = connections
+    return raw
+
+
+def _delta_sample(previous, current, timestamp, elapsed):
+    """Compute a :data:`RESOURCE_COLUMNS` sample from two consecutive raw
+    samples, ``elapsed`` seconds apart.
+    """
+    sample = dict.fromkeys(RESOURCE_COLUMNS)
+    sample['timestamp'] = timestamp
+    sample['load1'] = current.get('load1')
+    sample['db_connections'] = current['db_connections']
+    meminfo = current['meminfo']
+    if 'MemTotal' in meminfo:
+        available = meminfo.get(
+            'MemAvailable',
+            sum(meminfo.get(name, 0)
+                for name in ('MemFree', 'Buffers', 'Cached')),
+        )
+        sample['mem_used_mb'] = (meminfo['MemTotal'] - available) / 1024.0
+    if 'SwapTotal' in meminfo:
+        sample['swap_used_mb'] = (
+            meminfo['SwapTotal'] - meminfo.get('SwapFree', 0)) / 1024.0
+    services = dict(
+        (name, {'cpu': 0.0, 'rss': 0, 'processes': 0})
+        for name, _ in SERVICES
+    )
+    for pid, (name, rss, cputime) in current['processes'].items():
+        service = services[name]
+        service['rss'] += rss
+        service['processes'] += 1
+        if previous is not None and cputime is not None:
+            before = previous['processes'].get(pid)
+            if before is None:
+                # processes started since the previous sample count in full
+                service['cpu'] += cputime
+            elif before[2] is not None:
+                service['cpu'] += cputime - before[2]
+    for name, service in services.items():
+        sample['{0}_rss_mb'.format(name)] = service['rss'] / 1024.0
+        sample['{0}_processes'.format(name)] = service['processes']
+    if previous is None or elapsed <= 0:
+        return sample
+    for name, service in services.items():
+        sample['{0}_cpu_percent'.format(name)] = (
+            100.0 * max(service['cpu'], 0) / elapsed)
+    if 'cpu' in previous and 'cpu' in current:
+        total = current['cpu'][0] - previous['cpu'][0]
+        if total > 0:
+            idle = current['cpu'][1] - previous['cpu'][1]
+            iowait = current['cpu'][2] - previous['cpu'][2]
+            sample['cpu_percent'] = 100.0 * (total - idle - iowait) / total
+            sample['iowait_percent'] = 100.0 * iowait / total
+    sample['disk_read_mbps'] = (
+        (current['disk'][0] - previous['disk'][0]) * 512 / 1048576.0 /
+        elapsed
+    )
+    sample['disk_write_mbps'] = (
+        (current['disk'][1] - previous['disk'][1]) * 512 / 1048576.0 /
+        elapsed
+    )
+    return sample
+
+
+class ResourceSampler(threading.Thread):
+    """Sample the server resources on a background thread.
+
+    The first sample only has the figures which are not rates, e.g. the
+    memory; the rates are computed between consecutive samples. Sampling
+    errors are logged and end the sampling without failing the run.
+
+    :param int interval: Seconds between two samples.
+    :param str hostname: The server, defaults to the configured
+        ``server.hostname``.
+
+    """
+    def __init__(self, interval=5, hostname=None):
+        super(ResourceSampler, self).__init__()
+        self.daemon = True
+        self.interval = interval
+        self.hostname = hostname
+        self.samples = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._channel = None
+        self._previous = None
+
+    def add_sample(self, sections, timestamp=None):
+        """Add the sample of the raw ``sections`` of one iteration of the
+        sampling loop, received at ``timestamp``, defaulting to now.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        raw = parse_sample(sections)
+        previous = self._previous
+        elapsed = timestamp - previous[0] if previous else 0
+        sample = _delta_sample(
+            previous[1] if previous else None, raw, timestamp, elapsed)
+        self._previous = (timestamp, raw)
+        with self._lock:
+            self.samples.append(sample)
+
+    def run(self):
+        try:
+            with ssh._get_connection(hostname=self.hostname) as connection:
+                _, stdout, _ = connection.exec_command(
+                    SAMPLE_SCRIPT.format(interval=self.interval))
+                self._channel = stdout.channel
+                self._read(stdout)
+        except Exception as err:  # pylint:disable=broad-except
+            if not self._stop_event.is_set():
+                LOGGER.error('Server resource sampling stopped: %s', err)
+
+    def _read(self, stdout):
+        """Read the samples printed by the sampling loop."""
+        sections = {}
+        lines = None
+        for line in stdout:
+            if self._stop_event.is_set():
+                return
+            if isinstance(line, bytes):
+                line = line.decode('utf-8', 'replace')
+            line = line.rstrip('\n')
+            if line == '--- end':
+                self.add_sample(sections)
+                sections = {}
+                lines = None
+            elif line.startswith('--- '):
+                lines = sections.setdefault(line[4:], [])
+            elif lines is not None:
+                lines.append(line)
+
+    def stop(self):
+        """Stop sampling and close the SSH channel."""
+        self._stop_event.set()
+        if self._channel is not None:
+            self._channel.close()
+        self.join()
+
+    def window(self, start=None, end=None):
+        """Return the samples taken between ``start`` and ``end``."""
+        with self._lock:
+            samples = list(self.samples)
+        return [
+            sample for sample in samples
+            if (start is None or sample['timestamp'] >= start) and
+            (end is None or sample['timestamp'] <= end)
+        ]
+
+    def write_csv(self, filename, start=None, end=None):
+        """Write the samples taken between ``start`` and ``end`` to a csv
+        file, one row per sample.
+
+        An ``elapsed`` column follows the ``timestamp`` one, with the
+        seconds since ``start``, or since the first sample, matching the
+        time axis of the client timings of the run.
+
+        :returns: The number of samples written.
+
+        """
+        samples = self.window(start, end)
+        if start is None and samples:
+            start = samples[0]['timestamp']
+        with open(filename, 'w') as handler:
+            writer = csv.writer(handler)
+            writer.writerow(
+                (RESOURCE_COLUMNS[0], 'elapsed') + RESOURCE_COLUMNS[1:])
+            writer.writerows(
+                [sample['timestamp'], sample['timestamp'] - start] + [
+                    '' if sample[column] is None else sample[column]
+                    for column in RESOURCE_COLUMNS[1:]
+                ]
+                for sample in samples
+            )
+        return len(samples)
+
+
+def read_resources(filename):
+    """Read a csv file written by :meth:`ResourceSampler.write_csv`.
+
+    :returns: A dictionary mapping each column to its list of values,
+        ``None`` where a figure was not available.
+
+    """
+    with open(filename) as handler:
+        rows = list(csv.reader(handler))
+    columns = dict((name, []) for name in rows[0])
+    for row in rows[1:]:
+        for name, value in zip(rows[0], row):
+            columns[name].append(float(value) if value else None)
+    return columns
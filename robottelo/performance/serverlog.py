@@ -0,0 +1,361 @@
+"""Server side timings of the requests of a performance run
+
+The latency measured by the clients includes the network, SSH and hammer or
+subscription-manager overhead. The server logs tell how long the server
+itself took on each request:
+
+* Foreman ``production.log``: the ``Started``, ``Processing by`` and
+  ``Completed 200 OK in 523ms (Views: 10.2ms | ActiveRecord: 120.5ms)``
+  lines of each Rails request;
+* Candlepin ``candlepin.log``: the ``Request:`` and ``Response:`` lines of
+  each request, with its ``req=`` id and total ``time=``.
+
+The logs are parsed into :class:`ServerRequest` records, which
+:func:`correlate` assigns to the client operations by request id, when the
+client knows it, or else by time. :func:`breakdown` then splits each client
+operation into client overhead, Rails, database, views and Candlepin time.
+The logs lines of a run are read with a :class:`robottelo.log.LogTail`::
+
+    tail = LogTail(FOREMAN_LOG)
+    tail.mark()
+    ...  # run the load, keeping the (started, completed) operation windows
+    requests = parse_production_log(tail.read())
+    rows = breakdown(windows, correlate(windows, requests))
+
+The log timestamps only have a second resolution and, without request ids,
+concurrent requests can not always be told apart, so the time based
+correlation is a best effort: each request goes to the operation which
+started closest before it and was still running when it completed.
+
+"""
+import bisect
+import calendar
+import csv
+import re
+
+from datetime import datetime
+from robottelo import ssh
+
+#: Prefix of the ``production.log`` lines: timestamp, request id and tags,
+#: all optional depending on the Foreman version
+PRODUCTION_LINE = re.compile(
+    r'^(?:(?P<time>\d{4}-\d\d-\d\d[ T]\d\d:\d\d:\d\d)\S*\s+)?'
+    r'(?:(?P<request_id>[0-9a-f]{8})\s+)?'
+    r'(?:\[[^\]]*\]\s*)*'
+    r'(?P<message>.*)$'
+)
+PRODUCTION_STARTED = re.compile(
+    r'^Started (?P<method>[A-Z]+) "(?P<path>[^"]*)" for \S+ at '
+    r'(?P<time>\d{4}-\d\d-\d\d[ T]\d\d:\d\d:\d\d)(?: ?(?P<zone>[+-]\d{4}))?'
+)
+PRODUCTION_PROCESSING = re.compile(r'^Processing by (?P<action>\S+)')
+PRODUCTION_COMPLETED = re.compile(
+    r'^Completed (?P<status>\d{3})\b.*? in (?P<total>[\d.]+)ms'
+    r'(?: \((?P<details>[^)]*)\))?'
+)
+#: A detail of a ``Completed`` line, e.g. ``ActiveRecord: 120.5ms``
+PRODUCTION_DETAIL = re.compile(r'(?P<name>\w+): (?P<value>[\d.]+)ms')
+
+CANDLEPIN_LINE = re.compile(
+    r'^(?P<time>\d{4}-\d\d-\d\d \d\d:\d\d:\d\d),(?P<ms>\d{3}) '
+    r'.*?\[req=(?P<request_id>[^,\]]*)(?P<context>[^\]]*)\]'
+    r'.*? - (?P<kind>Request|Response): (?P<fields>.*)$'
+)
+CANDLEPIN_FIELD = re.compile(r'(?P<name>[\w-]+)=(?P<value>"[^"]*"|[^,]*)')
+
+
+class ServerRequest(object):
+    """A request as logged by the server.
+
+    :param str source: ``'foreman'`` or ``'candlepin'``.
+    :param started: When the request started, in seconds since the epoch.
+    :param duration: The request time on the server, in seconds.
+    :param views: The Rails views rendering time, in seconds.
+    :param db: The Rails database (ActiveRecord) time, in seconds.
+    :param correlation_id: The id of the Foreman request which sent the
+        Candlepin request, when Candlepin logs it.
+
+    """
+    def __init__(self, source, request_id=None, method=None, path=None,
+                 action=None, status=None, started=None, duration=None,
+                 views=None, db=None, correlation_id=None):
+        self.source = source
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.action = action
+        self.status = status
+        self.started = started
+        self.duration = duration
+        self.views = views
+        self.db = db
+        self.correlation_id = correlation_id
+
+    @property
+    def completed(self):
+        """When the request completed, in seconds since the epoch."""
+        return self.started + (self.duration or 0)
+
+    def __repr__(self):
+        return '<ServerRequest {0} {1} {2} {3} in {4}s>'.format(
+            self.source, self.request_id, self.method, self.path,
+            self.duration)
+
+
+def _timestamp(value, utc_offset=0):
+    """Convert a ``YYYY-MM-DD HH:MM:SS`` server time to seconds since the
+    epoch, ``utc_offset`` being the offset of the server time zone, in
+    seconds.
+    """
+    parsed = datetime.strptime(value.replace('T', ' '), '%Y-%m-%d %H:%M:%S')
+    return calendar.timegm(parsed.timetuple()) - utc_offset
+
+
+def _zone_offset(zone):
+    """Convert a ``+HHMM`` time zone to an offset in seconds."""
+    sign = -1 if zone[0] == '-' else 1
+    return sign * (int(zone[1:3]) * 3600 + int(zone[3:5]) * 60)
+
+
+def server_utc_offset(hostname=None):
+    """Return the offset, in seconds, of the server time zone, which the
+    server log timestamps are written in.
+    """
+    result = ssh.command('date +%z', hostname=hostname)
+    return _zone_offset(result.stdout[0].strip())
+
+
+def parse_production_log(lines, utc_offset=0):
+    """Parse the requests of a Foreman ``production.log``.
+
+    The lines of a request are grouped by the request id logged by recent
+    Foreman versions. On older versions, which do not log it, each
+    ``Completed`` line is given to the oldest request still in progress.
+
+    :param lines: The log lines.
+    :param utc_offset: Offset of the server time zone, in seconds, used
+        when the ``Started`` line has no time zone.
+    :returns: A list of the completed :class:`ServerRequest`.
+
+    """
+    in_progress = {}
+    requests = []
+    for line in lines:
+        match = PRODUCTION_LINE.match(line.rstrip())
+        request_id = match.group('request_id')
+        message = match.group('message')
+        started = PRODUCTION_STARTED.match(message)
+        if started is not None:
+            zone = started.group('zone')
+            in_progress.setdefault(request_id, []).append(ServerRequest(
+                'foreman',
+                request_id=request_id,
+                method=started.group('method'),
+                path=started.group('path'),
+                started=_timestamp(
+                    started.group('time'),
+                    _zone_offset(zone) if zone else utc_offset,
+                ),
+            ))
+            continue
+        pending = in_progress.get(request_id)
+        if not pending:
+            continue
+        processing = PRODUCTION_PROCESSING.match(message)
+        if processing is not None:
+            for request in pending:
+                if request.action is None:
+                    request.action = processing.group('action')
+                    break
+            continue
+        completed = PRODUCTION_COMPLETED.match(message)
+        if completed is not None:
+            request = pending.pop(0)
+            request.status = int(completed.group('status'))
+            request.duration = float(completed.group('total')) / 1000
+            details = dict(
+                (detail.group('name'), float(detail.group('value')) / 1000)
+                for detail in PRODUCTION_DETAIL.finditer(
+                    completed.group('details') or '')
+            )
+            request.views = details.get('Views')
+            request.db = details.get('ActiveRecord')
+            requests.append(request)
+    return requests
+
+
+def parse_candlepin_log(lines, utc_offset=0):
+    """Parse the requests of a Candlepin ``candlepin.log``.
+
+    :param lines: The log lines.
+    :param utc_offset: Offset of the server time zone, in seconds.
+    :returns: A list of the completed :class:`ServerRequest`.
+
+    """
+    in_progress = {}
+    requests = []
+    for line in lines:
+        match = CANDLEPIN_LINE.match(line.rstrip())
+        if match is None:
+            continue
+        timestamp = (
+            _timestamp(match.group('time'), utc_offset) +
+            int(match.group('ms')) / 1000.0
+        )
+        fields = dict(
+            (field.group('name'), field.group('value').strip('"'))
+            for field in CANDLEPIN_FIELD.finditer(match.group('fields'))
+        )
+        request_id = match.group('request_id')
+        if match.group('kind') == 'Request':
+            context = dict(
+                (field.group('name'), field.group('value'))
+                for field in CANDLEPIN_FIELD.finditer(match.group('context'))
+            )
+            in_progress[request_id] = ServerRequest(
+                'candlepin',
+                request_id=request_id,
+                method=fields.get('verb'),
+                path=fields.get('uri'),
+                started=timestamp,
+                correlation_id=context.get('csid') or None,
+            )
+            continue
+        request = in_progress.pop(request_id, None)
+        if request is None:
+            continue
+        request.status = int(fields['status']) if 'status' in fields else None
+        if fields.get('time', '').isdigit():
+            request.duration = int(fields['time']) / 1000.0
+        else:
+            request.duration = timestamp - request.started
+        requests.append(request)
+    return requests
+
+
+def _window(operation):
+    """Return the ``(started, completed, request_id)`` of an operation,
+    given as such a tuple, a ``(started, completed)`` tuple or an object
+    with ``started`` and ``completed`` attributes, e.g. a
+    :class:`robottelo.performance.load.OperationRecord`.
+    """
+    if isinstance(operation, tuple):
+        return (operation + (None,))[:3]
+    return (
+        operation.started,
+        operation.completed,
+        getattr(operation, 'request_id', None),
+    )
+
+
+def correlate(operations, requests, tolerance=1.0, path=None):
+    """Assign the server requests to the client operations.
+
+    A request goes to the operation with the same request id, Foreman only
+    logging the first 8 characters of it. Otherwise it goes to the
+    operation which started closest before it, within ``tolerance``
+    seconds, and was still running, within ``tolerance`` seconds, when it
+    completed.
+
+    :param operations: The client operations, see :func:`_window`.
+    :param requests: The :class:`ServerRequest` to assign.
+    :param tolerance: Seconds of clock resolution and skew allowed.
+    :param path: Optional regular expression the request path must match,
+        e.g. ``'/rhsm/'``, to leave out the unrelated requests.
+    :returns: A list with the list of requests of each operation.
+
+    """
+    windows = [_window(operation) for operation in operations]
+    assigned = [[] for _ in windows]
+    by_id = {}
+    for index, (_, _, request_id) in enumerate(windows):
+        if request_id:
+            by_id[request_id[:8]] = index
+    order = sorted(range(len(windows)), key=lambda index: windows[index][0])
+    starts = [windows[index][0] for index in order]
+    path = re.compile(path) if path else None
+    for request in requests:
+        if path is not None and not path.search(request.path or ''):
+            continue
+        if request.request_id and request.request_id[:8] in by_id:
+            assigned[by_id[request.request_id[:8]]].append(request)
+            continue
+        # latest operation started before the request, going backwards
+        position = bisect.bisect_right(starts, request.started + tolerance)
+        for index in reversed(order[:position]):
+            if request.completed <= windows[index][1] + tolerance:
+                assigned[index].append(request)
+                break
+    return assigned
+
+
+#: Columns of a :func:`breakdown` row, in csv column order
+BREAKDOWN_COLUMNS = (
+    'started',
+    'latency',
+    'requests',
+    'rails',
+    'db',
+    'views',
+    'rails_other',
+    'candlepin',
+    'client_overhead',
+)
+
+
+def breakdown(operations, assigned):
+    """Split each client operation latency into its server side parts.
+
+    Foreman forwards the subscription-manager requests to Candlepin and
+    calls Candlepin itself, so the Rails time includes the Candlepin time.
+    The client overhead is the latency not spent on Rails or, when no Rails
+    request was found, on Candlepin.
+
+    :param operations: The client operations, as given to
+        :func:`correlate`.
+    :param assigned: The requests of each operation, returned by
+        :func:`correlate`.
+    :returns: A list of dictionaries with the :data:`BREAKDOWN_COLUMNS`, in
+        seconds, ``None`` where there is no request to measure.
+
+    """
+    rows = []
+    for operation, requests in zip(operations, assigned):
+        started, completed, _ = _window(operation)
+        foreman = [
+            request for request in requests if request.source == 'foreman']
+        candlepin = [
+            request for request in requests
+            if request.source == 'candlepin'
+        ]
+        row = dict.fromkeys(BREAKDOWN_COLUMNS)
+        row.update({
+            'started': started,
+            'latency': completed - started,
+            'requests': len(requests),
+        })
+        if foreman:
+            row['rails'] = sum(request.duration for request in foreman)
+            row['db'] = sum(request.db or 0 for request in foreman)
+            row['views'] = sum(request.views or 0 for request in foreman)
+            row['rails_other'] = row['rails'] - row['db'] - row['views']
+        if candlepin:
+            row['candlepin'] = sum(
+                request.duration for request in candlepin)
+        server = row['rails'] if foreman else row['candlepin']
+        if server is not None:
+            row['client_overhead'] = row['latency'] - server
+        rows.append(row)
+    return rows
+
+
+def write_breakdown_csv(filename, rows):
+    """Write the :func:`breakdown` rows to a csv file."""
+    with open(filename, 'w') as handler:
+        writer = csv.writer(handler)
+        writer.writerow(BREAKDOWN_COLUMNS)
+        writer.writerows(
+            ['' if row[column] is None else row[column]
+             for column in BREAKDOWN_COLUMNS]
+            for row in rows
+        )
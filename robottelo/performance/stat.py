@@ -2,78 +2,152 @@
 import csv
 import numpy
 
+from robottelo.performance.histogram import LatencyHistogram
+
+#: Statistics computed for each bucket, in csv column order
+STAT_COLUMNS = ('min', 'median', 'mean', 'max', 'std', '90%', '95%', '99%')
+
+
+def _matrix_stats(matrix):
+    """Return the :data:`STAT_COLUMNS` statistics of each row of a 2-D
+    array, as a ``rows x len(STAT_COLUMNS)`` array.
+
+    """
+    percentiles = numpy.percentile(matrix, [50, 90, 95, 99], axis=1)
+    return numpy.column_stack([
+        matrix.min(axis=1),
+        percentiles[0],
+        matrix.mean(axis=1),
+        matrix.max(axis=1),
+        matrix.std(axis=1),
+        percentiles[1],
+        percentiles[2],
+        percentiles[3],
+    ])
+
+
+def _summary(samples):
+    """Return the :data:`STAT_COLUMNS` statistics of ``samples``, a list of
+    timings or a :class:`robottelo.performance.histogram.LatencyHistogram`.
+
+    """
+    if isinstance(samples, LatencyHistogram):
+        return tuple(
+            [
+                samples.min,
+                samples.median,
+                samples.mean,
+                samples.max,
+                samples.std,
+            ] + samples.percentiles([90, 95, 99])
+        )
+    values = numpy.asarray(samples, dtype=float).reshape(1, -1)
+    return tuple(_matrix_stats(values)[0].tolist())
+
+
+def bucket_stats(time_list, bucket_size):
+    """Compute the statistics of consecutive buckets of timings.
+
+    The timings are reshaped into a ``bucket x sample`` array, so all the
+    statistics of all the buckets are computed at once. When the number of
+    timings is not a multiple of ``bucket_size`` the last bucket holds the
+    remaining ones.
+
+    :param time_list: Sequence of timings.
+    :param int bucket_size: Number of timings per bucket.
+    :returns: A tuple with the list of bucket labels, e.g. ``'1-50'``, and a
+        ``buckets x len(STAT_COLUMNS)`` array of statistics.
+
+    """
+    bucket_size = int(bucket_size)
+    values = numpy.asarray(time_list, dtype=float)
+    num_full = len(values) // bucket_size
+    split = num_full * bucket_size
+    labels = [
+        '{0}-{1}'.format(bucket_size * i + 1, bucket_size * (i + 1))
+        for i in range(num_full)
+    ]
+    stats = [_matrix_stats(values[:split].reshape(num_full, bucket_size))]
+    if split < len(values):
+        labels.append('{0}-{1}'.format(split + 1, len(values)))
+        stats.append(_matrix_stats(values[split:].reshape(1, -1)))
+    return labels, numpy.vstack(stats)
+
+
+def _histogram_bucket_stats(histograms):
+    """Return the labels and statistics of bucket histograms, as
+    :func:`bucket_stats`.
+
+    """
+    histograms = [histogram for histogram in histograms if histogram.count]
+    labels = []
+    first = 1
+    for histogram in histograms:
+        labels.append('{0}-{1}'.format(first, first + histogram.count - 1))
+        first += histogram.count
+    stats = numpy.array(
+        [_summary(histogram) for histogram in histograms], dtype=float)
+    return labels, stats.reshape(len(histograms), len(STAT_COLUMNS))
+
 
 def generate_stat_for_concurrent_thread(
         thread_name,
         time_list,
         stat_file_name,
         bucket_size,
-        num_buckets):
-    """statistics computing utility for Candlepin tests"""
+        num_buckets=None):
+    """statistics computing utility for Candlepin tests
+
+    ``time_list`` is either a list of timings, sliced in buckets of
+    ``bucket_size`` timings, or a list of
+    :class:`robottelo.performance.histogram.LatencyHistogram`, one per
+    bucket, or a single histogram used as the only bucket.
+
+    ``num_buckets`` is only kept for compatibility: the number of buckets
+    follows from the number of timings and ``bucket_size``.
+
+    :returns: A dictionary mapping each bucket index to its min, median, max
+        and std, or ``None`` if ``bucket_size`` is 0.
+
+    """
+    if isinstance(time_list, LatencyHistogram):
+        time_list = [time_list]
+    if len(time_list) and isinstance(time_list[0], LatencyHistogram):
+        labels, stats = _histogram_bucket_stats(time_list)
     # check empty case: empty bucket has no need to compute stat
-    if bucket_size == 0:
+    elif bucket_size == 0:
         return
     else:
-        num_buckets = len(time_list)/bucket_size
-
-    return_stat = {}
-
-    # create list of bucket series
-    buckets = ['{0}-{1}'.format(bucket_size * i + 1, bucket_size * (i + 1))
-               for i in range(num_buckets)]
+        labels, stats = bucket_stats(time_list, bucket_size)
 
+    rows = stats.tolist()
     with open(stat_file_name, 'a') as handler:
         writer = csv.writer(handler)
-        writer.writerow([])
-        writer.writerow(['{0}'.format(thread_name)])
-        writer.writerow([
-            'bucket',
-            'min',
-            'median',
-            'mean',
-            'max',
-            'std',
-            '90%',
-            '95%',
-            '99%'
+        writer.writerows([
+            [],
+            ['{0}'.format(thread_name)],
+            ['bucket'] + list(STAT_COLUMNS),
         ])
-        for i, bucket in enumerate(buckets):
-            # slice the given time-list into buckets
-            time_list_slice = time_list[bucket_size * i:bucket_size * (i + 1)]
-
-            # variables for generating graphs only
-            gmin = numpy.amin(time_list_slice)
-            gmean = numpy.mean(time_list_slice)
-            gmedian = numpy.median(time_list_slice)
-            gmax = numpy.amax(time_list_slice)
-            gstd = numpy.std(time_list_slice)
-
-            writer.writerow([
-                bucket,
-                gmin,
-                gmedian,
-                gmean,
-                gmax,
-                gstd,
-                numpy.percentile(time_list_slice, 90),
-                numpy.percentile(time_list_slice, 95),
-                numpy.percentile(time_list_slice, 99)
-            ])
-
-            # update a dictionary with key as each bucket and values as stat
-            return_stat.update({i: (gmin, gmedian, gmax, gstd)})
-        return return_stat
+        writer.writerows(
+            [label] + row for label, row in zip(labels, rows))
+
+    # dictionary with key as each bucket and values as stat for the graphs
+    return dict(
+        (i, (row[0], row[1], row[3], row[4])) for i, row in enumerate(rows))
 
 
 def generate_stat_for_pulp_sync(index, time_list, stat_file_name):
-    """statistics computing utility for Pulp synchronization tests"""
+    """statistics computing utility for Pulp synchronization tests
+
+    ``time_list`` is a list of timings or a
+    :class:`robottelo.performance.histogram.LatencyHistogram`.
+
+    """
     with open(stat_file_name, 'a') as handler:
         writer = csv.writer(handler)
 
-        sync_min = numpy.amin(time_list)
-        sync_median = numpy.median(time_list)
-        sync_max = numpy.amax(time_list)
-        sync_std = numpy.std(time_list)
+        sync_min, sync_median, _, sync_max, sync_std = _summary(
+            time_list)[:5]
 
         writer.writerow([
             'test-{0}-threads'.format(index),
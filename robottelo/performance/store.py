@@ -0,0 +1,279 @@
+"""Columnar binary store of raw performance timings
+
+Each run is a directory holding one raw binary file per column, written in
+native byte order, and a ``metadata.json`` sidecar describing the run::
+
+    perf-runs/perf-raw-activationKey-10-clients-20161018120000000000/
+        metadata.json
+        timestamp.bin   # float64, when the operation completed
+        latency.bin     # float64, seconds
+        thread.bin      # int32, thread or client id
+        operation.bin   # int16, index on the metadata operations list
+
+Rows added one at a time are buffered and appended to the column files in
+batches, rows added with :meth:`TimingStore.append_many` are written at
+once, and columns are read back as memory-mapped arrays, without copying nor
+parsing them::
+
+    with TimingStore.create(path, metadata={'threads': 10}) as store:
+        store.append(0.42, thread=3, operation='register')
+    store = TimingStore.open(path)
+    store.column('latency').mean()
+
+:meth:`TimingStore.export_csv` writes the timings in the format of the
+``perf-raw-*.csv`` files.
+
+"""
+import csv
+import datetime
+import json
+import numpy
+import os
+import threading
+import time
+
+#: Name and type of the columns of a run
+COLUMNS = (
+    ('timestamp', numpy.float64),
+    ('latency', numpy.float64),
+    ('thread', numpy.int32),
+    ('operation', numpy.int16),
+)
+
+#: Name of the run metadata file
+METADATA_FILE_NAME = 'metadata.json'
+
+
+class TimingStoreError(Exception):
+    """Indicates an error while creating or reading a timing store."""
+
+
+class TimingStore(object):
+    """Raw timings of a single run, see :meth:`create` and :meth:`open`.
+
+    :param path: Directory of the run.
+    :param flush_size: Number of buffered rows written at once.
+
+    """
+    def __init__(self, path, flush_size=4096):
+        self.path = path
+        self.flush_size = flush_size
+        self._lock = threading.Lock()
+        self._buffer = dict((name, []) for name, _ in COLUMNS)
+        self._handles = {}
+        self.metadata = self._read_metadata()
+
+    @classmethod
+    def create(cls, path, metadata=None, flush_size=4096):
+        """Create the directory of a new run.
+
+        :param path: Directory of the run, must not exist yet.
+        :param metadata: JSON serializable dictionary describing the run,
+            e.g. the settings, server version and number of threads.
+        :raises robottelo.performance.store.TimingStoreError: If the run
+            already exists.
+
+        """
+        if os.path.exists(os.path.join(path, METADATA_FILE_NAME)):
+            raise TimingStoreError(
+                u'Timing store {0} already exists'.format(path))
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        for name, _ in COLUMNS:
+            open(os.path.join(path, u'{0}.bin'.format(name)), 'wb').close()
+        cls._write_metadata(path, {
+            'columns': dict(
+                (name, numpy.dtype(dtype).str) for name, dtype in COLUMNS),
+            'created': datetime.datetime.utcnow().isoformat(),
+            'operations': [],
+            'run': metadata or {},
+        })
+        return cls(path, flush_size)
+
+    @classmethod
+    def open(cls, path):
+        """Open an existing run.
+
+        :raises robottelo.performance.store.TimingStoreError: If there is no
+            run on ``path``.
+
+        """
+        if not os.path.exists(os.path.join(path, METADATA_FILE_NAME)):
+            raise TimingStoreError(
+                u'No timing store found on {0}'.format(path))
+        return cls(path)
+
+    def _read_metadata(self):
+        """Read the metadata sidecar."""
+        with open(os.path.join(self.path, METADATA_FILE_NAME)) as handler:
+            return json.load(handler)
+
+    @staticmethod
+    def _write_metadata(path, metadata):
+        """Atomically write the metadata sidecar."""
+        metadata_path = os.path.join(path, METADATA_FILE_NAME)
+        temp_path = u'{0}.tmp'.format(metadata_path)
+        with open(temp_path, 'w') as handler:
+            json.dump(metadata, handler, indent=2, sort_keys=True)
+        os.rename(temp_path, metadata_path)
+
+    def _operation_code(self, operation):
+        """Return the code of ``operation``, registering it if new. Must be
+        called holding the lock.
+        """
+        operations = self.metadata['operations']
+        if operation not in operations:
+            operations.append(operation)
+            self._write_metadata(self.path, self.metadata)
+        return operations.index(operation)
+
+    def append(self, latency, thread=0, operation='default', timestamp=None):
+        """Add a timing to the run.
+
+        :param latency: The operation latency, in seconds.
+        :param thread: Id of the thread or client which ran the operation.
+        :param operation: Name of the operation type.
+        :param timestamp: When the operation completed, defaults to now.
+
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            self._buffer['timestamp'].append(timestamp)
+            self._buffer['latency'].append(latency)
+            self._buffer['thread'].append(thread)
+            self._buffer['operation'].append(self._operation_code(operation))
+            if len(self._buffer['latency']) >= self.flush_size:
+                self._flush()
+
+    def append_many(self, latencies, thread=0, operation='default',
+                    timestamps=None):
+        """Add many timings of the same thread and operation at once.
+
+        :param timestamps: Sequence of completion times, unknown (``nan``)
+            if ``None``.
+
+        """
+        latencies = numpy.asarray(latencies, dtype=numpy.float64)
+        if timestamps is None:
+            timestamps = numpy.full(len(latencies), numpy.nan)
+        columns = {
+            'timestamp': numpy.asarray(timestamps, dtype=numpy.float64),
+            'latency': latencies,
+            'thread': numpy.full(len(latencies), thread, dtype=numpy.int32),
+        }
+        with self._lock:
+            self._flush()
+            columns['operation'] = numpy.full(
+                len(latencies),
+                self._operation_code(operation),
+                dtype=numpy.int16,
+            )
+            self._write_columns(columns)
+
+    def _write_columns(self, columns):
+        """Append arrays to the column files. Must be called holding the
+        lock.
+        """
+        for name, dtype in COLUMNS:
+            handle = self._handles.get(name)
+            if handle is None:
+                handle = open(
+                    os.path.join(self.path, u'{0}.bin'.format(name)), 'ab')
+                self._handles[name] = handle
+            handle.write(
+                numpy.asarray(columns[name], dtype=dtype).tobytes())
+            handle.flush()
+
+    def _flush(self):
+        """Write the buffered rows. Must be called holding the lock."""
+        if self._buffer['latency']:
+            self._write_columns(self._buffer)
+            self._buffer = dict((name, []) for name, _ in COLUMNS)
+
+    def flush(self):
+        """Write the buffered rows to the column files."""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        """Write the buffered rows and close the column files."""
+        with self._lock:
+            self._flush()
+            for handle in self._handles.values():
+                handle.close()
+            self._handles.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        """Number of rows written to all the column files."""
+        sizes = [
+            os.path.getsize(os.path.join(self.path, u'{0}.bin'.format(name)))
+            // numpy.dtype(dtype).itemsize
+            for name, dtype in COLUMNS
+        ]
+        return min(sizes)
+
+    def column(self, name):
+        """Return a read-only, memory-mapped array of a column.
+
+        Rows still buffered are not included, see :meth:`flush`.
+
+        """
+        dtypes = dict(COLUMNS)
+        if name not in dtypes:
+            raise TimingStoreError(u'Unknown column {0}'.format(name))
+        length = len(self)
+        if not length:
+            return numpy.empty(0, dtype=dtypes[name])
+        return numpy.memmap(
+            os.path.join(self.path, u'{0}.bin'.format(name)),
+            dtype=dtypes[name],
+            mode='r',
+            shape=(length,),
+        )
+
+    def time_result_dict(self, operation=None):
+        """Return the latencies in the ``{'thread-N': [...]}`` form used by
+        :mod:`robottelo.performance.stat` and
+        :mod:`robottelo.performance.graph`.
+
+        :param operation: Only keep the timings of this operation type.
+
+        """
+        latencies = self.column('latency')
+        threads = self.column('thread')
+        if operation is not None:
+            if operation not in self.metadata['operations']:
+                return {}
+            selected = self.column('operation') == (
+                self.metadata['operations'].index(operation))
+            latencies = latencies[selected]
+            threads = threads[selected]
+        return dict(
+            ('thread-{0}'.format(thread),
+             latencies[threads == thread].tolist())
+            for thread in numpy.unique(threads)
+        )
+
+    def export_csv(self, filename, operation=None, title=None):
+        """Append the latencies to a csv file, one row per thread as on the
+        ``perf-raw-*.csv`` files.
+
+        :param title: Optional first row, e.g. the test case name.
+
+        """
+        time_result_dict = self.time_result_dict(operation)
+        with open(filename, 'a') as handler:
+            writer = csv.writer(handler)
+            if title is not None:
+                writer.writerow([title])
+            writer.writerows(
+                time_result_dict[key] for key in sorted(
+                    time_result_dict, key=lambda key: int(key.split('-')[1])))
+            writer.writerow([])
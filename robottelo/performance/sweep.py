@@ -0,0 +1,326 @@
+"""Concurrency sweep with saturation point detection
+
+Instead of running a workload at the fixed concurrency levels of
+:data:`robottelo.performance.constants.NUM_THREADS` and reading the
+throughput curve by eye, a :class:`ConcurrencySweep` raises the number of
+concurrent clients step by step, linearly or geometrically, see
+:func:`concurrency_steps`. Each step runs a closed loop, every client
+sending its next operation once the previous one completed, and measures
+the throughput and the latency percentiles.
+
+The sweep stops at the first step where the server is saturated, see
+:func:`detect_saturation`:
+
+* the throughput does not grow anymore (plateau);
+* the 95th percentile latency blew up compared to the first step;
+* or too many operations failed.
+
+The maximum sustainable concurrency is the last step before the
+saturation, or the lowest concurrency reaching the throughput plateau::
+
+    sweep = ConcurrencySweep(
+        CandlepinRegisterAKWorkload(ak_name, org_label, vm_ips),
+        concurrency_steps(len(vm_ips), mode='geometric'),
+        iterations=20,
+    )
+    sweep.run()
+    sweep.max_sustainable, sweep.reason
+
+"""
+import csv
+import json
+import logging
+import numpy
+import threading
+import time
+
+from multiprocessing.pool import ThreadPool
+from robottelo.performance.load import (
+    LoadResult,
+    OperationRecord,
+    run_operation,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+#: Minimum throughput gain, relative to the best previous step, for a step
+#: not to be on the plateau
+DEFAULT_PLATEAU = 0.05
+
+#: 95th percentile latency, relative to the one of the first step, above
+#: which the latency blew up
+DEFAULT_LATENCY_FACTOR = 2.0
+
+#: Ratio of failed operations above which a step is saturated
+DEFAULT_MAX_ERROR_RATE = 0.05
+
+#: Saturation reasons
+PLATEAU = 'throughput plateau'
+LATENCY = 'latency blow-up'
+ERRORS = 'errors'
+
+#: Columns of a sweep step, in csv column order
+SWEEP_COLUMNS = (
+    'concurrency',
+    'operations',
+    'errors',
+    'duration',
+    'throughput',
+    'p50',
+    'p95',
+    'p99',
+)
+
+
+def concurrency_steps(stop, start=1, mode='linear', step=None):
+    """Return the concurrency levels of a sweep, from ``start`` to ``stop``.
+
+    :param int stop: The highest concurrency, always included.
+    :param int start: The lowest concurrency.
+    :param str mode: ``linear`` adds ``step``, 1 by default, to the previous
+        level, ``geometric`` multiplies it by ``step``, 2 by default.
+    :param step: The increment or the factor between two levels.
+    :returns: The sorted distinct levels.
+
+    """
+    if start < 1 or stop < start:
+        raise ValueError('concurrency must range from 1 to stop')
+    if mode == 'linear':
+        step = 1 if step is None else step
+        if step <= 0:
+            raise ValueError('linear step must be positive')
+    elif mode == 'geometric':
+        step = 2 if step is None else step
+        if step <= 1:
+            raise ValueError('geometric step must be greater than 1')
+    else:
+        raise ValueError('Unknown sweep mode {0}'.format(mode))
+    levels = []
+    level = float(start)
+    while int(round(level)) < stop:
+        if not levels or int(round(level)) > levels[-1]:
+            levels.append(int(round(level)))
+        level = level + step if mode == 'linear' else level * step
+    levels.append(stop)
+    return levels
+
+
+def run_closed_loop(workload, concurrency, iterations, first_index=0):
+    """Run ``iterations`` operations on each of ``concurrency`` clients,
+    each client sending its next operation once the previous one completed.
+
+    Client ``n`` runs the operations numbered from ``first_index + n *
+    iterations``, so operations never share an index.
+
+    :param workload: A :class:`robottelo.performance.load.Workload` or any
+        callable receiving the operation index.
+    :returns: A :class:`robottelo.performance.load.LoadResult`, the latency
+        of an operation is its service time.
+
+    """
+    records = []
+    lock = threading.Lock()
+
+    def client(number):
+        """Run the operations of a client"""
+        for offset in range(iterations):
+            record = OperationRecord(
+                first_index + number * iterations + offset, time.time())
+            run_operation(workload, record)
+            with lock:
+                records.append(record)
+
+    pool = ThreadPool(concurrency)
+    start = time.time()
+    try:
+        pool.map(client, range(concurrency))
+    finally:
+        pool.close()
+        pool.join()
+    return LoadResult(
+        sorted(records, key=lambda record: record.index), start, time.time())
+
+
+class SweepStep(object):
+    """Measures of a sweep step.
+
+    :param int concurrency: Number of concurrent clients.
+    :param result: The :class:`robottelo.performance.load.LoadResult` of the
+        step.
+
+    """
+    def __init__(self, concurrency, result):
+        self.concurrency = concurrency
+        self.result = result
+
+    @property
+    def throughput(self):
+        """Completed operations per second."""
+        return self.result.achieved_rate
+
+    @property
+    def error_rate(self):
+        """Ratio of failed operations."""
+        if not self.result.records:
+            return 0.0
+        return len(self.result.failed) / float(len(self.result.records))
+
+    def percentile(self, percentile):
+        """Return a latency percentile of the successful operations, or
+        ``None`` if none succeeded.
+        """
+        latencies = self.result.latencies()
+        if not len(latencies):
+            return None
+        return float(numpy.percentile(latencies, percentile))
+
+    def row(self):
+        """Return the :data:`SWEEP_COLUMNS` of the step."""
+        return {
+            'concurrency': self.concurrency,
+            'operations': len(self.result.records),
+            'errors': len(self.result.failed),
+            'duration': self.result.end - self.result.start,
+            'throughput': self.throughput,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+        }
+
+
+def detect_saturation(steps, plateau=DEFAULT_PLATEAU,
+                      latency_factor=DEFAULT_LATENCY_FACTOR,
+                      max_error_rate=DEFAULT_MAX_ERROR_RATE):
+    """Find the saturation point of a sweep.
+
+    A step is saturated when its error rate is above ``max_error_rate``, or
+    its 95th percentile latency is above ``latency_factor`` times the one of
+    the first step, or its throughput is less than ``plateau`` above the
+    best throughput of the previous steps.
+
+    :param steps: The :class:`SweepStep` in increasing concurrency order.
+    :returns: A tuple with the index of the maximum sustainable step and the
+        reason of the saturation, ``None`` if no step is saturated. The
+        index is the one of the step before a latency blow-up or too many
+        errors, or of the lowest concurrency step reaching the throughput
+        plateau; it is ``None`` if the first step is already saturated.
+
+    """
+    baseline = None
+    best = None
+    for index, step in enumerate(steps):
+        latency = step.percentile(95)
+        if step.error_rate > max_error_rate or latency is None:
+            return (index - 1 if index else None), ERRORS
+        if baseline is None:
+            baseline = latency
+        elif latency > latency_factor * baseline:
+            return index - 1, LATENCY
+        if best is not None:
+            best_throughput = steps[best].throughput
+            if step.throughput < best_throughput * (1 + plateau):
+                return best, PLATEAU
+        if best is None or step.throughput > steps[best].throughput:
+            best = index
+    return (len(steps) - 1 if steps else None), None
+
+
+class ConcurrencySweep(object):
+    """Raise the concurrency of a workload until the server saturates.
+
+    :param workload: A :class:`robottelo.performance.load.Workload` or any
+        callable receiving the operation index. Indexes are never reused
+        across steps.
+    :param levels: The concurrency levels, see :func:`concurrency_steps`.
+    :param int iterations: Operations run by each client on each step.
+    :param plateau: See :func:`detect_saturation`.
+    :param latency_factor: See :func:`detect_saturation`.
+    :param max_error_rate: See :func:`detect_saturation`.
+
+    """
+    def __init__(self, workload, levels, iterations=20,
+                 plateau=DEFAULT_PLATEAU,
+                 latency_factor=DEFAULT_LATENCY_FACTOR,
+                 max_error_rate=DEFAULT_MAX_ERROR_RATE):
+        self.workload = workload
+        self.levels = levels
+        self.iterations = iterations
+        self.plateau = plateau
+        self.latency_factor = latency_factor
+        self.max_error_rate = max_error_rate
+        self.steps = []
+        self.sustainable = None
+        self.reason = None
+
+    def run(self):
+        """Run the steps until the saturation point or the last level.
+
+        :returns: The maximum sustainable concurrency.
+
+        """
+        self.steps = []
+        first_index = 0
+        for concurrency in self.levels:
+            result = run_closed_loop(
+                self.workload, concurrency, self.iterations, first_index)
+            first_index += concurrency * self.iterations
+            step = SweepStep(concurrency, result)
+            self.steps.append(step)
+            LOGGER.info(
+                'Sweep step of %s clients: %.2f/s, p95 %s, %s failed',
+                concurrency, step.throughput, step.percentile(95),
+                len(result.failed)
+            )
+            self.sustainable, self.reason = detect_saturation(
+                self.steps, self.plateau, self.latency_factor,
+                self.max_error_rate)
+            if self.reason is not None:
+                break
+        LOGGER.info(
+            'Maximum sustainable concurrency: %s (%s)',
+            self.max_sustainable, self.reason or 'not saturated')
+        return self.max_sustainable
+
+    @property
+    def max_sustainable(self):
+        """The maximum sustainable concurrency, ``None`` if the first step
+        was already saturated or the sweep did not run.
+        """
+        if self.sustainable is None:
+            return None
+        return self.steps[self.sustainable].concurrency
+
+    def summary(self):
+        """Return a JSON serializable summary of the sweep.
+
+        :returns: A dictionary with the ``max_sustainable`` concurrency, the
+            ``saturation`` reason, ``None`` if the server did not saturate,
+            the thresholds and the :data:`SWEEP_COLUMNS` of each of the
+            ``steps``.
+
+        """
+        return {
+            'max_sustainable': self.max_sustainable,
+            'saturation': self.reason,
+            'plateau': self.plateau,
+            'latency_factor': self.latency_factor,
+            'max_error_rate': self.max_error_rate,
+            'steps': [step.row() for step in self.steps],
+        }
+
+    def write_csv(self, filename):
+        """Write the steps to a csv file, one row per step."""
+        with open(filename, 'w') as handler:
+            writer = csv.writer(handler)
+            writer.writerow(SWEEP_COLUMNS)
+            for step in self.steps:
+                row = step.row()
+                writer.writerow([
+                    '' if row[column] is None else row[column]
+                    for column in SWEEP_COLUMNS
+                ])
+
+    def write_json(self, filename):
+        """Write the :meth:`summary` to a JSON file."""
+        with open(filename, 'w') as handler:
+            json.dump(self.summary(), handler, indent=2, sort_keys=True)
@@ -16,24 +16,99 @@ class PerformanceThread(threading.Thread):
     concurrent deletion, concurrent synchronization would kick off
     multiple threads to measure timing latency.
 
+    :param start_event: Optional ``threading.Event`` set once all the
+        threads of a test were started, so they start timing at the same
+        time.
+    :param recorder: Optional
+        :class:`robottelo.performance.histogram.LatencyRecorder` the timings
+        are recorded on, under the thread name, instead of being appended to
+        ``time_result_dict``. Long running tests use it to keep a fixed
+        memory footprint.
+    :param metrics: Optional
+        :class:`robottelo.performance.metrics.LiveMetrics` fed with the
+        operations of the thread while they run.
+
     """
-    def __init__(self, thread_id, thread_name, time_result_dict):
+    #: Name of the operation type run by the thread on the live metrics
+    operation = 'operation'
+
+    def __init__(self, thread_id, thread_name, time_result_dict,
+                 start_event=None, recorder=None, metrics=None):
         threading.Thread.__init__(self)
         self.thread_id = thread_id
         self.thread_name = thread_name
         self.time_result_dict = time_result_dict
+        self.start_event = start_event
+        self.recorder = recorder
+        self.metrics = metrics
         self.logger = LOGGER
+        # (started, completed) time of each operation, to correlate them
+        # with the server logs
+        self.windows = []
+        # completion time of each recorded timing, to store them along
+        self.timestamps = []
+
+    def timed(self, function, *args):
+        """Run an operation, feeding the live metrics if any and keeping its
+        start and completion time on ``windows``.
+
+        The operation is counted as failed if it raises an exception or
+        returns a false value, e.g. the ``0`` returned by a failed sync, or
+        a tuple holding one, e.g. the timings of a register and attach.
+
+        """
+        if self.metrics is None:
+            started = time.time()
+        else:
+            started = self.metrics.start(self.operation)
+        error = True
+        try:
+            result = function(*args)
+            if isinstance(result, tuple):
+                error = not all(result)
+            else:
+                error = not result
+            return result
+        finally:
+            self.windows.append((started, time.time()))
+            if self.metrics is not None:
+                self.metrics.finish(self.operation, started, error)
+
+    def record(self, time_point):
+        """Store a timing of this thread, completed by the last operation.
+        """
+        if self.recorder is not None:
+            self.recorder.record(time_point, self.thread_name)
+        else:
+            self.time_result_dict[self.thread_name].append(time_point)
+        self.timestamps.append(
+            self.windows[-1][1] if self.windows else time.time())
+
+    def completion_times(self):
+        """Return the completion time of each timing of the thread, by
+        thread name, in the order of ``time_result_dict``.
+        """
+        return {self.thread_name: self.timestamps}
+
+    def wait_for_start(self):
+        """Block until all the threads of the test were started."""
+        if self.start_event is not None:
+            self.start_event.wait()
 
 
 class DeleteThread(PerformanceThread):
     """Thread utility to support concurrent content hosts deletion"""
-    def __init__(self, thread_id, thread_name, sublist, time_result_dict):
+    operation = 'delete'
+
+    def __init__(self, thread_id, thread_name, sublist, time_result_dict,
+                 start_event=None, recorder=None, metrics=None):
         super(DeleteThread, self).__init__(
-            thread_id, thread_name, time_result_dict)
+            thread_id, thread_name, time_result_dict, start_event, recorder,
+            metrics)
         self.sublist = sublist
 
     def run(self):
-        time.sleep(5)
+        self.wait_for_start()
         self.logger.debug('Start timing in thread {0}'.format(self.thread_id))
         for idx, uuid in enumerate(self.sublist):
             if uuid != '':
@@ -41,12 +116,17 @@ class DeleteThread(PerformanceThread):
                     'deletion attempt # {0} in thread {1}-uuid: {2}'
                     .format(idx, self.thread_id, uuid))
                 # conduct one request by the id
-                time_point = Candlepin.single_delete(uuid, self.thread_id)
-                self.time_result_dict[self.thread_name].append(time_point)
+                time_point = self.timed(
+                    Candlepin.single_delete, uuid, self.thread_id)
+                # failed deletions are counted on the metrics only
+                if time_point:
+                    self.record(time_point)
 
 
 class SubscribeAKThread(PerformanceThread):
     """Thread utility to support concurrent subscription by activation key"""
+    operation = 'register_ak'
+
     def __init__(
             self,
             thread_id,
@@ -55,25 +135,32 @@ class SubscribeAKThread(PerformanceThread):
             num_iterations,
             ak_name,
             default_org,
-            vm_ip):
+            vm_ip,
+            start_event=None,
+            recorder=None,
+            metrics=None):
         super(SubscribeAKThread, self).__init__(
-            thread_id, thread_name, time_result_dict)
+            thread_id, thread_name, time_result_dict, start_event, recorder,
+            metrics)
         self.num_iterations = num_iterations
         self.ak_name = ak_name
         self.default_org = default_org
         self.vm_ip = vm_ip
 
     def run(self):
-        time.sleep(5)
+        self.wait_for_start()
         for i in range(self.num_iterations):
             self.logger.debug(
                 "{0}: register with ak {1} on {2} attempt {3}"
                 .format(self.thread_name, self.ak_name, self.vm_ip, i))
-            time_point = Candlepin.single_register_activation_key(
+            time_point = self.timed(
+                Candlepin.single_register_activation_key,
                 self.ak_name,
                 self.default_org,
                 self.vm_ip)
-            self.time_result_dict[self.thread_name].append(time_point)
+            # failed registrations are counted on the metrics only
+            if time_point:
+                self.record(time_point)
 
 
 class SubscribeAttachThread(PerformanceThread):
@@ -88,7 +175,12 @@ class SubscribeAttachThread(PerformanceThread):
         dict-register: {client-0: [...], ..., client-9:[...]}
         dict-attach: {client-0: [...], ..., client-9:[...]}
 
+    The register timings are recorded on ``recorder`` and the attach ones on
+    ``attach_recorder`` instead, when given.
+
     """
+    operation = 'register_attach'
+
     def __init__(
             self,
             thread_id,
@@ -99,13 +191,21 @@ class SubscribeAttachThread(PerformanceThread):
             num_iterations,
             sub_id,
             default_org, environment,
-            vm_ip):
+            vm_ip,
+            start_event=None,
+            recorder=None,
+            attach_recorder=None,
+            metrics=None):
         super(SubscribeAttachThread, self).__init__(
             thread_id,
             thread_name,
-            time_result_dict
+            time_result_dict,
+            start_event,
+            recorder,
+            metrics,
         )
 
+        self.attach_recorder = attach_recorder
         self.time_result_dict_register = time_result_dict_register
         self.time_result_dict_attach = time_result_dict_attach
         self.num_iterations = num_iterations
@@ -115,31 +215,45 @@ class SubscribeAttachThread(PerformanceThread):
         self.vm_ip = vm_ip
 
     def run(self):
+        self.wait_for_start()
         for i in range(self.num_iterations):
             self.logger.debug(
                 "{0}: register with subscription {1} on vm {2} attempt {3}"
                 .format(self.thread_name, self.sub_id, self.vm_ip, i))
 
-            time_points = Candlepin.single_register_attach(
+            time_points = self.timed(
+                Candlepin.single_register_attach,
                 self.sub_id,
                 self.default_org,
                 self.environment,
                 self.vm_ip)
+            # failed subscriptions are counted on the metrics only
+            if not all(time_points):
+                continue
 
             # split original time_result_dict into two new dictionaries
             # append each client's register timing data
-            self.time_result_dict_register.get(
-                self.thread_name, 'thread-0'
-            ).append(time_points[0])
+            if self.recorder is not None:
+                self.recorder.record(time_points[0], self.thread_name)
+            else:
+                self.time_result_dict_register.get(
+                    self.thread_name, 'thread-0'
+                ).append(time_points[0])
 
             # append each client's attach timing data
-            self.time_result_dict_attach.get(
-                self.thread_name, 'thread-0'
-            ).append(time_points[1])
+            if self.attach_recorder is not None:
+                self.attach_recorder.record(time_points[1], self.thread_name)
+            else:
+                self.time_result_dict_attach.get(
+                    self.thread_name, 'thread-0'
+                ).append(time_points[1])
+            self.timestamps.append(self.windows[-1][1])
 
 
 class SyncThread(PerformanceThread):
     """Thread utility to support concurrent synchronization"""
+    operation = 'sync'
+
     def __init__(
             self,
             thread_id,
@@ -147,11 +261,15 @@ class SyncThread(PerformanceThread):
             time_result_dict,
             repository_id,
             repository_name,
-            iteration):
+            iteration,
+            recorder=None,
+            metrics=None):
         super(SyncThread, self).__init__(
             thread_id,
             thread_name,
-            time_result_dict
+            time_result_dict,
+            recorder=recorder,
+            metrics=metrics,
         )
         self.repository_id = repository_id
         self.repository_name = repository_name
@@ -163,11 +281,14 @@ class SyncThread(PerformanceThread):
             .format(self.thread_name, self.repository_name, self.iteration)
         )
 
-        time_point = Pulp.repository_single_sync(
+        time_point = self.timed(
+            Pulp.repository_single_sync,
             self.repository_id,
             self.repository_name,
             self.thread_id,
         )
 
-        # append sync timing to each thread
-        self.time_result_dict.get(self.thread_name).append(time_point)
+        # append sync timing to each thread, failed syncs are counted on the
+        # metrics only
+        if time_point:
+            self.record(time_point)
@@ -0,0 +1,211 @@
+"""Shared HTTP sessions with pooled, kept alive connections.
+
+Each call to one of the ``requests`` module functions opens a new connection
+to the server, paying for a new TLS handshake. :func:`get_session` returns a
+``requests.Session`` shared by everyone talking to the same server with the
+same credentials, so connections are reused::
+
+    session = get_session(settings.server.get_url(), auth=credentials)
+    session.get(url, auth=credentials, verify=False)
+
+:func:`install_nailgun_sessions` makes ``nailgun.client`` go through these
+sessions when the ``[robottelo] pooled_http_sessions`` setting is on, and
+:func:`session_stats` reports how many requests were made and how many
+connections were opened, hence how many TLS handshakes were saved.
+
+The sessions never store the cookies set by the server, so a cookie received
+by one test is not sent by the requests of the others.
+
+"""
+import logging
+import requests
+import threading
+
+from requests.adapters import HTTPAdapter
+from robottelo.performance.constants import NUM_THREADS
+from six.moves.http_cookiejar import DefaultCookiePolicy
+from six.moves.urllib.parse import urlsplit
+
+LOGGER = logging.getLogger(__name__)
+
+#: Connections kept alive per server when no pool size is given, enough for
+#: the highest number of concurrent performance test threads. Overridden by
+#: the ``[robottelo] http_pool_size`` setting.
+DEFAULT_POOL_SIZE = max(int(count) for count in NUM_THREADS.split(','))
+
+_lock = threading.Lock()
+_sessions = {}
+
+
+class SessionStats(object):
+    """Counts the requests made through a pooled session."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def response_hook(self, response, *args, **kwargs):
+        """``requests`` response hook counting the responses."""
+        with self._lock:
+            self.requests += 1
+
+
+class RejectCookiesPolicy(DefaultCookiePolicy):
+    """Cookie policy which never stores the cookies set by the server."""
+
+    def set_ok(self, cookie, request):
+        """Refuse every cookie."""
+        return False
+
+
+def _session_key(url, auth, verify):
+    """Return the key identifying the session of a server and credential."""
+    parts = urlsplit(url)
+    if isinstance(auth, list):
+        auth = tuple(auth)
+    return (parts.scheme, parts.netloc, auth, verify)
+
+
+def get_session(url, auth=None, verify=True, pool_size=None):
+    """Return the shared session of the server ``url`` belongs to.
+
+    Sessions are thread safe and are shared by all the threads asking for the
+    same server, credential and TLS verification.
+
+    :param url: Any URL of the server.
+    :param auth: The credential, e.g. a ``(user, password)`` tuple.
+    :param verify: Whether the TLS certificate is verified.
+    :param pool_size: Number of connections kept alive, defaults to
+        :data:`DEFAULT_POOL_SIZE`. Only used when creating the session.
+    :returns: A ``requests.Session``.
+
+    """
+    key = _session_key(url, auth, verify)
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            LOGGER.debug('Creating HTTP session for %s://%s', *key[:2])
+            session = requests.Session()
+            session.auth = auth
+            session.verify = verify
+            session.cookies.set_policy(RejectCookiesPolicy())
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=pool_size or DEFAULT_POOL_SIZE,
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.robottelo_stats = SessionStats()
+            session.hooks['response'].append(
+                session.robottelo_stats.response_hook)
+            _sessions[key] = session
+    return session
+
+
+def session_stats():
+    """Return the connection reuse metrics of the shared sessions.
+
+    :returns: A dictionary mapping ``scheme://host`` to a dictionary with the
+        number of ``requests`` made, ``connections`` opened and connections
+        ``reused``. For HTTPS sessions each reused connection is a TLS
+        handshake saved.
+
+    """
+    stats = {}
+    with _lock:
+        sessions = list(_sessions.items())
+    for (scheme, netloc, _, _), session in sessions:
+        connections = 0
+        for adapter in set(session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for pool_key in pools.keys():
+                pool = pools.get(pool_key)
+                if pool is not None:
+                    connections += pool.num_connections
+        server = stats.setdefault(u'{0}://{1}'.format(scheme, netloc), {
+            'connections': 0,
+            'requests': 0,
+            'reused': 0,
+        })
+        server['connections'] += connections
+        server['requests'] += session.robottelo_stats.requests
+        server['reused'] = max(0, server['requests'] - server['connections'])
+    return stats
+
+
+def close_sessions():
+    """Close and forget all the shared sessions."""
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+class PooledRequests(object):
+    """Drop-in replacement of the ``requests`` module functions going
+    through the shared sessions.
+
+    Any other attribute is looked up on the ``requests`` module.
+
+    :param pool_size: Number of connections kept alive per server, defaults
+        to :data:`DEFAULT_POOL_SIZE`.
+
+    """
+    def __init__(self, pool_size=None):
+        self.pool_size = pool_size
+
+    def request(self, method, url, **kwargs):
+        """Send a request through the shared session of ``url``."""
+        session = get_session(
+            url,
+            kwargs.get('auth'),
+            kwargs.get('verify', True),
+            pool_size=self.pool_size,
+        )
+        return session.request(method, url, **kwargs)
+
+    def head(self, url, **kwargs):
+        """Send a HEAD request."""
+        kwargs.setdefault('allow_redirects', False)
+        return self.request('HEAD', url, **kwargs)
+
+    def get(self, url, params=None, **kwargs):
+        """Send a GET request."""
+        kwargs.setdefault('allow_redirects', True)
+        return self.request('GET', url, params=params, **kwargs)
+
+    def post(self, url, data=None, json=None, **kwargs):
+        """Send a POST request."""
+        return self.request('POST', url, data=data, json=json, **kwargs)
+
+    def put(self, url, data=None, **kwargs):
+        """Send a PUT request."""
+        return self.request('PUT', url, data=data, **kwargs)
+
+    def patch(self, url, data=None, **kwargs):
+        """Send a PATCH request."""
+        return self.request('PATCH', url, data=data, **kwargs)
+
+    def delete(self, url, **kwargs):
+        """Send a DELETE request."""
+        return self.request('DELETE', url, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+
+def install_nailgun_sessions(pool_size=None):
+    """Make ``nailgun.client``, hence every nailgun entity, send its
+    requests through the shared sessions.
+
+    ``nailgun.client`` calls the ``requests`` module functions directly, so
+    the module it sees is replaced by a :class:`PooledRequests`.
+
+    :param pool_size: Number of connections kept alive per server, defaults
+        to :data:`DEFAULT_POOL_SIZE`.
+
+    """
+    from nailgun import client
+    if not isinstance(client.requests, PooledRequests):
+        client.requests = PooledRequests(pool_size)
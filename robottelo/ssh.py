@@ -1,6 +1,7 @@
 """Utility module to handle the shared ssh connection."""
 import json
 import logging
+import threading
 from contextlib import contextmanager
 
 import paramiko
@@ -11,6 +12,9 @@ from robottelo.config import settings
 
 logger = logging.getLogger(__name__)
 
+_shared_lock = threading.Lock()
+_shared_connections = {}
+
 
 class SSHCommandResult(object):
     """Structure that returns in all ssh commands results."""
@@ -40,6 +44,32 @@ def _call_paramiko_sshclient():
     return paramiko.SSHClient()
 
 
+def _connect(hostname=None, username=None, password=None, key_filename=None,
+             timeout=10):
+    """Return a new ssh connection, see :func:`_get_connection` for the
+    arguments.
+    """
+    if hostname is None:
+        hostname = settings.server.hostname
+    if username is None:
+        username = settings.server.ssh_username
+    if key_filename is None:
+        key_filename = settings.server.ssh_key
+    if password is None:
+        password = settings.server.ssh_password
+
+    client = _call_paramiko_sshclient()
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    client.connect(
+        hostname=hostname,
+        username=username,
+        key_filename=key_filename,
+        password=password,
+        timeout=timeout
+    )
+    return client
+
+
 @contextmanager
 def _get_connection(hostname=None, username=None, password=None,
                     key_filename=None, timeout=10):
@@ -72,24 +102,7 @@ def _get_connection(hostname=None, username=None, password=None,
     :rtype: paramiko.SSHClient
 
     """
-    if hostname is None:
-        hostname = settings.server.hostname
-    if username is None:
-        username = settings.server.ssh_username
-    if key_filename is None:
-        key_filename = settings.server.ssh_key
-    if password is None:
-        password = settings.server.ssh_password
-
-    client = _call_paramiko_sshclient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    client.connect(
-        hostname=hostname,
-        username=username,
-        key_filename=key_filename,
-        password=password,
-        timeout=timeout
-    )
+    client = _connect(hostname, username, password, key_filename, timeout)
     client_id = hex(id(client))
     try:
         logger.info('Instantiated Paramiko client {0}'.format(client_id))
@@ -100,6 +113,49 @@ def _get_connection(hostname=None, username=None, password=None,
         logger.info('Destroyed Paramiko client {0}'.format(client_id))
 
 
+def get_shared_connection(hostname=None):
+    """Return an ssh connection to ``hostname`` shared by all its callers.
+
+    The connection stays open, and is reopened if it was dropped, so long
+    running users, e.g. log watchers, open their own channels on a single
+    transport instead of connecting each time::
+
+        channel = get_shared_connection().get_transport().open_session()
+
+    The connections are closed by :func:`close_shared_connections`, called
+    when the test session ends, see ``pytest_unconfigure`` on
+    ``conftest.py``.
+
+    :param str hostname: The server, defaults to ``hostname`` from
+        configuration's ``server`` section.
+    :rtype: paramiko.SSHClient
+
+    """
+    if hostname is None:
+        hostname = settings.server.hostname
+    with _shared_lock:
+        client = _shared_connections.get(hostname)
+        transport = client.get_transport() if client is not None else None
+        if transport is None or not transport.is_active():
+            if client is not None:
+                logger.info('Destroying stale shared Paramiko client {0}'
+                            .format(hex(id(client))))
+                client.close()
+            client = _connect(hostname=hostname)
+            logger.info('Instantiated shared Paramiko client {0}'.format(
+                hex(id(client))))
+            _shared_connections[hostname] = client
+        return client
+
+
+def close_shared_connections():
+    """Close the connections returned by :func:`get_shared_connection`."""
+    with _shared_lock:
+        for client in _shared_connections.values():
+            client.close()
+        _shared_connections.clear()
+
+
 def upload_file(local_file, remote_file, hostname=None):
     """Upload a local file to a remote machine
 
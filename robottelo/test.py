@@ -8,6 +8,8 @@ import csv
 import logging
 import os
 import pytest
+import threading
+import time
 import unittest2
 
 try:
@@ -27,13 +29,51 @@ from robottelo.cli.org import Org as OrgCli
 from robottelo.cli.subscription import Subscription
 from robottelo.config import settings
 from robottelo.constants import DEFAULT_ORG, DEFAULT_ORG_ID
-from robottelo.performance.constants import NUM_THREADS
+from robottelo.helpers import get_server_version
+from robottelo.log import LogTail
+from robottelo.performance.adaptive import AdaptiveSampler
+from robottelo.performance.constants import (
+    CANDLEPIN_LOG,
+    FOREMAN_LOG,
+    NUM_THREADS,
+    RAW_STORE_DIR,
+    REQUESTS_FILE_NAME,
+    RESOURCES_FILE_NAME,
+)
+from robottelo.performance.distributed import (
+    Coordinator,
+    make_shards,
+    new_authkey,
+    start_remote_agent,
+)
 from robottelo.performance.graph import (
+    ChartRenderer,
     generate_bar_chart_stat,
-    generate_line_chart_raw_candlepin,
     generate_line_chart_stat_bucketized_candlepin,
+    render_raw_chart_from_store,
+)
+from robottelo.performance.histogram import (
+    LatencyHistogram,
+    LatencyRecorder,
+    merge_histograms,
+)
+from robottelo.performance.metrics import (
+    LiveMetrics,
+    MetricsServer,
+    SnapshotWriter,
+)
+from robottelo.performance.resources import ResourceSampler
+from robottelo.performance.serverlog import (
+    breakdown,
+    correlate,
+    parse_candlepin_log,
+    parse_production_log,
+    server_utc_offset,
+    write_breakdown_csv,
 )
 from robottelo.performance.stat import generate_stat_for_concurrent_thread
+from robottelo.performance.store import TimingStore
+from robottelo.performance.sweep import ConcurrencySweep, concurrency_steps
 from robottelo.performance.thread import (
     DeleteThread,
     SyncThread,
@@ -384,6 +424,11 @@ class ConcurrentTestCase(TestCase):
         """Make sure to only read configuration values once."""
         super(ConcurrentTestCase, cls).setUpClass()
 
+        # charts are rendered by background processes, started before the
+        # ssh, metrics and sampling threads
+        cls.chart_renderer = ChartRenderer()
+        cls.chart_renderer.start()
+
         # general running parameters
         cls.num_threads = NUM_THREADS
         cls.num_buckets = settings.performance.csv_buckets_count
@@ -398,6 +443,91 @@ class ConcurrentTestCase(TestCase):
         # read default organization from constant module
         cls.default_org = DEFAULT_ORG
 
+        # recorded on the metadata of the raw timing stores
+        cls.server_version = get_server_version()
+
+        # live metrics of the running operations, see
+        # robottelo.performance.metrics
+        cls.live_metrics = LiveMetrics()
+        cls.metrics_server = None
+        cls.metrics_writer = None
+        if settings.performance.metrics_port is not None:
+            cls.metrics_server = MetricsServer(
+                cls.live_metrics, port=settings.performance.metrics_port)
+            cls.metrics_server.start()
+        if settings.performance.metrics_snapshot:
+            cls.metrics_writer = SnapshotWriter(
+                cls.live_metrics, settings.performance.metrics_snapshot)
+            cls.metrics_writer.start()
+
+        # server resources, sampled on the timeline of the client timings
+        cls.run_started = cls.run_finished = None
+        cls.resource_sampler = None
+        if settings.performance.resource_sample_interval:
+            cls.resource_sampler = ResourceSampler(
+                settings.performance.resource_sample_interval)
+            cls.resource_sampler.start()
+
+        # summary of the adaptive sampling of the current run, if enabled
+        cls.adaptive_summary = None
+
+        # server side timings of the requests, read from the server logs
+        cls.operation_windows = []
+        cls.operation_timestamps = {}
+        cls.server_requests = []
+        cls.server_log_tails = None
+        if settings.performance.server_logs:
+            cls.server_log_tails = (
+                LogTail(FOREMAN_LOG), LogTail(CANDLEPIN_LOG))
+            cls.server_utc_offset = server_utc_offset()
+
+        # agents the load is distributed over, see
+        # robottelo.performance.distributed
+        cls.coordinator = None
+        cls.agent_channels = []
+        if settings.performance.agents:
+            authkey = new_authkey()
+            addresses = []
+            for hostname in settings.performance.agents:
+                channel, address = start_remote_agent(
+                    hostname,
+                    authkey,
+                    settings.performance.agent_port,
+                    settings.performance.agent_directory,
+                )
+                cls.agent_channels.append(channel)
+                addresses.append(address)
+            cls.coordinator = Coordinator(
+                addresses, authkey, metrics=cls.live_metrics)
+            cls.coordinator.connect()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Wait for the charts to be rendered, stop the agents and the live
+        metrics and save the server resource samples of the whole test case.
+        """
+        cls.chart_renderer.wait()
+        if cls.coordinator is not None:
+            cls.coordinator.close()
+            for channel in cls.agent_channels:
+                channel.close()
+        if cls.metrics_server is not None:
+            cls.metrics_server.stop()
+        if cls.metrics_writer is not None:
+            cls.metrics_writer.stop()
+        if cls.resource_sampler is not None:
+            cls.resource_sampler.stop()
+            if not os.path.isdir(RAW_STORE_DIR):
+                os.makedirs(RAW_STORE_DIR)
+            cls.resource_sampler.write_csv(os.path.join(
+                RAW_STORE_DIR,
+                'perf-resources-{0}-{1}.csv'.format(
+                    cls.__name__,
+                    datetime.utcnow().strftime('%Y%m%d%H%M%S%f'),
+                )
+            ))
+        super(ConcurrentTestCase, cls).tearDownClass()
+
     @classmethod
     def _convert_to_numbers(cls):
         """read in string type series, convert to numbers"""
@@ -502,11 +632,11 @@ class ConcurrentTestCase(TestCase):
            1000 iterations concurrently;
 
         """
-        self.num_iterations = total_iterations / current_num_threads
+        self.num_iterations = total_iterations // current_num_threads
 
     def _set_bucket_size(self):
         """Set size for each bucket"""
-        bucket = self.num_iterations / self.num_buckets
+        bucket = self.num_iterations // self.num_buckets
 
         # check if num_iterations for each client is smaller than 10
         if bucket > 0:
@@ -514,10 +644,181 @@ class ConcurrentTestCase(TestCase):
         else:
             self.bucket_size = 1
 
+    def _new_recorder(self):
+        """Return the latency recorder of a run, or ``None`` if the timings
+        are kept in lists
+
+        A :class:`robottelo.performance.histogram.LatencyRecorder`, with a
+        bucket histogram every ``bucket_size`` timings of a client, is used
+        when ``latency_histograms`` is set on the performance settings. The
+        adaptive runs need the timings themselves, so they never use one.
+
+        """
+        if not settings.performance.latency_histograms:
+            return None
+        if settings.performance.adaptive_ci_width:
+            self.logger.warning(
+                'Latency histograms are not used by adaptive runs')
+            return None
+        return LatencyRecorder(bucket_size=self.bucket_size)
+
+    def _recorded_timings(self, recorder, time_result_dict):
+        """Return the timings of each client of a run: the bucket
+        histograms of ``recorder`` if any, else ``time_result_dict``
+        """
+        if recorder is None:
+            return time_result_dict
+        return dict(
+            (key, recorder.buckets(key)) for key in time_result_dict)
+
+    @staticmethod
+    def _merge_samples(time_list):
+        """Return a list of timings as is, or a list of bucket histograms
+        merged in a single histogram
+        """
+        if len(time_list) and isinstance(time_list[0], LatencyHistogram):
+            return merge_histograms(time_list)
+        return time_list
+
+    def _start_run(self):
+        """Mark the start of a run on the client timeline and on the server
+        logs
+        """
+        self.run_started = time.time()
+        self.operation_windows = []
+        self.operation_timestamps = {}
+        self.server_requests = []
+        if self.server_log_tails is not None:
+            for tail in self.server_log_tails:
+                tail.mark()
+
+    def _run_rounds(self, create_threads, time_result_dict):
+        """Run the threads of a test, adaptively if enabled
+
+        By default the threads run ``num_iterations`` at once. When
+        ``adaptive_ci_width`` is set on the performance settings, they run
+        rounds of ``bucket_size`` iterations instead, until the timings of
+        ``time_result_dict`` converged, see
+        :class:`robottelo.performance.adaptive.AdaptiveSampler`, or
+        ``num_iterations`` were run.
+
+        :param create_threads: Callable starting the threads, given the
+            number of iterations of each thread and the event to start them.
+        :param dict time_result_dict: The timings deciding when to stop.
+        :return: The number of warm-up timings of each thread, to be left out
+            of the statistics.
+
+        """
+        sampler = None
+        rounds, iterations = 1, self.num_iterations
+        self.adaptive_summary = None
+        if settings.performance.adaptive_ci_width:
+            sampler = AdaptiveSampler(
+                percentile=settings.performance.adaptive_percentile,
+                target_width=settings.performance.adaptive_ci_width,
+            )
+            iterations = self.bucket_size
+            rounds = max(self.num_iterations // iterations, 1)
+
+        self._start_run()
+        for _ in range(rounds):
+            sizes = dict(
+                (key, len(timings))
+                for key, timings in time_result_dict.items()
+            )
+            start_event = threading.Event()
+            thread_list = create_threads(iterations, start_event)
+            start_event.set()
+            self._join_all_threads(thread_list)
+            if sampler is None:
+                continue
+            for key in sorted(time_result_dict):
+                sampler.add(time_result_dict[key][sizes[key]:])
+            if sampler.converged:
+                break
+
+        if sampler is None:
+            return 0
+        self.adaptive_summary = sampler.summary()
+        self.logger.info(
+            'Adaptive sampling: {0}'.format(self.adaptive_summary))
+        # warm-up rounds, of `iterations` timings of each thread
+        return (
+            sampler.warmup // (iterations * len(time_result_dict)) *
+            iterations
+        )
+
+    def _start_distributed(self, workload, kwargs, current_num_threads,
+                           num_iterations, time_result_dicts, split=None,
+                           recorders=None):
+        """Start running a workload on the agents
+
+        The clients are shared out among the agents, see
+        :func:`robottelo.performance.distributed.make_shards`, and the value
+        returned by each operation is appended to the list of its client in
+        ``time_result_dicts``, as the threads of
+        :mod:`robottelo.performance.thread` do.
+
+        :param str workload: The workload name, see
+            :data:`robottelo.performance.distributed.WORKLOADS`.
+        :param dict kwargs: The arguments of the workload.
+        :param list time_result_dicts: The timing dictionaries, more than one
+            if the operations return a tuple of timings.
+        :param str split: The argument shared out among the agents.
+        :param list recorders: The latency recorders the values are recorded
+            on instead of ``time_result_dicts``, one per timing.
+        :return: The started
+            :class:`robottelo.performance.distributed.DistributedRun`, joined
+            as a thread.
+
+        """
+        def record(name, operation):
+            """Store the timings of an operation"""
+            values = operation.value
+            if len(time_result_dicts) == 1:
+                values = (values,)
+            if recorders is not None:
+                for recorder, value in zip(recorders, values):
+                    recorder.record(value, name)
+                return
+            for time_result_dict, value in zip(time_result_dicts, values):
+                time_result_dict[name].append(value)
+
+        shards = make_shards(
+            workload,
+            kwargs,
+            current_num_threads,
+            num_iterations,
+            len(self.coordinator.agents),
+            split,
+        )
+        return self.coordinator.start(shards, record)
+
+    def _steady_state(self, time_result_dict, warmup):
+        """Leave the ``warmup`` first timings of each thread out"""
+        return dict(
+            (key, timings[warmup:])
+            for key, timings in time_result_dict.items()
+        )
+
     def _join_all_threads(self, thread_list):
-        """Wait for all threads to complete"""
+        """Wait for all threads to complete, then collect the operation
+        times and the server requests logged meanwhile
+        """
         for thread in thread_list:
             thread.join()
+        self.run_finished = time.time()
+        for thread in thread_list:
+            self.operation_windows.extend(thread.windows)
+            for name, timestamps in thread.completion_times().items():
+                self.operation_timestamps.setdefault(name, []).extend(
+                    timestamps)
+        if self.server_log_tails is not None:
+            foreman_tail, candlepin_tail = self.server_log_tails
+            self.server_requests.extend(parse_production_log(
+                foreman_tail.read(), self.server_utc_offset))
+            self.server_requests.extend(parse_candlepin_log(
+                candlepin_tail.read(), self.server_utc_offset))
 
     def _get_output_filename(self, file_name):
         """Get type of test: ak/att/del/reg as output file name
@@ -535,6 +836,85 @@ class ConcurrentTestCase(TestCase):
         split_file_name = file_name.split('.')
         return split_file_name[0]
 
+    def _store_raw_timings(
+            self,
+            test_category,
+            time_result_dict,
+            current_num_threads,
+            test_case_name,
+            charts=None):
+        """Save raw timings on a new columnar timing store
+
+        The timings of each thread are saved once the run completed, with the
+        completion time of each operation collected by
+        :meth:`_join_all_threads`. Each run gets its own directory under
+        ``robottelo.performance.constants.RAW_STORE_DIR``, see
+        :class:`robottelo.performance.store.TimingStore`, with the server
+        resources sampled while the run was in progress and the server side
+        breakdown of the operations, see
+        :mod:`robottelo.performance.serverlog`.
+
+        :param list charts: The raw charts of the run, recorded so they can
+            be rendered again by
+            :func:`robottelo.performance.graph.regenerate_charts`
+
+        :return: The timing store.
+        :rtype: robottelo.performance.store.TimingStore
+
+        """
+        path = os.path.join(
+            RAW_STORE_DIR,
+            '{0}-{1}-clients-{2}'.format(
+                test_category,
+                current_num_threads,
+                datetime.utcnow().strftime('%Y%m%d%H%M%S%f'),
+            )
+        )
+        metadata = {
+            'bucket_size': self.bucket_size,
+            'num_buckets': self.num_buckets,
+            'num_iterations': self.num_iterations,
+            'num_threads': current_num_threads,
+            'server_hostname': settings.server.hostname,
+            'server_version': self.server_version,
+            'test_case': test_case_name,
+            'charts': charts or [],
+            'started': self.run_started,
+            'finished': self.run_finished,
+            'adaptive': self.adaptive_summary,
+        }
+        with TimingStore.create(path, metadata) as store:
+            for i in range(len(time_result_dict)):
+                time_list = time_result_dict.get('thread-{0}'.format(i))
+                # completion times of the operations, unknown if the
+                # timings were not collected by the threads of this run
+                timestamps = self.operation_timestamps.get(
+                    'thread-{0}'.format(i))
+                if timestamps is not None and (
+                        len(timestamps) != len(time_list)):
+                    timestamps = None
+                store.append_many(
+                    time_list,
+                    thread=i,
+                    operation=test_category,
+                    timestamps=timestamps,
+                )
+        if self.resource_sampler is not None:
+            self.resource_sampler.write_csv(
+                os.path.join(path, RESOURCES_FILE_NAME),
+                self.run_started,
+                self.run_finished,
+            )
+        if self.server_log_tails is not None:
+            write_breakdown_csv(
+                os.path.join(path, REQUESTS_FILE_NAME),
+                breakdown(
+                    self.operation_windows,
+                    correlate(self.operation_windows, self.server_requests),
+                ),
+            )
+        return store
+
     def _write_raw_csv_file(
             self,
             raw_file_name,
@@ -564,24 +944,31 @@ class ConcurrentTestCase(TestCase):
         self.logger.debug(
             'Timing result is: {0}'.format(time_result_dict))
 
-        with open(raw_file_name, 'a') as handler:
-            writer = csv.writer(handler)
-            writer.writerow([test_case_name])
-
-            # for each thread, write its head and data
-            for i in range(current_num_threads):
-                writer.writerow(time_result_dict.get('thread-{0}'.format(i)))
-            writer.writerow([])
-
-        # generate line chart of raw data
         test_category = self._get_output_filename(raw_file_name)
-        generate_line_chart_raw_candlepin(
+        chart = {
+            'kind': 'line_candlepin',
+            'head': 'Candlepin Subscription Raw Timings Line Chart - '
+                    '({0}-{1}-clients)'
+                    .format(test_category, current_num_threads),
+            'filename': '{0}-{1}-clients-raw-data-line-chart.svg'
+                        .format(test_category, current_num_threads),
+        }
+        store = self._store_raw_timings(
+            test_category,
             time_result_dict,
-            'Candlepin Subscription Raw Timings Line Chart - '
-            '({0}-{1}-clients)'
-            .format(test_category, current_num_threads),
-            '{0}-{1}-clients-raw-data-line-chart.svg'
-            .format(test_category, current_num_threads)
+            current_num_threads,
+            test_case_name,
+            [chart],
+        )
+        store.export_csv(raw_file_name, title=test_case_name)
+
+        # generate line chart of raw data from the saved timings
+        self.chart_renderer.submit(
+            render_raw_chart_from_store,
+            store.path,
+            chart['kind'],
+            chart['head'],
+            chart['filename'],
         )
 
     def _write_stat_csv_chart(
@@ -649,6 +1036,15 @@ class ConcurrentTestCase(TestCase):
             )
             writer.writerow([])
 
+    def _write_all_failed(self, stat_file_name, name):
+        """Report a client, or a test, whose operations all failed, so it
+        has no timing to compute statistics on
+        """
+        self.logger.warning('All the operations of {0} failed'.format(name))
+        with open(stat_file_name, 'a') as handler:
+            csv.writer(handler).writerows(
+                [[], [name], ['all operations failed']])
+
     def _write_stat_per_client_bucketized(
             self,
             stat_file_name,
@@ -669,6 +1065,9 @@ class ConcurrentTestCase(TestCase):
         for i in range(current_num_threads):
             time_list = time_result_dict.get('thread-{0}'.format(i))
             thread_name = 'client-{0}'.format(i)
+            if not len(time_list):
+                self._write_all_failed(stat_file_name, thread_name)
+                continue
             stat_dict = generate_stat_for_concurrent_thread(
                 thread_name,
                 time_list,
@@ -678,7 +1077,8 @@ class ConcurrentTestCase(TestCase):
             )
 
             # create line chart with each client being grouped by buckets
-            generate_line_chart_stat_bucketized_candlepin(
+            self.chart_renderer.submit(
+                generate_line_chart_stat_bucketized_candlepin,
                 stat_dict,
                 'Concurrent Subscription Statistics - per client bucketized: '
                 'Client-{0} by {1}-{2}-clients'
@@ -686,7 +1086,7 @@ class ConcurrentTestCase(TestCase):
                 '{0}-client-{1}-bucketized-{2}-clients.svg'
                 .format(test_category, i, current_num_threads),
                 self.bucket_size,
-                self.num_buckets
+                len(stat_dict)
             )
 
     def _write_stat_per_test_bucketized(
@@ -717,19 +1117,28 @@ class ConcurrentTestCase(TestCase):
         current_num_threads = len(time_result_dict)
         test_category = self._get_output_filename(stat_file_name)
 
-        for i in range(self.num_buckets):
+        # a recorder already bucketized the timings in histograms
+        step = self.bucket_size
+        for time_list in time_result_dict.values():
+            if len(time_list) and isinstance(time_list[0], LatencyHistogram):
+                step = 1
+        # buckets holding timings only: adaptive runs may stop early
+        longest = max(
+            [len(time_list) for time_list in time_result_dict.values()] +
+            [0])
+        num_buckets = min(self.num_buckets, -(-longest // step))
+
+        for i in range(num_buckets):
             chunks_bucket_i = []
             for j in range(len(time_result_dict)):
                 time_list = time_result_dict.get('thread-{0}'.format(j))
                 # slice out bucket-size from each client's result and merge
-                chunks_bucket_i += time_list[
-                    i * self.bucket_size: (i + 1) * self.bucket_size
-                ]
+                chunks_bucket_i += time_list[i * step: (i + 1) * step]
 
             # for each chunk i, compute and output its stat
             return_stat = generate_stat_for_concurrent_thread(
                 'bucket-{0}'.format(i),
-                chunks_bucket_i,
+                self._merge_samples(chunks_bucket_i),
                 stat_file_name,
                 len(chunks_bucket_i),
                 1
@@ -739,7 +1148,8 @@ class ConcurrentTestCase(TestCase):
             stat_dict.update({i: return_stat.get(0, (0, 0, 0, 0))})
 
         # create line chart with all clients grouped by a chunk of buckets
-        generate_line_chart_stat_bucketized_candlepin(
+        self.chart_renderer.submit(
+            generate_line_chart_stat_bucketized_candlepin,
             stat_dict,
             'Concurrent Subscription Statistics - per test bucketized: '
             '({0}-{1}-clients)'
@@ -747,7 +1157,7 @@ class ConcurrentTestCase(TestCase):
             '{0}-test-bucketized-{1}-clients.svg'
             .format(test_category, current_num_threads),
             self.bucket_size,
-            self.num_buckets
+            num_buckets
         )
 
     def _write_stat_per_client(
@@ -769,11 +1179,14 @@ class ConcurrentTestCase(TestCase):
         for i in range(current_num_threads):
             time_list = time_result_dict.get('thread-{0}'.format(i))
             thread_name = 'client-{0}'.format(i)
+            if not len(time_list):
+                self._write_all_failed(stat_file_name, thread_name)
+                continue
 
             # for each client i, compute and output its stat
             return_stat = generate_stat_for_concurrent_thread(
                 thread_name,
-                time_list,
+                self._merge_samples(time_list),
                 stat_file_name,
                 len(time_list),
                 1
@@ -783,7 +1196,8 @@ class ConcurrentTestCase(TestCase):
             stat_dict.update({i: return_stat.get(0, (0, 0, 0, 0))})
 
         # create graph based on stats of all clients
-        generate_bar_chart_stat(
+        self.chart_renderer.submit(
+            generate_bar_chart_stat,
             stat_dict,
             'Concurrent Subscription Statistics - per client: '
             '({0}-{1}-clients)'
@@ -806,16 +1220,21 @@ class ConcurrentTestCase(TestCase):
         for i in range(len(time_result_dict)):
             time_list = time_result_dict.get('thread-{0}'.format(i))
             full_list += time_list
+        if not full_list:
+            self._write_all_failed(
+                stat_file_name, 'test-{0}'.format(len(time_result_dict)))
+            return
 
         stat_dict = generate_stat_for_concurrent_thread(
             'test-{0}'.format(len(time_result_dict)),
-            full_list,
+            self._merge_samples(full_list),
             stat_file_name,
             len(full_list),
             1
         )
 
-        generate_bar_chart_stat(
+        self.chart_renderer.submit(
+            generate_bar_chart_stat,
             stat_dict,
             'Concurrent Subscription Statistics - per test: '
             '({0}-{1}-clients)'
@@ -840,42 +1259,63 @@ class ConcurrentTestCase(TestCase):
         self._set_num_iterations(total_iterations, current_num_threads)
         self._set_bucket_size()
 
-        # Create a list to store all threads
-        thread_list = []
         # Create a dictionary to store all timing results from each client
-        time_result_dict_ak = {}
+        time_result_dict_ak = dict(
+            ('thread-{0}'.format(i), []) for i in range(current_num_threads))
+        recorder = self._new_recorder()
+
+        def create_threads(num_iterations, start_event):
+            """Start a thread mapped with each vm"""
+            if self.coordinator is not None:
+                return [self._start_distributed(
+                    'register_ak',
+                    {
+                        'ak_name': self.ak_name,
+                        'default_org': self.default_org,
+                        'vm_ips': current_vm_list,
+                    },
+                    current_num_threads,
+                    num_iterations,
+                    [time_result_dict_ak],
+                    split='vm_ips',
+                    recorders=None if recorder is None else [recorder],
+                )]
+            thread_list = []
+            for i in range(current_num_threads):
+                thread = SubscribeAKThread(
+                    i,
+                    'thread-{0}'.format(i),
+                    time_result_dict_ak,
+                    num_iterations,
+                    self.ak_name,
+                    self.default_org,
+                    current_vm_list[i],
+                    start_event,
+                    recorder,
+                    metrics=self.live_metrics,
+                )
+                thread.start()
+                thread_list.append(thread)
+            return thread_list
 
-        # Create new threads and start each thread mapped with a vm
-        for i in range(current_num_threads):
-            thread_name = 'thread-{0}'.format(i)
-            time_result_dict_ak[thread_name] = []
-            thread = SubscribeAKThread(
-                i,
-                thread_name,
+        warmup = self._run_rounds(create_threads, time_result_dict_ak)
+
+        # write raw result of activation-key, not kept by a recorder
+        if recorder is None:
+            self._write_raw_csv_file(
+                self.raw_file_name,
                 time_result_dict_ak,
-                self.num_iterations,
-                self.ak_name,
-                self.default_org,
-                current_vm_list[i]
+                current_num_threads,
+                'raw-ak-{0}-clients'.format(current_num_threads)
             )
-            thread.start()
-            thread_list.append(thread)
-
-        # wait all threads in thread list
-        self._join_all_threads(thread_list)
-
-        # write raw result of activation-key
-        self._write_raw_csv_file(
-            self.raw_file_name,
-            time_result_dict_ak,
-            current_num_threads,
-            'raw-ak-{0}-clients'.format(current_num_threads)
-        )
 
         # write stat result of ak and generate charts
         self._write_stat_csv_chart(
             self.stat_file_name,
-            time_result_dict_ak,
+            self._steady_state(
+                self._recorded_timings(recorder, time_result_dict_ak),
+                warmup,
+            ),
             current_num_threads,
             'stat-ak-{0}-clients'.format(current_num_threads)
         )
@@ -895,57 +1335,81 @@ class ConcurrentTestCase(TestCase):
         self._set_num_iterations(total_iterations, current_num_threads)
         self._set_bucket_size()
 
-        # Create a list to store all threads
-        thread_list = []
         # Create a dictionary to store register timings from each client
-        time_result_dict_register = {}
+        time_result_dict_register = dict(
+            ('thread-{0}'.format(i), []) for i in range(current_num_threads))
         # Create a dictionary to store attach timings from each client
-        time_result_dict_attach = {}
+        time_result_dict_attach = dict(
+            ('thread-{0}'.format(i), []) for i in range(current_num_threads))
+        register_recorder = self._new_recorder()
+        attach_recorder = self._new_recorder()
+
+        def create_threads(num_iterations, start_event):
+            """Start a thread mapped with each vm"""
+            if self.coordinator is not None:
+                return [self._start_distributed(
+                    'register_attach',
+                    {
+                        'sub_id': self.sub_id,
+                        'default_org': self.default_org,
+                        'environment': self.environment,
+                        'vm_ips': current_vm_list,
+                    },
+                    current_num_threads,
+                    num_iterations,
+                    [time_result_dict_register, time_result_dict_attach],
+                    split='vm_ips',
+                    recorders=None if register_recorder is None else [
+                        register_recorder, attach_recorder],
+                )]
+            thread_list = []
+            for i in range(current_num_threads):
+                thread = SubscribeAttachThread(
+                    i,
+                    'thread-{0}'.format(i),
+                    {},
+                    time_result_dict_register,
+                    time_result_dict_attach,
+                    num_iterations,
+                    self.sub_id,
+                    self.default_org,
+                    self.environment,
+                    current_vm_list[i],
+                    start_event,
+                    register_recorder,
+                    attach_recorder,
+                    metrics=self.live_metrics,
+                )
+                thread.start()
+                thread_list.append(thread)
+            return thread_list
 
-        # Create new threads and start each thread mapped with a vm
-        for i in range(current_num_threads):
-            thread_name = 'thread-{0}'.format(i)
-            time_result_dict_register[thread_name] = []
-            time_result_dict_attach[thread_name] = []
+        # the register timings decide when to stop, see _run_rounds
+        warmup = self._run_rounds(create_threads, time_result_dict_register)
 
-            thread = SubscribeAttachThread(
-                i,
-                thread_name,
-                {},
+        # write raw results of register and attach, not kept by recorders
+        if register_recorder is None:
+            self._write_raw_csv_file(
+                self.reg_raw_file_name,
                 time_result_dict_register,
+                current_num_threads,
+                'raw-reg-{0}-clients'.format(current_num_threads)
+            )
+            self._write_raw_csv_file(
+                self.raw_file_name,
                 time_result_dict_attach,
-                self.num_iterations,
-                self.sub_id,
-                self.default_org,
-                self.environment,
-                current_vm_list[i]
+                current_num_threads,
+                'raw-att-{0}-clients'.format(current_num_threads)
             )
-            thread.start()
-            thread_list.append(thread)
-
-        # wait all threads in thread list
-        self._join_all_threads(thread_list)
-
-        # write raw result of register
-        self._write_raw_csv_file(
-            self.reg_raw_file_name,
-            time_result_dict_register,
-            current_num_threads,
-            'raw-reg-{0}-clients'.format(current_num_threads)
-        )
-
-        # write raw result of attach
-        self._write_raw_csv_file(
-            self.raw_file_name,
-            time_result_dict_attach,
-            current_num_threads,
-            'raw-att-{0}-clients'.format(current_num_threads)
-        )
 
         # write stat result of register and generate charts
         self._write_stat_csv_chart(
             self.reg_stat_file_name,
-            time_result_dict_register,
+            self._steady_state(
+                self._recorded_timings(
+                    register_recorder, time_result_dict_register),
+                warmup,
+            ),
             current_num_threads,
             'stat-reg-{0}-clients'.format(current_num_threads)
         )
@@ -953,7 +1417,11 @@ class ConcurrentTestCase(TestCase):
         # write stat result of attach and generate charts
         self._write_stat_csv_chart(
             self.stat_file_name,
-            time_result_dict_attach,
+            self._steady_state(
+                self._recorded_timings(
+                    attach_recorder, time_result_dict_attach),
+                warmup,
+            ),
             current_num_threads,
             'stat-att-{0}-clients'.format(current_num_threads)
         )
@@ -979,36 +1447,59 @@ class ConcurrentTestCase(TestCase):
         thread_list = []
         # Create a dictionary to store all timing results from each thread
         time_result_dict_del = {}
+        # Set once all threads are started, so they start timing together
+        start_event = threading.Event()
+        recorder = self._new_recorder()
 
         # Create new threads and start the thread which has sublist of uuids
         for i in range(current_num_threads):
             time_result_dict_del['thread-{0}'.format(i)] = []
+            if self.coordinator is not None:
+                continue
             thread = DeleteThread(
                 i,
                 'thread-{0}'.format(i),
                 uuid_list[
                     self.num_iterations * i: self.num_iterations * (i + 1)
                 ],
-                time_result_dict_del
+                time_result_dict_del,
+                start_event,
+                recorder,
+                metrics=self.live_metrics,
             )
             thread.start()
             thread_list.append(thread)
+        if self.coordinator is not None:
+            # the agents start together on their own
+            thread_list.append(self._start_distributed(
+                'delete',
+                {'uuids': uuid_list[
+                    :self.num_iterations * current_num_threads]},
+                current_num_threads,
+                self.num_iterations,
+                [time_result_dict_del],
+                split='uuids',
+                recorders=None if recorder is None else [recorder],
+            ))
+        self._start_run()
+        start_event.set()
 
         # wait all threads in thread list
         self._join_all_threads(thread_list)
 
-        # write raw result of del
-        self._write_raw_csv_file(
-            self.raw_file_name,
-            time_result_dict_del,
-            current_num_threads,
-            'raw-del-{0}-clients'.format(current_num_threads)
-        )
+        # write raw result of del, not kept by a recorder
+        if recorder is None:
+            self._write_raw_csv_file(
+                self.raw_file_name,
+                time_result_dict_del,
+                current_num_threads,
+                'raw-del-{0}-clients'.format(current_num_threads)
+            )
 
         # write stat result of del
         self._write_stat_csv_chart(
             self.stat_file_name,
-            time_result_dict_del,
+            self._recorded_timings(recorder, time_result_dict_del),
             current_num_threads,
             'stat-del-{0}-clients'.format(current_num_threads)
         )
@@ -1019,6 +1510,9 @@ class ConcurrentTestCase(TestCase):
             is_initial_sync):
         """Refactor out concurrent repository synchronization test case
 
+        Failed syncs have no timing, the longest successful sync of each
+        iteration is kept on ``iteration_max_timings``.
+
         :param int current_num_threads: The number of threads
         :param bool is_initial_sync: Decide whether resync or initial sync
         :return dict time_result_dict: Contain a list of X # of timings
@@ -1036,15 +1530,23 @@ class ConcurrentTestCase(TestCase):
             .format(repo_names_list)
         )
 
-        # Create a list to store all threads
-        thread_list = []
         # Create a dictionary to store all timing results from each thread
         time_result_dict = {}
         for thread_id in range(current_num_threads):
             time_result_dict['thread-{0}'.format(thread_id)] = []
 
         # sync all specified repositories and repeate X times
+        self.iteration_max_timings = []
+        self._start_run()
         for iteration in range(self.sync_iterations):
+            # Create a list to store the threads of this iteration
+            thread_list = []
+            sizes = dict(
+                (key, len(timings))
+                for key, timings in time_result_dict.items()
+            )
+            # repositories synchronized by the agents, if distributed
+            repositories = {}
             # for each thread, sync a single repository
             for tid in range(current_num_threads):
                 repo_name = repo_names_list[tid]
@@ -1065,6 +1567,9 @@ class ConcurrentTestCase(TestCase):
                     )
                 )
 
+                if self.coordinator is not None:
+                    repositories[repo_name] = repo_id
+                    continue
                 thread = SyncThread(
                     tid,
                     "thread-{0}".format(tid),
@@ -1072,12 +1577,33 @@ class ConcurrentTestCase(TestCase):
                     repo_id,
                     repo_name,
                     iteration,
+                    metrics=self.live_metrics,
                 )
                 thread.start()
                 thread_list.append(thread)
 
+            if repositories:
+                thread_list.append(self._start_distributed(
+                    'sync',
+                    {'repositories': repositories},
+                    len(repositories),
+                    1,
+                    [time_result_dict],
+                    split='repositories',
+                ))
+
             # wait all threads in thread list
             self._join_all_threads(thread_list)
+            timings = [
+                timing
+                for key in sorted(time_result_dict)
+                for timing in time_result_dict[key][sizes[key]:]
+            ]
+            if timings:
+                self.iteration_max_timings.append(max(timings))
+            else:
+                self.logger.warning(
+                    'All syncs of iteration {0} failed'.format(iteration))
 
             # Once all threads have completed syncs,
             # reset database before next iteration, if initial sync test
@@ -1095,3 +1621,57 @@ class ConcurrentTestCase(TestCase):
                 )
 
         return time_result_dict
+
+    def kick_off_sweep(self, workload, operation, max_concurrency,
+                       iterations=None):
+        """Sweep the concurrency of a workload up to its saturation point
+
+        The concurrency levels and thresholds are read from the ``sweep_*``
+        performance settings, see
+        :class:`robottelo.performance.sweep.ConcurrencySweep`. The measures
+        of each step are saved under
+        ``robottelo.performance.constants.RAW_STORE_DIR`` as
+        ``perf-sweep-<operation>-<timestamp>.csv``, with the summary in the
+        ``.json`` file of the same name.
+
+        :param workload: A :class:`robottelo.performance.load.Workload`.
+        :param str operation: Name of the operation, e.g. ``register_ak``.
+        :param int max_concurrency: Highest number of concurrent clients.
+        :param int iterations: Operations run by each client on each step,
+            defaults to the ``sweep_iterations`` setting.
+        :return: The sweep, its ``max_sustainable`` attribute is the maximum
+            sustainable concurrency.
+
+        """
+        sweep = ConcurrencySweep(
+            workload,
+            concurrency_steps(
+                max_concurrency,
+                mode=settings.performance.sweep_mode,
+                step=settings.performance.sweep_step,
+            ),
+            iterations=iterations or settings.performance.sweep_iterations,
+            plateau=settings.performance.sweep_plateau,
+            latency_factor=settings.performance.sweep_latency_factor,
+        )
+        self._start_run()
+        sweep.run()
+        self.run_finished = time.time()
+
+        if not os.path.isdir(RAW_STORE_DIR):
+            os.makedirs(RAW_STORE_DIR)
+        path = os.path.join(
+            RAW_STORE_DIR,
+            'perf-sweep-{0}-{1}'.format(
+                operation, datetime.utcnow().strftime('%Y%m%d%H%M%S%f'))
+        )
+        sweep.write_csv(path + '.csv')
+        sweep.write_json(path + '.json')
+        self.logger.info(
+            'Maximum sustainable concurrency of {0}: {1} ({2})'.format(
+                operation,
+                sweep.max_sustainable,
+                sweep.reason or 'not saturated',
+            )
+        )
+        return sweep
@@ -2,10 +2,10 @@
 """Base class for all UI operations"""
 
 import logging
-import time
 
 from robottelo.helpers import escape_search
 from robottelo.ui.locators import locators, common_locators
+from robottelo.wait import WaitTimeoutError, wait_for
 from selenium.common.exceptions import NoSuchElementException
 from selenium.common.exceptions import TimeoutException
 from selenium.common.exceptions import WebDriverException
@@ -126,10 +126,12 @@ class Base(object):
         self.perform_action_chain_move(search_button_locator)
 
         self.click(search_button_locator)
+
         # Make sure that found element is returned no matter it described by
         # its own locator or common one (locator can transform depending on
         # element name length)
-        for _ in range(self.result_timeout):
+        def find_result():
+            """Return the found element, if any."""
             for strategy, value in (
                     element_locator,
                     common_locators['select_filtered_entity']
@@ -137,8 +139,18 @@ class Base(object):
                 result = self.find_element((strategy, value % element))
                 if result is not None:
                     return result
-            time.sleep(1)
-        return None
+
+        try:
+            return wait_for(
+                find_result,
+                timeout=self.result_timeout,
+                delay=0.25,
+                backoff=1.5,
+                max_delay=1,
+                name='search result',
+            )
+        except WaitTimeoutError:
+            return None
 
     def create_a_bookmark(self, name=None, query=None, public=None,
                           searchbox_query=None):
@@ -11,11 +11,12 @@ snap-guest and its dependencies and the ``image_dir`` path created.
 """
 import logging
 import os
-import time
+import paramiko
 
 from robottelo import ssh
 from robottelo.config import settings
 from robottelo.helpers import install_katello_ca, remove_katello_ca
+from robottelo.wait import WaitTimeoutError, wait_for
 
 BASE_IMAGES = (
     'rhel65',
@@ -135,18 +136,48 @@ class VirtualMachine(object):
             raise VirtualMachineError(
                 u'Failed to run snap-guest: {0}'.format(result.stderr))
 
-        # Give some time to machine boot
-        time.sleep(60)
+        def ping():
+            """Return the ping result once the machine answers."""
+            result = ssh.command(
+                u'ping -c 1 {0}.local'.format(self._target_image),
+                self.provisioning_server
+            )
+            return result if result.return_code == 0 else None
 
-        result = ssh.command(
-            u'ping -c 1 {0}.local'.format(self._target_image),
-            self.provisioning_server
-        )
-        if result.return_code != 0:
+        # Wait for the machine to boot
+        try:
+            result = wait_for(
+                ping,
+                timeout=300,
+                delay=5,
+                backoff=1.5,
+                max_delay=15,
+                name=u'{0} boot'.format(self._target_image),
+            )
+        except WaitTimeoutError:
             raise VirtualMachineError(
                 'Failed to fetch virtual machine IP address information')
         output = ''.join(result.stdout)
         self.ip_addr = output.split('(')[1].split(')')[0]
+
+        def ssh_ready():
+            """Return whether the machine runs commands over ssh."""
+            return ssh.command(u'true', hostname=self.ip_addr).return_code == 0
+
+        # The machine answers ping before sshd is up, wait for it too
+        try:
+            wait_for(
+                ssh_ready,
+                timeout=300,
+                delay=5,
+                backoff=1.5,
+                max_delay=15,
+                exceptions=(EnvironmentError, paramiko.SSHException),
+                name=u'{0} ssh'.format(self._target_image),
+            )
+        except WaitTimeoutError:
+            raise VirtualMachineError(
+                'Failed to connect to the virtual machine over ssh')
         self.hostname = u'{0}.{1}'.format(self._target_image, self._domain)
         self._created = True
 
@@ -0,0 +1,157 @@
+"""Polling utilities to wait for a condition instead of sleeping blindly.
+
+:func:`wait_for` calls a condition until it returns a truthy value, sleeping
+between the attempts according to an exponential and jittered backoff::
+
+    ip_addr = wait_for(
+        lambda: get_ip_address(hostname),
+        timeout=300,
+        delay=5,
+        name='vm ip address',
+    )
+
+Deadlines are propagated: a :func:`wait_for` called from within the
+condition of another one never waits past the outer deadline.
+
+Time spent waiting is recorded per wait name, see :func:`wait_stats`.
+
+"""
+import logging
+import random
+import threading
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+_deadlines = threading.local()
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+class WaitTimeoutError(Exception):
+    """Indicates that a condition was not met before the timeout."""
+
+
+def backoff_delays(delay=1, backoff=2, max_delay=None, jitter=0.1):
+    """Generate the delays between the attempts of a polling loop.
+
+    :param delay: Seconds to wait after the first attempt.
+    :param backoff: Factor the delay is multiplied by after each attempt.
+    :param max_delay: Upper bound of the delay, no bound if ``None``.
+    :param jitter: Fraction of each delay which is randomly added or
+        removed, so concurrent pollers don't hit the server at the same
+        time.
+
+    """
+    while True:
+        current = delay
+        if jitter:
+            current *= 1 + random.uniform(-jitter, jitter)
+        yield current
+        delay *= backoff
+        if max_delay is not None:
+            delay = min(delay, max_delay)
+
+
+def current_deadline():
+    """Return the deadline of the innermost running :func:`wait_for` of the
+    current thread, as a :func:`time.time` timestamp, or ``None``.
+
+    """
+    stack = getattr(_deadlines, 'stack', None)
+    return stack[-1] if stack else None
+
+
+def _record(name, waited, attempts, timed_out):
+    """Update the metrics of the waits called ``name``."""
+    with _stats_lock:
+        stats = _stats.setdefault(name, {
+            'calls': 0,
+            'attempts': 0,
+            'timeouts': 0,
+            'waited': 0.0,
+        })
+        stats['calls'] += 1
+        stats['attempts'] += attempts
+        stats['timeouts'] += int(timed_out)
+        stats['waited'] += waited
+
+
+def wait_stats():
+    """Return the wait metrics.
+
+    :returns: A dictionary mapping each wait name to a dictionary with the
+        number of ``calls``, condition ``attempts``, ``timeouts`` and the
+        total seconds ``waited``.
+
+    """
+    with _stats_lock:
+        return dict((name, dict(stats)) for name, stats in _stats.items())
+
+
+def reset_wait_stats():
+    """Forget the recorded wait metrics."""
+    with _stats_lock:
+        _stats.clear()
+
+
+def wait_for(condition, timeout=60, delay=1, backoff=2, max_delay=None,
+             jitter=0.1, exceptions=(), name=None):
+    """Call ``condition`` until it returns a truthy value.
+
+    :param condition: Callable without arguments.
+    :param timeout: Maximum number of seconds to wait. The wait also stops at
+        the deadline of any enclosing :func:`wait_for`.
+    :param delay: Seconds to sleep after the first attempt.
+    :param backoff: Factor the delay is multiplied by after each attempt, use
+        ``1`` to poll at a fixed interval.
+    :param max_delay: Upper bound of the delay between attempts.
+    :param jitter: Fraction of each delay randomly added or removed.
+    :param exceptions: Exception types raised by ``condition`` which mean
+        "not ready yet". The last one is chained on the timeout error message.
+    :param name: Name used on logs and metrics, defaults to the condition
+        name.
+    :returns: The truthy value returned by ``condition``.
+    :raises robottelo.wait.WaitTimeoutError: If ``condition`` is not met in
+        time.
+
+    """
+    name = name or getattr(condition, '__name__', repr(condition))
+    start = time.time()
+    deadline = start + timeout
+    outer_deadline = current_deadline()
+    if outer_deadline is not None:
+        deadline = min(deadline, outer_deadline)
+    if not hasattr(_deadlines, 'stack'):
+        _deadlines.stack = []
+    _deadlines.stack.append(deadline)
+    attempts = 0
+    last_error = None
+    delays = backoff_delays(delay, backoff, max_delay, jitter)
+    try:
+        while True:
+            attempts += 1
+            try:
+                result = condition()
+            except exceptions as err:
+                result = None
+                last_error = err
+            if result:
+                _record(name, time.time() - start, attempts, False)
+                return result
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            time.sleep(min(next(delays), remaining))
+    finally:
+        _deadlines.stack.pop()
+    waited = time.time() - start
+    _record(name, waited, attempts, True)
+    LOGGER.debug(
+        'Gave up waiting for %s after %.1fs and %s attempts',
+        name, waited, attempts
+    )
+    message = u'Timed out waiting for {0} after {1:.1f}s'.format(name, waited)
+    if last_error is not None:
+        message = u'{0}: {1}'.format(message, last_error)
+    raise WaitTimeoutError(message)
@@ -0,0 +1,57 @@
+"""Benchmark the bucketed statistics of ``robottelo.performance.stat``.
+
+Compare the vectorized :func:`robottelo.performance.stat.bucket_stats` with a
+loop computing the statistics of one bucket at a time::
+
+    python scripts/benchmark_stat.py --samples 1000000 --bucket-size 1000
+
+"""
+from __future__ import print_function
+import argparse
+import numpy
+import timeit
+
+from robottelo.performance.stat import bucket_stats
+
+
+def per_bucket_stats(values, bucket_size):
+    """Compute the statistics one bucket and one numpy call at a time."""
+    stats = []
+    for start in range(0, len(values), bucket_size):
+        bucket = values[start:start + bucket_size]
+        stats.append([
+            numpy.amin(bucket),
+            numpy.median(bucket),
+            numpy.mean(bucket),
+            numpy.amax(bucket),
+            numpy.std(bucket),
+            numpy.percentile(bucket, 90),
+            numpy.percentile(bucket, 95),
+            numpy.percentile(bucket, 99),
+        ])
+    return stats
+
+
+def main():
+    """Run the benchmark and print the timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--samples', type=int, default=1000000)
+    parser.add_argument('--bucket-size', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    values = numpy.random.exponential(0.5, args.samples)
+    print('{0} samples, buckets of {1}'.format(
+        args.samples, args.bucket_size))
+    for name, function in (
+            ('per bucket', per_bucket_stats), ('vectorized', bucket_stats)):
+        best = min(timeit.repeat(
+            lambda: function(values, args.bucket_size),
+            number=1,
+            repeat=args.repeat,
+        ))
+        print('{0:>12}: {1:.3f}s'.format(name, best))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""Compare performance runs and flag the regressions.
+
+Each run is given as a comma separated list of its outputs: raw csv files,
+timing store directories or directories holding them. The first run is the
+baseline::
+
+    scripts/compare_perf_runs.py old/perf-runs new/perf-runs \\
+        --names 6.2.1,6.2.2 --json verdict.json --html report.html
+
+The markdown summary is printed and the exit status is 1 when a regression
+is flagged.
+
+"""
+from __future__ import print_function
+import argparse
+import json
+import sys
+
+from robottelo.performance.compare import (
+    DEFAULT_ALPHA,
+    DEFAULT_ITERATIONS,
+    DEFAULT_THRESHOLD,
+    compare_runs,
+    load_run,
+    render_html,
+    render_markdown,
+)
+
+
+def main():
+    """Parse the arguments, compare the runs and write the reports."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        'runs', nargs='+', metavar='RUN',
+        help='comma separated outputs of a run, the first run is the baseline')
+    parser.add_argument(
+        '--names', help='comma separated names of the runs')
+    parser.add_argument(
+        '--threshold', type=float, default=DEFAULT_THRESHOLD,
+        help='relative slowdown flagged as regression (default: %(default)s)')
+    parser.add_argument(
+        '--alpha', type=float, default=DEFAULT_ALPHA,
+        help='significance level (default: %(default)s)')
+    parser.add_argument(
+        '--iterations', type=int, default=DEFAULT_ITERATIONS,
+        help='bootstrap resamples (default: %(default)s)')
+    parser.add_argument('--json', help='write the verdict to this file')
+    parser.add_argument('--markdown', help='write the summary to this file')
+    parser.add_argument('--html', help='write the HTML summary to this file')
+    args = parser.parse_args()
+
+    if len(args.runs) < 2:
+        parser.error('at least two runs are needed')
+    names = args.names.split(',') if args.names else args.runs
+    if len(names) != len(args.runs):
+        parser.error('one name per run is needed')
+    runs = [load_run(run.split(',')) for run in args.runs]
+    report = compare_runs(
+        runs, names, args.threshold, args.alpha, args.iterations)
+
+    markdown = render_markdown(report)
+    print(markdown)
+    if args.json:
+        with open(args.json, 'w') as handler:
+            json.dump(report, handler, indent=2, sort_keys=True)
+    if args.markdown:
+        with open(args.markdown, 'w') as handler:
+            handler.write(markdown)
+    if args.html:
+        with open(args.html, 'w') as handler:
+            handler.write(render_html(report))
+    return 1 if report['verdict'] == 'fail' else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+"""Render again the raw charts of saved performance runs.
+
+Each argument is a timing store run or a directory holding runs, e.g.
+``perf-runs``::
+
+    scripts/regenerate_perf_charts.py perf-runs
+
+"""
+from __future__ import print_function
+import argparse
+
+from robottelo.performance.graph import ChartRenderer, regenerate_charts
+
+
+def main():
+    """Parse the arguments and render the charts."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('paths', nargs='+', metavar='PATH')
+    parser.add_argument(
+        '--processes', type=int, help='rendering processes (default: CPUs)')
+    args = parser.parse_args()
+
+    renderer = ChartRenderer(args.processes)
+    filenames = []
+    for path in args.paths:
+        filenames.extend(regenerate_charts(path, renderer))
+    errors = renderer.wait()
+    for filename in filenames:
+        print(filename)
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -20,8 +20,7 @@ import random
 from fauxfactory import gen_integer, gen_string, gen_utf8
 from nailgun import entities
 from requests.exceptions import HTTPError
-from robottelo.api.utils import enable_rhrepo_and_fetchid, promote
-from robottelo import manifests
+from robottelo.api.utils import promote
 from robottelo.constants import (
     FAKE_0_PUPPET_REPO,
     PRDS,
@@ -41,6 +40,7 @@ from robottelo.decorators import (
     tier2,
     tier3,
 )
+from robottelo.fixture_pool import session_pool
 from robottelo.helpers import get_data_file
 from robottelo.test import APITestCase
 
@@ -1003,28 +1003,31 @@ class ContentViewDeleteTestCase(APITestCase):
 class ContentViewRedHatContent(APITestCase):
     """Tests for publishing and promoting content views."""
 
+    rh_repo_options = {
+        u'product': PRDS['rhel'],
+        u'repository-set': REPOSET['rhst7'],
+        u'repository': REPOS['rhst7']['name'],
+    }
+
     @classmethod
     @skip_if_not_set('fake_manifest')
     def setUpClass(cls):  # noqa
         """Set up organization, product and repositories for tests."""
         super(ContentViewRedHatContent, cls).setUpClass()
 
-        cls.org = entities.Organization().create()
-        with manifests.clone() as manifest:
-            entities.Subscription().upload(
-                data={'organization_id': cls.org.id},
-                files={'content': manifest.content},
-            )
-        repo_id = enable_rhrepo_and_fetchid(
-            basearch='x86_64',
-            org_id=cls.org.id,
-            product=PRDS['rhel'],
-            repo=REPOS['rhst7']['name'],
-            reposet=REPOSET['rhst7'],
-            releasever=None,
-        )
-        cls.repo = entities.Repository(id=repo_id)
-        cls.repo.sync()
+        # The tests publish content views on the organization, so it is
+        # leased exclusively and given back to the pool afterwards
+        cls.rh_repo = session_pool().acquire(
+            'rh_repo', cls.rh_repo_options, exclusive=True)
+        cls.org = entities.Organization(
+            id=int(cls.rh_repo['organization-id']))
+        cls.repo = entities.Repository(id=int(cls.rh_repo['repository-id']))
+
+    @classmethod
+    def tearDownClass(cls):
+        """Give the organization back to the fixture pool."""
+        session_pool().release('rh_repo', cls.rh_repo, cls.rh_repo_options)
+        super(ContentViewRedHatContent, cls).tearDownClass()
 
     @tier2
     def test_positive_add_rh(self):
@@ -29,6 +29,7 @@ from robottelo.cli.factory import (
     make_host_collection,
     make_lifecycle_environment,
     make_org,
+    make_prerequisite,
     setup_org_for_a_custom_repo,
     setup_org_for_a_rh_repo,
 )
@@ -59,7 +60,7 @@ class ActivationKeyTestCase(CLITestCase):
     def setUpClass(cls):
         """Tests for activation keys via Hammer CLI"""
         super(ActivationKeyTestCase, cls).setUpClass()
-        cls.org = make_org()
+        cls.org = make_prerequisite(make_org)
 
     @staticmethod
     def get_default_env():
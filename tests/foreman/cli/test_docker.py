@@ -27,6 +27,7 @@ from robottelo.cli.factory import (
     make_content_view,
     make_lifecycle_environment,
     make_org,
+    make_prerequisite,
     make_product_wait,  # workaround for BZ 1332650
     make_registry,
     make_repository,
@@ -135,7 +136,7 @@ class DockerRepositoryTestCase(CLITestCase):
     def setUpClass(cls):
         """Create an organization and product which can be re-used in tests."""
         super(DockerRepositoryTestCase, cls).setUpClass()
-        cls.org_id = make_org()['id']
+        cls.org_id = make_prerequisite(make_org)['id']
 
     @tier1
     @run_only_on('sat')
@@ -355,7 +356,7 @@ class DockerContentViewTestCase(CLITestCase):
     def setUpClass(cls):
         """Create an organization which can be re-used in tests."""
         super(DockerContentViewTestCase, cls).setUpClass()
-        cls.org_id = make_org()['id']
+        cls.org_id = make_prerequisite(make_org)['id']
 
     def _create_and_associate_repo_with_cv(self):
         """Create a Docker-based repository and content view and associate
@@ -1131,7 +1132,7 @@ class DockerClientTestCase(CLITestCase):
     def setUpClass(cls):
         """Create an organization and product which can be re-used in tests."""
         super(DockerClientTestCase, cls).setUpClass()
-        cls.org = make_org()
+        cls.org = make_prerequisite(make_org)
 
     @run_only_on('sat')
     @tier3
@@ -1274,7 +1275,7 @@ class DockerComputeResourceTestCase(CLITestCase):
     def setUpClass(cls):
         """Create an organization and product which can be re-used in tests."""
         super(DockerComputeResourceTestCase, cls).setUpClass()
-        cls.org = make_org()
+        cls.org = make_prerequisite(make_org)
 
     @tier3
     @run_only_on('sat')
@@ -15,10 +15,13 @@
 @Upstream: No
 """
 from robottelo import ssh
+from robottelo.config import settings
 from robottelo.performance.constants import (
     RAW_DEL_FILE_NAME,
     STAT_DEL_FILE_NAME,
 )
+from robottelo.performance.load import CandlepinDeleteWorkload
+from robottelo.performance.sweep import concurrency_steps
 from robottelo.test import ConcurrentTestCase
 
 
@@ -137,3 +140,34 @@ class ConcurrentDeleteTestCase(ConcurrentTestCase):
 
         """
         self.kick_off_del_test(self.num_threads[5])
+
+    def test_delete_sweep(self):
+        """Delete subscriptions by a rising number of threads, until the
+        server saturates
+
+        @id: 0151bcee-4db2-4b84-b6af-7378d5bc076e
+
+        @Steps:
+
+        1. get list of all registered systems' uuid
+        2. raise the number of concurrent threads step by step,
+           the uuids are shared out so that all the steps can run
+        3. stop at the throughput plateau or latency blow-up
+
+        @Assert: The maximum sustainable concurrency is found
+
+        """
+        uuid_list = self._get_registered_uuids()
+        max_concurrency = max(self.num_threads)
+        levels = concurrency_steps(
+            max_concurrency,
+            mode=settings.performance.sweep_mode,
+            step=settings.performance.sweep_step,
+        )
+        sweep = self.kick_off_sweep(
+            CandlepinDeleteWorkload(uuid_list),
+            'delete',
+            max_concurrency,
+            iterations=max(len(uuid_list) // sum(levels), 1),
+        )
+        self.assertIsNotNone(sweep.max_sustainable)
@@ -25,6 +25,7 @@ from robottelo.performance.constants import (
     RAW_AK_FILE_NAME,
     STAT_AK_FILE_NAME,
 )
+from robottelo.performance.load import CandlepinRegisterAKWorkload
 from robottelo.test import ConcurrentTestCase
 
 
@@ -193,3 +194,28 @@ class ConcurrentSubActivationKeyTestCase(ConcurrentTestCase):
 
         """
         self.kick_off_ak_test(self.num_threads[5], 5000)
+
+    def test_subscribe_ak_sweep(self):
+        """Subscribe system concurrently by a rising number of virtual
+        machines, until the server saturates
+
+        @id: f4481e4d-19ee-4dd8-b8af-3a75e1a96bba
+
+        @Steps:
+
+        1. create activation key (setup)
+        2. get subscription id (setup)
+        3. add activation key to subscription (setup)
+        4. raise the number of concurrent clients step by step
+        5. stop at the throughput plateau or latency blow-up
+
+        @Assert: The maximum sustainable concurrency is found
+
+        """
+        sweep = self.kick_off_sweep(
+            CandlepinRegisterAKWorkload(
+                self.ak_name, self.default_org, self.vm_list),
+            'register_ak',
+            len(self.vm_list),
+        )
+        self.assertIsNotNone(sweep.max_sustainable)
@@ -21,6 +21,7 @@ from robottelo.performance.constants import (
     STAT_ATT_FILE_NAME,
     STAT_REG_FILE_NAME,
 )
+from robottelo.performance.load import CandlepinAttachWorkload
 from robottelo.test import ConcurrentTestCase
 
 
@@ -132,3 +133,26 @@ class ConcurrentSubAttachTestCase(ConcurrentTestCase):
 
         """
         self.kick_off_att_test(self.num_threads[5], 5000)
+
+    def test_register_attach_sweep(self):
+        """Subscribe system concurrently by a rising number of virtual
+        machines, until the server saturates
+
+        @id: dccb3316-6edb-4998-8ad7-fd1ef692f591
+
+        @Steps:
+
+        1. raise the number of concurrent clients step by step
+        2. stop at the throughput plateau or latency blow-up
+
+        @Assert: The maximum sustainable concurrency is found
+
+        """
+        sweep = self.kick_off_sweep(
+            CandlepinAttachWorkload(
+                self.sub_id, self.default_org, self.environment,
+                self.vm_list),
+            'register_attach',
+            len(self.vm_list),
+        )
+        self.assertIsNotNone(sweep.max_sustainable)
@@ -24,9 +24,10 @@ from robottelo.performance.constants import (
     STAT_SYNC_FILE_NAME
 )
 from robottelo.performance.graph import (
-    generate_line_chart_raw_pulp,
     generate_line_chart_stat_pulp,
+    render_raw_chart_from_store,
 )
+from robottelo.performance.load import PulpSyncWorkload
 from robottelo.performance.pulp import Pulp
 from robottelo.performance.stat import generate_stat_for_pulp_sync
 from robottelo.test import ConcurrentTestCase
@@ -122,7 +123,6 @@ class ConcurrentSyncTestCase(ConcurrentTestCase):
             self.logger.debug(
                 'Kick off {0}-repo test case:'.format(current_num_threads)
             )
-            total_max_timing[current_num_threads] = []
 
             # if resync test, sequentially sync all repos for first time
             if not self.is_initial_sync:
@@ -153,12 +153,9 @@ class ConcurrentSyncTestCase(ConcurrentTestCase):
                 'raw-sync-{0}-clients'.format(current_num_threads)
             )
 
-            # get max for each iteration
-            for iteration in range(self.sync_iterations):
-                total_max_timing[current_num_threads].append(max([
-                    subtest_dict.get('thread-{0}'.format(thread))[iteration]
-                    for thread in range(current_num_threads)
-                ]))
+            # get max for each iteration, failed syncs have no timing
+            total_max_timing[current_num_threads] = list(
+                self.iteration_max_timings)
 
         self.logger.debug(
             'Total Results for all tests from 2 threads to 10 threads: {0}'
@@ -172,29 +169,42 @@ class ConcurrentSyncTestCase(ConcurrentTestCase):
             time_result_dict,
             current_num_threads,
             test_case_name):
-        """Write csv and chart for raw data of Pulp Test sync/resync"""
+        """Write csv and chart for raw data of Pulp Test sync/resync
+
+        The timings are saved on a timing store, as the Candlepin ones, see
+        ``robottelo.test.ConcurrentTestCase._store_raw_timings``, and the
+        chart is rendered from it in the background.
+
+        """
         self.logger.debug(
             'Timing result is: {0}'.format(time_result_dict)
         )
 
-        with open(raw_file_name, 'a') as handler:
-            writer = csv.writer(handler)
-            writer.writerow([test_case_name])
-
-            # for each thread, write its head and data
-            for i in range(len(time_result_dict)):
-                writer.writerow(time_result_dict.get('thread-{0}'.format(i)))
-            writer.writerow([])
-
-        # generate line chart of raw data
         test_category = self._get_output_filename(raw_file_name)
-        generate_line_chart_raw_pulp(
+        chart = {
+            'kind': 'line_pulp',
+            'head': 'Pulp Synchronization Raw Timings Line Chart - '
+                    '({0}-{1}-clients)'
+                    .format(test_category, current_num_threads),
+            'filename': '{0}-{1}-clients-raw-data-line-chart.svg'
+                        .format(test_category, current_num_threads),
+        }
+        store = self._store_raw_timings(
+            test_category,
             time_result_dict,
-            'Pulp Synchronization Raw Timings Line Chart - '
-            '({0}-{1}-clients)'
-            .format(test_category, current_num_threads),
-            '{0}-{1}-clients-raw-data-line-chart.svg'
-            .format(test_category, current_num_threads)
+            current_num_threads,
+            test_case_name,
+            [chart],
+        )
+        store.export_csv(raw_file_name, title=test_case_name)
+
+        # generate line chart of raw data from the saved timings
+        self.chart_renderer.submit(
+            render_raw_chart_from_store,
+            store.path,
+            chart['kind'],
+            chart['head'],
+            chart['filename'],
         )
 
     def _write_stat_pulp_concurrent(self, total_max_timing):
@@ -208,6 +218,10 @@ class ConcurrentSyncTestCase(ConcurrentTestCase):
         stat_dict = {}
         for test in range(2, len(total_max_timing) + 2):
             time_list = total_max_timing.get(test)
+            if not time_list:
+                self._write_all_failed(
+                    self.stat_file_name, 'test-{0}-threads'.format(test))
+                continue
             stat_tuple = generate_stat_for_pulp_sync(
                 test,
                 time_list,
@@ -216,7 +230,8 @@ class ConcurrentSyncTestCase(ConcurrentTestCase):
             # insert each returned tuple of statistics into stat_dict
             stat_dict.update({test: stat_tuple})
 
-        generate_line_chart_stat_pulp(
+        self.chart_renderer.submit(
+            generate_line_chart_stat_pulp,
             stat_dict,
             'Satellite 6 Pulp Concurrent Sync Test',
             'perf-statistics-concurrent-sync.svg',
@@ -237,12 +252,16 @@ class ConcurrentSyncTestCase(ConcurrentTestCase):
 
         @Assert: Target repositories are enabled
         """
+        self._start_run()
         time_result_dict_sync = Pulp.repositories_sequential_sync(
             self.repo_names_list,
             self.map_repo_name_id,
             self.sync_iterations,
-            self.savepoint
+            self.savepoint,
+            self.operation_timestamps,
         )
+        # no thread to join, mark the end of the run
+        self._join_all_threads([])
         self._write_raw_csv_chart_pulp(
             self.raw_file_name,
             time_result_dict_sync,
@@ -261,6 +280,10 @@ class ConcurrentSyncTestCase(ConcurrentTestCase):
         stat_dict = {}
         for i in range(len(time_result_dict)):
             time_list = time_result_dict.get('thread-{0}'.format(i))
+            if not time_list:
+                self._write_all_failed(
+                    self.stat_file_name, 'test-{0}-threads'.format(i))
+                continue
             stat_tuple = generate_stat_for_pulp_sync(
                 i,
                 time_list,
@@ -268,9 +291,38 @@ class ConcurrentSyncTestCase(ConcurrentTestCase):
             )
             stat_dict.update({i: stat_tuple})
 
-        generate_line_chart_stat_pulp(
+        self.chart_renderer.submit(
+            generate_line_chart_stat_pulp,
             stat_dict,
             'Satellite 6 Pulp Sequential Sync Test',
             'perf-statistics-sequential-sync.svg',
             len(self.repo_names_list)
         )
+
+    def test_synchronization_sweep(self):
+        """Synchronize a rising number of repositories concurrently, until
+        the server saturates
+
+        @id: 96da8139-da90-46be-bc02-97a8e1b10fb5
+
+        @Steps:
+
+        1. raise the number of concurrent syncs step by step,
+           each thread repeating its syncs sync_count times
+        2. stop at the throughput plateau or latency blow-up
+
+        @Assert: The maximum sustainable concurrency is found
+
+        """
+        repositories = dict(
+            (name, self.map_repo_name_id[name])
+            for name in self.repo_names_list
+            if name in self.map_repo_name_id
+        )
+        sweep = self.kick_off_sweep(
+            PulpSyncWorkload(repositories),
+            'sync',
+            len(repositories),
+            iterations=self.sync_iterations,
+        )
+        self.assertIsNotNone(sweep.max_sustainable)
@@ -15,14 +15,14 @@
 @Upstream: No
 """
 
-import time
-
 from fauxfactory import gen_string
 from nailgun import entities
 from robottelo import manifests
 from robottelo.api.utils import upload_manifest
 from robottelo.constants import DEFAULT_SUBSCRIPTION_NAME
 from robottelo.decorators import run_in_one_thread, skip_if_not_set
+from robottelo.log import LogWatcher
+from robottelo.performance.serverlog import PRODUCTION_LINE
 from robottelo.test import UITestCase
 from robottelo.ui.locators import locators
 from robottelo.ui.navigator import Navigator
@@ -30,6 +30,10 @@ from robottelo.ui.session import Session
 from robottelo.vm import VirtualMachine
 
 
+#: Log of the Foreman requests, watched for the unregister request
+FOREMAN_LOG = '/var/log/foreman/production.log'
+
+
 @run_in_one_thread
 class RHAITestCase(UITestCase):
 
@@ -152,12 +156,23 @@ class RHAITestCase(UITestCase):
                     )
 
                     # Confirm selection for clicking on 'Yes' to unregister the
-                    # system
-                    session.nav.click(
-                        locators['insights.unregister_button']
-                    )
-                    self.browser.refresh()
-                    time.sleep(60)
+                    # system, and wait for the server to complete the request
+                    with LogWatcher(FOREMAN_LOG) as watcher:
+                        session.nav.click(
+                            locators['insights.unregister_button']
+                        )
+                        self.browser.refresh()
+                        started = watcher.wait_for(
+                            r'Started DELETE "/redhat_access/', timeout=60)
+                        request_id = PRODUCTION_LINE.match(
+                            started.text).group('request_id')
+                        self.assertIsNotNone(
+                            request_id, 'The server log has no request ids')
+                        # other requests complete meanwhile, only the line
+                        # with the same request id is the DELETE one
+                        completed = r'\b{0}\b.*\bCompleted \d{{3}} '.format(
+                            request_id)
+                        watcher.wait_for(completed, timeout=60)
                     self.browser.refresh()
 
                 result = vm.run('redhat-access-insights')
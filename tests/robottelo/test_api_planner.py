@@ -0,0 +1,89 @@
+"""Unit tests for :mod:`robottelo.api.planner`."""
+import six
+
+from nailgun import entities
+from nailgun.config import ServerConfig
+from robottelo.api.planner import EntityPlan, EntityPlanError, HOST_FIXTURE
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+def fake_create(entity):
+    """Return the entity instead of creating it on the server."""
+    return entity
+
+
+class EntityPlanTestCase(TestCase):
+    """Tests for :class:`robottelo.api.planner.EntityPlan`."""
+
+    def setUp(self):
+        self.server_config = ServerConfig('http://example.com')
+        self.domain_include = {'Domain': ('location', 'organization')}
+
+    def test_host_levels(self):
+        """Prerequisites are created before the entities depending on them"""
+        plan = EntityPlan(
+            'Host', include=HOST_FIXTURE, server_config=self.server_config)
+        position = dict(
+            (name, index)
+            for index, level in enumerate(plan.levels)
+            for name in level
+        )
+        self.assertEqual(plan.levels[0], ['Organization'])
+        self.assertEqual(plan.levels[-1], ['Host'])
+        self.assertEqual(set(position), set((
+            'Architecture', 'Domain', 'Environment', 'Host', 'HostGroup',
+            'Location', 'Media', 'OperatingSystem', 'Organization',
+            'PartitionTable', 'Subnet',
+        )))
+        self.assertLess(position['Location'], position['Domain'])
+        self.assertLess(position['HostGroup'], position['Host'])
+
+    def test_given_values_not_followed(self):
+        """Relations given a value are not planned"""
+        plan = EntityPlan(
+            'Domain',
+            include=self.domain_include,
+            values={'Domain': {'location': [1]}},
+            server_config=self.server_config,
+        )
+        self.assertEqual(plan.levels, [['Organization'], ['Domain']])
+
+    def test_unknown_entity(self):
+        """Planning an unknown entity raises ``EntityPlanError``"""
+        with self.assertRaises(EntityPlanError):
+            EntityPlan('Unknown', server_config=self.server_config)
+
+    @mock.patch.object(entities.Domain, 'create', fake_create)
+    @mock.patch.object(entities.Location, 'create', fake_create)
+    @mock.patch.object(entities.Organization, 'create', fake_create)
+    def test_build(self):
+        """Created entities are linked to their prerequisites"""
+        graph = EntityPlan(
+            'Domain',
+            include=self.domain_include,
+            values={'Organization': {'name': 'foo'}},
+            server_config=self.server_config,
+        ).build()
+        self.assertEqual(graph['Organization'].name, 'foo')
+        self.assertIs(graph['Location'].organization[0],
+                      graph['Organization'])
+        self.assertIs(graph['Domain'].location[0], graph['Location'])
+        self.assertIs(graph['Domain'].organization[0], graph['Organization'])
+
+    @mock.patch.object(entities.Domain, 'create')
+    @mock.patch.object(entities.Location, 'create', side_effect=ValueError)
+    @mock.patch.object(entities.Organization, 'create', fake_create)
+    def test_build_failure(self, location_create, domain_create):
+        """A failed prerequisite stops the build"""
+        with self.assertRaises(EntityPlanError):
+            EntityPlan(
+                'Domain',
+                include=self.domain_include,
+                server_config=self.server_config,
+            ).build()
+        domain_create.assert_not_called()
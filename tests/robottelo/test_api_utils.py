@@ -1,7 +1,14 @@
 """Unit tests for :mod:`robottelo.api.utils`."""
+import six
+
 from robottelo.api import utils
 from unittest2 import TestCase
 
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
 
 class UtilsTestCase(TestCase):
     """Tests for the functions in :mod:`robottelo.api.utils`."""
@@ -19,3 +26,47 @@ class UtilsTestCase(TestCase):
             utils.one_to_many_names('person'),
             {'person', 'person_ids', 'people'},
         )
+
+
+class EnableRHReposTestCase(TestCase):
+    """Tests for :func:`robottelo.api.utils.enable_rhrepos_and_fetch_ids`."""
+
+    @mock.patch('robottelo.api.utils.entities')
+    def test_bulk_enable(self, entities):
+        """Products and reposets are looked up once, repositories are
+        enabled with their payload and resolved with a single search.
+        """
+        reposets = {}
+
+        def reposet(name, product):
+            """Return one repository set mock per name."""
+            return mock.Mock(**{
+                'search.return_value': [reposets.setdefault(name, mock.Mock())]
+            })
+
+        entities.RepositorySet.side_effect = reposet
+        repos = []
+        for index, name in enumerate(('other', 'rhel7', 'tools', 'rhel6')):
+            repo = mock.Mock(id=index)
+            # ``name`` is a special ``Mock`` argument, set it afterwards
+            repo.name = name
+            repos.append(repo)
+        entities.Repository.return_value.search.return_value = repos
+        specs = [
+            {'basearch': 'x86_64', 'product': 'RHEL', 'releasever': '7Server',
+             'repo': 'rhel7', 'reposet': 'RHEL 7'},
+            {'basearch': 'x86_64', 'product': 'RHEL', 'releasever': None,
+             'repo': 'tools', 'reposet': 'Tools'},
+            {'basearch': 'x86_64', 'product': 'RHEL', 'releasever': '6Server',
+             'repo': 'rhel6', 'reposet': 'RHEL 6'},
+        ]
+        self.assertEqual(
+            utils.enable_rhrepos_and_fetch_ids(1, specs), [1, 2, 3])
+        self.assertEqual(entities.Product.call_count, 1)
+        self.assertEqual(entities.RepositorySet.call_count, 3)
+        self.assertEqual(
+            entities.Repository.return_value.search.call_count, 1)
+        reposets['Tools'].enable.assert_called_once_with(
+            data={'basearch': 'x86_64'})
+        reposets['RHEL 7'].enable.assert_called_once_with(
+            data={'basearch': 'x86_64', 'releasever': '7Server'})
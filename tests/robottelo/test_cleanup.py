@@ -0,0 +1,96 @@
+"""Tests for module ``robottelo.cleanup``."""
+import six
+
+from nailgun import entities
+from nailgun.config import ServerConfig
+from robottelo import cleanup
+from robottelo.cleanup import EntitiesCleaner
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class EntitiesCleanerTestCase(TestCase):
+    """Tests for :class:`robottelo.cleanup.EntitiesCleaner`."""
+
+    def setUp(self):
+        self.server_config = ServerConfig('http://example.com')
+        self.cleaner = EntitiesCleaner()
+        for patcher in (
+                mock.patch(
+                    'nailgun.entity_mixins.DEFAULT_SERVER_CONFIG',
+                    self.server_config
+                ),
+                mock.patch.object(
+                    cleanup, 'wait_for', lambda func, **kwargs: func()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def make_org(self, org_id):
+        """Return an organization entity queued for cleanup."""
+        org = entities.Organization(self.server_config, id=org_id)
+        self.cleaner.cleanup_queue['Organization'].appendleft(org)
+        return org
+
+    def make_host(self, org_id):
+        """Return a host entity belonging to organization ``org_id``."""
+        return entities.Host(
+            self.server_config,
+            id=org_id * 100,
+            organization=entities.Organization(self.server_config, id=org_id),
+        )
+
+    @mock.patch.object(entities.ForemanTask, 'search')
+    @mock.patch.object(entities.Host, 'search')
+    @mock.patch.object(entities.Organization, 'delete', autospec=True)
+    def test_delete_orgs(self, org_delete, host_search, task_search):
+        """Orgs with hosts are skipped without stopping the others, a single
+        host search is done and asynchronous deletions are waited together.
+        """
+        for org_id in (1, 2, 3, 4):
+            self.make_org(org_id)
+        host_search.return_value = [self.make_host(2), self.make_host(2)]
+        org_delete.side_effect = lambda org, **kwargs: {
+            u'id': u'task-{0}'.format(org.id), u'pending': True}
+        task_search.return_value = [
+            entities.ForemanTask(
+                self.server_config,
+                id=u'task-{0}'.format(org_id),
+                state=u'stopped',
+                result=u'error' if org_id == 4 else u'success',
+            )
+            for org_id in (1, 3, 4)
+        ]
+        report = self.cleaner.clean()
+        self.assertEqual(host_search.call_count, 1)
+        self.assertEqual(task_search.call_count, 1)
+        self.assertEqual(org_delete.call_count, 3)
+        self.assertEqual(sorted(report.cleaned['Organization']), [1, 3])
+        self.assertEqual(list(report.skipped['Organization']), [2])
+        self.assertEqual(list(report.failed['Organization']), [4])
+        self.assertEqual(
+            self.cleaner.deleted_entities['Organization'], set([1, 3]))
+        self.assertIn(u'2 cleaned, 1 failed, 1 skipped', str(report))
+
+    @mock.patch.object(entities.Host, 'search', return_value=[])
+    @mock.patch.object(entities.Organization, 'delete', autospec=True)
+    def test_delete_errors_reported(self, org_delete, host_search):
+        """A failed deletion is reported and the others are deleted"""
+        def delete(org, **kwargs):
+            """Fail deleting organization 1."""
+            if org.id == 1:
+                raise ValueError('boom')
+
+        org_delete.side_effect = delete
+        self.make_org(1)
+        self.make_org(2)
+        report = self.cleaner.clean()
+        self.assertEqual(report.failed['Organization'], {1: u'boom'})
+        self.assertEqual(list(report.cleaned['Organization']), [2])
+        self.cleaner.clean()
+        # Already deleted entities are not deleted again
+        self.assertEqual(org_delete.call_count, 3)
@@ -1,7 +1,9 @@
 import six
+import threading
 import unittest2
 
-from robottelo.cli.base import Base
+from robottelo.cli.base import Base, CLIError
+from robottelo.cli.task import Task
 
 if six.PY2:
     import mock
@@ -67,3 +69,96 @@ class BaseCliTestCase(unittest2.TestCase):
         self.assertEqual(new_class.foreman_admin_username, 'auser')
         self.assertEqual(new_class.foreman_admin_password, 'apass')
         self.assertIn(Base, new_class.__bases__)
+
+    @mock.patch('robottelo.cli.base.Base.execute')
+    def test_execute_async(self, execute):
+        """``_execute_async`` adds the async flag and returns the task ID"""
+        execute.return_value = [{'id': 'a-task-uuid'}]
+        Base.command_base = 'basecommand'
+        Base.command_sub = 'subcommand'
+        options = {u'id': 1}
+        self.assertEqual(Base._execute_async(options), 'a-task-uuid')
+        self.assertIn(u'--async', execute.call_args[0][0])
+        self.assertNotIn(u'async', options)
+
+    @mock.patch('robottelo.cli.base.Base.execute')
+    def test_execute_async_no_task(self, execute):
+        """``_execute_async`` raises ``CLIError`` if no task is returned"""
+        execute.return_value = []
+        with self.assertRaises(CLIError):
+            Base._execute_async({u'id': 1})
+
+
+class TaskTestCase(unittest2.TestCase):
+    """Tests for the Task cli class"""
+
+    @mock.patch('robottelo.cli.task.time')
+    @mock.patch('robottelo.cli.task.Task.list')
+    def test_wait_for_tasks(self, task_list, task_time):
+        """All tasks are polled together until each one is finished"""
+        task_time.time.return_value = 0
+        task_list.side_effect = [
+            [
+                {'id': 'a', 'state': 'running', 'result': 'pending'},
+                {'id': 'b', 'state': 'stopped', 'result': 'success',
+                 'started-at': '2016/08/29 12:00:00',
+                 'ended-at': '2016/08/29 12:00:30'},
+            ],
+            [{'id': 'a', 'state': 'stopped', 'result': 'error'}],
+        ]
+        outcomes = Task.wait_for_tasks(['a', 'b'])
+        self.assertEqual(task_list.call_count, 2)
+        searches = [call[0][0]['search'] for call in task_list.call_args_list]
+        self.assertEqual(searches, [u'id ^ (a,b)', u'id ^ (a)'])
+        self.assertTrue(outcomes['b'].succeeded)
+        self.assertEqual(outcomes['b'].duration, 30)
+        self.assertFalse(outcomes['a'].succeeded)
+        self.assertEqual(outcomes['a'].result, 'error')
+
+    @mock.patch('robottelo.cli.task.time')
+    @mock.patch('robottelo.cli.task.Task.list')
+    def test_wait_for_tasks_backoff(self, task_list, task_time):
+        """Poll interval grows while no task finishes"""
+        task_time.time.return_value = 0
+        task_list.side_effect = [
+            [{'id': 'a', 'state': 'running'}],
+            [{'id': 'a', 'state': 'running'}],
+            [{'id': 'a', 'state': 'running'}],
+            [{'id': 'a', 'state': 'stopped', 'result': 'success'}],
+        ]
+        Task.wait_for_tasks(['a'], poll_interval=2, backoff=2)
+        self.assertEqual(
+            [call[0][0] for call in task_time.sleep.call_args_list],
+            [2, 4, 8]
+        )
+
+    @mock.patch('robottelo.cli.task.time')
+    @mock.patch('robottelo.cli.task.Task.list')
+    def test_wait_for_tasks_timeout(self, task_list, task_time):
+        """Tasks not finished before the timeout are flagged"""
+        task_time.time.side_effect = [0, 10]
+        task_list.return_value = [{'id': 'a', 'state': 'running'}]
+        outcomes = Task.wait_for_tasks(['a'], timeout=5)
+        self.assertTrue(outcomes['a'].timed_out)
+        self.assertEqual(outcomes['a'].state, 'running')
+
+
+class ThreadLocalCommandTestCase(unittest2.TestCase):
+    """Tests for the per thread CLI class attributes"""
+
+    def test_command_sub_per_thread(self):
+        """``command_sub`` assigned by a thread is not seen by the others"""
+        Base.command_sub = u'main'
+        seen = []
+
+        def assign():
+            """Assign a different command_sub on another thread."""
+            seen.append(Base.command_sub)
+            Base.command_sub = u'other'
+            seen.append(Base.command_sub)
+
+        thread = threading.Thread(target=assign)
+        thread.start()
+        thread.join()
+        self.assertEqual(seen, [None, u'other'])
+        self.assertEqual(Base.command_sub, u'main')
@@ -0,0 +1,143 @@
+"""Tests for module ``robottelo.cli.factory``."""
+import six
+
+from collections import defaultdict
+from robottelo.cli import factory
+from robottelo.cli.factory import (
+    CLIFactoryError,
+    make_many,
+    make_org,
+    make_prerequisite,
+)
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+def make_foo(options=None):
+    """Return the given options as the created entity."""
+    return options
+
+
+class MakeManyTestCase(TestCase):
+    """Tests for :func:`robottelo.cli.factory.make_many`."""
+
+    def test_unique_names(self):
+        """Every created entity gets a different name"""
+        result = make_many(
+            make_foo, 20, lambda index: {u'organization-id': 1})
+        names = [entity[u'name'] for entity in result.succeeded]
+        self.assertEqual(len(set(names)), 20)
+        self.assertTrue(all(
+            entity[u'organization-id'] == 1 for entity in result.succeeded))
+
+    def test_given_names(self):
+        """Names returned by ``options_fn`` are kept"""
+        result = make_many(
+            make_foo, 3, lambda index: {u'login': u'user{0}'.format(index)},
+            name_key=u'login'
+        )
+        self.assertEqual(
+            [entity[u'login'] for entity in result.succeeded],
+            [u'user0', u'user1', u'user2']
+        )
+
+    def test_duplicated_names(self):
+        """Duplicated names are refused before creating anything"""
+        with self.assertRaises(CLIFactoryError):
+            make_many(make_foo, 2, lambda index: {u'name': u'same'})
+
+
+class MakePrerequisiteTestCase(TestCase):
+    """Tests for :func:`robottelo.cli.factory.make_prerequisite`."""
+
+    def setUp(self):
+        self.api_org = mock.Mock(return_value={u'id': u'1'})
+        patchers = (
+            mock.patch.dict(
+                factory.API_PREREQUISITES,
+                {'make_org': (self.api_org, {u'name': 'name'})}
+            ),
+            mock.patch.object(
+                factory, 'PREREQUISITE_TIMES', defaultdict(list)),
+            mock.patch.object(factory, 'settings'),
+        )
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.settings = factory.settings
+
+    def test_api_channel(self):
+        """Prerequisites are created through the API when enabled"""
+        self.settings.api_factory_prerequisites = True
+        org = make_prerequisite(make_org, {u'name': u'foo'})
+        self.assertEqual(org, {u'id': u'1'})
+        self.api_org.assert_called_once_with({'name': u'foo'})
+        self.assertEqual(
+            list(factory.PREREQUISITE_TIMES), [(__name__, u'api')])
+        self.assertIn(__name__, factory.prerequisites_report())
+
+    @mock.patch('robottelo.cli.factory.make_org')
+    def test_cli_channel(self, cli_make_org):
+        """Prerequisites are created through hammer when disabled"""
+        cli_make_org.__name__ = 'make_org'
+        self.settings.api_factory_prerequisites = False
+        make_prerequisite(cli_make_org, {u'name': u'foo'})
+        cli_make_org.assert_called_once_with({u'name': u'foo'})
+        self.api_org.assert_not_called()
+        self.assertEqual(
+            list(factory.PREREQUISITE_TIMES), [(__name__, u'cli')])
+
+    @mock.patch('robottelo.cli.factory.make_org')
+    def test_unsupported_options(self, cli_make_org):
+        """Options the API creator does not know fall back to hammer"""
+        cli_make_org.__name__ = 'make_org'
+        self.settings.api_factory_prerequisites = True
+        make_prerequisite(cli_make_org, {u'media-ids': u'1'})
+        cli_make_org.assert_called_once_with({u'media-ids': u'1'})
+        self.api_org.assert_not_called()
+
+
+class APIPrerequisitesTestCase(TestCase):
+    """Tests for the API creators of
+    :data:`robottelo.cli.factory.API_PREREQUISITES`.
+    """
+
+    @mock.patch('robottelo.cli.factory.entities')
+    def test_lifecycle_environment(self, entities):
+        """Lifecycle environments are shaped as ``hammer info`` output,
+        from the create response only
+        """
+        entities.LifecycleEnvironment.return_value.create_json.return_value = {
+            u'description': None,
+            u'id': 3,
+            u'label': u'dev',
+            u'name': u'dev',
+            u'organization': {u'id': 1, u'name': u'org'},
+            u'prior': {u'id': 2, u'name': u'Library'},
+        }
+        lce = factory._api_lifecycle_environment({u'organization': 1})
+        self.assertEqual(lce[u'prior-lifecycle-environment'], u'Library')
+        self.assertEqual(lce[u'organization'], u'org')
+        self.assertEqual(lce[u'id'], u'3')
+        entities.LifecycleEnvironment.return_value.read.assert_not_called()
+
+    @mock.patch('robottelo.cli.factory.entities')
+    def test_org(self, entities):
+        """Organizations are shaped as ``hammer info`` output, from the
+        create response only
+        """
+        entities.Organization.return_value.create_json.return_value = {
+            u'description': None,
+            u'id': 1,
+            u'label': u'org',
+            u'name': u'org',
+            u'title': u'org',
+        }
+        org = factory._api_org({u'name': u'org'})
+        self.assertEqual(org[u'id'], u'1')
+        self.assertEqual(org[u'title'], u'org')
+        entities.Organization.return_value.create.assert_not_called()
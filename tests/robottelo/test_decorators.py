@@ -1,5 +1,7 @@
 """Unit tests for :mod:`robottelo.decorators`."""
 import six
+import threading
+import time
 
 from fauxfactory import gen_integer
 from robottelo import decorators
@@ -151,13 +153,16 @@ class BzBugIsOpenTestCase(TestCase):
 class CacheableTestCase(TestCase):
     """Tests for :func:`robottelo.decorators.cacheable`."""
     def setUp(self):
-        self.object_cache_patcher = mock.patch.dict(
-            'robottelo.decorators.OBJECT_CACHE')
+        self.object_cache_patcher = mock.patch(
+            'robottelo.decorators.OBJECT_CACHE', decorators.ObjectCache())
         self.object_cache = self.object_cache_patcher.start()
+        self.counter = []
 
         def make_foo(options):
-            return {'id': 42}
+            self.counter.append(options)
+            return {'id': len(self.counter)}
 
+        self.raw_make_foo = make_foo
         self.make_foo = decorators.cacheable(make_foo)
 
     def tearDown(self):
@@ -166,21 +171,97 @@ class CacheableTestCase(TestCase):
     def test_build_cache(self):
         """Create a new object and add it to the cache."""
         obj = self.make_foo(cached=True)
-        self.assertEqual(decorators.OBJECT_CACHE, {'foo': {'id': 42}})
-        self.assertEqual(id(decorators.OBJECT_CACHE['foo']), id(obj))
+        self.assertIn(('foo', ()), decorators.OBJECT_CACHE)
+        self.assertEqual(id(self.make_foo(cached=True)), id(obj))
+        self.assertEqual(len(self.counter), 1)
 
     def test_return_from_cache(self):
         """Return an already cached object."""
         cache_obj = {'id': 42}
-        decorators.OBJECT_CACHE['foo'] = cache_obj
+        decorators.OBJECT_CACHE.set(('foo', ()), cache_obj)
         obj = self.make_foo(cached=True)
         self.assertEqual(id(cache_obj), id(obj))
 
     def test_create_and_not_add_to_cache(self):
         """Create a new object and not add it to the cache."""
         self.make_foo(cached=False)
-        self.assertNotIn('foo', decorators.OBJECT_CACHE)
-        self.assertEqual(decorators.OBJECT_CACHE, {})
+        self.assertEqual(len(decorators.OBJECT_CACHE), 0)
+
+    def test_keyed_on_options(self):
+        """Different options get different objects, same options in any
+        order and with unset values get the same object.
+        """
+        first = self.make_foo({'name': 'a', 'org-id': 1}, cached=True)
+        second = self.make_foo({'name': 'b', 'org-id': 1}, cached=True)
+        third = self.make_foo(
+            {'org-id': '1', 'name': 'a', 'label': None}, cached=True)
+        self.assertNotEqual(first, second)
+        self.assertEqual(id(first), id(third))
+
+    def test_validate(self):
+        """Stale cached objects are created again."""
+        make_foo = decorators.cacheable(
+            self.raw_make_foo, validate=lambda obj: obj['id'] > 1)
+        first = make_foo(cached=True)
+        second = make_foo(cached=True)
+        self.assertNotEqual(first, second)
+        self.assertEqual(id(make_foo(cached=True)), id(second))
+        self.assertEqual(decorators.OBJECT_CACHE.stats()['stale'], 1)
+
+
+class ObjectCacheTestCase(TestCase):
+    """Tests for :class:`robottelo.decorators.ObjectCache`."""
+
+    def test_lru_eviction(self):
+        """The least recently used object is evicted when full."""
+        cache = decorators.ObjectCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get_or_create('a', lambda: None)
+        cache.set('c', 3)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    @mock.patch('robottelo.decorators.time')
+    def test_ttl_expiration(self, dec_time):
+        """Objects older than the TTL are created again."""
+        cache = decorators.ObjectCache(ttl=10)
+        dec_time.time.return_value = 0
+        cache.set('a', 1)
+        dec_time.time.return_value = 11
+        self.assertEqual(cache.get_or_create('a', lambda: 2), 2)
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_no_duplicates_on_concurrent_creation(self):
+        """Concurrent callers of the same key create a single object."""
+        cache = decorators.ObjectCache()
+        created = []
+
+        def create():
+            created.append(1)
+            time.sleep(0.1)
+            return len(created)
+
+        threads = [
+            threading.Thread(target=cache.get_or_create, args=('a', create))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(created), 1)
+        self.assertEqual(cache.stats()['hits'], 4)
+
+    def test_key_locks_released(self):
+        """The creation lock of a key is dropped once no caller uses it."""
+        cache = decorators.ObjectCache(max_size=2)
+        for key in range(10):
+            cache.get_or_create(
+                key, lambda: cache.get_or_create('nested', lambda: 1))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache._key_locks, {})
 
 
 class RmBugIsOpenTestCase(TestCase):
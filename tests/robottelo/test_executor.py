@@ -0,0 +1,105 @@
+"""Tests for module ``robottelo.executor``."""
+import threading
+
+from robottelo.executor import Recipe, RecipeError, run_bulk
+from unittest2 import TestCase
+
+
+class RecipeTestCase(TestCase):
+    """Tests for :class:`robottelo.executor.Recipe`."""
+
+    def test_results_passed_to_dependents(self):
+        """Each step receives the results of the steps it requires"""
+        recipe = Recipe('test')
+        recipe.add('org', lambda: {'id': 1})
+        recipe.add_value('name', 'foo')
+        recipe.add(
+            'product',
+            lambda org, name: {'org': org['id'], 'name': name},
+            requires=('org', 'name')
+        )
+        results = recipe.run()
+        self.assertEqual(results['product'], {'org': 1, 'name': 'foo'})
+        self.assertEqual(
+            set(recipe.timings), set(['org', 'name', 'product']))
+
+    def test_independent_steps_run_concurrently(self):
+        """Steps without dependencies between them run at the same time"""
+        barrier = threading.Event()
+        recipe = Recipe('test', max_workers=2)
+
+        def first():
+            """Wait for the second step, fail if it never runs."""
+            if not barrier.wait(5):
+                raise AssertionError('second step not run concurrently')
+
+        recipe.add('first', first)
+        recipe.add('second', barrier.set)
+        recipe.run()
+        self.assertTrue(barrier.is_set())
+
+    def test_dependencies_order(self):
+        """A step only starts after all its requirements finished"""
+        order = []
+        recipe = Recipe('test')
+        recipe.add('a', lambda: order.append('a'))
+        recipe.add('b', lambda a: order.append('b'), requires=('a',))
+        recipe.add('c', lambda a, b: order.append('c'), requires=('a', 'b'))
+        recipe.run()
+        self.assertEqual(order, ['a', 'b', 'c'])
+
+    def test_failure_skips_dependents(self):
+        """A failed step is reported and its dependents are not run"""
+        def fail():
+            """Always fail."""
+            raise ValueError('boom')
+
+        called = []
+        recipe = Recipe('test')
+        recipe.add('fail', fail)
+        recipe.add('after', lambda fail: called.append(1), requires=('fail',))
+        with self.assertRaises(RecipeError) as context:
+            recipe.run()
+        self.assertEqual(called, [])
+        self.assertIsInstance(context.exception.failures['fail'], ValueError)
+        self.assertEqual(context.exception.skipped, ['after'])
+        self.assertIn('boom', str(context.exception))
+
+    def test_unknown_requirement(self):
+        """Requiring an undefined step raises ``ValueError``"""
+        recipe = Recipe('test')
+        with self.assertRaises(ValueError):
+            recipe.add('a', lambda b: None, requires=('b',))
+
+    def test_duplicated_step(self):
+        """Defining a step twice raises ``ValueError``"""
+        recipe = Recipe('test')
+        recipe.add('a', lambda: None)
+        with self.assertRaises(ValueError):
+            recipe.add('a', lambda: None)
+
+
+class RunBulkTestCase(TestCase):
+    """Tests for :func:`robottelo.executor.run_bulk`."""
+
+    def test_partial_success(self):
+        """Failed items are reported without stopping the others"""
+        def func(item):
+            """Fail on odd items."""
+            if item % 2:
+                raise ValueError(item)
+            return item * 10
+
+        result = run_bulk(func, list(range(6)), max_workers=3)
+        self.assertEqual(result.succeeded, [0, 20, 40])
+        self.assertEqual(sorted(result.errors), [1, 3, 5])
+        self.assertEqual(len(result.latencies), 6)
+        self.assertGreater(result.throughput, 0)
+        self.assertEqual(
+            sorted(result.latency_percentiles), [50, 90, 95, 99])
+
+    def test_empty(self):
+        """No items produce an empty result"""
+        result = run_bulk(lambda item: item, [])
+        self.assertEqual(result.succeeded, [])
+        self.assertEqual(result.latency_percentiles, {})
@@ -0,0 +1,104 @@
+"""Tests for module ``robottelo.fixture_pool``."""
+import shutil
+import six
+import tempfile
+
+from robottelo import fixture_pool
+from robottelo.fixture_pool import FixturePool, FixturePoolError
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class FixturePoolTestCase(TestCase):
+    """Tests for :class:`robottelo.fixture_pool.FixturePool`."""
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.built = []
+        self.deleted = []
+
+        def build(options):
+            self.built.append(options)
+            return {u'organization-id': len(self.built)}
+
+        builders_patcher = mock.patch.dict(
+            fixture_pool.FIXTURE_BUILDERS,
+            {'fake': (build, self.deleted.append)}
+        )
+        builders_patcher.start()
+        self.addCleanup(builders_patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_shared_lease_builds_once(self):
+        """Shared leases from different workers get the same entity."""
+        first = FixturePool(self.path, holder='gw0').acquire('fake')
+        second = FixturePool(self.path, holder='gw1').acquire('fake')
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.built), 1)
+
+    def test_exclusive_lease(self):
+        """An exclusively leased entity is not leased to other workers until
+        released.
+        """
+        pool = FixturePool(self.path, holder='gw0')
+        other = FixturePool(self.path, holder='gw1')
+        with pool.lease('fake', exclusive=True) as first:
+            second = other.acquire('fake')
+            self.assertNotEqual(first, second)
+        self.assertEqual(
+            FixturePool(self.path, holder='gw2').acquire(
+                'fake', exclusive=True),
+            first
+        )
+        self.assertEqual(len(self.built), 2)
+
+    def test_options_are_part_of_the_key(self):
+        """Entities built with different options are not shared."""
+        pool = FixturePool(self.path)
+        pool.acquire('fake', {u'product': 'foo'})
+        pool.acquire('fake', {u'product': 'bar'})
+        pool.acquire('fake', {u'product': 'foo'})
+        self.assertEqual(len(self.built), 2)
+
+    def test_teardown(self):
+        """Teardown deletes every recorded entity and empties the manifest."""
+        pool = FixturePool(self.path)
+        pool.acquire('fake', {u'product': 'foo'})
+        pool.acquire('fake', {u'product': 'bar'})
+        self.assertEqual(pool.teardown(), [])
+        self.assertEqual(len(self.deleted), 2)
+        pool.acquire('fake', {u'product': 'foo'})
+        self.assertEqual(len(self.built), 3)
+
+    def test_teardown_keeps_failures(self):
+        """Entities which could not be deleted stay on the manifest."""
+        pool = FixturePool(self.path)
+        pool.acquire('fake', {u'product': 'foo'})
+        pool.acquire('fake', {u'product': 'bar'})
+        with mock.patch.dict(
+                fixture_pool.FIXTURE_BUILDERS,
+                {'fake': (None, mock.Mock(side_effect=[None, ValueError]))}):
+            errors = pool.teardown()
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(pool.teardown(), [])
+        self.assertEqual(len(self.deleted), 1)
+
+    def test_unknown_kind(self):
+        """Asking for an unknown kind raises ``FixturePoolError``."""
+        with self.assertRaises(FixturePoolError):
+            FixturePool(self.path).acquire('unknown')
+
+    @mock.patch.object(fixture_pool, '_session_pool', None)
+    def test_session_pool(self):
+        """The session pool is created once and reads the pool directory."""
+        with mock.patch.dict(
+                'os.environ', {'ROBOTTELO_FIXTURE_POOL_DIR': self.path}):
+            pool = fixture_pool.session_pool()
+        self.assertEqual(pool.path, self.path)
+        self.assertIs(fixture_pool.session_pool(), pool)
@@ -0,0 +1,264 @@
+"""Tests for module ``robottelo.log``."""
+import os
+import shutil
+import six
+import tempfile
+import threading
+import zlib
+
+from robottelo.log import LogFile, LogLine, LogTail, LogWatcher
+from robottelo.wait import WaitTimeoutError
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class LogTailTestCase(TestCase):
+    """Tests for :class:`robottelo.log.LogTail`."""
+
+    def setUp(self):
+        self.content = b'first\n'
+        self.commands = []
+        patcher = mock.patch.object(LogTail, '_run', side_effect=self._run)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tail = LogTail('/var/log/app.log')
+
+    def _run(self, cmd):
+        """Run ``stat`` and ``tail | head`` on the fake remote content."""
+        self.commands.append(cmd)
+        if cmd.startswith('stat'):
+            return str(len(self.content)).encode('utf-8') + b'\n'
+        offset = int(cmd.split()[2].lstrip('+')) - 1
+        length = int(cmd.split()[-1])
+        return self.content[offset:offset + length]
+
+    def test_read_appended(self):
+        """Only the lines appended since the mark are read"""
+        self.assertEqual(self.tail.mark(), 6)
+        self.assertEqual(self.tail.read(), [])
+        self.content += b'second\nthird\n'
+        self.assertEqual(self.tail.read(), [u'second\n', u'third\n'])
+        self.assertEqual(self.commands[-1], 'tail -c +7 /var/log/app.log '
+                                            '| head -c 13')
+        self.assertEqual(self.tail.read(), [])
+
+    def test_partial_line(self):
+        """A line still being written is read once complete"""
+        self.tail.mark()
+        self.content += b'second\nthi'
+        self.assertEqual(self.tail.read(), [u'second\n'])
+        self.content += b'rd\n'
+        self.assertEqual(self.tail.read(), [u'third\n'])
+
+    def test_rotated(self):
+        """A rotated file is read from its beginning"""
+        self.tail.mark()
+        self.content = b'new\n'
+        self.assertEqual(self.tail.read(), [u'new\n'])
+
+
+class LogFileTestCase(TestCase):
+    """Tests for :class:`robottelo.log.LogFile`."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        patcher = mock.patch('robottelo.log.LOGS_DATA_DIR', self.tmpdir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch(
+            'robottelo.log._run_remote', side_effect=self._run_remote)
+        self.run_remote = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.content = (
+            b'2016-10-18 [I] Started\n'
+            b'2016-10-18 [E] ERROR first\n'
+            b'ERROR second\n'
+            b'no newline ERROR'
+        )
+        self.missing = False
+
+    def _run_remote(self, cmd, hostname=None, handler=None):
+        """Fake the remote commands on ``self.content``."""
+        if cmd.startswith('stat'):
+            if self.missing:
+                return 1, b''
+            return 0, str(len(self.content)).encode('utf-8')
+        if self.missing:
+            return 66, b''
+        offset = int(cmd.split('tail -c +')[1].split()[0]) - 1
+        content = self.content[offset:]
+        if cmd.endswith('gzip -c'):
+            compressor = zlib.compressobj(
+                9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            compressed = compressor.compress(content) + compressor.flush()
+            # received in many chunks
+            for index in range(0, len(compressed), 7):
+                handler(compressed[index:index + 7])
+            return 0, None
+        self.assertIn("grep -P -- '^ERROR'", cmd)
+        return 0, b''.join(
+            line + b'\n' for line in content.split(b'\n')
+            if line.startswith(b'ERROR')
+        )
+
+    def test_download(self):
+        """The log is downloaded compressed and filtered locally"""
+        log = LogFile('/var/log/app.log', r'ERROR \w+')
+        self.assertTrue(log.downloaded)
+        with open(os.path.join(self.tmpdir, 'app.log'), 'rb') as handler:
+            self.assertEqual(handler.read(), self.content)
+        self.assertEqual(len(log.data), 4)
+        self.assertEqual(
+            log.filter(),
+            [u'2016-10-18 [E] ERROR first\n', u'ERROR second\n'],
+        )
+        self.assertEqual(log.filter('^ERROR'), [u'ERROR second\n'])
+        self.assertEqual(log.filter(r'ERROR$'), [u'no newline ERROR'])
+        self.assertEqual(log.filter('absent'), [])
+
+    def test_missing(self):
+        """IOError is raised when the remote file can not be read"""
+        self.missing = True
+        with self.assertRaises(IOError):
+            LogFile('/var/log/app.log')
+        log = LogFile('/var/log/app.log', download=False)
+        with self.assertRaises(IOError):
+            log.filter('ERROR')
+        with self.assertRaises(IOError):
+            log.mark()
+
+    def test_remote_filter(self):
+        """Without download the log is filtered on the server"""
+        log = LogFile('/var/log/app.log', '^ERROR', download=False)
+        self.assertFalse(log.downloaded)
+        self.assertEqual(log.filter(), [u'ERROR second\n'])
+        self.assertEqual(self.run_remote.call_count, 1)
+
+    def test_bookmark(self):
+        """Only what was appended after the bookmark is read"""
+        log = LogFile('/var/log/app.log', download=False)
+        bookmark = log.mark()
+        self.assertEqual(bookmark, len(self.content))
+        self.content += b'\nERROR third\n'
+        self.assertEqual(log.filter('^ERROR'), [u'ERROR third\n'])
+        self.assertEqual(log.data, [u'\n', u'ERROR third\n'])
+        log = LogFile('/var/log/app.log', offset=bookmark)
+        self.assertEqual(log.filter('ERROR'), [u'ERROR third\n'])
+
+
+class FakeChannel(object):
+    """A ``paramiko.Channel`` receiving the given chunks."""
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.command = None
+        self.pty = False
+        self.closed = threading.Event()
+
+    def get_pty(self):
+        """Record the pty request."""
+        self.pty = True
+
+    def exec_command(self, command):
+        """Record the command."""
+        self.command = command
+
+    def recv(self, size):  # pylint:disable=W0613
+        """Return the next chunk, then block until closed."""
+        if self.chunks:
+            return self.chunks.pop(0)
+        self.closed.wait()
+        return b''
+
+    def close(self):
+        """Unblock :meth:`recv`."""
+        self.closed.set()
+
+
+class LogWatcherTestCase(TestCase):
+    """Tests for :class:`robottelo.log.LogWatcher`."""
+
+    def watch(self, chunks, **kwargs):
+        """Start a watcher of two files receiving ``chunks``."""
+        self.channel = FakeChannel(chunks)
+        patcher = mock.patch('robottelo.log.ssh.get_shared_connection')
+        get_connection = patcher.start()
+        self.addCleanup(patcher.stop)
+        transport = get_connection.return_value.get_transport.return_value
+        transport.open_session.return_value = self.channel
+        watcher = LogWatcher(['/var/log/a.log', '/var/log/b.log'], **kwargs)
+        watcher.start()
+        self.addCleanup(watcher.stop)
+        return watcher
+
+    def test_lines(self):
+        """Lines are split on chunk boundaries and know their file"""
+        watcher = self.watch([
+            b'==> /var/log/a.log <==\nfirst li',
+            b'ne\nsecond line\n\n==> /var/log/b.log <==\nthird\n',
+        ], parser=len)
+        self.assertEqual(
+            self.channel.command,
+            'tail -v -n 0 -F /var/log/a.log /var/log/b.log',
+        )
+        self.assertTrue(self.channel.pty)
+        lines = [watcher.get(5) for _ in range(3)]
+        self.assertEqual(
+            [(line.path, line.text, line.parsed) for line in lines],
+            [
+                ('/var/log/a.log', u'first line', 10),
+                ('/var/log/a.log', u'second line', 11),
+                ('/var/log/b.log', u'third', 5),
+            ],
+        )
+        self.assertIsNone(watcher.get(0.01))
+
+    def test_wait_for(self):
+        """Waiting consumes the lines up to the matching one"""
+        watcher = self.watch([
+            b'==> /var/log/a.log <==\nCompleted 200 OK\n',
+            b'==> /var/log/b.log <==\nCompleted 500 Error\nafter\n',
+        ])
+        line = watcher.wait_for('Completed', path='/var/log/b.log')
+        self.assertEqual(line.text, u'Completed 500 Error')
+        self.assertEqual(watcher.get(5).text, u'after')
+        with self.assertRaises(WaitTimeoutError):
+            watcher.wait_for('never', timeout=0.05)
+
+    def test_closed(self):
+        """Waiting on a closed watcher raises IOError"""
+        watcher = self.watch([b'line\n'])
+        self.channel.close()
+        with self.assertRaises(IOError):
+            watcher.wait_for('never', timeout=5)
+
+    def test_stop(self):
+        """Stopping closes the channel, hanging up the remote tail"""
+        watcher = self.watch([])
+        watcher.stop()
+        self.assertTrue(self.channel.closed.is_set())
+        self.assertTrue(watcher.closed)
+
+    def test_backpressure(self):
+        """A full buffer stops reading until there is room"""
+        watcher = self.watch(
+            [b'1\n2\n3\n', b'4\n'], buffer_size=2)
+        self.assertEqual(watcher.get(5).text, u'1')
+        self.assertEqual(
+            [watcher.get(5).text for _ in range(3)], [u'2', u'3', u'4'])
+        self.assertEqual(watcher.dropped, 0)
+
+    def test_drop_oldest(self):
+        """The oldest lines are dropped when asked to"""
+        watcher = LogWatcher('/var/log/a.log', buffer_size=2, drop_oldest=True)
+        for text in ('1', '2', '3', '4'):
+            watcher._put(LogLine('/var/log/a.log', text, 0))
+        self.assertEqual(watcher.dropped, 2)
+        self.assertEqual(watcher.get(0).text, u'3')
+        watcher.clear()
+        self.assertIsNone(watcher.get(0.01))
@@ -0,0 +1,125 @@
+"""Tests for module ``robottelo.performance.adaptive``."""
+import numpy
+import six
+
+from robottelo.performance.adaptive import (
+    AdaptiveSampler,
+    flag_outliers,
+    percentile_interval,
+    steady_state_start,
+)
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class SteadyStateTestCase(TestCase):
+    """Tests for :func:`robottelo.performance.adaptive.steady_state_start`."""
+
+    def test_warmup(self):
+        """Slow first timings are detected as warm-up"""
+        random = numpy.random.RandomState(0)
+        warmup = numpy.linspace(5, 1.2, 50)
+        samples = numpy.concatenate(
+            [warmup, 1 + random.normal(0, 0.05, 450)])
+        start = steady_state_start(samples.tolist())
+        self.assertEqual(start % 5, 0)
+        self.assertGreaterEqual(start, 40)
+        self.assertLessEqual(start, 70)
+
+    def test_stable(self):
+        """Stable series have no warm-up"""
+        samples = 1 + numpy.random.RandomState(0).normal(0, 0.05, 500)
+        self.assertLess(steady_state_start(samples.tolist()), 50)
+        self.assertEqual(steady_state_start([1, 2, 3]), 0)
+
+
+class PercentileIntervalTestCase(TestCase):
+    """Tests for :func:`robottelo.performance.adaptive.percentile_interval`.
+    """
+
+    def test_interval(self):
+        """The interval holds the percentile and narrows with samples"""
+        random = numpy.random.RandomState(0)
+        small = percentile_interval(random.lognormal(0, 0.5, 200), 95)
+        large = percentile_interval(random.lognormal(0, 0.5, 20000), 95)
+        for low, estimate, high in (small, large):
+            self.assertLessEqual(low, estimate)
+            self.assertLessEqual(estimate, high)
+        self.assertLess(large[2] - large[0], small[2] - small[0])
+        # true 95th percentile of the distribution
+        expected = numpy.exp(0.5 * 1.6449)
+        self.assertLess(large[0], expected)
+        self.assertGreater(large[2], expected)
+
+    def test_too_few(self):
+        """Too few samples give no interval"""
+        self.assertIsNone(percentile_interval([1, 2, 3], 99))
+        self.assertIsNone(percentile_interval([], 50))
+
+
+class OutliersTestCase(TestCase):
+    """Tests for :func:`robottelo.performance.adaptive.flag_outliers`."""
+
+    def test_outliers(self):
+        """Timings far from the median are flagged"""
+        samples = [1.0, 1.1, 0.9, 1.05, 0.95, 9.0, 1.0, 0.1]
+        self.assertEqual(flag_outliers(samples), [5, 7])
+        self.assertEqual(flag_outliers([1, 1, 1, 1, 5]), [4])
+        self.assertEqual(flag_outliers([1, 1, 1]), [])
+
+
+class AdaptiveSamplerTestCase(TestCase):
+    """Tests for :class:`robottelo.performance.adaptive.AdaptiveSampler`."""
+
+    def test_converges(self):
+        """Sampling stops once the interval is narrow enough"""
+        random = numpy.random.RandomState(0)
+        sampler = AdaptiveSampler(percentile=90, target_width=0.1)
+        batches = 0
+        while not sampler.done:
+            sampler.add(random.normal(1, 0.05, 50).tolist())
+            batches += 1
+        self.assertLess(batches, 20)
+        self.assertTrue(sampler.converged)
+        summary = sampler.summary()
+        self.assertTrue(summary['converged'])
+        self.assertEqual(summary['samples'], batches * 50)
+        self.assertLessEqual(summary['relative_width'], 0.1)
+        self.assertLess(summary['low'], summary['estimate'])
+
+    def test_noisy(self):
+        """Noisy timings run until the budget runs out"""
+        random = numpy.random.RandomState(0)
+        sampler = AdaptiveSampler(
+            percentile=99, target_width=0.01, max_samples=1000)
+        while not sampler.done:
+            sampler.add(random.lognormal(0, 1, 100).tolist())
+        self.assertFalse(sampler.converged)
+        self.assertTrue(sampler.exhausted)
+        self.assertEqual(len(sampler.samples), 1000)
+
+    def test_duration_budget(self):
+        """Sampling stops once the duration budget runs out"""
+        sampler = AdaptiveSampler(max_duration=60)
+        with mock.patch(
+                'robottelo.performance.adaptive.time.time') as time_mock:
+            time_mock.return_value = 1000
+            sampler.add([1, 2, 3])
+            self.assertFalse(sampler.done)
+            time_mock.return_value = 1060
+            self.assertTrue(sampler.done)
+
+    def test_warmup(self):
+        """Warm-up timings are left out of the interval"""
+        random = numpy.random.RandomState(0)
+        sampler = AdaptiveSampler(percentile=50)
+        sampler.add((numpy.linspace(10, 2, 40)).tolist())
+        sampler.add((1 + random.normal(0, 0.01, 400)).tolist())
+        self.assertGreaterEqual(sampler.warmup, 35)
+        self.assertAlmostEqual(sampler.interval()[1], 1, delta=0.01)
+        self.assertGreater(
+            numpy.median(sampler.samples), sampler.interval()[1])
@@ -0,0 +1,158 @@
+"""Tests for module ``robottelo.performance.compare``."""
+import json
+import numpy
+import os
+import shutil
+import tempfile
+
+from robottelo.performance.compare import (
+    bootstrap_change,
+    compare_runs,
+    compare_samples,
+    load_raw_csv,
+    load_run,
+    mann_whitney,
+    render_html,
+    render_markdown,
+)
+from robottelo.performance.store import TimingStore
+from unittest2 import TestCase
+
+
+class StatisticsTestCase(TestCase):
+    """Tests for the distribution tests."""
+
+    def setUp(self):
+        self.random = numpy.random.RandomState(1)
+
+    def test_mann_whitney(self):
+        """Known U statistic and p-values"""
+        u_statistic, p_value = mann_whitney([1, 2, 3], [4, 5, 6])
+        self.assertEqual(u_statistic, 0)
+        self.assertAlmostEqual(p_value, 0.0495, places=3)
+        self.assertAlmostEqual(mann_whitney([1, 1], [1, 1])[1], 1)
+
+    def test_bootstrap_change(self):
+        """The interval holds the change of the percentile"""
+        baseline = self.random.normal(1, 0.05, 500)
+        change, low, high = bootstrap_change(
+            baseline, baseline * 1.2, 50, iterations=200,
+            random_state=self.random)
+        self.assertAlmostEqual(change, 0.2)
+        self.assertLess(low, change)
+        self.assertGreater(high, change)
+        self.assertGreater(low, 0.1)
+
+    def test_verdicts(self):
+        """Regressions, improvements and unchanged timings are told apart"""
+        baseline = self.random.lognormal(0, 0.2, 300)
+        same = self.random.lognormal(0, 0.2, 300)
+        self.assertEqual(
+            compare_samples(baseline, baseline * 1.3)['verdict'],
+            'regression')
+        self.assertEqual(
+            compare_samples(baseline, baseline * 0.7)['verdict'],
+            'improvement')
+        self.assertEqual(compare_samples(baseline, same)['verdict'],
+                         'unchanged')
+        self.assertEqual(
+            compare_samples(baseline, baseline * 1.3, threshold=0.5)[
+                'verdict'],
+            'unchanged',
+        )
+        self.assertEqual(
+            compare_samples([1], baseline)['verdict'], 'insufficient data')
+
+
+class LoadTestCase(TestCase):
+    """Tests for loading runs from their outputs."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_raw_csv(self):
+        """Raw csv blocks are keyed by operation and clients"""
+        filename = os.path.join(self.tmpdir, 'perf-raw-activationKey.csv')
+        with open(filename, 'w') as handler:
+            handler.write(
+                'raw-ak-1-clients\r\n1.5,2.5\r\n\r\n'
+                'raw-ak-2-clients\r\n1,2\r\n3\r\n\r\n'
+            )
+        self.assertEqual(
+            dict((key, value.tolist())
+                 for key, value in load_raw_csv(filename).items()),
+            {('ak', 1): [1.5, 2.5], ('ak', 2): [1, 2, 3]},
+        )
+
+    def test_stores_directory(self):
+        """Timing stores of a directory are merged with the raw csvs"""
+        runs = os.path.join(self.tmpdir, 'perf-runs')
+        for index in range(2):
+            with TimingStore.create(
+                    os.path.join(runs, 'del-{0}'.format(index)),
+                    {'test_case': 'raw-del-4-clients'}) as store:
+                store.append_many([index, index + 0.5], thread=index)
+        with TimingStore.create(
+                os.path.join(runs, 'load'), {'num_threads': 3}) as store:
+            store.append(1, operation='sync')
+        with open(os.path.join(runs, 'perf-raw-attach.csv'), 'w') as handler:
+            handler.write('raw-att-2-clients\r\n7,8\r\n\r\n')
+        run = load_run([runs])
+        self.assertEqual(
+            sorted(run), [('att', 2), ('del', 4), ('sync', 3)])
+        self.assertEqual(sorted(run[('del', 4)]), [0, 0.5, 1, 1.5])
+
+
+class ReportTestCase(TestCase):
+    """Tests for :func:`robottelo.performance.compare.compare_runs`."""
+
+    def setUp(self):
+        random = numpy.random.RandomState(2)
+        ak_timings = random.lognormal(0, 0.2, 200)
+        del_timings = random.lognormal(0, 0.2, 200)
+        self.baseline = {('ak', 1): ak_timings, ('del', 1): del_timings}
+        self.candidate = {
+            ('ak', 1): ak_timings * 1.5,
+            ('del', 1): del_timings,
+            ('att', 1): del_timings,
+        }
+
+    def test_report(self):
+        """Regressions fail the verdict, missing keys are listed"""
+        report = compare_runs(
+            [self.baseline, self.candidate], ['old', 'new'], iterations=100)
+        self.assertEqual(report['verdict'], 'fail')
+        self.assertEqual(report['regressions'], 1)
+        verdicts = dict(
+            (comparison['operation'], comparison['verdict'])
+            for comparison in report['comparisons'])
+        self.assertEqual(verdicts, {'ak': 'regression', 'del': 'unchanged'})
+        self.assertEqual(report['missing'], [{
+            'candidate': 'new',
+            'concurrency': 1,
+            'missing_from': 'old',
+            'operation': 'att',
+        }])
+        json.dumps(report)
+
+    def test_pass(self):
+        """Runs without regression pass"""
+        report = compare_runs([self.baseline, self.baseline], iterations=100)
+        self.assertEqual(report['verdict'], 'pass')
+        with self.assertRaises(ValueError):
+            compare_runs([self.baseline])
+
+    def test_render(self):
+        """Markdown and HTML summaries have a row per comparison"""
+        report = compare_runs(
+            [self.baseline, self.candidate], ['old', 'new'], iterations=100)
+        markdown = render_markdown(report)
+        self.assertIn('FAIL', markdown.splitlines()[0])
+        self.assertEqual(markdown.count('| new | '), 2)
+        self.assertIn('att with 1 clients: missing from old', markdown)
+        html = render_html(report)
+        self.assertEqual(html.count('<tr style='), 2)
+        self.assertIn('regression', html)
@@ -0,0 +1,272 @@
+"""Tests for module ``robottelo.performance.distributed``."""
+import os
+import six
+import threading
+import time
+
+from robottelo.performance.distributed import (
+    AUTHKEY_ENV,
+    Agent,
+    Coordinator,
+    build_workload,
+    coordinator_interface,
+    main,
+    make_shards,
+    new_authkey,
+    start_local_agent,
+    start_remote_agent,
+)
+from robottelo.performance.metrics import LiveMetrics
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+#: Dotted path of the workload run by the test agents
+WORKLOAD = 'tests.robottelo.test_performance_distributed.EchoWorkload'
+
+
+class EchoWorkload(object):
+    """Return the operation index, or its item, after ``delay``, failing
+    the ``fail`` ones.
+    """
+    def __init__(self, items=(), delay=0, fail=()):
+        self.items = items
+        self.delay = delay
+        self.fail = fail
+
+    def __call__(self, index):
+        time.sleep(self.delay)
+        if index in self.fail:
+            raise ValueError(index)
+        return (self.items[index] if self.items else index) or 0.0
+
+
+class MakeShardsTestCase(TestCase):
+    """Tests for :func:`robottelo.performance.distributed.make_shards`."""
+
+    def test_split_list(self):
+        """Clients and items are shared out in proportion"""
+        shards = make_shards(
+            'register_ak', {'ak_name': 'ak', 'vm_ips': list('abcde')},
+            clients=5, iterations=3, agents=2, split='vm_ips')
+        self.assertEqual(
+            [(shard['first_client'], shard['clients']) for shard in shards],
+            [(0, 3), (3, 2)],
+        )
+        self.assertEqual(shards[0]['kwargs']['vm_ips'], ['a', 'b', 'c'])
+        self.assertEqual(shards[1]['kwargs']['vm_ips'], ['d', 'e'])
+        self.assertEqual(shards[1]['kwargs']['ak_name'], 'ak')
+        self.assertEqual(shards[1]['iterations'], 3)
+
+    def test_split_dict(self):
+        """Dictionaries are split on their sorted items"""
+        shards = make_shards(
+            'sync', {'repositories': {'b': 2, 'a': 1, 'c': 3}},
+            clients=3, iterations=1, agents=2, split='repositories')
+        self.assertEqual(
+            [shard['kwargs']['repositories'] for shard in shards],
+            [{'a': 1, 'b': 2}, {'c': 3}],
+        )
+
+    def test_more_agents(self):
+        """Agents without clients get no shard"""
+        shards = make_shards('delete', {}, clients=2, iterations=1, agents=4)
+        self.assertEqual(len(shards), 2)
+
+    def test_not_enough_items(self):
+        """Every client needs an item"""
+        with self.assertRaises(ValueError):
+            make_shards(
+                'delete', {'uuids': ['a']}, clients=2, iterations=1,
+                agents=1, split='uuids')
+
+    def test_not_enough_items_per_operation(self):
+        """Workloads addressing an item per operation need an item for
+        each iteration of each client
+        """
+        uuids = ['a', 'b', 'c', 'd']
+        shards = make_shards(
+            'delete', {'uuids': uuids}, clients=2, iterations=2,
+            agents=2, split='uuids')
+        self.assertEqual(
+            [shard['kwargs']['uuids'] for shard in shards],
+            [['a', 'b'], ['c', 'd']],
+        )
+        with self.assertRaises(ValueError):
+            make_shards(
+                'delete', {'uuids': uuids}, clients=2, iterations=3,
+                agents=2, split='uuids')
+        # the virtual machines are reused by the iterations
+        make_shards(
+            'register_ak', {'vm_ips': ['a', 'b']}, clients=2, iterations=3,
+            agents=1, split='vm_ips')
+
+
+class CoordinatorTestCase(TestCase):
+    """Tests for :class:`robottelo.performance.distributed.Coordinator`."""
+
+    def setUp(self):
+        self.authkey = new_authkey()
+        addresses = []
+        for _ in range(2):
+            agent = Agent('127.0.0.1', 0, self.authkey)
+            thread = threading.Thread(target=agent.serve)
+            thread.daemon = True
+            thread.start()
+            self.addCleanup(thread.join, 5)
+            addresses.append(agent.address)
+        self.metrics = LiveMetrics()
+        self.coordinator = Coordinator(
+            addresses, self.authkey, metrics=self.metrics, start_delay=0.1)
+        self.coordinator.connect()
+        self.addCleanup(self.coordinator.close)
+
+    def test_clock_offset(self):
+        """Agents on this host have no clock offset"""
+        for _, offset in self.coordinator.agents:
+            self.assertLess(abs(offset), 0.5)
+
+    def test_run(self):
+        """The timings of all the agents are merged by client"""
+        received = []
+        started = time.time()
+        records = self.coordinator.run(
+            make_shards(
+                WORKLOAD, {'delay': 0.01, 'fail': (1,)},
+                clients=3, iterations=2, agents=2),
+            callback=lambda name, record: received.append(name),
+        )
+        self.assertEqual(
+            sorted(records), ['thread-0', 'thread-1', 'thread-2'])
+        self.assertEqual(
+            [record.value for record in records['thread-0']], [0, None])
+        self.assertEqual(
+            [record.value for record in records['thread-1']], [2, 3])
+        self.assertEqual(
+            [record.value for record in records['thread-2']], [0, None])
+        self.assertFalse(records['thread-0'][1].success)
+        self.assertIn('ValueError', records['thread-0'][1].error)
+        self.assertEqual(sorted(set(received)), sorted(records))
+        self.assertEqual(len(received), 4)
+        for client_records in records.values():
+            for record in client_records:
+                self.assertGreaterEqual(record.started, started)
+                self.assertGreaterEqual(record.service_time, 0.01)
+        stats = self.metrics.snapshot()[WORKLOAD]
+        self.assertEqual(stats['count'], 6)
+        self.assertEqual(stats['errors'], 4)
+
+    def test_failed_workload(self):
+        """Workloads which can not be built fail the run"""
+        with self.assertRaises(RuntimeError):
+            self.coordinator.run(make_shards(
+                'tests.robottelo.test_performance_distributed.Missing', {},
+                clients=1, iterations=1, agents=2))
+
+    def test_too_many_shards(self):
+        """There can not be more shards than agents"""
+        with self.assertRaises(ValueError):
+            self.coordinator.start([{}, {}, {}])
+
+
+class BuildWorkloadTestCase(TestCase):
+    """Tests for :func:`robottelo.performance.distributed.build_workload`."""
+
+    def test_dotted_path(self):
+        """Workloads are imported by dotted path"""
+        workload = build_workload(WORKLOAD, {'items': [2.5]})
+        self.assertIsInstance(workload, EchoWorkload)
+        self.assertEqual(workload(0), 2.5)
+
+
+class AgentTestCase(TestCase):
+    """Tests for :class:`robottelo.performance.distributed.Agent`."""
+
+    def test_missing_authkey(self):
+        """Agents refuse to start without an authentication key"""
+        with self.assertRaises(ValueError):
+            Agent('127.0.0.1', 0)
+        with self.assertRaises(ValueError):
+            Agent('127.0.0.1', 0, '')
+
+    def test_main_missing_authkey(self):
+        """The agent command refuses to start without an authentication key
+        """
+        environ = dict(os.environ)
+        environ.pop(AUTHKEY_ENV, None)
+        with mock.patch.dict(os.environ, environ, clear=True):
+            with mock.patch('sys.argv', ['agent', '--port', '0']):
+                with mock.patch('sys.stderr'):
+                    with self.assertRaises(SystemExit):
+                        main()
+
+    @mock.patch('robottelo.performance.distributed.Agent')
+    def test_main_authkey_stdin(self, agent):
+        """The agent command can read the authentication key from its
+        standard input
+        """
+        agent.return_value.address = ('127.0.0.1', 1234)
+        argv = ['agent', '--port', '0', '--authkey-stdin']
+        with mock.patch('sys.argv', argv):
+            with mock.patch('sys.stdin', six.StringIO(u'secret\n')):
+                with mock.patch('sys.stdout'):
+                    main()
+        agent.assert_called_once_with(None, 0, u'secret')
+        agent.return_value.serve.assert_called_once_with()
+
+    @mock.patch('robottelo.performance.distributed.ssh.get_shared_connection')
+    def test_remote_authkey_on_stdin(self, get_connection):
+        """Remote agents get the authentication key on their standard
+        input, not on their command line
+        """
+        transport = get_connection.return_value.get_transport.return_value
+        channel = transport.open_session.return_value
+        channel.makefile.return_value.readline.return_value = (
+            b'Agent listening on 10.0.0.2:5000\n')
+        _, address = start_remote_agent('driver', 'secret', port=5000)
+        self.assertEqual(address, ('driver', 5000))
+        command = channel.exec_command.call_args[0][0]
+        self.assertNotIn('secret', command)
+        self.assertIn('--authkey-stdin', command)
+        channel.sendall.assert_called_once_with(b'secret\n')
+
+    def test_coordinator_interface(self):
+        """Agents started over SSH listen on the interface it reached"""
+        with mock.patch.dict(
+                os.environ, {'SSH_CONNECTION': '10.0.0.1 50000 10.0.0.2 22'}):
+            self.assertEqual(coordinator_interface(), '10.0.0.2')
+
+    def test_loopback_interface(self):
+        """Other agents listen on the loopback interface"""
+        environ = dict(os.environ)
+        environ.pop('SSH_CONNECTION', None)
+        with mock.patch.dict(os.environ, environ, clear=True):
+            self.assertEqual(coordinator_interface(), '127.0.0.1')
+            agent = Agent(port=0, authkey=new_authkey())
+        self.addCleanup(agent.listener.close)
+        self.assertEqual(agent.address[0], '127.0.0.1')
+
+
+class LocalAgentTestCase(TestCase):
+    """Tests for :func:`robottelo.performance.distributed.start_local_agent`.
+    """
+
+    def test_local_agent(self):
+        """Agents run as separate processes"""
+        authkey = new_authkey()
+        process, address = start_local_agent(
+            authkey,
+            cwd=os.path.dirname(os.path.dirname(os.path.dirname(
+                os.path.abspath(__file__)))),
+        )
+        self.addCleanup(process.stdout.close)
+        with Coordinator([address], authkey, start_delay=0) as coordinator:
+            records = coordinator.run(make_shards(
+                WORKLOAD, {'items': [1.5, 2.5]},
+                clients=1, iterations=2, agents=1))
+        self.assertEqual(
+            [record.value for record in records['thread-0']], [1.5, 2.5])
+        self.assertEqual(process.wait(), 0)
@@ -0,0 +1,103 @@
+"""Tests for module ``robottelo.performance.graph``."""
+import os
+import shutil
+import six
+import tempfile
+
+from robottelo.performance.store import TimingStore
+from unittest2 import TestCase, skipIf
+
+try:
+    from robottelo.performance import graph
+except ImportError:  # pygal does not support every interpreter
+    graph = None
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+@skipIf(graph is None, 'pygal is not importable')
+class MinMaxDecimateTestCase(TestCase):
+    """Tests for :func:`robottelo.performance.graph.min_max_decimate`."""
+
+    def test_short_series(self):
+        """Series shorter than the limit are kept"""
+        labels, series = graph.min_max_decimate(
+            {'thread-0': [1, 2, 3]}, max_points=10)
+        self.assertEqual(labels, ['1', '2', '3'])
+        self.assertEqual(series, {'thread-0': [1, 2, 3]})
+
+    def test_decimate(self):
+        """Each window keeps its min and max, in order"""
+        time_list = [5, 1, 9, 2, 3, 4, 8, 0, 7, 6]
+        labels, series = graph.min_max_decimate(
+            {'thread-0': time_list, 'thread-1': time_list[:3]},
+            max_points=4,
+        )
+        self.assertEqual(labels, ['1', '5', '6', '10'])
+        self.assertEqual(series['thread-0'], [1, 9, 8, 0])
+        self.assertEqual(series['thread-1'], [1, 9, None, None])
+
+    def test_spikes_kept(self):
+        """A single spike survives heavy downsampling"""
+        time_list = [1.0] * 10000
+        time_list[4321] = 50.0
+        _, series = graph.min_max_decimate({'thread-0': time_list})
+        self.assertLessEqual(len(series['thread-0']), graph.MAX_CHART_POINTS)
+        self.assertEqual(max(series['thread-0']), 50.0)
+
+
+@skipIf(graph is None, 'pygal is not importable')
+class RenderTestCase(TestCase):
+    """Tests for rendering the charts from saved runs."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'run')
+        chart = {
+            'kind': 'line_pulp',
+            'head': 'Raw',
+            'filename': os.path.join(self.tmpdir, 'raw.svg'),
+        }
+        with TimingStore.create(self.path, {'charts': [chart]}) as store:
+            store.append_many([1, 2, 3], thread=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_regenerate_charts(self):
+        """Charts recorded on the run metadata are rendered again"""
+        with mock.patch.dict(graph.RAW_CHARTS, {'line_pulp': mock.Mock()}):
+            filenames = graph.regenerate_charts(self.tmpdir)
+            render = graph.RAW_CHARTS['line_pulp']
+        self.assertEqual(filenames, [os.path.join(self.tmpdir, 'raw.svg')])
+        render.assert_called_once_with(
+            {'thread-0': [1, 2, 3]}, 'Raw', filenames[0])
+
+    def test_background_rendering(self):
+        """The renderer renders the svg on another process"""
+        renderer = graph.ChartRenderer(processes=1)
+        graph.regenerate_charts(self.path, renderer)
+        self.assertEqual(renderer.wait(), [])
+        self.assertTrue(os.path.exists(os.path.join(self.tmpdir, 'raw.svg')))
+
+    def test_started_pool(self):
+        """Charts are rendered by the processes started beforehand"""
+        renderer = graph.ChartRenderer(processes=1)
+        renderer.start()
+        pool = renderer._pool
+        graph.regenerate_charts(self.path, renderer)
+        self.assertIs(renderer._pool, pool)
+        self.assertEqual(renderer.wait(), [])
+
+    def test_render_errors(self):
+        """Rendering errors are returned by wait"""
+        renderer = graph.ChartRenderer(processes=1)
+        renderer.submit(
+            graph.render_raw_chart_from_store,
+            os.path.join(self.tmpdir, 'missing'), 'line_pulp', 'Raw', 'x.svg')
+        errors = renderer.wait()
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0][0], 'render_raw_chart_from_store')
@@ -0,0 +1,210 @@
+"""Tests for module ``robottelo.performance.histogram``."""
+import csv
+import json
+import numpy
+import os
+import shutil
+import six
+import tempfile
+import threading
+
+from robottelo.performance.histogram import (
+    LatencyHistogram,
+    LatencyRecorder,
+    merge_histograms,
+)
+from robottelo.performance.stat import (
+    generate_stat_for_concurrent_thread,
+    generate_stat_for_pulp_sync,
+)
+from robottelo.performance.thread import SubscribeAttachThread, SyncThread
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class LatencyHistogramTestCase(TestCase):
+    """Tests for :class:`robottelo.performance.histogram.LatencyHistogram`."""
+
+    def setUp(self):
+        self.values = numpy.random.RandomState(0).lognormal(0, 1, 20000)
+
+    def test_statistics(self):
+        """Percentiles are within the precision, moments are exact"""
+        histogram = LatencyHistogram(precision=0.01)
+        histogram.record_many(self.values)
+        self.assertEqual(histogram.count, len(self.values))
+        self.assertEqual(histogram.min, self.values.min())
+        self.assertEqual(histogram.max, self.values.max())
+        self.assertAlmostEqual(histogram.mean, numpy.mean(self.values))
+        self.assertAlmostEqual(histogram.std, numpy.std(self.values))
+        for quantile in (1, 50, 90, 95, 99, 99.9):
+            expected = numpy.percentile(self.values, quantile)
+            self.assertLess(
+                abs(histogram.percentile(quantile) - expected) / expected,
+                0.02,
+            )
+        self.assertEqual(histogram.percentile(0), histogram.min)
+        self.assertEqual(histogram.percentile(100), histogram.max)
+
+    def test_record_matches_record_many(self):
+        """Recording one by one or at once gives the same histogram"""
+        one_by_one = LatencyHistogram()
+        for value in self.values[:500]:
+            one_by_one.record(value)
+        at_once = LatencyHistogram()
+        at_once.record_many(self.values[:500])
+        self.assertTrue(numpy.array_equal(one_by_one.counts, at_once.counts))
+
+    def test_fixed_size(self):
+        """Out of range values are clamped, the size never changes"""
+        histogram = LatencyHistogram(lowest=0.001, highest=10)
+        size = len(histogram.counts)
+        histogram.record_many([0, 0.0001, 100, 1e6])
+        self.assertEqual(len(histogram.counts), size)
+        self.assertEqual(histogram.counts.sum(), 4)
+        self.assertEqual(histogram.max, 1e6)
+        self.assertEqual(histogram.min, 0)
+
+    def test_empty(self):
+        """An empty histogram has no statistics"""
+        histogram = LatencyHistogram()
+        self.assertIsNone(histogram.mean)
+        self.assertIsNone(histogram.std)
+        self.assertIsNone(histogram.median)
+
+    def test_merge(self):
+        """Merged histograms equal a histogram of all values"""
+        first, second = LatencyHistogram(), LatencyHistogram()
+        first.record_many(self.values[:100])
+        second.record_many(self.values[100:])
+        merged = merge_histograms([first, second])
+        whole = LatencyHistogram()
+        whole.record_many(self.values)
+        self.assertTrue(numpy.array_equal(merged.counts, whole.counts))
+        self.assertEqual(merged.count, whole.count)
+        self.assertEqual(first.count, 100)
+        with self.assertRaises(ValueError):
+            first.merge(LatencyHistogram(precision=0.05))
+
+    def test_serialization(self):
+        """Histograms go through JSON, e.g. from other processes"""
+        histogram = LatencyHistogram()
+        histogram.record_many(self.values)
+        copy = LatencyHistogram.from_dict(
+            json.loads(json.dumps(histogram.to_dict())))
+        self.assertTrue(numpy.array_equal(copy.counts, histogram.counts))
+        self.assertEqual(copy.percentile(99), histogram.percentile(99))
+
+
+class LatencyRecorderTestCase(TestCase):
+    """Tests for :class:`robottelo.performance.histogram.LatencyRecorder`."""
+
+    def test_threads(self):
+        """Each thread records its own bucketed series"""
+        recorder = LatencyRecorder(bucket_size=10)
+
+        def work():
+            for value in range(1, 26):
+                recorder.record(value)
+
+        threads = [
+            threading.Thread(target=work, name='thread-{0}'.format(i))
+            for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(recorder.keys(), [
+            'thread-0', 'thread-1', 'thread-2', 'thread-3'])
+        self.assertEqual(
+            [bucket.count for bucket in recorder.buckets('thread-0')],
+            [10, 10, 5],
+        )
+        self.assertEqual(
+            [bucket.count for bucket in recorder.merged_buckets()],
+            [40, 40, 20],
+        )
+        self.assertEqual(recorder.histogram().count, 100)
+        self.assertEqual(recorder.histogram('thread-1').max, 25)
+
+    def test_merge_serialized(self):
+        """Recorders of other processes can be merged"""
+        first, second = LatencyRecorder(2), LatencyRecorder(2)
+        for value in (1, 2, 3):
+            first.record(value, 'a')
+            second.record(value, 'a')
+        second.record(4, 'b')
+        first.merge(LatencyRecorder.from_dict(
+            json.loads(json.dumps(second.to_dict()))))
+        self.assertEqual(
+            [bucket.count for bucket in first.buckets('a')], [4, 2])
+        self.assertEqual(first.histogram('b').count, 1)
+
+    def test_thread_records(self):
+        """Performance threads record on the recorder when given one"""
+        recorder = LatencyRecorder()
+        thread = SyncThread(0, 'thread-0', {}, 1, 'repo', 0, recorder)
+        thread.record(1.5)
+        self.assertEqual(recorder.histogram('thread-0').max, 1.5)
+
+    def test_attach_thread_records(self):
+        """Register and attach threads wait for the start event and record
+        each step on its own recorder
+        """
+        register, attach = LatencyRecorder(), LatencyRecorder()
+        start_event = threading.Event()
+        thread = SubscribeAttachThread(
+            0, 'thread-0', {}, {}, {}, 2, 'sub', 'org', 'env', 'vm',
+            start_event, register, attach,
+        )
+        with mock.patch(
+                'robottelo.performance.thread.Candlepin.'
+                'single_register_attach',
+                return_value=(1.5, 2.5)) as register_attach:
+            thread.start()
+            thread.join(0.05)
+            self.assertFalse(register_attach.called)
+            start_event.set()
+            thread.join()
+        self.assertEqual(register.histogram('thread-0').count, 2)
+        self.assertEqual(attach.histogram('thread-0').max, 2.5)
+
+
+class StatTestCase(TestCase):
+    """Tests for the histogram support of ``robottelo.performance.stat``."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.stat_file = os.path.join(self.tmpdir, 'stat.csv')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_concurrent_thread_buckets(self):
+        """Bucket histograms are the stat buckets"""
+        recorder = LatencyRecorder(bucket_size=3)
+        for value in (1, 2, 3, 4, 5):
+            recorder.record(value, 'thread-0')
+        stat = generate_stat_for_concurrent_thread(
+            'client-0', recorder.buckets('thread-0'), self.stat_file, 3, 2)
+        self.assertEqual(sorted(stat), [0, 1])
+        self.assertEqual(stat[0][0], 1)
+        self.assertEqual(stat[1][2], 5)
+        with open(self.stat_file) as handler:
+            rows = list(csv.reader(handler))
+        self.assertEqual([row[0] for row in rows[3:]], ['1-3', '4-5'])
+
+    def test_pulp_sync(self):
+        """The pulp stat accepts a histogram"""
+        histogram = LatencyHistogram()
+        histogram.record_many([1, 2, 3])
+        sync_min, sync_median, sync_max, sync_std = (
+            generate_stat_for_pulp_sync(1, histogram, self.stat_file))
+        self.assertEqual((sync_min, sync_max), (1, 3))
+        self.assertAlmostEqual(sync_median, 2, delta=0.02)
+        self.assertAlmostEqual(sync_std, numpy.std([1, 2, 3]))
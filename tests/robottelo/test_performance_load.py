@@ -0,0 +1,198 @@
+"""Tests for module ``robottelo.performance.load``."""
+import six
+import threading
+import time
+
+from robottelo.performance import load
+from robottelo.performance.load import (
+    CandlepinAttachWorkload,
+    CandlepinDeleteWorkload,
+    CandlepinRegisterAKWorkload,
+    ConstantRate,
+    LoadGenerator,
+    PulpSyncWorkload,
+    RampRate,
+)
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class RateProfileTestCase(TestCase):
+    """Tests for the arrival rate profiles."""
+
+    def test_constant_rate(self):
+        """Arrivals are evenly spaced"""
+        self.assertEqual(
+            ConstantRate(rate=2, duration=2).offsets(), [0, 0.5, 1, 1.5])
+
+    def test_constant_rate_poisson(self):
+        """Poisson arrivals have the requested mean rate"""
+        offsets = ConstantRate(rate=100, duration=100, poisson=True).offsets()
+        self.assertTrue(all(0 <= offset < 100 for offset in offsets))
+        self.assertEqual(offsets, sorted(offsets))
+        self.assertAlmostEqual(len(offsets) / 10000.0, 1, delta=0.05)
+
+    def test_ramp_rate(self):
+        """Arrivals get closer as the rate increases"""
+        offsets = RampRate(start_rate=1, end_rate=9, duration=10).offsets()
+        self.assertEqual(len(offsets), 50)
+        gaps = [b - a for a, b in zip(offsets, offsets[1:])]
+        self.assertEqual(gaps, sorted(gaps, reverse=True))
+        self.assertAlmostEqual(offsets[1], 0.766, places=3)
+
+    def test_flat_ramp(self):
+        """A ramp with equal rates is a constant rate"""
+        self.assertEqual(
+            RampRate(2, 2, 2).offsets(), ConstantRate(2, 2).offsets())
+
+    def test_invalid_rates(self):
+        """Rates and durations must be positive"""
+        with self.assertRaises(ValueError):
+            ConstantRate(0, 10)
+        with self.assertRaises(ValueError):
+            RampRate(0, 0, 10)
+        with self.assertRaises(ValueError):
+            RampRate(1, 2, 0)
+
+
+class FixedProfile(object):
+    """Rate profile with fixed arrival offsets."""
+
+    def __init__(self, offsets):
+        self._offsets = offsets
+
+    def offsets(self):
+        """Return the fixed offsets."""
+        return list(self._offsets)
+
+
+class LoadGeneratorTestCase(TestCase):
+    """Tests for :class:`robottelo.performance.load.LoadGenerator`."""
+
+    def test_records_times(self):
+        """Every operation records its intended, start and end times"""
+        result = LoadGenerator(
+            lambda index: index * 10, FixedProfile([0, 0.01, 0.02])).run()
+        self.assertEqual(len(result.records), 3)
+        for index, record in enumerate(result.records):
+            self.assertEqual(record.index, index)
+            self.assertTrue(record.success)
+            self.assertEqual(record.value, index * 10)
+            self.assertAlmostEqual(
+                record.intended - result.start, index * 0.01, places=6)
+            self.assertLessEqual(record.intended, record.started)
+            self.assertLessEqual(record.started, record.completed)
+        self.assertEqual(len(result.latencies()), 3)
+        self.assertEqual(len(result.time_result_dict()['thread-0']), 3)
+
+    def test_open_loop(self):
+        """Operations are submitted without waiting for slow ones"""
+        running = []
+        lock = threading.Lock()
+        release = threading.Event()
+
+        def workload(index):
+            with lock:
+                running.append(index)
+            release.wait(5)
+
+        generator = LoadGenerator(
+            workload, FixedProfile([0, 0, 0, 0]), max_workers=4)
+        thread = threading.Thread(target=generator.run)
+        thread.start()
+        deadline = time.time() + 5
+        while len(running) < 4 and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        thread.join()
+        self.assertEqual(sorted(running), [0, 1, 2, 3])
+
+    def test_saturated_workers_delay_start(self):
+        """Operations arriving on busy workers record their start delay"""
+        result = LoadGenerator(
+            lambda index: time.sleep(0.1),
+            FixedProfile([0, 0]),
+            max_workers=1,
+        ).run()
+        second = result.records[1]
+        self.assertGreaterEqual(second.start_delay, 0.09)
+        self.assertGreaterEqual(second.latency, second.service_time + 0.09)
+
+    def test_failures(self):
+        """Failed operations are recorded and excluded from latencies"""
+        def workload(index):
+            if index == 1:
+                raise RuntimeError('boom')
+
+        result = LoadGenerator(workload, FixedProfile([0, 0, 0])).run()
+        self.assertEqual(len(result.completed), 2)
+        self.assertEqual([record.index for record in result.failed], [1])
+        self.assertIsInstance(result.failed[0].error, RuntimeError)
+        self.assertEqual(len(result.latencies()), 2)
+        self.assertEqual(len(result.start_delays()), 3)
+
+
+class WorkloadTestCase(TestCase):
+    """Tests for the Candlepin and Pulp workloads."""
+
+    def test_register_ak_uses_free_vms(self):
+        """A client VM is never used by two operations at once"""
+        in_use = set()
+        overlaps = []
+        lock = threading.Lock()
+
+        def register(ak_name, org, vm_ip):
+            with lock:
+                if vm_ip in in_use:
+                    overlaps.append(vm_ip)
+                in_use.add(vm_ip)
+            time.sleep(0.02)
+            with lock:
+                in_use.remove(vm_ip)
+            return 1.0
+
+        with mock.patch.object(
+                load.Candlepin, 'single_register_activation_key',
+                side_effect=register) as register_mock:
+            result = LoadGenerator(
+                CandlepinRegisterAKWorkload('ak', 'org', ['vm1', 'vm2']),
+                FixedProfile([0] * 6),
+                max_workers=4,
+            ).run()
+        self.assertEqual(register_mock.call_count, 6)
+        self.assertEqual(len(result.completed), 6)
+        self.assertEqual(overlaps, [])
+
+    def test_candlepin_failures(self):
+        """Failed Candlepin operations are failed operations"""
+        with mock.patch.object(
+                load.Candlepin, 'single_register_activation_key',
+                return_value=0):
+            result = LoadGenerator(
+                CandlepinRegisterAKWorkload('ak', 'org', ['vm1']),
+                FixedProfile([0])).run()
+        self.assertEqual(len(result.failed), 1)
+        with mock.patch.object(
+                load.Candlepin, 'single_register_attach',
+                return_value=(1.5, 0)):
+            result = LoadGenerator(
+                CandlepinAttachWorkload('sub', 'org', 'env', ['vm1']),
+                FixedProfile([0])).run()
+        self.assertEqual(len(result.failed), 1)
+        with mock.patch.object(
+                load.Candlepin, 'single_delete', return_value=0):
+            result = LoadGenerator(
+                CandlepinDeleteWorkload(['uuid']), FixedProfile([0])).run()
+        self.assertEqual(len(result.failed), 1)
+
+    def test_pulp_sync_failure(self):
+        """A failed sync is a failed operation"""
+        with mock.patch.object(
+                load.Pulp, 'repository_single_sync', return_value=0):
+            result = LoadGenerator(
+                PulpSyncWorkload({'repo': 1}), FixedProfile([0])).run()
+        self.assertEqual(len(result.failed), 1)
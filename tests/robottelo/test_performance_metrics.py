@@ -0,0 +1,267 @@
+"""Tests for module ``robottelo.performance.metrics``."""
+import json
+import os
+import shutil
+import six
+import tempfile
+
+from robottelo.performance.metrics import (
+    LiveMetrics,
+    MetricsServer,
+    SnapshotWriter,
+)
+from robottelo.performance.thread import (
+    DeleteThread,
+    SubscribeAttachThread,
+    SyncThread,
+)
+from six.moves.urllib.error import HTTPError
+from six.moves.urllib.request import urlopen
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class LiveMetricsTestCase(TestCase):
+    """Tests for :class:`robottelo.performance.metrics.LiveMetrics`."""
+
+    def setUp(self):
+        self.now = [1000.0]
+        patcher = mock.patch(
+            'robottelo.performance.metrics.time.time',
+            side_effect=lambda: self.now[0],
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.metrics = LiveMetrics(window=10)
+
+    def test_snapshot(self):
+        """Counts, errors, in flight operations and percentiles"""
+        for latency in range(1, 101):
+            self.metrics.record('register', latency / 100.0)
+        self.metrics.record('register', 5, error=True)
+        self.metrics.start('register')
+        self.now[0] += 5
+        stats = self.metrics.snapshot()['register']
+        self.assertEqual(stats['count'], 101)
+        self.assertEqual(stats['errors'], 1)
+        self.assertEqual(stats['in_flight'], 1)
+        self.assertAlmostEqual(stats['ops_per_sec'], 101 / 5.0)
+        self.assertAlmostEqual(stats['errors_per_sec'], 1 / 5.0)
+        self.assertAlmostEqual(stats['p50'], 0.5, delta=0.01)
+        self.assertAlmostEqual(stats['p95'], 0.95, delta=0.02)
+        self.assertAlmostEqual(stats['p99'], 0.99, delta=0.02)
+
+    def test_start_finish(self):
+        """The latency of a started operation is measured on finish"""
+        started = self.metrics.start('sync')
+        self.now[0] += 2
+        self.metrics.finish('sync', started)
+        stats = self.metrics.snapshot()['sync']
+        self.assertEqual(stats['in_flight'], 0)
+        self.assertAlmostEqual(stats['p50'], 2, delta=0.02)
+
+    def test_track(self):
+        """Exceptions raised on the tracked context count as errors"""
+        with self.metrics.track('delete'):
+            pass
+        with self.assertRaises(ValueError):
+            with self.metrics.track('delete'):
+                raise ValueError
+        stats = self.metrics.snapshot()['delete']
+        self.assertEqual(stats['count'], 2)
+        self.assertEqual(stats['errors'], 1)
+        self.assertEqual(stats['in_flight'], 0)
+
+    def test_sliding_window(self):
+        """Latencies older than the window are discarded"""
+        self.metrics.record('register', 10)
+        self.now[0] += 20
+        self.metrics.record('register', 1)
+        stats = self.metrics.snapshot()['register']
+        self.assertEqual(stats['count'], 2)
+        self.assertAlmostEqual(stats['p99'], 1, delta=0.01)
+        self.assertAlmostEqual(stats['ops_per_sec'], 0.1)
+        self.now[0] += 20
+        stats = self.metrics.snapshot()['register']
+        self.assertEqual(stats['count'], 2)
+        self.assertEqual(stats['ops_per_sec'], 0)
+        self.assertIsNone(stats['p50'])
+
+    def test_prometheus_text(self):
+        """Metrics are exposed in the Prometheus text format"""
+        self.metrics.record('register', 0.5)
+        self.metrics.record('sync', 1, error=True)
+        lines = self.metrics.prometheus_text().splitlines()
+        self.assertIn('# TYPE robottelo_operations_total counter', lines)
+        self.assertIn(
+            'robottelo_operations_total{operation="register"} 1', lines)
+        self.assertIn(
+            'robottelo_operation_errors_total{operation="sync"} 1', lines)
+        self.assertIn(
+            'robottelo_operation_latency_seconds'
+            '{operation="sync",quantile="0.5"} NaN',
+            lines,
+        )
+        latency = [
+            float(line.split()[1]) for line in lines
+            if line.startswith(
+                'robottelo_operation_latency_seconds'
+                '{operation="register",quantile="0.99"}')
+        ]
+        self.assertEqual(len(latency), 1)
+        self.assertAlmostEqual(latency[0], 0.5, delta=0.01)
+
+
+class MetricsServerTestCase(TestCase):
+    """Tests for :class:`robottelo.performance.metrics.MetricsServer`."""
+
+    def setUp(self):
+        self.metrics = LiveMetrics()
+        self.metrics.record('register', 0.5)
+        self.server = MetricsServer(self.metrics)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.url = 'http://127.0.0.1:{0}'.format(self.server.port)
+
+    def test_prometheus(self):
+        """The Prometheus metrics are served on /metrics"""
+        response = urlopen(self.url + '/metrics')
+        self.assertIn('text/plain', response.info().get('Content-Type'))
+        self.assertIn(
+            b'robottelo_operations_total{operation="register"} 1',
+            response.read(),
+        )
+
+    def test_json(self):
+        """The snapshot is served on /metrics.json"""
+        response = urlopen(self.url + '/metrics.json')
+        snapshot = json.loads(response.read().decode('utf-8'))
+        self.assertEqual(snapshot['register']['count'], 1)
+
+    def test_not_found(self):
+        """Other paths are not found"""
+        with self.assertRaises(HTTPError) as context:
+            urlopen(self.url + '/other')
+        self.assertEqual(context.exception.code, 404)
+
+
+class SnapshotWriterTestCase(TestCase):
+    """Tests for :class:`robottelo.performance.metrics.SnapshotWriter`."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'metrics.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_write(self):
+        """The snapshot file is rewritten, and written once more on stop"""
+        metrics = LiveMetrics()
+        writer = SnapshotWriter(metrics, self.filename, interval=0.01)
+        writer.start()
+        metrics.record('register', 0.5)
+        writer.stop()
+        self.assertFalse(writer.is_alive())
+        with open(self.filename) as handler:
+            snapshot = json.load(handler)
+        self.assertEqual(snapshot['operations']['register']['count'], 1)
+        self.assertIn('time', snapshot)
+        self.assertEqual(os.listdir(self.tmpdir), ['metrics.json'])
+
+
+class ThreadMetricsTestCase(TestCase):
+    """Tests for the live metrics of ``robottelo.performance.thread``."""
+
+    def test_delete_thread(self):
+        """Delete threads feed the live metrics"""
+        metrics = LiveMetrics()
+        thread = DeleteThread(
+            0, 'thread-0', ['uuid-1', 'uuid-2'], {'thread-0': []},
+            metrics=metrics,
+        )
+        with mock.patch(
+                'robottelo.performance.thread.Candlepin.single_delete',
+                return_value=0.5):
+            thread.run()
+        self.assertEqual(thread.time_result_dict['thread-0'], [0.5, 0.5])
+        stats = metrics.snapshot()['delete']
+        self.assertEqual(stats['count'], 2)
+        self.assertEqual(stats['errors'], 0)
+        self.assertEqual(stats['in_flight'], 0)
+
+    def test_completion_times(self):
+        """Threads keep the completion time of each recorded timing"""
+        thread = DeleteThread(
+            0, 'thread-0', ['uuid-1', 'uuid-2'], {'thread-0': []})
+        with mock.patch(
+                'robottelo.performance.thread.Candlepin.single_delete',
+                return_value=0.5):
+            thread.run()
+        timestamps = thread.completion_times()['thread-0']
+        self.assertEqual(
+            timestamps, [completed for _, completed in thread.windows])
+        self.assertLessEqual(timestamps[0], timestamps[1])
+
+    def test_failed_delete(self):
+        """Failed deletions are counted as errors and not recorded"""
+        metrics = LiveMetrics()
+        thread = DeleteThread(
+            0, 'thread-0', ['uuid-1', 'uuid-2'], {'thread-0': []},
+            metrics=metrics,
+        )
+        with mock.patch(
+                'robottelo.performance.thread.Candlepin.single_delete',
+                side_effect=[0, 0.5]):
+            thread.run()
+        self.assertEqual(thread.time_result_dict['thread-0'], [0.5])
+        self.assertEqual(len(thread.completion_times()['thread-0']), 1)
+        self.assertEqual(metrics.snapshot()['delete']['errors'], 1)
+
+    def test_failed_attach(self):
+        """Register and attach fails if one of the steps failed"""
+        metrics = LiveMetrics()
+        register, attach = {'thread-0': []}, {'thread-0': []}
+        thread = SubscribeAttachThread(
+            0, 'thread-0', {}, register, attach, 2, 'sub', 'org', 'env',
+            'vm', metrics=metrics,
+        )
+        with mock.patch(
+                'robottelo.performance.thread.Candlepin.'
+                'single_register_attach',
+                side_effect=[(1.5, 0), (1.5, 2.5)]):
+            thread.run()
+        self.assertEqual(register['thread-0'], [1.5])
+        self.assertEqual(attach['thread-0'], [2.5])
+        self.assertEqual(
+            metrics.snapshot()['register_attach']['errors'], 1)
+
+    def test_failed_sync(self):
+        """Failed synchronizations are counted as errors"""
+        metrics = LiveMetrics()
+        thread = SyncThread(
+            0, 'thread-0', {'thread-0': []}, 1, 'repo', 0, metrics=metrics)
+        with mock.patch(
+                'robottelo.performance.thread.Pulp.repository_single_sync',
+                return_value=0):
+            thread.run()
+        self.assertEqual(metrics.snapshot()['sync']['errors'], 1)
+        self.assertEqual(thread.time_result_dict['thread-0'], [])
+
+    def test_exception(self):
+        """Exceptions are counted as errors and raised"""
+        metrics = LiveMetrics()
+        thread = SyncThread(
+            0, 'thread-0', {'thread-0': []}, 1, 'repo', 0, metrics=metrics)
+        with mock.patch(
+                'robottelo.performance.thread.Pulp.repository_single_sync',
+                side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                thread.run()
+        stats = metrics.snapshot()['sync']
+        self.assertEqual(stats['errors'], 1)
+        self.assertEqual(stats['in_flight'], 0)
@@ -0,0 +1,186 @@
+"""Tests for module ``robottelo.performance.resources``."""
+import os
+import shutil
+import six
+import tempfile
+
+from robottelo.performance.resources import (
+    RESOURCE_COLUMNS,
+    ResourceSampler,
+    parse_sample,
+    read_resources,
+)
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+def _stat(pid, comm, ticks):
+    """Build the ``/proc/<pid>/stat`` line of a process which used ``ticks``
+    clock ticks, split between user and system time.
+    """
+    return (
+        '{0} ({1}) S 1 {0} {0} 0 -1 4202752 0 0 0 0 {2} {3} 0 0 20 0 1 0 '
+        '100 1000 100'.format(pid, comm, ticks - ticks // 4, ticks // 4)
+    )
+
+
+def _sections(jiffies, read, written, tomcat_cputime, postgres_connections):
+    """Build the raw output sections of one sampling iteration, the tomcat
+    CPU time is in seconds.
+    """
+    return {
+        'stat': ['cpu  {0} 0 0'.format(' '.join(map(str, jiffies)))],
+        'meminfo': [
+            'MemTotal:       8192000 kB',
+            'MemFree:        1024000 kB',
+            'MemAvailable:   4096000 kB',
+            'SwapTotal:      2048000 kB',
+            'SwapFree:       1024000 kB',
+        ],
+        'loadavg': ['2.50 1.00 0.50 3/400 12345'],
+        'diskstats': [
+            '   8       0 sda 100 0 {0} 0 100 0 {1} 0 0 0 0'.format(
+                read, written),
+            '   8       1 sda1 100 0 {0} 0 100 0 {1} 0 0 0 0'.format(
+                read, written),
+        ],
+        'processes': [
+            '  100 2048000 /usr/lib/jvm/jre/bin/java '
+            '-Dcatalina.base=/usr/share/tomcat',
+            '  200  102400 postgres -D /var/lib/pgsql/data',
+            '  201   10240 postgres: checkpointer process',
+        ] + [
+            '  {0}   10240 postgres: candlepin candlepin '
+            '127.0.0.1({1}) idle'.format(300 + i, 40000 + i)
+            for i in range(postgres_connections)
+        ] + [
+            '  400   51200 /usr/bin/python /usr/bin/celery worker',
+            '  500    1024 bash',
+            '  600    1024 /usr/bin/python /usr/bin/celery beat',
+        ],
+        'clktck': ['100'],
+        'cputicks': [
+            _stat(100, 'java', int(tomcat_cputime * 100)),
+            _stat(200, 'postgres', 500),
+            _stat(201, 'postgres', 100),
+        ] + [
+            _stat(300 + i, 'postgres', 0)
+            for i in range(postgres_connections)
+        ] + [
+            _stat(400, 'celery) worker', 8640000),
+            _stat(500, 'bash', 0),
+            # process 600 exited before its CPU time was read
+        ],
+    }
+
+
+class ParseSampleTestCase(TestCase):
+    """Tests for :func:`robottelo.performance.resources.parse_sample`."""
+
+    def test_parse(self):
+        """Counters are read from the raw sections"""
+        raw = parse_sample(
+            _sections([10, 0, 10, 70, 10, 0, 0, 0], 2048, 4096, 60.25, 3))
+        self.assertEqual(raw['cpu'], (100, 70, 10))
+        self.assertEqual(raw['meminfo']['MemAvailable'], 4096000)
+        self.assertEqual(raw['load1'], 2.5)
+        # partitions are not counted twice
+        self.assertEqual(raw['disk'], (2048, 4096))
+        self.assertEqual(raw['db_connections'], 3)
+        # the CPU time has the resolution of a clock tick
+        self.assertEqual(
+            raw['processes']['100'], ('candlepin', 2048000, 60.25))
+        # command names with parentheses and spaces are parsed
+        self.assertEqual(raw['processes']['400'][0], 'pulp')
+        self.assertEqual(raw['processes']['400'][2], 86400)
+        self.assertIsNone(raw['processes']['600'][2])
+        self.assertEqual(raw['processes']['300'][0], 'postgres')
+        self.assertNotIn('500', raw['processes'])
+
+
+class ResourceSamplerTestCase(TestCase):
+    """Tests for :class:`robottelo.performance.resources.ResourceSampler`."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.sampler = ResourceSampler(interval=10)
+        self.sampler.add_sample(
+            _sections([10, 0, 10, 70, 10, 0, 0, 0], 0, 0, 60, 2), 100.0)
+        self.sampler.add_sample(
+            _sections([60, 0, 10, 120, 10, 0, 0, 0], 20480, 40960, 120.5, 5),
+            110.0)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_first_sample(self):
+        """The first sample has no rates"""
+        sample = self.sampler.samples[0]
+        self.assertEqual(sample['timestamp'], 100.0)
+        self.assertIsNone(sample['cpu_percent'])
+        self.assertIsNone(sample['candlepin_cpu_percent'])
+        self.assertEqual(sample['mem_used_mb'], 4000)
+        self.assertEqual(sample['swap_used_mb'], 1000)
+        self.assertEqual(sample['candlepin_rss_mb'], 2000)
+        self.assertEqual(sample['postgres_processes'], 4)
+        self.assertEqual(sample['db_connections'], 2)
+
+    def test_rates(self):
+        """Rates are computed between consecutive samples"""
+        sample = self.sampler.samples[1]
+        self.assertEqual(sample['cpu_percent'], 50)
+        self.assertEqual(sample['iowait_percent'], 0)
+        self.assertEqual(sample['load1'], 2.5)
+        self.assertEqual(sample['disk_read_mbps'], 1)
+        self.assertEqual(sample['disk_write_mbps'], 2)
+        # a minute and half a second of tomcat CPU time in ten seconds
+        self.assertEqual(sample['candlepin_cpu_percent'], 605)
+        # the three new connections count with their whole CPU time
+        self.assertEqual(sample['postgres_cpu_percent'], 0)
+        self.assertEqual(sample['db_connections'], 5)
+
+    def test_write_csv(self):
+        """Samples of a window are written with their elapsed time"""
+        filename = os.path.join(self.tmpdir, 'resources.csv')
+        self.assertEqual(self.sampler.write_csv(filename, start=105.0), 1)
+        columns = read_resources(filename)
+        self.assertEqual(
+            sorted(columns), sorted(RESOURCE_COLUMNS + ('elapsed',)))
+        self.assertEqual(columns['timestamp'], [110.0])
+        self.assertEqual(columns['elapsed'], [5.0])
+        self.assertEqual(columns['cpu_percent'], [50.0])
+        self.assertEqual(self.sampler.write_csv(filename), 2)
+        columns = read_resources(filename)
+        self.assertEqual(columns['elapsed'], [0.0, 10.0])
+        self.assertEqual(columns['cpu_percent'], [None, 50.0])
+
+    def test_run(self):
+        """Samples are read from a single SSH channel"""
+        lines = []
+        for section, section_lines in sorted(
+                _sections([10, 0, 10, 70, 10, 0, 0, 0], 0, 0, 60, 2).items()):
+            lines.append('--- {0}\n'.format(section))
+            lines.extend(line + '\n' for line in section_lines)
+        lines.append('--- end\n')
+        stdout = mock.MagicMock()
+        stdout.__iter__.return_value = iter(lines * 3)
+        connection = mock.MagicMock()
+        connection.exec_command.return_value = (None, stdout, None)
+        sampler = ResourceSampler(interval=10)
+        with mock.patch(
+                'robottelo.performance.resources.ssh._get_connection'
+                ) as get_connection:
+            get_connection.return_value.__enter__.return_value = connection
+            sampler.start()
+            sampler.join()
+        self.assertEqual(connection.exec_command.call_count, 1)
+        self.assertIn('sleep 10', connection.exec_command.call_args[0][0])
+        self.assertEqual(len(sampler.samples), 3)
+        self.assertEqual(sampler.samples[2]['cpu_percent'], None)
+        self.assertEqual(sampler.samples[2]['db_connections'], 2)
+        sampler.stop()
+        stdout.channel.close.assert_called_once_with()
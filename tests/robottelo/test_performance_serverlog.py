@@ -0,0 +1,184 @@
+"""Tests for module ``robottelo.performance.serverlog``."""
+import csv
+import os
+import shutil
+import tempfile
+
+from robottelo.performance.serverlog import (
+    BREAKDOWN_COLUMNS,
+    breakdown,
+    correlate,
+    parse_candlepin_log,
+    parse_production_log,
+    ServerRequest,
+    write_breakdown_csv,
+)
+from unittest2 import TestCase
+
+#: 2016-10-18 12:00:00 UTC
+NOON = 1476792000
+
+PRODUCTION_LOG = [
+    '2016-10-18 14:00:00 3f2a1b9c [app] [I] Started DELETE '
+    '"/katello/api/hosts/5" for 10.0.0.1 at 2016-10-18 14:00:00 +0200\n',
+    '2016-10-18 14:00:00 8d7e6f5a [app] [I] Started GET "/rhsm/status" '
+    'for 10.0.0.2 at 2016-10-18 14:00:00 +0200\n',
+    '2016-10-18 14:00:00 3f2a1b9c [app] [I] Processing by '
+    'Katello::Api::V2::HostsController#destroy as JSON\n',
+    '2016-10-18 14:00:00 8d7e6f5a [app] [I] Processing by '
+    'Katello::Api::Rhsm::CandlepinProxiesController#server_status as JSON\n',
+    '2016-10-18 14:00:00 8d7e6f5a [app] [I] Completed 200 OK in 12ms '
+    '(Views: 2.0ms | ActiveRecord: 1.5ms)\n',
+    '2016-10-18 14:00:00 3f2a1b9c [app] [I]   Rendered '
+    'katello/api/v2/common/async.json.rabl (1.2ms)\n',
+    '2016-10-18 14:00:01 3f2a1b9c [app] [I] Completed 202 Accepted in '
+    '523.4ms (Views: 10.5ms | ActiveRecord: 120.5ms)\n',
+]
+
+CANDLEPIN_LOG = [
+    '2016-10-18 12:00:00,250 [thread=http-bio-8443-exec-3] '
+    '[req=8c1a2b3c-1111, org=, csid=3f2a1b9c] INFO  '
+    'org.candlepin.common.filter.LoggingFilter - Request: verb=DELETE, '
+    'uri=/candlepin/consumers/abc\n',
+    '2016-10-18 12:00:00,300 [thread=http-bio-8443-exec-4] '
+    '[req=9d2b3c4d-2222, org=, csid=] INFO  '
+    'org.candlepin.common.filter.LoggingFilter - Request: verb=GET, '
+    'uri=/candlepin/status\n',
+    '2016-10-18 12:00:00,550 [thread=http-bio-8443-exec-3] '
+    '[req=8c1a2b3c-1111, org=ACME, csid=3f2a1b9c] INFO  '
+    'org.candlepin.common.filter.LoggingFilter - Response: status=204, '
+    'content-type="null", time=300\n',
+    '2016-10-18 12:00:00,400 [thread=http-bio-8443-exec-4] '
+    '[req=9d2b3c4d-2222, org=, csid=] INFO  '
+    'org.candlepin.common.filter.LoggingFilter - Response: status=200, '
+    'content-type="application/json"\n',
+]
+
+
+class ParseTestCase(TestCase):
+    """Tests for the server log parsers."""
+
+    def test_production_log(self):
+        """Rails requests are grouped by request id"""
+        requests = parse_production_log(PRODUCTION_LOG)
+        self.assertEqual(len(requests), 2)
+        status, delete = requests
+        self.assertEqual(delete.request_id, '3f2a1b9c')
+        self.assertEqual(delete.method, 'DELETE')
+        self.assertEqual(delete.path, '/katello/api/hosts/5')
+        self.assertEqual(
+            delete.action, 'Katello::Api::V2::HostsController#destroy')
+        self.assertEqual(delete.status, 202)
+        self.assertEqual(delete.started, NOON)
+        self.assertAlmostEqual(delete.duration, 0.5234)
+        self.assertAlmostEqual(delete.views, 0.0105)
+        self.assertAlmostEqual(delete.db, 0.1205)
+        self.assertEqual(status.path, '/rhsm/status')
+        self.assertAlmostEqual(status.duration, 0.012)
+
+    def test_production_log_without_request_id(self):
+        """Without request ids, requests complete in order"""
+        lines = [
+            'Started GET "/api/hosts" for 127.0.0.1 at 2016-10-18 12:00:00\n',
+            'Processing by Api::V2::HostsController#index as JSON\n',
+            'Completed 200 OK in 40ms (Views: 5.0ms | ActiveRecord: 9.0ms)\n',
+        ]
+        requests = parse_production_log(lines, utc_offset=-3600)
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(requests[0].started, NOON + 3600)
+        self.assertEqual(
+            requests[0].action, 'Api::V2::HostsController#index')
+        self.assertAlmostEqual(requests[0].duration, 0.04)
+
+    def test_candlepin_log(self):
+        """Candlepin requests are matched by request id"""
+        requests = parse_candlepin_log(CANDLEPIN_LOG)
+        self.assertEqual(len(requests), 2)
+        delete, status = requests
+        self.assertEqual(delete.request_id, '8c1a2b3c-1111')
+        self.assertEqual(delete.method, 'DELETE')
+        self.assertEqual(delete.path, '/candlepin/consumers/abc')
+        self.assertEqual(delete.status, 204)
+        self.assertEqual(delete.started, NOON + 0.25)
+        self.assertEqual(delete.duration, 0.3)
+        self.assertEqual(delete.correlation_id, '3f2a1b9c')
+        # no time field: measured between the request and response lines
+        self.assertAlmostEqual(status.duration, 0.1, places=5)
+        self.assertIsNone(status.correlation_id)
+
+
+class CorrelateTestCase(TestCase):
+    """Tests for the correlation of requests and client operations."""
+
+    def test_request_id(self):
+        """Requests go to the operation with the same request id"""
+        operations = [
+            (NOON, NOON + 1, '3f2a1b9c-aaaa-bbbb'),
+            (NOON, NOON + 1, '8d7e6f5a-cccc-dddd'),
+        ]
+        requests = parse_production_log(PRODUCTION_LOG)
+        assigned = correlate(operations, requests)
+        self.assertEqual(
+            [[request.request_id for request in requests]
+             for requests in assigned],
+            [['3f2a1b9c'], ['8d7e6f5a']],
+        )
+
+    def test_time(self):
+        """Requests go to the last operation started before them"""
+        operations = [(NOON, NOON + 2), (NOON + 5, NOON + 9)]
+        requests = [
+            ServerRequest(
+                'foreman', path='/rhsm/a', started=NOON, duration=1.5),
+            ServerRequest(
+                'foreman', path='/rhsm/b', started=NOON + 6, duration=1),
+            ServerRequest(
+                'candlepin', path='/rhsm/c', started=NOON + 7, duration=1),
+            # completes after the end of the operation
+            ServerRequest(
+                'foreman', path='/rhsm/d', started=NOON + 8, duration=5),
+            ServerRequest('foreman', path='/other', started=NOON + 6),
+        ]
+        assigned = correlate(operations, requests, path='^/rhsm/')
+        self.assertEqual(assigned, [requests[:1], requests[1:3]])
+
+    def test_breakdown(self):
+        """Client latency is split into the server side times"""
+        operations = [(NOON, NOON + 1), (NOON + 5, NOON + 6), (NOON + 9, 20)]
+        assigned = [
+            [
+                ServerRequest(
+                    'foreman', started=NOON, duration=0.5, views=0.1,
+                    db=0.2),
+                ServerRequest('candlepin', started=NOON, duration=0.25),
+            ],
+            [ServerRequest('candlepin', started=NOON + 5, duration=0.75)],
+            [],
+        ]
+        rows = breakdown(operations, assigned)
+        self.assertEqual(rows[0]['latency'], 1)
+        self.assertEqual(rows[0]['requests'], 2)
+        self.assertEqual(rows[0]['rails'], 0.5)
+        self.assertAlmostEqual(rows[0]['rails_other'], 0.2)
+        self.assertEqual(rows[0]['candlepin'], 0.25)
+        self.assertEqual(rows[0]['client_overhead'], 0.5)
+        self.assertIsNone(rows[1]['rails'])
+        self.assertEqual(rows[1]['client_overhead'], 0.25)
+        self.assertIsNone(rows[2]['client_overhead'])
+
+    def test_write_breakdown_csv(self):
+        """Breakdown rows are written as csv"""
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        filename = os.path.join(tmpdir, 'requests.csv')
+        rows = breakdown(
+            [(NOON, NOON + 1)],
+            [[ServerRequest('candlepin', started=NOON, duration=0.5)]],
+        )
+        write_breakdown_csv(filename, rows)
+        with open(filename) as handler:
+            written = list(csv.reader(handler))
+        self.assertEqual(tuple(written[0]), BREAKDOWN_COLUMNS)
+        self.assertEqual(dict(zip(written[0], written[1]))['rails'], '')
+        self.assertEqual(
+            float(dict(zip(written[0], written[1]))['client_overhead']), 0.5)
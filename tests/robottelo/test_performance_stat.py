@@ -0,0 +1,85 @@
+"""Tests for module ``robottelo.performance.stat``."""
+import csv
+import numpy
+import os
+import shutil
+import tempfile
+
+from robottelo.performance.stat import (
+    bucket_stats,
+    generate_stat_for_concurrent_thread,
+)
+from unittest2 import TestCase
+
+
+def reference_stats(samples):
+    """Compute the statistics of a single bucket one numpy call at a time."""
+    return [
+        numpy.amin(samples),
+        numpy.median(samples),
+        numpy.mean(samples),
+        numpy.amax(samples),
+        numpy.std(samples),
+        numpy.percentile(samples, 90),
+        numpy.percentile(samples, 95),
+        numpy.percentile(samples, 99),
+    ]
+
+
+class BucketStatsTestCase(TestCase):
+    """Tests for :func:`robottelo.performance.stat.bucket_stats`."""
+
+    def test_million_samples(self):
+        """A million samples match the per bucket computation"""
+        values = numpy.random.RandomState(0).exponential(0.5, 1000003)
+        labels, stats = bucket_stats(values, 1000)
+        self.assertEqual(stats.shape, (1001, 8))
+        self.assertEqual(labels[0], '1-1000')
+        self.assertEqual(labels[-1], '1000001-1000003')
+        for index in (0, 500, 999):
+            numpy.testing.assert_allclose(
+                stats[index],
+                reference_stats(values[index * 1000:(index + 1) * 1000]),
+            )
+        numpy.testing.assert_allclose(
+            stats[-1], reference_stats(values[1000000:]))
+
+    def test_fewer_samples_than_bucket(self):
+        """Timings fewer than a bucket make a single ragged bucket"""
+        labels, stats = bucket_stats([1, 2], 3)
+        self.assertEqual(labels, ['1-2'])
+        self.assertEqual(stats[0][0], 1)
+
+    def test_float_bucket_size(self):
+        """A float bucket size, as computed on Python 3, is accepted"""
+        labels, _ = bucket_stats(range(4), 2.0)
+        self.assertEqual(labels, ['1-2', '3-4'])
+
+
+class ConcurrentThreadStatTestCase(TestCase):
+    """Tests for the csv written by ``generate_stat_for_concurrent_thread``."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.stat_file = os.path.join(self.tmpdir, 'stat.csv')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_csv_rows(self):
+        """A header and a row per bucket are written"""
+        stat = generate_stat_for_concurrent_thread(
+            'client-0', [1, 2, 3, 4, 5], self.stat_file, 2, 2)
+        self.assertEqual(stat[0], (1, 1.5, 2, 0.5))
+        self.assertEqual(sorted(stat), [0, 1, 2])
+        with open(self.stat_file) as handler:
+            rows = list(csv.reader(handler))
+        self.assertEqual(rows[0], [])
+        self.assertEqual(rows[1], ['client-0'])
+        self.assertEqual(rows[2][0], 'bucket')
+        self.assertEqual([row[0] for row in rows[3:]], ['1-2', '3-4', '5-5'])
+
+    def test_zero_bucket_size(self):
+        """Nothing is computed for an empty bucket size"""
+        self.assertIsNone(generate_stat_for_concurrent_thread(
+            'client-0', [], self.stat_file, 0, 0))
@@ -0,0 +1,93 @@
+"""Tests for module ``robottelo.performance.store``."""
+import csv
+import numpy
+import os
+import shutil
+import tempfile
+
+from robottelo.performance.store import TimingStore, TimingStoreError
+from unittest2 import TestCase
+
+
+class TimingStoreTestCase(TestCase):
+    """Tests for :class:`robottelo.performance.store.TimingStore`."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'run')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_append_and_read(self):
+        """Appended rows are read back as memory-mapped columns"""
+        with TimingStore.create(
+                self.path, {'threads': 2}, flush_size=2) as store:
+            store.append(0.5, thread=0, operation='register', timestamp=10)
+            store.append(1.5, thread=1, operation='attach', timestamp=11)
+            store.append(2.5, thread=1, operation='register', timestamp=12)
+            self.assertEqual(len(store), 2)
+        store = TimingStore.open(self.path)
+        self.assertEqual(len(store), 3)
+        latency = store.column('latency')
+        self.assertIsInstance(latency, numpy.memmap)
+        self.assertEqual(latency.tolist(), [0.5, 1.5, 2.5])
+        self.assertEqual(store.column('thread').tolist(), [0, 1, 1])
+        self.assertEqual(store.column('operation').tolist(), [0, 1, 0])
+        self.assertEqual(store.column('timestamp').tolist(), [10, 11, 12])
+        self.assertEqual(store.metadata['run'], {'threads': 2})
+        self.assertEqual(
+            store.metadata['operations'], ['register', 'attach'])
+
+    def test_append_many(self):
+        """Whole thread results are appended at once"""
+        with TimingStore.create(self.path) as store:
+            store.append_many([1, 2, 3], thread=0, operation='ak')
+            store.append_many([4, 5], thread=1, operation='ak')
+        self.assertEqual(store.time_result_dict(), {
+            'thread-0': [1, 2, 3],
+            'thread-1': [4, 5],
+        })
+        self.assertEqual(store.time_result_dict('other'), {})
+        self.assertTrue(numpy.isnan(store.column('timestamp')).all())
+
+    def test_reopen_and_append(self):
+        """A run can be appended to after being reopened"""
+        with TimingStore.create(self.path) as store:
+            store.append(1)
+        with TimingStore.open(self.path) as store:
+            store.append(2)
+        self.assertEqual(store.column('latency').tolist(), [1, 2])
+
+    def test_empty(self):
+        """An empty run has empty columns"""
+        store = TimingStore.create(self.path)
+        self.assertEqual(len(store.column('latency')), 0)
+        with self.assertRaises(TimingStoreError):
+            store.column('unknown')
+
+    def test_create_twice(self):
+        """A run can not be created twice nor opened before creation"""
+        with self.assertRaises(TimingStoreError):
+            TimingStore.open(self.path)
+        TimingStore.create(self.path).close()
+        with self.assertRaises(TimingStoreError):
+            TimingStore.create(self.path)
+
+    def test_export_csv(self):
+        """The csv has a row per thread, as the raw csv files"""
+        with TimingStore.create(self.path) as store:
+            for thread in (1, 0, 10, 2):
+                store.append_many([thread, thread + 0.5], thread=thread)
+        filename = os.path.join(self.tmpdir, 'raw.csv')
+        store.export_csv(filename, title='raw-ak-4-clients')
+        with open(filename) as handler:
+            rows = list(csv.reader(handler))
+        self.assertEqual(rows, [
+            ['raw-ak-4-clients'],
+            ['0.0', '0.5'],
+            ['1.0', '1.5'],
+            ['2.0', '2.5'],
+            ['10.0', '10.5'],
+            [],
+        ])
@@ -0,0 +1,157 @@
+"""Tests for module ``robottelo.performance.sweep``."""
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from robottelo.performance.load import LoadResult, OperationRecord
+from robottelo.performance.sweep import (
+    ERRORS,
+    LATENCY,
+    PLATEAU,
+    ConcurrencySweep,
+    SweepStep,
+    concurrency_steps,
+    detect_saturation,
+    run_closed_loop,
+)
+from unittest2 import TestCase
+
+
+def _step(concurrency, throughput, latency, errors=0, operations=100):
+    """Return a sweep step of ``operations`` lasting one second"""
+    records = []
+    for index in range(operations):
+        record = OperationRecord(index, 0.0)
+        record.started = 0.0
+        record.completed = latency
+        record.success = index >= errors
+        records.append(record)
+    # achieved rate of the successful operations over the duration
+    duration = (operations - errors) / float(throughput)
+    return SweepStep(concurrency, LoadResult(records, 0.0, duration))
+
+
+class ConcurrencyStepsTestCase(TestCase):
+    """Tests for :func:`robottelo.performance.sweep.concurrency_steps`."""
+
+    def test_linear(self):
+        """Linear steps end with the highest concurrency"""
+        self.assertEqual(concurrency_steps(4), [1, 2, 3, 4])
+        self.assertEqual(concurrency_steps(10, step=3), [1, 4, 7, 10])
+
+    def test_geometric(self):
+        """Geometric steps are distinct integers"""
+        self.assertEqual(
+            concurrency_steps(10, mode='geometric'), [1, 2, 4, 8, 10])
+        self.assertEqual(
+            concurrency_steps(8, mode='geometric', step=1.5),
+            [1, 2, 3, 5, 8])
+
+    def test_invalid(self):
+        """Invalid steps raise ValueError"""
+        with self.assertRaises(ValueError):
+            concurrency_steps(0)
+        with self.assertRaises(ValueError):
+            concurrency_steps(4, mode='geometric', step=1)
+        with self.assertRaises(ValueError):
+            concurrency_steps(4, mode='exponential')
+
+
+class DetectSaturationTestCase(TestCase):
+    """Tests for :func:`robottelo.performance.sweep.detect_saturation`."""
+
+    def test_not_saturated(self):
+        """Throughput growing with a steady latency does not saturate"""
+        steps = [_step(1, 10, 0.1), _step(2, 20, 0.1), _step(4, 40, 0.1)]
+        self.assertEqual(detect_saturation(steps), (2, None))
+
+    def test_plateau(self):
+        """The lowest concurrency of the plateau is sustainable"""
+        steps = [
+            _step(1, 10, 0.1),
+            _step(2, 20, 0.1),
+            _step(4, 20.5, 0.15),
+        ]
+        self.assertEqual(detect_saturation(steps), (1, PLATEAU))
+
+    def test_latency(self):
+        """The step before the latency blow-up is sustainable"""
+        steps = [_step(1, 10, 0.1), _step(2, 20, 0.15), _step(4, 40, 0.3)]
+        self.assertEqual(detect_saturation(steps), (1, LATENCY))
+
+    def test_errors(self):
+        """Failing operations saturate, even on the first step"""
+        steps = [_step(1, 10, 0.1), _step(2, 20, 0.1, errors=10)]
+        self.assertEqual(detect_saturation(steps), (0, ERRORS))
+        self.assertEqual(
+            detect_saturation([_step(1, 10, 0.1, errors=100)]),
+            (None, ERRORS),
+        )
+
+
+class RunClosedLoopTestCase(TestCase):
+    """Tests for :func:`robottelo.performance.sweep.run_closed_loop`."""
+
+    def test_indexes(self):
+        """Every client runs its own operations once"""
+        seen = []
+        lock = threading.Lock()
+
+        def workload(index):
+            """Record the operation index"""
+            with lock:
+                seen.append(index)
+            if index == 12:
+                raise ValueError
+
+        result = run_closed_loop(workload, 3, 4, first_index=10)
+        self.assertEqual(sorted(seen), list(range(10, 22)))
+        self.assertEqual(
+            [record.index for record in result.records], list(range(10, 22)))
+        self.assertEqual([record.index for record in result.failed], [12])
+        self.assertTrue(all(
+            record.completed >= record.started >= record.intended
+            for record in result.records
+        ))
+
+
+class ConcurrencySweepTestCase(TestCase):
+    """Tests for :class:`robottelo.performance.sweep.ConcurrencySweep`."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_run(self):
+        """The sweep stops at the saturation point and reports it"""
+        semaphore = threading.Semaphore(2)
+
+        def workload(index):
+            """An operation served by two workers at most"""
+            with semaphore:
+                threading.Event().wait(0.05)
+
+        sweep = ConcurrencySweep(
+            workload, [1, 2, 4, 8], iterations=10, plateau=0.2)
+        self.assertEqual(sweep.run(), 2)
+        self.assertIn(sweep.reason, (PLATEAU, LATENCY))
+        self.assertEqual(
+            [step.concurrency for step in sweep.steps], [1, 2, 4])
+        self.assertEqual(sweep.max_sustainable, 2)
+
+        filename = os.path.join(self.tmpdir, 'sweep')
+        sweep.write_csv(filename + '.csv')
+        sweep.write_json(filename + '.json')
+        with open(filename + '.csv') as handler:
+            lines = handler.read().splitlines()
+        self.assertEqual(lines[0].split(',')[:3], [
+            'concurrency', 'operations', 'errors'])
+        self.assertEqual(len(lines), 4)
+        with open(filename + '.json') as handler:
+            summary = json.load(handler)
+        self.assertEqual(summary['max_sustainable'], 2)
+        self.assertEqual(summary['steps'][2]['operations'], 40)
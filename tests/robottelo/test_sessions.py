@@ -0,0 +1,138 @@
+"""Tests for module ``robottelo.sessions``."""
+import six
+import threading
+
+from robottelo import sessions
+from six.moves.BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from six.moves.socketserver import ThreadingMixIn
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Answer every request with an empty body, keeping connections."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):  # noqa pylint:disable=invalid-name
+        """Send an empty response."""
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    do_DELETE = do_GET
+
+    def log_message(self, *args):
+        """Keep the test output clean."""
+
+
+class CookieHandler(KeepAliveHandler):
+    """Set a cookie and record the cookies sent by the client."""
+    received_cookies = []
+
+    def do_GET(self):  # noqa pylint:disable=invalid-name
+        """Send an empty response setting a cookie."""
+        self.received_cookies.append(self.headers.get('Cookie'))
+        self.send_response(200)
+        self.send_header('Set-Cookie', 'session=abc; Path=/')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    """Serve each connection on its own thread."""
+    daemon_threads = True
+
+
+class SessionsTestCase(TestCase):
+    """Tests for :func:`robottelo.sessions.get_session`."""
+
+    def setUp(self):
+        sessions.close_sessions()
+        self.addCleanup(sessions.close_sessions)
+
+    def test_shared_per_server_and_credential(self):
+        """Sessions are shared by server and credential"""
+        first = sessions.get_session(
+            'https://example.com/api/v2', ('admin', 'changeme'))
+        self.assertIs(
+            sessions.get_session(
+                'https://example.com/katello/api', ['admin', 'changeme']),
+            first
+        )
+        self.assertIsNot(
+            sessions.get_session(
+                'https://example.com/api/v2', ('user', 'changeme')),
+            first
+        )
+        self.assertIsNot(
+            sessions.get_session(
+                'https://other.example.com/api/v2', ('admin', 'changeme')),
+            first
+        )
+
+    def serve(self, handler):
+        """Start a local server answering with ``handler``, return its URL.
+        """
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.addCleanup(sessions.close_sessions)
+        self.server = server
+        return 'http://127.0.0.1:{0}/'.format(server.server_port)
+
+    def test_connections_reused(self):
+        """Requests reuse the session connections and are measured"""
+        url = self.serve(KeepAliveHandler)
+        server = self.server
+        pooled = sessions.PooledRequests()
+        for _ in range(3):
+            pooled.get(url)
+        pooled.delete(url)
+        stats = sessions.session_stats()['http://127.0.0.1:{0}'.format(
+            server.server_port)]
+        self.assertEqual(
+            stats, {'connections': 1, 'requests': 4, 'reused': 3})
+
+    def test_cookies_not_stored(self):
+        """Cookies set by the server are not sent by the next requests"""
+        url = self.serve(CookieHandler)
+        self.addCleanup(setattr, CookieHandler, 'received_cookies', [])
+        pooled = sessions.PooledRequests()
+        for _ in range(2):
+            self.assertIn('session', pooled.get(url).cookies)
+        self.assertEqual(CookieHandler.received_cookies, [None, None])
+        self.assertEqual(len(sessions.get_session(url).cookies), 0)
+
+    def test_pool_size(self):
+        """The pool size given to the pooled requests is used"""
+        pooled = sessions.PooledRequests(pool_size=3)
+        with mock.patch.object(
+                sessions.requests.Session, 'request') as request:
+            pooled.get('https://example.com/api/v2')
+        self.assertEqual(request.call_count, 1)
+        adapter = sessions.get_session(
+            'https://example.com/').get_adapter('https://example.com/')
+        self.assertEqual(adapter._pool_maxsize, 3)
+
+    def test_install_nailgun_sessions(self):
+        """nailgun.client is routed through the shared sessions"""
+        from nailgun import client
+        with mock.patch.object(client, 'requests', client.requests):
+            sessions.install_nailgun_sessions()
+            self.assertIsInstance(client.requests, sessions.PooledRequests)
+            with mock.patch.object(
+                    sessions.requests.Session, 'request') as request:
+                request.return_value.status_code = 200
+                client.get(
+                    'https://example.com/api/v2', auth=('a', 'b'),
+                    verify=False)
+            self.assertEqual(request.call_args[0][0], 'GET')
+            self.assertEqual(
+                list(sessions.session_stats()), ['https://example.com'])
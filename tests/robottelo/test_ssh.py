@@ -118,3 +118,20 @@ class SSHTestCase(TestCase):
         self.assertEqual(connection.set_missing_host_key_policy_, 1)
         self.assertEqual(connection.connect_, 1)
         self.assertEqual(connection.close_, 1)
+
+    @mock.patch('robottelo.ssh._connect')
+    def test_shared_connection(self, connect):
+        """Test method ``get_shared_connection`` reuses the connection to a
+        server while it is active, and reconnects once it is not.
+        """
+        self.addCleanup(ssh.close_shared_connections)
+        first = ssh.get_shared_connection('example.com')
+        self.assertIs(ssh.get_shared_connection('example.com'), first)
+        connect.assert_called_once_with(hostname='example.com')
+        first.get_transport.return_value.is_active.return_value = False
+        connect.return_value = mock.MagicMock()
+        second = ssh.get_shared_connection('example.com')
+        self.assertIsNot(second, first)
+        first.close.assert_called_once_with()
+        ssh.close_shared_connections()
+        second.close.assert_called_once_with()
@@ -0,0 +1,114 @@
+"""Tests for module ``robottelo.test``."""
+import csv
+import os
+import shutil
+import six
+import tempfile
+
+from unittest2 import TestCase, skipIf
+
+from robottelo.performance.histogram import LatencyRecorder
+try:
+    from robottelo.test import ConcurrentTestCase
+except ImportError:  # pygal does not support every interpreter
+    ConcurrentTestCase = None
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+@skipIf(ConcurrentTestCase is None, 'pygal is not importable')
+class ConcurrentStatTestCase(TestCase):
+    """Tests for the statistics of ``robottelo.test.ConcurrentTestCase``."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.stat_file = os.path.join(self.tmpdir, 'perf-stat-ak.csv')
+
+        class Case(ConcurrentTestCase):
+            """Concurrent test case whose class was not set up"""
+            def runTest(self):
+                """Nothing to run"""
+
+        self.case = Case()
+        self.case.bucket_size = 2
+        self.case.num_buckets = 2
+        self.case.chart_renderer = mock.Mock()
+        self.case.logger = mock.Mock()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_all_failed_client(self):
+        """Clients whose operations all failed are reported, not charted"""
+        self.case._write_stat_csv_chart(
+            self.stat_file,
+            {'thread-0': [1, 2, 3, 4], 'thread-1': []},
+            2,
+            'ak-2-clients',
+        )
+        with open(self.stat_file) as handler:
+            rows = list(csv.reader(handler))
+        self.assertEqual(
+            rows.count(['all operations failed']), 2)
+        charts = dict(
+            (call[0][2], call[0][1])
+            for call in self.case.chart_renderer.submit.call_args_list
+        )
+        self.assertFalse([head for head in charts if 'Client-1 ' in head])
+        per_client = [
+            stat_dict for head, stat_dict in charts.items()
+            if 'per client:' in head
+        ]
+        self.assertEqual(
+            [sorted(stat_dict) for stat_dict in per_client], [[0]])
+
+    def test_all_failed_test(self):
+        """Tests whose operations all failed are reported, not charted"""
+        self.case._write_stat_per_test(
+            self.stat_file, {'thread-0': [], 'thread-1': []})
+        with open(self.stat_file) as handler:
+            rows = list(csv.reader(handler))
+        self.assertEqual(rows, [[], ['test-2'], ['all operations failed']])
+        self.assertFalse(self.case.chart_renderer.submit.called)
+
+    def charts(self):
+        """Return the stat dictionaries submitted to the chart renderer, by
+        chart filename
+        """
+        return dict(
+            (call[0][3], call[0][1])
+            for call in self.case.chart_renderer.submit.call_args_list
+        )
+
+    def test_recorded_timings(self):
+        """Timings of a latency recorder give the same charts"""
+        timings = {'thread-0': [1, 2, 3, 4], 'thread-1': [5, 6, 7]}
+        self.case._write_stat_csv_chart(
+            self.stat_file, timings, 2, 'ak-2-clients')
+        expected = self.charts()
+        self.case.chart_renderer.reset_mock()
+        recorder = LatencyRecorder(bucket_size=self.case.bucket_size)
+        for key, time_list in timings.items():
+            for timing in time_list:
+                recorder.record(timing, key)
+        self.case._write_stat_csv_chart(
+            self.stat_file,
+            self.case._recorded_timings(
+                recorder, {'thread-0': [], 'thread-1': []}),
+            2,
+            'ak-2-clients',
+        )
+        charts = self.charts()
+        self.assertEqual(sorted(charts), sorted(expected))
+        for filename, stat_dict in charts.items():
+            self.assertEqual(sorted(stat_dict), sorted(expected[filename]))
+            for index, stats in stat_dict.items():
+                # min and max are exact, median and std approximated
+                self.assertEqual(
+                    (stats[0], stats[2]),
+                    (expected[filename][index][0],
+                     expected[filename][index][2]),
+                )
@@ -1,5 +1,6 @@
 """Tests for :mod:`robottelo.vm`."""
 import six
+import socket
 import unittest2
 from robottelo import ssh
 from robottelo.vm import VirtualMachine, VirtualMachineError
@@ -34,7 +35,11 @@ class VirtualMachineTestCase(unittest2.TestCase):
     @patch('time.sleep')
     @patch('robottelo.ssh.command', side_effect=[
         ssh.SSHCommandResult(),
+        ssh.SSHCommandResult(return_code=1),
         ssh.SSHCommandResult(stdout=['(192.168.0.1)']),
+        socket.error('Connection refused'),
+        ssh.SSHCommandResult(return_code=255),
+        ssh.SSHCommandResult(),
     ])
     def test_dont_create_if_already_created(
             self, ssh_command, sleep):
@@ -50,8 +55,13 @@ class VirtualMachineTestCase(unittest2.TestCase):
             vm.create()
             vm.create()
         self.assertEqual(vm.ip_addr, '192.168.0.1')
-        self.assertEqual(ssh_command.call_count, 2)
-        self.assertEqual(sleep.call_count, 1)
+        self.assertEqual(ssh_command.call_count, 6)
+        # the machine boots, then sshd starts
+        self.assertEqual(
+            ssh_command.call_args_list[-1],
+            call(u'true', hostname='192.168.0.1'),
+        )
+        self.assertEqual(sleep.call_count, 3)
 
     def test_invalid_distro(self):
         """Check if an exception is raised if an invalid distro is passed"""
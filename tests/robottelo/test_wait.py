@@ -0,0 +1,98 @@
+"""Tests for module ``robottelo.wait``."""
+import six
+
+from itertools import islice
+from robottelo import wait
+from robottelo.wait import WaitTimeoutError, backoff_delays, wait_for
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class FakeClock(object):
+    """Replace ``time.time`` and ``time.sleep`` on ``robottelo.wait``."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def time(self):
+        """Return the fake current time."""
+        return self.now
+
+    def sleep(self, seconds):
+        """Move the fake clock forward."""
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class WaitForTestCase(TestCase):
+    """Tests for :func:`robottelo.wait.wait_for`."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(wait, 'time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        wait.reset_wait_stats()
+
+    def test_returns_condition_value(self):
+        """The first truthy value returned by the condition is returned"""
+        results = iter([None, [], ['repo']])
+        self.assertEqual(
+            wait_for(lambda: next(results), jitter=0, name='repo'), ['repo'])
+        self.assertEqual(self.clock.sleeps, [1, 2])
+        self.assertEqual(
+            wait.wait_stats()['repo'],
+            {'calls': 1, 'attempts': 3, 'timeouts': 0, 'waited': 3.0}
+        )
+
+    def test_timeout(self):
+        """Timing out raises and never sleeps past the timeout"""
+        with self.assertRaises(WaitTimeoutError):
+            wait_for(lambda: False, timeout=10, jitter=0, name='never')
+        self.assertEqual(self.clock.sleeps, [1, 2, 4, 3])
+        self.assertEqual(wait.wait_stats()['never']['timeouts'], 1)
+
+    def test_not_ready_exceptions(self):
+        """Expected exceptions mean not ready, others are raised"""
+        def condition():
+            """Raise a not ready error."""
+            raise ValueError('not yet')
+
+        with self.assertRaises(WaitTimeoutError) as context:
+            wait_for(condition, timeout=3, exceptions=(ValueError,))
+        self.assertIn('not yet', str(context.exception))
+        with self.assertRaises(ValueError):
+            wait_for(condition, timeout=3)
+
+    def test_deadline_propagation(self):
+        """A nested wait never waits past the outer deadline"""
+        def outer():
+            """Run an inner wait which would take longer than the outer."""
+            self.assertEqual(wait.current_deadline(), 1005.0)
+            wait_for(lambda: False, timeout=60, jitter=0)
+
+        with self.assertRaises(WaitTimeoutError):
+            wait_for(outer, timeout=5)
+        self.assertEqual(self.clock.now, 1005.0)
+        self.assertIsNone(wait.current_deadline())
+
+
+class BackoffDelaysTestCase(TestCase):
+    """Tests for :func:`robottelo.wait.backoff_delays`."""
+
+    def test_max_delay(self):
+        """Delays grow exponentially up to the maximum"""
+        self.assertEqual(
+            list(islice(backoff_delays(1, 3, 10, jitter=0), 4)),
+            [1, 3, 9, 10]
+        )
+
+    def test_jitter(self):
+        """Jitter keeps delays within the given fraction"""
+        for delay in islice(backoff_delays(10, 1, jitter=0.5), 50):
+            self.assertTrue(5 <= delay <= 15)